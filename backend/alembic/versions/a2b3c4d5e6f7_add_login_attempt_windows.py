@@ -0,0 +1,38 @@
+"""add login attempt windows
+
+Revision ID: a2b3c4d5e6f7
+Revises: z1a2b3c4d5e6
+Create Date: 2026-10-19 18:20:00
+
+The failed-login limiter kept its attempts in a per-process dict, so every
+extra web worker multiplied the allowed attempts. ``login_attempt_windows``
+holds one sliding-window counter per username that all workers share.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a2b3c4d5e6f7'
+down_revision = 'z1a2b3c4d5e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'login_attempt_windows',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=100), nullable=False),
+        sa.Column('window_index', sa.Integer(), nullable=False),
+        sa.Column('current_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('previous_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_login_attempt_windows_id', 'login_attempt_windows', ['id'])
+    op.create_index('ix_login_attempt_windows_username', 'login_attempt_windows', ['username'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_login_attempt_windows_username', table_name='login_attempt_windows')
+    op.drop_index('ix_login_attempt_windows_id', table_name='login_attempt_windows')
+    op.drop_table('login_attempt_windows')
@@ -0,0 +1,53 @@
+"""add tenant scoped composite indexes
+
+Revision ID: b3c4d5e6f7a8
+Revises: a2b3c4d5e6f7
+Create Date: 2026-10-19 18:55:00
+
+Hosted queries go through ``scope_query_to_user``, which pins
+``organization_id`` and ``branch_id`` before any endpoint filter. With only
+single-column indexes on those, PostgreSQL bitmap-ANDs or filters whole
+organizations to find one branch's date range or active rows. Each index here
+leads with the scope pair and continues with the hot query's own predicate and
+ordering columns. ``ix_sales_org_branch_created_id`` supersedes the
+branch-led ``ix_sales_branch_created_id``, which is dropped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b3c4d5e6f7a8'
+down_revision = 'a2b3c4d5e6f7'
+branch_labels = None
+depends_on = None
+
+TENANT_INDEXES = (
+    ('ix_sales_org_branch_created_id', 'sales', ['organization_id', 'branch_id', 'created_at', 'id']),
+    ('ix_sales_org_branch_status_created', 'sales', ['organization_id', 'branch_id', 'status', 'created_at']),
+    ('ix_products_org_branch_active_name', 'products', ['organization_id', 'branch_id', 'is_active', 'name']),
+    ('ix_product_batches_org_branch_expiry', 'product_batches', ['organization_id', 'branch_id', 'expiry_date']),
+    ('ix_stock_adjustments_org_branch_created', 'stock_adjustments', ['organization_id', 'branch_id', 'created_at']),
+    ('ix_customers_org_branch_active_name', 'customers', ['organization_id', 'branch_id', 'is_active', 'full_name']),
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+        op.get_bind().execute(sa.text("COMMIT"))
+        for idx_name, table_name, columns in TENANT_INDEXES:
+            op.get_bind().execute(sa.text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} "
+                f"ON {table_name} ({', '.join(columns)})"
+            ))
+        op.get_bind().execute(sa.text("DROP INDEX CONCURRENTLY IF EXISTS ix_sales_branch_created_id"))
+        op.get_bind().execute(sa.text("BEGIN"))
+    else:
+        for idx_name, table_name, columns in TENANT_INDEXES:
+            op.create_index(idx_name, table_name, columns)
+        op.drop_index('ix_sales_branch_created_id', table_name='sales')
+
+
+def downgrade() -> None:
+    op.create_index('ix_sales_branch_created_id', 'sales', ['branch_id', 'created_at', 'id'])
+    for idx_name, table_name, _columns in reversed(TENANT_INDEXES):
+        op.drop_index(idx_name, table_name=table_name)
@@ -0,0 +1,182 @@
+"""add till shifts
+
+Revision ID: c4d5e6f7a8b9
+Revises: b3c4d5e6f7a8
+Create Date: 2026-10-19 21:05:00
+
+Closeout and today-summary used to aggregate the day's sales and sale items
+on every call, at closing time when tills are still ringing up final sales.
+``till_shifts`` holds each cashier's drawer session with running totals by
+status and payment method, kept current by checkout and void/refund, and
+``sales.till_shift_id`` records which shift a sale was booked into.
+``sale_items.unit_cost`` snapshots the cost price so profit stays fixed once
+sold. History is backfilled as one closed shift per cashier, branch and UTC
+business day, computed set-based from the existing sales.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c4d5e6f7a8b9'
+down_revision = 'b3c4d5e6f7a8'
+branch_labels = None
+depends_on = None
+
+PAYMENT_COLUMNS = (
+    ('CASH', 'cash_amount'),
+    ('MOMO', 'momo_amount'),
+    ('CARD', 'card_amount'),
+    ('BANK_TRANSFER', 'bank_transfer_amount'),
+    ('CREDIT', 'credit_amount'),
+)
+STATUS_COLUMNS = (
+    ('COMPLETED', 'completed_count', 'completed_amount'),
+    ('REFUNDED', 'refunded_count', 'refunded_amount'),
+    ('CANCELLED', 'cancelled_count', 'cancelled_amount'),
+)
+
+
+def _money_column(name: str, nullable: bool = False) -> sa.Column:
+    if nullable:
+        return sa.Column(name, sa.Numeric(12, 2), nullable=True)
+    return sa.Column(name, sa.Numeric(12, 2), nullable=False, server_default='0')
+
+
+def _backfill(bind) -> None:
+    if bind.dialect.name == "postgresql":
+        business_date = "CAST(timezone('UTC', {}.created_at) AS date)"
+        same = "IS NOT DISTINCT FROM"
+        # A bare literal in INSERT ... SELECT is text, which has no assignment cast to an enum.
+        closed = "CAST('CLOSED' AS tillshiftstatus)"
+    else:
+        business_date = "date({}.created_at)"
+        same = "IS"
+        closed = "'CLOSED'"
+
+    bind.execute(sa.text(
+        """
+        UPDATE sale_items
+        SET unit_cost = (SELECT products.cost_price FROM products WHERE products.id = sale_items.product_id)
+        """
+    ))
+
+    total_columns = []
+    total_values = []
+    for status, count_column, amount_column in STATUS_COLUMNS:
+        total_columns += [count_column, amount_column]
+        total_values += [
+            f"SUM(CASE WHEN s.status = '{status}' THEN 1 ELSE 0 END)",
+            f"SUM(CASE WHEN s.status = '{status}' THEN s.total_amount ELSE 0 END)",
+        ]
+    for method, column in PAYMENT_COLUMNS:
+        total_columns.append(column)
+        total_values.append(
+            f"SUM(CASE WHEN s.status = 'COMPLETED' AND s.payment_method = '{method}' "
+            "THEN s.total_amount ELSE 0 END)"
+        )
+    total_columns += ['items_sold', 'gross_profit']
+    total_values += [
+        "SUM(CASE WHEN s.status = 'COMPLETED' THEN COALESCE(lines.units, 0) ELSE 0 END)",
+        "SUM(CASE WHEN s.status = 'COMPLETED' THEN COALESCE(lines.profit, 0) ELSE 0 END)",
+    ]
+    sale_date = business_date.format("s")
+    bind.execute(sa.text(
+        f"""
+        INSERT INTO till_shifts (
+            organization_id, branch_id, user_id, business_date, status,
+            opened_at, closed_at, opening_float, {', '.join(total_columns)}
+        )
+        SELECT s.organization_id, s.branch_id, s.user_id, {sale_date}, {closed},
+               MIN(s.created_at), MAX(s.created_at), 0, {', '.join(total_values)}
+        FROM sales AS s
+        LEFT JOIN (
+            SELECT sale_id,
+                   SUM(quantity) AS units,
+                   SUM((unit_price - COALESCE(unit_cost, 0)) * quantity) AS profit
+            FROM sale_items
+            GROUP BY sale_id
+        ) AS lines ON lines.sale_id = s.id
+        GROUP BY s.organization_id, s.branch_id, s.user_id, {sale_date}
+        """
+    ))
+    bind.execute(sa.text(
+        f"""
+        UPDATE sales
+        SET till_shift_id = (
+            SELECT t.id FROM till_shifts AS t
+            WHERE t.user_id = sales.user_id
+              AND t.business_date = {business_date.format("sales")}
+              AND t.organization_id {same} sales.organization_id
+              AND t.branch_id {same} sales.branch_id
+        )
+        """
+    ))
+
+
+def upgrade() -> None:
+    op.create_table(
+        'till_shifts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=True),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('business_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.Enum('OPEN', 'CLOSED', name='tillshiftstatus'), nullable=False),
+        sa.Column('opened_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('closed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('closed_by', sa.Integer(), nullable=True),
+        _money_column('opening_float'),
+        _money_column('counted_cash', nullable=True),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        _money_column('completed_amount'),
+        sa.Column('refunded_count', sa.Integer(), nullable=False, server_default='0'),
+        _money_column('refunded_amount'),
+        sa.Column('cancelled_count', sa.Integer(), nullable=False, server_default='0'),
+        _money_column('cancelled_amount'),
+        *[_money_column(column) for _method, column in PAYMENT_COLUMNS],
+        sa.Column('items_sold', sa.Integer(), nullable=False, server_default='0'),
+        _money_column('gross_profit'),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['closed_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_till_shifts_id'), 'till_shifts', ['id'])
+    op.create_index(op.f('ix_till_shifts_organization_id'), 'till_shifts', ['organization_id'])
+    op.create_index(op.f('ix_till_shifts_branch_id'), 'till_shifts', ['branch_id'])
+    op.create_index(op.f('ix_till_shifts_user_id'), 'till_shifts', ['user_id'])
+    op.create_index(
+        'ix_till_shifts_org_branch_business_date',
+        'till_shifts',
+        ['organization_id', 'branch_id', 'business_date'],
+    )
+    op.create_index(
+        'ix_till_shifts_user_business_date_status',
+        'till_shifts',
+        ['user_id', 'business_date', 'status'],
+    )
+
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.add_column(sa.Column('till_shift_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_sales_till_shift_id', 'till_shifts', ['till_shift_id'], ['id'])
+    op.add_column('sale_items', _money_column('unit_cost', nullable=True))
+
+    _backfill(op.get_bind())
+    op.create_index(op.f('ix_sales_till_shift_id'), 'sales', ['till_shift_id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sales_till_shift_id'), table_name='sales')
+    op.drop_column('sale_items', 'unit_cost')
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.drop_constraint('fk_sales_till_shift_id', type_='foreignkey')
+        batch_op.drop_column('till_shift_id')
+    op.drop_index('ix_till_shifts_user_business_date_status', table_name='till_shifts')
+    op.drop_index('ix_till_shifts_org_branch_business_date', table_name='till_shifts')
+    op.drop_index(op.f('ix_till_shifts_user_id'), table_name='till_shifts')
+    op.drop_index(op.f('ix_till_shifts_branch_id'), table_name='till_shifts')
+    op.drop_index(op.f('ix_till_shifts_organization_id'), table_name='till_shifts')
+    op.drop_index(op.f('ix_till_shifts_id'), table_name='till_shifts')
+    op.drop_table('till_shifts')
+    if op.get_bind().dialect.name == "postgresql":
+        sa.Enum(name='tillshiftstatus').drop(op.get_bind(), checkfirst=True)
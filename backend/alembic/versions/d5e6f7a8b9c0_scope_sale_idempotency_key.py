@@ -0,0 +1,35 @@
+"""scope sale idempotency keys to their branch
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-20 00:20:00
+
+``sales.idempotency_key`` was unique across the whole database while replays
+are only matched within the caller's organization and branch, so a key that
+another tenant had already used (e.g. a ``TMP-<date>-<digits>`` fallback)
+failed ``/sales/batch`` as "already used by another sale". Keys are now
+unique per (organization_id, branch_id).
+"""
+from alembic import op
+
+revision = 'd5e6f7a8b9c0'
+down_revision = 'c4d5e6f7a8b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_sales_idempotency_key', table_name='sales')
+    op.create_index('ix_sales_idempotency_key', 'sales', ['idempotency_key'])
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_sales_org_branch_idempotency_key',
+            ['organization_id', 'branch_id', 'idempotency_key'],
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.drop_constraint('uq_sales_org_branch_idempotency_key', type_='unique')
+    op.drop_index('ix_sales_idempotency_key', table_name='sales')
+    op.create_index('ix_sales_idempotency_key', 'sales', ['idempotency_key'], unique=True)
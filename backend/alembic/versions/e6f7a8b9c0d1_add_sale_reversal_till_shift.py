@@ -0,0 +1,35 @@
+"""add the till shift that booked a late sale reversal
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-20 00:40:00
+
+A void or refund used to be booked into the shift that rang up the sale even
+after that shift was closed, rewriting its counted drawer's expected cash and
+variance. Reversals of a closed shift's sale are now booked into the
+reversing user's open shift, recorded in ``sales.reversal_till_shift_id``.
+Existing reversals stay in the sale's own shift, which a NULL means.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e6f7a8b9c0d1'
+down_revision = 'd5e6f7a8b9c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.add_column(sa.Column('reversal_till_shift_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_sales_reversal_till_shift_id', 'till_shifts', ['reversal_till_shift_id'], ['id'],
+        )
+    op.create_index(op.f('ix_sales_reversal_till_shift_id'), 'sales', ['reversal_till_shift_id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sales_reversal_till_shift_id'), table_name='sales')
+    with op.batch_alter_table('sales') as batch_op:
+        batch_op.drop_constraint('fk_sales_reversal_till_shift_id', type_='foreignkey')
+        batch_op.drop_column('reversal_till_shift_id')
@@ -0,0 +1,41 @@
+"""add ai response cache
+
+Revision ID: r3s4t5u6v7w8
+Revises: q2r3s4t5u6v7
+Create Date: 2026-10-19 09:00:00
+
+Optional persistent tier for the external AI response cache so identical
+questions over identical evidence survive process restarts within the TTL.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'r3s4t5u6v7w8'
+down_revision = 'q2r3s4t5u6v7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ai_response_cache_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_ai_response_cache_entries_id', 'ai_response_cache_entries', ['id'])
+    op.create_index('ix_ai_response_cache_entries_cache_key', 'ai_response_cache_entries', ['cache_key'], unique=True)
+    op.create_index('ix_ai_response_cache_entries_expires_at', 'ai_response_cache_entries', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ai_response_cache_entries_expires_at', table_name='ai_response_cache_entries')
+    op.drop_index('ix_ai_response_cache_entries_cache_key', table_name='ai_response_cache_entries')
+    op.drop_index('ix_ai_response_cache_entries_id', table_name='ai_response_cache_entries')
+    op.drop_table('ai_response_cache_entries')
@@ -0,0 +1,26 @@
+"""add sale idempotency key
+
+Revision ID: s4t5u6v7w8x9
+Revises: r3s4t5u6v7w8
+Create Date: 2026-10-19 12:30:00
+
+Client-generated key per sale so replaying the offline queue after a lost
+response returns the original sale instead of dispensing stock twice.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 's4t5u6v7w8x9'
+down_revision = 'r3s4t5u6v7w8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('sales', sa.Column('idempotency_key', sa.String(length=100), nullable=True))
+    op.create_index('ix_sales_idempotency_key', 'sales', ['idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sales_idempotency_key', table_name='sales')
+    op.drop_column('sales', 'idempotency_key')
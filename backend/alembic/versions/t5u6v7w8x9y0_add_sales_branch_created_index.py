@@ -0,0 +1,39 @@
+"""add sales history indexes
+
+Revision ID: t5u6v7w8x9y0
+Revises: s4t5u6v7w8x9
+Create Date: 2026-10-19 13:05:00
+
+Serves the sales history listing: half-open ``created_at`` ranges within a
+branch, ordered and paged by the ``(created_at, id)`` keyset, plus the
+``sale_items.sale_id`` foreign key its ``selectinload`` of items filters on.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 't5u6v7w8x9y0'
+down_revision = 's4t5u6v7w8x9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+        op.get_bind().execute(sa.text("COMMIT"))
+        for idx_name, idx_on in (
+            ("ix_sales_branch_created_id", "sales (branch_id, created_at, id)"),
+            ("ix_sale_items_sale_id", "sale_items (sale_id)"),
+        ):
+            op.get_bind().execute(sa.text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} ON {idx_on}"
+            ))
+        op.get_bind().execute(sa.text("BEGIN"))
+    else:
+        op.create_index('ix_sales_branch_created_id', 'sales', ['branch_id', 'created_at', 'id'])
+        op.create_index('ix_sale_items_sale_id', 'sale_items', ['sale_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sale_items_sale_id', table_name='sale_items')
+    op.drop_index('ix_sales_branch_created_id', table_name='sales')
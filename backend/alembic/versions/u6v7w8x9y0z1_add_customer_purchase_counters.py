@@ -0,0 +1,108 @@
+"""add customer purchase counters and search indexes
+
+Revision ID: u6v7w8x9y0z1
+Revises: t5u6v7w8x9y0
+Create Date: 2026-10-19 14:15:00
+
+Customer list and profile reads used to count each customer's sales one
+query at a time. ``purchase_count``, ``last_purchase_at`` and
+``lifetime_spend`` are now kept on the customer by checkout and void/refund,
+and are backfilled here from completed sales. Search moves off
+``ILIKE '%q%'`` table scans onto a digits-only ``phone_normalized`` prefix
+index and, on PostgreSQL, a ``pg_trgm`` GIN index on ``full_name``.
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'u6v7w8x9y0z1'
+down_revision = 't5u6v7w8x9y0'
+branch_labels = None
+depends_on = None
+
+
+def _normalize_phone(phone: str) -> str:
+    # Frozen copy of app.models.customer.normalize_phone.
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("00233"):
+        digits = digits[2:]
+    if digits.startswith("233"):
+        digits = "0" + digits[3:]
+    return digits
+
+
+def upgrade() -> None:
+    op.add_column('customers', sa.Column('phone_normalized', sa.String(length=30), nullable=True))
+    op.add_column(
+        'customers',
+        sa.Column('purchase_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column('customers', sa.Column('last_purchase_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        'customers',
+        sa.Column('lifetime_spend', sa.Numeric(12, 2), nullable=False, server_default='0'),
+    )
+
+    bind = op.get_bind()
+    bind.execute(sa.text(
+        """
+        UPDATE customers
+        SET purchase_count = totals.purchase_count,
+            last_purchase_at = totals.last_purchase_at,
+            lifetime_spend = totals.lifetime_spend
+        FROM (
+            SELECT customer_id,
+                   COUNT(*) AS purchase_count,
+                   MAX(created_at) AS last_purchase_at,
+                   COALESCE(SUM(total_amount), 0) AS lifetime_spend
+            FROM sales
+            WHERE customer_id IS NOT NULL AND status = 'COMPLETED'
+            GROUP BY customer_id
+        ) AS totals
+        WHERE customers.id = totals.customer_id
+        """
+    ))
+
+    if bind.dialect.name == "postgresql":
+        bind.execute(sa.text(
+            """
+            UPDATE customers
+            SET phone_normalized = regexp_replace(
+                regexp_replace(regexp_replace(phone, '\\D', '', 'g'), '^00233', '233'),
+                '^233', '0'
+            )
+            """
+        ))
+        bind.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+        bind.execute(sa.text("COMMIT"))
+        for idx_name, idx_on in (
+            (
+                "ix_customers_org_phone_normalized",
+                "customers (organization_id, phone_normalized varchar_pattern_ops)",
+            ),
+            ("ix_customers_full_name_trgm", "customers USING gin (full_name gin_trgm_ops)"),
+        ):
+            bind.execute(sa.text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {idx_name} ON {idx_on}"
+            ))
+        bind.execute(sa.text("BEGIN"))
+    else:
+        rows = bind.execute(sa.text("SELECT id, phone FROM customers")).fetchall()
+        for customer_id, phone in rows:
+            bind.execute(
+                sa.text("UPDATE customers SET phone_normalized = :normalized WHERE id = :id"),
+                {"normalized": _normalize_phone(phone), "id": customer_id},
+            )
+        op.create_index('ix_customers_org_phone_normalized', 'customers', ['organization_id', 'phone_normalized'])
+        op.create_index('ix_customers_full_name_trgm', 'customers', ['full_name'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_customers_full_name_trgm', table_name='customers')
+    op.drop_index('ix_customers_org_phone_normalized', table_name='customers')
+    op.drop_column('customers', 'lifetime_spend')
+    op.drop_column('customers', 'last_purchase_at')
+    op.drop_column('customers', 'purchase_count')
+    op.drop_column('customers', 'phone_normalized')
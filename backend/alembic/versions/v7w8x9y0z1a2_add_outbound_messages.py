@@ -0,0 +1,71 @@
+"""add outbound message queue
+
+Revision ID: v7w8x9y0z1a2
+Revises: u6v7w8x9y0z1
+Create Date: 2026-10-19 15:25:00
+
+Digital receipts used to be sent to the SMS provider inside the checkout
+request. ``outbound_messages`` queues them instead; the scheduler's message
+worker claims due rows by ``(status, next_attempt_at, id)`` and delivers them
+in batches with retries.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'v7w8x9y0z1a2'
+down_revision = 'u6v7w8x9y0z1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbound_messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=True),
+        sa.Column('customer_id', sa.Integer(), nullable=False),
+        sa.Column('sale_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(length=30), nullable=False, server_default='receipt'),
+        sa.Column('channel', sa.String(length=20), nullable=False),
+        sa.Column('recipient', sa.String(length=30), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('pending', 'sent', 'failed', name='outboundmessagestatus'),
+            nullable=False,
+            server_default='pending',
+        ),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('provider_message_id', sa.String(length=200), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+        sa.ForeignKeyConstraint(['sale_id'], ['sales.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_outbound_messages_id', 'outbound_messages', ['id'])
+    op.create_index('ix_outbound_messages_organization_id', 'outbound_messages', ['organization_id'])
+    op.create_index('ix_outbound_messages_branch_id', 'outbound_messages', ['branch_id'])
+    op.create_index('ix_outbound_messages_customer_id', 'outbound_messages', ['customer_id'])
+    op.create_index('ix_outbound_messages_sale_id', 'outbound_messages', ['sale_id'])
+    op.create_index(
+        'ix_outbound_messages_status_next_attempt',
+        'outbound_messages',
+        ['status', 'next_attempt_at', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbound_messages_status_next_attempt', table_name='outbound_messages')
+    op.drop_index('ix_outbound_messages_sale_id', table_name='outbound_messages')
+    op.drop_index('ix_outbound_messages_customer_id', table_name='outbound_messages')
+    op.drop_index('ix_outbound_messages_branch_id', table_name='outbound_messages')
+    op.drop_index('ix_outbound_messages_organization_id', table_name='outbound_messages')
+    op.drop_index('ix_outbound_messages_id', table_name='outbound_messages')
+    op.drop_table('outbound_messages')
+    op.execute('DROP TYPE IF EXISTS outboundmessagestatus')
@@ -0,0 +1,37 @@
+"""add cloud fleet summary
+
+Revision ID: w8x9y0z1a2b3
+Revises: v7w8x9y0z1a2
+Create Date: 2026-10-19 16:00:00
+
+The vendor command center used to load every organization, branch, device
+and heartbeat snapshot per request. ``cloud_fleet_summaries`` holds the
+device/heartbeat rollup, rebuilt when heartbeats are projected and served
+while fresh when ``ADMIN_FLEET_SUMMARY_CACHE_ENABLED`` is on.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'w8x9y0z1a2b3'
+down_revision = 'v7w8x9y0z1a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cloud_fleet_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scope', sa.String(length=50), nullable=False, server_default='fleet'),
+        sa.Column('generated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('scope'),
+    )
+    op.create_index('ix_cloud_fleet_summaries_id', 'cloud_fleet_summaries', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cloud_fleet_summaries_id', table_name='cloud_fleet_summaries')
+    op.drop_table('cloud_fleet_summaries')
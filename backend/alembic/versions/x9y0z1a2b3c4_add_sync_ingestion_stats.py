@@ -0,0 +1,73 @@
+"""add sync ingestion counters
+
+Revision ID: x9y0z1a2b3c4
+Revises: w8x9y0z1a2b3
+Create Date: 2026-10-19 16:35:00
+
+Sync-health reads used to COUNT/SUM over the whole ``ingested_sync_events``
+table. ``sync_ingestion_stats`` keeps per (organization, branch, device)
+ingested/projected/failed/duplicate counters and latest timestamps, updated by
+ingest and projection; it is backfilled here from the event log.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'x9y0z1a2b3c4'
+down_revision = 'w8x9y0z1a2b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_ingestion_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=False),
+        sa.Column('source_device_id', sa.Integer(), nullable=False),
+        sa.Column('ingested_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('projected_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('duplicate_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_received_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_projected_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id']),
+        sa.ForeignKeyConstraint(['branch_id'], ['branches.id']),
+        sa.ForeignKeyConstraint(['source_device_id'], ['devices.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'organization_id',
+            'branch_id',
+            'source_device_id',
+            name='uq_sync_ingestion_stats_source',
+        ),
+    )
+    op.create_index('ix_sync_ingestion_stats_id', 'sync_ingestion_stats', ['id'])
+    op.create_index('ix_sync_ingestion_stats_organization_id', 'sync_ingestion_stats', ['organization_id'])
+    op.create_index('ix_sync_ingestion_stats_branch_id', 'sync_ingestion_stats', ['branch_id'])
+    op.create_index('ix_sync_ingestion_stats_source_device_id', 'sync_ingestion_stats', ['source_device_id'])
+
+    op.execute(
+        """
+        INSERT INTO sync_ingestion_stats (
+            organization_id, branch_id, source_device_id,
+            ingested_count, projected_count, failed_count, duplicate_count,
+            last_received_at, last_projected_at
+        )
+        SELECT organization_id, branch_id, source_device_id,
+               COUNT(id), COUNT(projected_at), COUNT(projection_error),
+               COALESCE(SUM(duplicate_count), 0),
+               MAX(received_at), MAX(projected_at)
+        FROM ingested_sync_events
+        GROUP BY organization_id, branch_id, source_device_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_ingestion_stats_source_device_id', table_name='sync_ingestion_stats')
+    op.drop_index('ix_sync_ingestion_stats_branch_id', table_name='sync_ingestion_stats')
+    op.drop_index('ix_sync_ingestion_stats_organization_id', table_name='sync_ingestion_stats')
+    op.drop_index('ix_sync_ingestion_stats_id', table_name='sync_ingestion_stats')
+    op.drop_table('sync_ingestion_stats')
@@ -0,0 +1,68 @@
+"""add sync event archive watermarks
+
+Revision ID: y0z1a2b3c4d5
+Revises: x9y0z1a2b3c4
+Create Date: 2026-10-19 17:10:00
+
+Projected ``ingested_sync_events`` older than ``SYNC_EVENT_ARCHIVE_AFTER_DAYS``
+are moved to compressed cold storage. ``sync_ingestion_stats`` gains the
+per-device ``archived_through_sequence`` watermark that keeps re-uploads of
+archived events idempotent, plus the archived counts that keep sync-health
+totals whole. The projection tables' foreign keys to the event log are
+dropped so archived rows can be deleted; ``source_event_id`` stays as a plain
+indexed reference.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'y0z1a2b3c4d5'
+down_revision = 'x9y0z1a2b3c4'
+branch_labels = None
+depends_on = None
+
+SOURCE_EVENT_REFERENCES = (
+    ('cloud_sale_facts', 'source_event_id'),
+    ('cloud_inventory_movement_facts', 'source_event_id'),
+    ('cloud_product_snapshots', 'last_source_event_id'),
+    ('cloud_batch_snapshots', 'last_source_event_id'),
+    ('cloud_device_heartbeat_snapshots', 'last_source_event_id'),
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'sync_ingestion_stats',
+        sa.Column('archived_through_sequence', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'sync_ingestion_stats',
+        sa.Column('archived_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column(
+        'sync_ingestion_stats',
+        sa.Column('archived_duplicate_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for table_name, column_name in SOURCE_EVENT_REFERENCES:
+            bind.execute(sa.text(
+                f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {table_name}_{column_name}_fkey"
+            ))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Only restorable while nothing has been archived yet.
+        for table_name, column_name in SOURCE_EVENT_REFERENCES:
+            op.create_foreign_key(
+                f'{table_name}_{column_name}_fkey',
+                table_name,
+                'ingested_sync_events',
+                [column_name],
+                ['id'],
+            )
+    op.drop_column('sync_ingestion_stats', 'archived_duplicate_count')
+    op.drop_column('sync_ingestion_stats', 'archived_count')
+    op.drop_column('sync_ingestion_stats', 'archived_through_sequence')
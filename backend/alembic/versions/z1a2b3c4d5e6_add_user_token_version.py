@@ -0,0 +1,30 @@
+"""add user token version
+
+Revision ID: z1a2b3c4d5e6
+Revises: y0z1a2b3c4d5
+Create Date: 2026-10-19 17:45:00
+
+Authenticated principals are cached per ``(user id, token version)`` instead
+of loading the user on every request. ``token_version`` is bumped when a
+user's password changes or the user is deactivated, which revokes access
+tokens issued before the change. Existing tokens carry no version and match
+the default of 0.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'z1a2b3c4d5e6'
+down_revision = 'y0z1a2b3c4d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
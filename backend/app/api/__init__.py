@@ -1,7 +1,7 @@
 """
 API package initialization.
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from app.api.endpoints import (
     admin_tenancy,
@@ -22,27 +22,36 @@ from app.api.endpoints import (
     system_ops,
     telegram,
     customers,
+    till_shifts,
 )
+from app.db.workloads import Workload, use_workload
 
 # Create main API router
 api_router = APIRouter()
 
-# Include all endpoint routers
-api_router.include_router(admin_tenancy.router)
-api_router.include_router(auth.router)
-api_router.include_router(users.router)
-api_router.include_router(products.router)
-api_router.include_router(categories.router)
-api_router.include_router(suppliers.router)
-api_router.include_router(sales.router)
-api_router.include_router(stock_adjustments.router)
-api_router.include_router(stock_takes.router)
-api_router.include_router(ai_manager.router)
-api_router.include_router(sync.router)
-api_router.include_router(cloud_reports.router)
-api_router.include_router(notifications.router)
-api_router.include_router(dashboard.router)
-api_router.include_router(insights.router)
-api_router.include_router(system_ops.router)
-api_router.include_router(telegram.router)
-api_router.include_router(customers.router)
+
+def _tagged(workload: Workload) -> dict:
+    """Route every request of a router through ``workload``'s connection pool."""
+    return {"dependencies": [Depends(use_workload(workload))]}
+
+
+# Include all endpoint routers, each tagged with its workload class
+api_router.include_router(admin_tenancy.router, **_tagged(Workload.INTERACTIVE_READ))
+api_router.include_router(auth.router, **_tagged(Workload.POS_CRITICAL))
+api_router.include_router(users.router, **_tagged(Workload.INTERACTIVE_READ))
+api_router.include_router(products.router, **_tagged(Workload.INTERACTIVE_READ))
+api_router.include_router(categories.router, **_tagged(Workload.INTERACTIVE_READ))
+api_router.include_router(suppliers.router, **_tagged(Workload.INTERACTIVE_READ))
+api_router.include_router(sales.router, **_tagged(Workload.POS_CRITICAL))
+api_router.include_router(stock_adjustments.router, **_tagged(Workload.POS_CRITICAL))
+api_router.include_router(stock_takes.router, **_tagged(Workload.INTERACTIVE_READ))
+api_router.include_router(ai_manager.router, **_tagged(Workload.REPORTING))
+api_router.include_router(sync.router, **_tagged(Workload.SYNC_INGEST))
+api_router.include_router(cloud_reports.router, **_tagged(Workload.REPORTING))
+api_router.include_router(notifications.router, **_tagged(Workload.INTERACTIVE_READ))
+api_router.include_router(dashboard.router, **_tagged(Workload.REPORTING))
+api_router.include_router(insights.router, **_tagged(Workload.REPORTING))
+api_router.include_router(system_ops.router, **_tagged(Workload.REPORTING))
+api_router.include_router(telegram.router, **_tagged(Workload.REPORTING))
+api_router.include_router(customers.router, **_tagged(Workload.INTERACTIVE_READ))
+api_router.include_router(till_shifts.router, **_tagged(Workload.POS_CRITICAL))
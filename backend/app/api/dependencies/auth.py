@@ -1,35 +1,44 @@
 """
 Authentication dependencies for FastAPI endpoints.
 """
+import time
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.security import decode_access_token
 from app.db.base import get_db
 from app.models.user import User, UserPermission, UserRole
+from app.services.principal_cache import PRINCIPAL_CLAIM, AuthenticatedPrincipal, principal_cache
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user(
+def _principal_from_signed_claims(payload: dict, user_id: int, token_version: int) -> Optional[AuthenticatedPrincipal]:
+    claims = payload.get(PRINCIPAL_CLAIM)
+    issued_at = payload.get("iat")
+    if not claims or issued_at is None:
+        return None
+    if time.time() - issued_at >= settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS:
+        return None
+    return AuthenticatedPrincipal.from_claims(user_id, token_version, claims)
+
+
+def get_current_principal(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> User:
+) -> AuthenticatedPrincipal:
     """
-    Get the current authenticated user from JWT token.
+    Resolve the JWT to the caller's role, permissions and tenant scope.
 
-    Args:
-        token: JWT access token
-        db: Database session
-
-    Returns:
-        Current user object
+    Fresh signed claims are used as-is when enabled, then the principal
+    cache; the user row is only loaded on a miss.
 
     Raises:
-        HTTPException: If user not found or inactive
+        HTTPException: If user not found, token revoked, or user inactive
     """
     payload = decode_access_token(token)
     user_id: Optional[int] = payload.get("user_id")
@@ -40,20 +49,54 @@ def get_current_user(
             detail="Could not validate credentials",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+    # Tokens issued before token versions existed belong to version 0.
+    token_version = int(payload.get("token_version") or 0)
+    principal = None
+    if settings.AUTH_PRINCIPAL_SIGNED_CLAIMS:
+        principal = _principal_from_signed_claims(payload, user_id, token_version)
+    if principal is None and settings.AUTH_PRINCIPAL_CACHE_ENABLED:
+        principal = principal_cache.get(user_id, token_version)
+
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        if (user.token_version or 0) != token_version:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+            )
+        principal = AuthenticatedPrincipal.from_user(user)
+        if settings.AUTH_PRINCIPAL_CACHE_ENABLED:
+            principal_cache.put(principal)
 
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user",
         )
 
-    return user
+    return principal
+
+
+def get_current_user(
+    principal: AuthenticatedPrincipal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Get the current authenticated user from JWT token.
+
+    Args:
+        principal: Authenticated principal for the token
+        db: Database session
+
+    Returns:
+        Current user object, bound to ``db``
+    """
+    return principal.attach(db)
 
 
 def get_current_active_user(
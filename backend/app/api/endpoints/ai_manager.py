@@ -1,17 +1,25 @@
 """
 Read-only AI manager assistant endpoints.
 """
+import json
+import logging
+import queue
+import threading
 import time
 from collections import defaultdict
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi import status as http_status
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.api.dependencies import require_admin, require_manager, require_organization_access, require_view_reports
-from app.db.base import get_db
+from app.db.base import get_async_db, get_db
+from app.db.read_replica import get_read_db
 from app.models.ai_report import (
     AIChatMessage,
     AIChatSession,
@@ -48,6 +56,7 @@ from app.services.ai_weekly_report_service import AIWeeklyReportService
 from app.services.audit_service import AuditService
 
 router = APIRouter(prefix="/ai-manager", tags=["AI Manager Assistant"])
+logger = logging.getLogger(__name__)
 
 # ── AI chat rate limiter —————————————————————————————————————————
 # 10 requests per user per minute (single-process store, fine for a single
@@ -87,6 +96,63 @@ def chat_with_ai_manager(
 
     Rate-limited: {_AI_RATE_LIMIT_MAX} requests per user per {_AI_RATE_LIMIT_WINDOW}s.
     """
+    session, conversation_history = _start_chat_turn(db, payload=payload, current_user=current_user)
+
+    result = AIManagerService.answer(
+        db,
+        message=payload.message,
+        organization_id=payload.organization_id,
+        branch_id=payload.branch_id,
+        period_days=payload.period_days,
+        current_user=current_user,
+        conversation_history=conversation_history,
+    )
+
+    # Persist assistant message
+    assistant_msg = AIChatMessage(session_id=session.id, role="assistant", content=result["answer"])
+    db.add(assistant_msg)
+    db.commit()
+
+    return AIManagerChatResponse(session_id=session.id, **result)
+
+
+@router.post("/chat/stream")
+def stream_chat_with_ai_manager(
+    payload: AIManagerChatRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_manager),
+):
+    """
+    Same contract as ``POST /chat``, streamed as newline-delimited JSON.
+
+    Emits a ``session`` event first, then ``tool_call`` / ``tool_result`` /
+    ``partial_answer`` progress events while the provider works, and finally
+    one ``final`` event whose ``response`` matches ``AIManagerChatResponse``
+    (or an ``error`` event). Shares the /chat rate limit.
+    """
+    session, conversation_history = _start_chat_turn(db, payload=payload, current_user=current_user)
+    # The request session is closed before the body is streamed, so the
+    # worker gets its own session on the same engine.
+    db.commit()
+    return StreamingResponse(
+        _chat_event_stream(
+            db.get_bind(),
+            payload=payload,
+            session_id=session.id,
+            user_id=current_user.id,
+            conversation_history=conversation_history,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+def _start_chat_turn(
+    db: Session,
+    *,
+    payload: AIManagerChatRequest,
+    current_user: User,
+) -> Tuple[AIChatSession, List[Dict[str, str]]]:
+    """Rate-limit, authorize, and record the user's message for one chat turn."""
     # Rate limit first so we fail fast before hitting the DB or LLM
     _check_ai_rate_limit(current_user.id)
 
@@ -121,22 +187,52 @@ def chat_with_ai_manager(
     db.add(user_msg)
     db.flush()
 
-    result = AIManagerService.answer(
-        db,
-        message=payload.message,
-        organization_id=payload.organization_id,
-        branch_id=payload.branch_id,
-        period_days=payload.period_days,
-        current_user=current_user,
-        conversation_history=conversation_history,
-    )
+    return session, conversation_history
 
-    # Persist assistant message
-    assistant_msg = AIChatMessage(session_id=session.id, role="assistant", content=result["answer"])
-    db.add(assistant_msg)
-    db.commit()
 
-    return AIManagerChatResponse(session_id=session.id, **result)
+def _chat_event_stream(
+    bind,
+    *,
+    payload: AIManagerChatRequest,
+    session_id: int,
+    user_id: int,
+    conversation_history: List[Dict[str, str]],
+) -> Iterator[str]:
+    events: "queue.Queue[Any]" = queue.Queue()
+    finished = object()
+
+    def _worker() -> None:
+        worker_db = sessionmaker(bind=bind, autocommit=False, autoflush=False)()
+        try:
+            result = AIManagerService.answer(
+                worker_db,
+                message=payload.message,
+                organization_id=payload.organization_id,
+                branch_id=payload.branch_id,
+                period_days=payload.period_days,
+                current_user=worker_db.get(User, user_id),
+                conversation_history=conversation_history,
+                on_event=events.put,
+            )
+            worker_db.add(AIChatMessage(session_id=session_id, role="assistant", content=result["answer"]))
+            worker_db.commit()
+            response = AIManagerChatResponse(session_id=session_id, **result)
+            events.put({"type": "final", "response": response.model_dump(mode="json")})
+        except Exception:
+            worker_db.rollback()
+            logger.exception("AI manager streamed answer failed for session %s", session_id)
+            events.put({"type": "error", "detail": "The AI manager could not answer this question."})
+        finally:
+            worker_db.close()
+            events.put(finished)
+
+    threading.Thread(target=_worker, name="ai-chat-stream", daemon=True).start()
+    yield json.dumps({"type": "session", "session_id": session_id}) + "\n"
+    while True:
+        event = events.get()
+        if event is finished:
+            return
+        yield json.dumps(event, default=str) + "\n"
 
 
 @router.get("/sessions", response_model=List[AIChatSessionResponse])
@@ -262,13 +358,14 @@ def _finding_to_response(f) -> AIFindingResponse:
 
 
 @router.get("/briefing", response_model=AIManagerBriefing)
-def get_ai_manager_briefing(
+async def get_ai_manager_briefing(
     organization_id: int,
     branch_id: Optional[int] = None,
     period_days: int = Query(30, ge=1, le=365),
     max_findings: int = Query(5, ge=1, le=20),
     persist: bool = Query(False, description="If true, upsert all findings into the ai_findings table."),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_view_reports),
 ):
     """
@@ -278,6 +375,9 @@ def get_ai_manager_briefing(
     When persist=true, all findings (up to 50) are upserted into the ai_findings table
     so the owner can track and action them. Existing dismissed/resolved findings are
     left untouched; open/snoozed findings are refreshed.
+
+    The analyzers read from the read replica when it is fresh enough; findings
+    are always persisted on the primary.
     """
     require_organization_access(
         organization_id=organization_id,
@@ -288,25 +388,25 @@ def get_ai_manager_briefing(
 
     if persist:
         # Generate all findings (no cap) for persistence, then cap for response
-        full_result = AIBriefingService.briefing(
+        full_result = await AIBriefingService.briefing_async(
             db,
             organization_id=organization_id,
             branch_id=effective_branch_id,
             period_days=period_days,
             max_findings=50,
         )
-        AIFindingService.upsert_findings(
-            db,
+        await write_db.run_sync(
+            AIFindingService.upsert_findings,
             organization_id=organization_id,
             branch_id=effective_branch_id,
             findings=full_result["findings"],
             data_trust_status=full_result["data_trust_status"],
         )
-        db.commit()
+        await write_db.commit()
         # Return a capped view
         result = {**full_result, "findings": full_result["findings"][:max_findings]}
     else:
-        result = AIBriefingService.briefing(
+        result = await AIBriefingService.briefing_async(
             db,
             organization_id=organization_id,
             branch_id=effective_branch_id,
@@ -462,11 +562,11 @@ def generate_weekly_manager_report(
 
 
 @router.get("/weekly-reports", response_model=List[AIWeeklyManagerReportResponse])
-def list_weekly_manager_reports(
+async def list_weekly_manager_reports(
     organization_id: int,
     branch_id: Optional[int] = None,
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_view_reports),
 ):
     """List saved weekly manager reports within the user's tenant scope."""
@@ -476,8 +576,8 @@ def list_weekly_manager_reports(
         current_user=current_user,
     )
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    reports = AIWeeklyReportService.list_reports(
-        db,
+    reports = await db.run_sync(
+        AIWeeklyReportService.list_reports,
         organization_id=organization_id,
         branch_id=effective_branch_id,
         limit=limit,
@@ -486,13 +586,13 @@ def list_weekly_manager_reports(
 
 
 @router.get("/weekly-reports/{report_id}", response_model=AIWeeklyManagerReportResponse)
-def get_weekly_manager_report(
+async def get_weekly_manager_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_view_reports),
 ):
     """Fetch a saved weekly manager report by id."""
-    report = db.query(AIWeeklyManagerReport).filter(AIWeeklyManagerReport.id == report_id).first()
+    report = await db.get(AIWeeklyManagerReport, report_id)
     if report is None:
         raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Weekly manager report not found")
     require_organization_access(
@@ -576,14 +676,14 @@ def deliver_weekly_manager_report(
 
 
 @router.get("/weekly-reports/{report_id}/deliveries", response_model=List[AIWeeklyReportDeliveryResponse])
-def list_weekly_report_deliveries(
+async def list_weekly_report_deliveries(
     report_id: int,
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_view_reports),
 ):
     """List persisted delivery attempts for a saved weekly manager report."""
-    report = db.query(AIWeeklyManagerReport).filter(AIWeeklyManagerReport.id == report_id).first()
+    report = await db.get(AIWeeklyManagerReport, report_id)
     if report is None:
         raise HTTPException(status_code=http_status.HTTP_404_NOT_FOUND, detail="Weekly manager report not found")
     require_organization_access(
@@ -595,12 +695,13 @@ def list_weekly_report_deliveries(
         raise HTTPException(status_code=http_status.HTTP_403_FORBIDDEN, detail="Branch access denied")
 
     deliveries = (
-        db.query(AIWeeklyReportDelivery)
-        .filter(AIWeeklyReportDelivery.report_id == report.id)
-        .order_by(AIWeeklyReportDelivery.created_at.desc(), AIWeeklyReportDelivery.id.desc())
-        .limit(limit)
-        .all()
-    )
+        await db.execute(
+            select(AIWeeklyReportDelivery)
+            .filter(AIWeeklyReportDelivery.report_id == report.id)
+            .order_by(AIWeeklyReportDelivery.created_at.desc(), AIWeeklyReportDelivery.id.desc())
+            .limit(limit)
+        )
+    ).scalars().all()
     return [_delivery_response(delivery) for delivery in deliveries]
 
 
@@ -1,51 +1,54 @@
 """
 Authentication API endpoints.
 """
-import time
 import logging
-from collections import defaultdict
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from app.core.security import verify_password, create_access_token, get_password_hash
+from app.core.config import settings
+from app.core.password_pool import PasswordPoolBusy, password_pool
+from app.core.security import create_access_token, get_password_hash
 from app.db.base import get_db
 from app.models.user import User
 from app.schemas.user import Token, User as UserSchema
 from app.api.dependencies import get_current_active_user
+from app.services.login_rate_limiter import login_rate_limiter
+from app.services.principal_cache import PRINCIPAL_CLAIM, AuthenticatedPrincipal
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-# ── In-memory login rate limiter ──────────────────────────────────────────────
-# Suitable for single-process local pharmacy deployments. For multi-process
-# setups, swap to Redis-backed storage.
-_login_attempts: dict[str, list[float]] = defaultdict(list)
-_MAX_ATTEMPTS = 5
-_WINDOW_SECONDS = 300  # 5 minutes
-
 # Pre-computed dummy hash so that timing is constant when a user is not found.
 _DUMMY_HASH = get_password_hash("__dummy_never_match_placeholder__")
 
 
-def _check_rate_limit(username: str) -> None:
+def _check_rate_limit(db: Session, username: str) -> None:
     """Reject if too many recent failed login attempts for this username."""
-    now = time.time()
-    attempts = _login_attempts[username]
-    # Prune expired entries
-    _login_attempts[username] = [t for t in attempts if now - t < _WINDOW_SECONDS]
-    if len(_login_attempts[username]) >= _MAX_ATTEMPTS:
+    if login_rate_limiter.is_limited(db, username):
         logger.warning("Login rate limit exceeded for username=%s", username)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Too many login attempts. Try again in {_WINDOW_SECONDS // 60} minutes.",
+            detail=f"Too many login attempts. Try again in {login_rate_limiter.window_seconds // 60} minutes.",
         )
 
 
-def _record_failed_attempt(username: str) -> None:
-    _login_attempts[username].append(time.time())
+def _record_failed_attempt(db: Session, username: str) -> None:
+    login_rate_limiter.record_failure(db, username)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return password_pool.verify(plain_password, hashed_password)
+    except PasswordPoolBusy:
+        logger.warning("Password hashing queue full; asking client to retry login")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Login is busy. Please try again in a few seconds.",
+            headers={"Retry-After": "2"},
+        )
 
 
 @router.post("/login", response_model=Token)
@@ -69,23 +72,23 @@ def login(
     normalized_username = form_data.username.strip()
 
     # Rate-limit check (P1-07)
-    _check_rate_limit(normalized_username)
+    _check_rate_limit(db, normalized_username)
 
     # Find user by username
     user = db.query(User).filter(User.username == normalized_username).first()
 
     if not user:
         # Always run bcrypt to prevent timing-based username enumeration (P3-01)
-        verify_password("__dummy__", _DUMMY_HASH)
-        _record_failed_attempt(normalized_username)
+        _verify_password("__dummy__", _DUMMY_HASH)
+        _record_failed_attempt(db, normalized_username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not verify_password(form_data.password, user.hashed_password):
-        _record_failed_attempt(normalized_username)
+    if not _verify_password(form_data.password, user.hashed_password):
+        _record_failed_attempt(db, normalized_username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -99,7 +102,10 @@ def login(
         )
 
     # Create access token
-    access_token = create_access_token(data={"user_id": user.id, "username": user.username})
+    claims = {"user_id": user.id, "username": user.username, "token_version": user.token_version or 0}
+    if settings.AUTH_PRINCIPAL_SIGNED_CLAIMS:
+        claims[PRINCIPAL_CLAIM] = AuthenticatedPrincipal.from_user(user).to_claims()
+    access_token = create_access_token(data=claims)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -1,15 +1,28 @@
 """
 Cloud reporting endpoints backed by projected sync facts.
+
+The read-only reports are ``async def`` on the asyncio engine: a slow report
+awaits its queries instead of holding one of the threadpool threads that the
+sync POS routes run on. Independent sub-queries run concurrently through
+``gather_reads``. Analytics reports read through ``get_read_db``, which uses
+the read replica when one is configured and fresh enough; the response's
+``X-Data-Source`` and ``X-Data-Staleness-Seconds`` headers say which was
+used. Sync health and reconciliation read the primary, since they describe
+ingestion itself and must see repairs immediately. Reconciliation actions
+write and stay on ``get_db``.
 """
 from datetime import date, datetime, timedelta
+from functools import partial
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import case, func
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import require_admin, require_organization_access, require_view_reports
-from app.db.base import get_db
+from app.db.base import gather_reads, get_async_db, get_db
+from app.db.read_replica import get_read_db
 from app.models.user import User
 from app.models.cloud_projection import (
     CloudBatchSnapshot,
@@ -17,7 +30,6 @@ from app.models.cloud_projection import (
     CloudProductSnapshot,
     CloudSaleFact,
 )
-from app.models.sync_ingestion import IngestedSyncEvent
 from app.models.sync_event import SyncEventType
 from app.schemas.cloud_reports import (
     CloudBranchSalesSummary,
@@ -43,7 +55,9 @@ from app.schemas.cloud_reports import (
 from app.services.cloud_dead_stock_service import CloudDeadStockService
 from app.services.cloud_reconciliation_service import CloudReconciliationService
 from app.services.cloud_sales_trend_service import CloudSalesTrendService
+from app.services.cloud_stock_report_service import CloudStockReportService
 from app.services.cloud_stock_velocity_service import CloudStockVelocityService
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 router = APIRouter(prefix="/cloud-reports", tags=["Cloud Reports"])
 
@@ -67,16 +81,16 @@ def _resolve_branch_scope(current_user: User, branch_id: Optional[int]) -> Optio
 
 
 @router.get("/sales-summary", response_model=CloudSalesSummary)
-def get_cloud_sales_summary(
+async def get_cloud_sales_summary(
     organization_id: int,
     branch_id: Optional[int] = None,
     start_at: Optional[datetime] = None,
     end_at: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    query = db.query(
+    query = select(
         func.count(CloudSaleFact.id).label("sales_count"),
         func.coalesce(func.sum(CloudSaleFact.total_amount), 0).label("total_revenue"),
         func.coalesce(func.sum(CloudSaleFact.item_count), 0).label("total_items"),
@@ -85,7 +99,7 @@ def get_cloud_sales_summary(
     if effective_branch_id is not None:
         query = query.filter(CloudSaleFact.branch_id == effective_branch_id)
     query = _apply_time_filters(query, CloudSaleFact, start_at, end_at)
-    row = query.one()
+    row = (await db.execute(query)).one()
 
     sales_count = int(row.sales_count or 0)
     total_revenue = float(row.total_revenue or 0)
@@ -100,15 +114,15 @@ def get_cloud_sales_summary(
 
 
 @router.get("/branch-sales", response_model=List[CloudBranchSalesSummary])
-def get_cloud_branch_sales(
+async def get_cloud_branch_sales(
     organization_id: int,
     start_at: Optional[datetime] = None,
     end_at: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, None)
-    query = db.query(
+    query = select(
         CloudSaleFact.branch_id,
         func.count(CloudSaleFact.id).label("sales_count"),
         func.coalesce(func.sum(CloudSaleFact.total_amount), 0).label("total_revenue"),
@@ -119,7 +133,9 @@ def get_cloud_branch_sales(
         query = query.filter(CloudSaleFact.branch_id == effective_branch_id)
 
     query = _apply_time_filters(query, CloudSaleFact, start_at, end_at)
-    rows = query.group_by(CloudSaleFact.branch_id).order_by(CloudSaleFact.branch_id.asc()).all()
+    rows = (
+        await db.execute(query.group_by(CloudSaleFact.branch_id).order_by(CloudSaleFact.branch_id.asc()))
+    ).all()
 
     return [
         CloudBranchSalesSummary(
@@ -133,12 +149,12 @@ def get_cloud_branch_sales(
 
 
 @router.get("/inventory-movements-summary", response_model=CloudInventoryMovementSummary)
-def get_cloud_inventory_movement_summary(
+async def get_cloud_inventory_movement_summary(
     organization_id: int,
     branch_id: Optional[int] = None,
     start_at: Optional[datetime] = None,
     end_at: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
@@ -152,7 +168,7 @@ def get_cloud_inventory_movement_summary(
     )
     net_quantity = func.coalesce(func.sum(CloudInventoryMovementFact.quantity_delta), 0)
 
-    query = db.query(
+    query = select(
         func.count(CloudInventoryMovementFact.id).label("movement_count"),
         positive_quantity.label("total_positive_quantity"),
         negative_quantity.label("total_negative_quantity"),
@@ -162,7 +178,7 @@ def get_cloud_inventory_movement_summary(
     if effective_branch_id is not None:
         query = query.filter(CloudInventoryMovementFact.branch_id == effective_branch_id)
     query = _apply_time_filters(query, CloudInventoryMovementFact, start_at, end_at)
-    row = query.one()
+    row = (await db.execute(query)).one()
 
     return CloudInventoryMovementSummary(
         organization_id=organization_id,
@@ -175,95 +191,76 @@ def get_cloud_inventory_movement_summary(
 
 
 @router.get("/sync-health", response_model=CloudSyncHealth)
-def get_cloud_sync_health(
+async def get_cloud_sync_health(
     organization_id: int,
     branch_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    query = db.query(IngestedSyncEvent).filter(IngestedSyncEvent.organization_id == organization_id)
-    if effective_branch_id is not None:
-        query = query.filter(IngestedSyncEvent.branch_id == effective_branch_id)
-
-    row = query.with_entities(
-        func.count(IngestedSyncEvent.id).label("ingested_event_count"),
-        func.coalesce(func.sum(case((IngestedSyncEvent.projected_at.is_not(None), 1), else_=0)), 0).label("projected_event_count"),
-        func.coalesce(func.sum(case((IngestedSyncEvent.projection_error.is_not(None), 1), else_=0)), 0).label("projection_failed_count"),
-        func.coalesce(func.sum(IngestedSyncEvent.duplicate_count), 0).label("duplicate_delivery_count"),
-        func.max(IngestedSyncEvent.received_at).label("last_received_at"),
-        func.max(IngestedSyncEvent.projected_at).label("last_projected_at"),
-    ).one()
+    totals = await db.run_sync(
+        SyncIngestionStatsService.totals,
+        organization_id=organization_id,
+        branch_id=effective_branch_id,
+    )
 
     return CloudSyncHealth(
         organization_id=organization_id,
         branch_id=effective_branch_id,
-        ingested_event_count=int(row.ingested_event_count or 0),
-        projected_event_count=int(row.projected_event_count or 0),
-        projection_failed_count=int(row.projection_failed_count or 0),
-        duplicate_delivery_count=int(row.duplicate_delivery_count or 0),
-        last_received_at=row.last_received_at,
-        last_projected_at=row.last_projected_at,
+        ingested_event_count=totals["ingested_event_count"],
+        projected_event_count=totals["projected_event_count"],
+        projection_failed_count=totals["projection_failed_count"],
+        duplicate_delivery_count=totals["duplicate_delivery_count"],
+        last_received_at=totals["last_received_at"],
+        last_projected_at=totals["last_projected_at"],
     )
 
 
 @router.get("/stock-risk-summary", response_model=CloudStockRiskSummary)
-def get_cloud_stock_risk_summary(
+async def get_cloud_stock_risk_summary(
     organization_id: int,
     branch_id: Optional[int] = None,
     expiry_warning_days: int = Query(90, ge=1, le=730),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    product_query = db.query(CloudProductSnapshot).filter(
-        CloudProductSnapshot.organization_id == organization_id,
-        CloudProductSnapshot.is_active.is_(True),
-    )
-    batch_query = db.query(CloudBatchSnapshot).filter(
-        CloudBatchSnapshot.organization_id == organization_id,
-        CloudBatchSnapshot.quantity > 0,
-        CloudBatchSnapshot.is_quarantined.is_(False),
-    )
-
-    if effective_branch_id is not None:
-        product_query = product_query.filter(CloudProductSnapshot.branch_id == effective_branch_id)
-        batch_query = batch_query.filter(CloudBatchSnapshot.branch_id == effective_branch_id)
-
     today = date.today()
-    warning_date = today + timedelta(days=expiry_warning_days)
-    products = product_query.all()
-    batches = batch_query.all()
+    product_counts, batch_counts = await gather_reads(
+        db,
+        partial(
+            CloudStockReportService.product_risk_counts,
+            organization_id=organization_id,
+            branch_id=effective_branch_id,
+        ),
+        partial(
+            CloudStockReportService.batch_risk_counts,
+            organization_id=organization_id,
+            branch_id=effective_branch_id,
+            today=today,
+            warning_date=today + timedelta(days=expiry_warning_days),
+        ),
+    )
 
     return CloudStockRiskSummary(
         organization_id=organization_id,
         branch_id=effective_branch_id,
-        low_stock_count=sum(1 for product in products if 0 < product.total_stock <= product.low_stock_threshold),
-        out_of_stock_count=sum(1 for product in products if product.total_stock <= 0),
-        near_expiry_batch_count=sum(1 for batch in batches if today <= batch.expiry_date <= warning_date),
-        expired_batch_count=sum(1 for batch in batches if batch.expiry_date < today),
-        total_quantity_on_hand=sum(max(product.total_stock, 0) for product in products),
-        value_at_risk=float(
-            sum(
-                (batch.cost_price or 0) * batch.quantity
-                for batch in batches
-                if batch.expiry_date <= warning_date
-            )
-        ),
+        **product_counts,
+        **batch_counts,
         expiry_warning_days=expiry_warning_days,
     )
 
 
 @router.get("/low-stock", response_model=List[CloudLowStockItem])
-def get_cloud_low_stock(
+async def get_cloud_low_stock(
     organization_id: int,
     branch_id: Optional[int] = None,
     limit: int = Query(50, ge=1, le=500),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    query = db.query(CloudProductSnapshot).filter(
+    query = select(CloudProductSnapshot).filter(
         CloudProductSnapshot.organization_id == organization_id,
         CloudProductSnapshot.is_active.is_(True),
         CloudProductSnapshot.total_stock <= CloudProductSnapshot.low_stock_threshold,
@@ -271,7 +268,8 @@ def get_cloud_low_stock(
     if effective_branch_id is not None:
         query = query.filter(CloudProductSnapshot.branch_id == effective_branch_id)
 
-    rows = query.order_by(CloudProductSnapshot.total_stock.asc(), CloudProductSnapshot.name.asc()).limit(limit).all()
+    query = query.order_by(CloudProductSnapshot.total_stock.asc(), CloudProductSnapshot.name.asc()).limit(limit)
+    rows = (await db.execute(query)).scalars().all()
     return [
         CloudLowStockItem(
             branch_id=row.branch_id,
@@ -289,18 +287,18 @@ def get_cloud_low_stock(
 
 
 @router.get("/expiry-risk", response_model=List[CloudExpiryRiskItem])
-def get_cloud_expiry_risk(
+async def get_cloud_expiry_risk(
     organization_id: int,
     branch_id: Optional[int] = None,
     days: int = Query(90, ge=1, le=730),
     limit: int = Query(50, ge=1, le=500),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
     today = date.today()
     warning_date = today + timedelta(days=days)
-    query = db.query(CloudBatchSnapshot, CloudProductSnapshot).join(
+    query = select(CloudBatchSnapshot, CloudProductSnapshot).join(
         CloudProductSnapshot,
         (CloudProductSnapshot.organization_id == CloudBatchSnapshot.organization_id)
         & (CloudProductSnapshot.branch_id == CloudBatchSnapshot.branch_id)
@@ -315,7 +313,8 @@ def get_cloud_expiry_risk(
     if effective_branch_id is not None:
         query = query.filter(CloudBatchSnapshot.branch_id == effective_branch_id)
 
-    rows = query.order_by(CloudBatchSnapshot.expiry_date.asc(), CloudProductSnapshot.name.asc()).limit(limit).all()
+    query = query.order_by(CloudBatchSnapshot.expiry_date.asc(), CloudProductSnapshot.name.asc()).limit(limit)
+    rows = (await db.execute(query)).all()
     return [
         CloudExpiryRiskItem(
             branch_id=batch.branch_id,
@@ -335,42 +334,40 @@ def get_cloud_expiry_risk(
 
 
 @router.get("/stock-velocity", response_model=List[CloudStockVelocityItem])
-def get_cloud_stock_velocity(
+async def get_cloud_stock_velocity(
     organization_id: int,
     branch_id: Optional[int] = None,
     period_days: int = Query(30, ge=1, le=365),
     limit: int = Query(50, ge=1, le=500),
     include_stable: bool = True,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    return [
-        CloudStockVelocityItem(**item)
-        for item in CloudStockVelocityService.stock_velocity(
-            db,
-            organization_id=organization_id,
-            branch_id=effective_branch_id,
-            period_days=period_days,
-            limit=limit,
-            include_stable=include_stable,
-        )
-    ]
+    items = await db.run_sync(
+        CloudStockVelocityService.stock_velocity,
+        organization_id=organization_id,
+        branch_id=effective_branch_id,
+        period_days=period_days,
+        limit=limit,
+        include_stable=include_stable,
+    )
+    return [CloudStockVelocityItem(**item) for item in items]
 
 
 @router.get("/revenue-comparison", response_model=CloudRevenueComparison)
-def get_cloud_revenue_comparison(
+async def get_cloud_revenue_comparison(
     organization_id: int,
     branch_id: Optional[int] = None,
     period_days: int = Query(7, ge=1, le=365),
     limit: int = Query(20, ge=1, le=500),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
     return CloudRevenueComparison(
-        **CloudSalesTrendService.revenue_comparison(
-            db,
+        **await db.run_sync(
+            CloudSalesTrendService.revenue_comparison,
             organization_id=organization_id,
             branch_id=effective_branch_id,
             period_days=period_days,
@@ -380,16 +377,16 @@ def get_cloud_revenue_comparison(
 
 
 @router.get("/reconciliation", response_model=CloudReconciliationSummary)
-def get_cloud_reconciliation(
+async def get_cloud_reconciliation(
     organization_id: int,
     branch_id: Optional[int] = None,
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_organization_access),
 ):
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    result = CloudReconciliationService.reconcile(
-        db,
+    result = await db.run_sync(
+        CloudReconciliationService.reconcile,
         organization_id=organization_id,
         branch_id=effective_branch_id,
         limit=limit,
@@ -478,12 +475,12 @@ def repair_cloud_reconciliation_issue(
 
 
 @router.get("/dead-stock", response_model=List[CloudDeadStockItem])
-def get_cloud_dead_stock(
+async def get_cloud_dead_stock(
     organization_id: int,
     branch_id: Optional[int] = None,
     period_days: int = Query(30, ge=1, le=365),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_view_reports),
 ):
     """
@@ -491,8 +488,8 @@ def get_cloud_dead_stock(
     (slow movers) in the analysis period, derived from projected cloud movement facts.
     """
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    items = CloudDeadStockService.dead_stock(
-        db,
+    items = await db.run_sync(
+        CloudDeadStockService.dead_stock,
         organization_id=organization_id,
         branch_id=effective_branch_id,
         period_days=period_days,
@@ -502,12 +499,12 @@ def get_cloud_dead_stock(
 
 
 @router.get("/profit-summary", response_model=CloudProfitSummary)
-def get_cloud_profit_summary(
+async def get_cloud_profit_summary(
     organization_id: int,
     branch_id: Optional[int] = None,
     start_at: Optional[datetime] = None,
     end_at: Optional[datetime] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     """
@@ -520,19 +517,17 @@ def get_cloud_profit_summary(
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
 
     # Revenue from sale facts
-    revenue_query = db.query(
+    revenue_query = select(
         func.coalesce(func.sum(CloudSaleFact.total_amount), 0).label("total_revenue"),
     ).filter(CloudSaleFact.organization_id == organization_id)
     if effective_branch_id is not None:
         revenue_query = revenue_query.filter(CloudSaleFact.branch_id == effective_branch_id)
     revenue_query = _apply_time_filters(revenue_query, CloudSaleFact, start_at, end_at)
-    revenue_row = revenue_query.one()
-    total_revenue = float(revenue_row.total_revenue or 0)
 
     # Cost from SALE_CREATED movement facts × product cost_price
     movement_time = func.coalesce(CloudInventoryMovementFact.occurred_at, CloudInventoryMovementFact.created_at)
     cost_query = (
-        db.query(
+        select(
             CloudProductSnapshot.local_product_id,
             CloudProductSnapshot.branch_id,
             CloudProductSnapshot.cost_price,
@@ -558,12 +553,18 @@ def get_cloud_profit_summary(
         cost_query = cost_query.filter(movement_time >= start_at)
     if end_at is not None:
         cost_query = cost_query.filter(movement_time <= end_at)
-
-    cost_rows = cost_query.group_by(
+    cost_query = cost_query.group_by(
         CloudProductSnapshot.local_product_id,
         CloudProductSnapshot.branch_id,
         CloudProductSnapshot.cost_price,
-    ).all()
+    )
+
+    revenue_row, cost_rows = await gather_reads(
+        db,
+        lambda session: session.execute(revenue_query).one(),
+        lambda session: session.execute(cost_query).all(),
+    )
+    total_revenue = float(revenue_row.total_revenue or 0)
 
     estimated_cost = 0.0
     products_with_cost = set()
@@ -597,50 +598,32 @@ def get_cloud_profit_summary(
 
 
 @router.get("/stock-value", response_model=CloudStockValueSummary)
-def get_cloud_stock_value(
+async def get_cloud_stock_value(
     organization_id: int,
     branch_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     """Total capital tied up in inventory based on cost and retail prices."""
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
-    query = db.query(CloudProductSnapshot).filter(
-        CloudProductSnapshot.organization_id == organization_id,
-        CloudProductSnapshot.is_active.is_(True),
-        CloudProductSnapshot.total_stock > 0,
-    )
-    if effective_branch_id is not None:
-        query = query.filter(CloudProductSnapshot.branch_id == effective_branch_id)
-
-    products = query.all()
-    total_cost_value = 0.0
-    total_retail_value = 0.0
-    products_valued = 0
-    for p in products:
-        if p.cost_price is not None:
-            total_cost_value += float(p.cost_price) * max(p.total_stock, 0)
-            products_valued += 1
-        if p.selling_price is not None:
-            total_retail_value += float(p.selling_price) * max(p.total_stock, 0)
-
     return CloudStockValueSummary(
         organization_id=organization_id,
         branch_id=effective_branch_id,
-        total_cost_value=round(total_cost_value, 2),
-        total_retail_value=round(total_retail_value, 2),
-        products_valued=products_valued,
-        total_active_products=len(products),
+        **await db.run_sync(
+            CloudStockReportService.stock_value,
+            organization_id=organization_id,
+            branch_id=effective_branch_id,
+        ),
     )
 
 
 @router.get("/stockout-impact", response_model=CloudStockoutImpact)
-def get_cloud_stockout_impact(
+async def get_cloud_stockout_impact(
     organization_id: int,
     branch_id: Optional[int] = None,
     period_days: int = Query(30, ge=1, le=365),
     limit: int = Query(50, ge=1, le=500),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_organization_access),
 ):
     """
@@ -651,8 +634,8 @@ def get_cloud_stockout_impact(
     effective_branch_id = _resolve_branch_scope(current_user, branch_id)
 
     # Get velocity data for out-of-stock products
-    velocity_rows = CloudStockVelocityService.stock_velocity(
-        db,
+    velocity_rows = await db.run_sync(
+        CloudStockVelocityService.stock_velocity,
         organization_id=organization_id,
         branch_id=effective_branch_id,
         period_days=period_days,
@@ -661,12 +644,16 @@ def get_cloud_stockout_impact(
     )
     out_of_stock = [r for r in velocity_rows if r["status"] == "out_of_stock" and r["average_daily_units_sold"] > 0]
 
-    # Fetch selling prices for affected products
+    # Selling prices and branch names for affected products, fetched concurrently
+    price_map: dict[tuple[int, int], object] = {}
+    branch_names: dict[int, str] = {}
     if out_of_stock:
+        from app.models.tenancy import Branch
+
         product_keys = [(r["branch_id"], r["product_id"]) for r in out_of_stock]
         branch_ids = list({k[0] for k in product_keys})
         product_ids = list({k[1] for k in product_keys})
-        price_rows = db.query(
+        price_query = select(
             CloudProductSnapshot.branch_id,
             CloudProductSnapshot.local_product_id,
             CloudProductSnapshot.selling_price,
@@ -674,16 +661,14 @@ def get_cloud_stockout_impact(
             CloudProductSnapshot.organization_id == organization_id,
             CloudProductSnapshot.branch_id.in_(branch_ids),
             CloudProductSnapshot.local_product_id.in_(product_ids),
-        ).all()
+        )
+        branch_query = select(Branch.id, Branch.name).filter(Branch.id.in_(branch_ids))
+        price_rows, branches = await gather_reads(
+            db,
+            lambda session: session.execute(price_query).all(),
+            lambda session: session.execute(branch_query).all(),
+        )
         price_map = {(r.branch_id, r.local_product_id): r.selling_price for r in price_rows}
-    else:
-        price_map = {}
-
-    branch_ids_seen = list({r["branch_id"] for r in out_of_stock})
-    branch_names: dict[int, str] = {}
-    if branch_ids_seen:
-        from app.models.tenancy import Branch
-        branches = db.query(Branch.id, Branch.name).filter(Branch.id.in_(branch_ids_seen)).all()
         branch_names = {b.id: b.name for b in branches}
 
     items: list[CloudStockoutImpactItem] = []
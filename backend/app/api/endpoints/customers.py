@@ -7,23 +7,32 @@ Routes:
   GET    /customers/search                — Search by name or phone (POS autocomplete)
   GET    /customers/analytics             — Retention + churn + product affinity summary
   GET    /customers/follow-ups/pending    — Operator view: all pending follow-ups
+  GET    /customers/messages              — Operator view: queued receipt delivery state
   GET    /customers/{id}                  — Customer profile with purchase history
   PATCH  /customers/{id}                  — Update customer details
   PATCH  /customers/{id}/consent          — Update consent only (lightweight POS endpoint)
   GET    /customers/{id}/follow-ups       — List follow-ups for a customer
+  GET    /customers/{id}/messages         — List queued/sent receipts for a customer
 """
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_current_active_user, require_manage_users
 from app.core.app_mode import scope_query_to_user
 from app.core.config import settings
 from app.db.base import get_db
-from app.models.customer import ConsentStatus, Customer, CustomerFollowUp, FollowUpStatus
-from app.models.sale import Sale
+from app.models.customer import (
+    ConsentStatus,
+    Customer,
+    CustomerFollowUp,
+    FollowUpStatus,
+    OutboundMessage,
+    OutboundMessageStatus,
+    normalize_phone,
+)
 from app.models.user import User
 from app.schemas.customer import (
     Customer as CustomerSchema,
@@ -32,6 +41,7 @@ from app.schemas.customer import (
     CustomerSearchResult,
     CustomerUpdate,
     FollowUpSchema,
+    OutboundMessageSchema,
 )
 from app.services.customer_analytics_service import CustomerAnalyticsService
 
@@ -108,7 +118,6 @@ def register_customer(
     db.add(customer)
     db.commit()
     db.refresh(customer)
-    customer.total_purchases = 0
     return customer
 
 
@@ -124,10 +133,7 @@ def list_customers(
     query = _customer_scope(db.query(Customer), current_user)
     if is_active is not None:
         query = query.filter(Customer.is_active == is_active)
-    customers = query.order_by(Customer.full_name).offset(skip).limit(limit).all()
-    for c in customers:
-        c.total_purchases = db.query(func.count(Sale.id)).filter(Sale.customer_id == c.id).scalar() or 0
-    return customers
+    return query.order_by(Customer.full_name).offset(skip).limit(limit).all()
 
 
 @router.get("/search", response_model=List[CustomerSearchResult])
@@ -137,13 +143,30 @@ def search_customers(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Search customers by name or phone — used for POS autocomplete."""
-    term = f"%{q}%"
+    """Search customers by name or phone — used for POS autocomplete.
+
+    Phone input is matched as a prefix of the digits-only ``phone_normalized``
+    column, so ``+233 24…`` and ``024…`` find the same customer. Names use the
+    trigram index on PostgreSQL, which also ranks close misspellings.
+    """
+    term = q.strip()
+    digits = normalize_phone(term)
+    trigram = db.get_bind().dialect.name == "postgresql"
+    matches = [Customer.full_name.ilike(f"%{term}%")]
+    if trigram:
+        matches.append(Customer.full_name.op("%")(term))
+    if len(digits) >= 3:
+        matches.append(Customer.phone_normalized.like(f"{digits}%"))
+
     query = _customer_scope(db.query(Customer), current_user).filter(
         Customer.is_active == True,
-        (Customer.full_name.ilike(term)) | (Customer.phone.ilike(term)),
+        or_(*matches),
     )
-    return query.order_by(Customer.full_name).limit(limit).all()
+    if trigram:
+        query = query.order_by(func.similarity(Customer.full_name, term).desc(), Customer.full_name)
+    else:
+        query = query.order_by(Customer.full_name)
+    return query.limit(limit).all()
 
 
 @router.get("/follow-ups/pending", response_model=List[FollowUpSchema])
@@ -164,6 +187,25 @@ def list_pending_follow_ups(
     return query.order_by(CustomerFollowUp.scheduled_at).limit(limit).all()
 
 
+@router.get("/messages", response_model=List[OutboundMessageSchema])
+def list_outbound_messages(
+    status_filter: Optional[OutboundMessageStatus] = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Operator view: queued customer messages, newest first."""
+    query = scope_query_to_user(
+        db.query(OutboundMessage),
+        OutboundMessage,
+        current_user,
+        app_mode=settings.APP_MODE,
+    )
+    if status_filter is not None:
+        query = query.filter(OutboundMessage.status == status_filter)
+    return query.order_by(OutboundMessage.id.desc()).limit(limit).all()
+
+
 @router.get("/analytics")
 def get_customer_analytics(
     period_days: int = Query(30, ge=1, le=365),
@@ -192,11 +234,7 @@ def get_customer(
     current_user: User = Depends(get_current_active_user),
 ):
     """Get customer profile with total purchase count."""
-    customer = _get_or_404(db, customer_id, current_user)
-    customer.total_purchases = (
-        db.query(func.count(Sale.id)).filter(Sale.customer_id == customer_id).scalar() or 0
-    )
-    return customer
+    return _get_or_404(db, customer_id, current_user)
 
 
 @router.patch("/{customer_id}", response_model=CustomerSchema)
@@ -225,9 +263,6 @@ def update_customer(
 
     db.commit()
     db.refresh(customer)
-    customer.total_purchases = (
-        db.query(func.count(Sale.id)).filter(Sale.customer_id == customer_id).scalar() or 0
-    )
     return customer
 
 
@@ -253,9 +288,6 @@ def update_consent(
 
     db.commit()
     db.refresh(customer)
-    customer.total_purchases = (
-        db.query(func.count(Sale.id)).filter(Sale.customer_id == customer_id).scalar() or 0
-    )
     return customer
 
 
@@ -283,6 +315,29 @@ def list_customer_follow_ups(
     return follow_ups
 
 
+@router.get("/{customer_id}/messages", response_model=List[OutboundMessageSchema])
+def list_customer_messages(
+    customer_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """List receipt delivery history for a specific customer."""
+    _get_or_404(db, customer_id, current_user)  # access check
+    return (
+        scope_query_to_user(
+            db.query(OutboundMessage),
+            OutboundMessage,
+            current_user,
+            app_mode=settings.APP_MODE,
+        )
+        .filter(OutboundMessage.customer_id == customer_id)
+        .order_by(OutboundMessage.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
 # ── helpers ──────────────────────────────────────────────────────────────────
 
 def _get_or_404(db: Session, customer_id: int, current_user: User) -> Customer:
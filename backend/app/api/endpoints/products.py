@@ -180,15 +180,13 @@ def _validate_batch_dates(
 
 
 def _refresh_product_stocks(db: Session, products: List[Product]) -> None:
-    """Normalize stored sellable stock for the products being returned."""
-    stock_changed = False
-    for product in products:
-        previous_stock = product.total_stock
-        current_stock = InventoryService.recalculate_product_stock(db, product)
-        if current_stock != previous_stock:
-            stock_changed = True
+    """Normalize stored sellable stock for the products being returned.
 
-    if stock_changed:
+    Recalculates the whole page in one grouped query and commits only when a
+    stored total was stale, e.g. after a batch expired.
+    """
+    previous_stock = {product.id: product.total_stock for product in products}
+    if InventoryService.recalculate_products_stock(db, products) != previous_stock:
         db.commit()
 
 
@@ -1,18 +1,21 @@
 """
 Sales/POS API endpoints.
 """
+import base64
+import binascii
 from decimal import Decimal
 from uuid import uuid4
 from typing import List, Optional
-from datetime import datetime, date, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from datetime import datetime, date, time, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
 
-from app.core.money import round_money, to_decimal
+from app.core.money import round_money
 from app.db.base import get_db
+from app.db.workloads import Workload, use_workload
 from app.models.sale import (
-    PaymentMethod,
     Sale,
     SaleItem,
     SalePricingMode,
@@ -29,9 +32,14 @@ from app.models.user import User
 from app.services.audit_service import AuditService
 from app.services.inventory_service import InventoryService
 from app.services.sync_outbox_service import SyncOutboxService
+from app.services.till_ledger_service import TillLedgerService, business_date_of
 from app.schemas.sale import (
+    CloseoutVerification,
     Sale as SaleSchema,
     SaleActionRequest,
+    SaleBatchCreate,
+    SaleBatchOutcome,
+    SaleBatchResult,
     SaleCreate,
     EndOfDayCloseout,
     SaleWithItems,
@@ -94,30 +102,65 @@ def _resolve_sale_customer(
     return customer
 
 
-def _allocate_product_batches(db: Session, product: Product, required_quantity: int) -> List[ProductBatch]:
+def _lock_sale_stock(
+    db: Session,
+    product_ids: List[int],
+    current_user: User,
+) -> tuple[dict[int, Product], dict[int, List[ProductBatch]]]:
     """
-    Allocate sale quantity from available batches using FEFO.
+    Lock a sale's products and their sellable batches in two queries.
 
-    Returns a list containing the same ProductBatch object repeated in the
-    order it should be consumed. The caller is responsible for decrementing
-    quantities.
+    Rows are locked in id order, so concurrent tills selling overlapping
+    products wait on each other instead of deadlocking. Batches come back in
+    FEFO order per product.
+    """
+    products = scope_query_to_user(
+        db.query(Product),
+        Product,
+        current_user,
+        app_mode=settings.APP_MODE,
+    ).filter(Product.id.in_(product_ids)).order_by(Product.id).with_for_update().all()
+    batches_by_product: dict[int, List[ProductBatch]] = {product.id: [] for product in products}
+    if batches_by_product:
+        batches = db.query(ProductBatch).filter(
+            ProductBatch.product_id.in_(batches_by_product),
+            *InventoryService.sellable_batch_criteria(),
+        ).order_by(
+            ProductBatch.product_id.asc(),
+            ProductBatch.expiry_date.asc(),
+            ProductBatch.received_date.asc(),
+            ProductBatch.id.asc(),
+        ).with_for_update().all()
+        for batch in batches:
+            batches_by_product[batch.product_id].append(batch)
+    return {product.id: product for product in products}, batches_by_product
+
+
+def _allocate_product_batches(
+    product: Product,
+    sellable_batches: List[ProductBatch],
+    required_quantity: int,
+    reserved: dict[int, int],
+) -> List[tuple[ProductBatch, int]]:
     """
-    available_batches = InventoryService.sellable_batches_query(db, product.id).with_for_update().order_by(
-        ProductBatch.expiry_date.asc(),
-        ProductBatch.received_date.asc(),
-        ProductBatch.id.asc(),
-    ).all()
+    Allocate sale quantity from available batches using FEFO.
 
-    allocated_batches: List[ProductBatch] = []
+    ``reserved`` holds quantities already allocated to earlier lines of the
+    same sale and is updated in place. Returns ``(batch, quantity)`` pairs in
+    the order they should be consumed; the caller is responsible for
+    decrementing quantities.
+    """
+    allocations: List[tuple[ProductBatch, int]] = []
     remaining_quantity = required_quantity
 
-    for batch in available_batches:
+    for batch in sellable_batches:
         if remaining_quantity <= 0:
             break
 
-        take_quantity = min(batch.quantity, remaining_quantity)
+        take_quantity = min(batch.quantity - reserved.get(batch.id, 0), remaining_quantity)
         if take_quantity > 0:
-            allocated_batches.extend([batch] * take_quantity)
+            allocations.append((batch, take_quantity))
+            reserved[batch.id] = reserved.get(batch.id, 0) + take_quantity
             remaining_quantity -= take_quantity
 
     if remaining_quantity > 0:
@@ -130,7 +173,7 @@ def _allocate_product_batches(db: Session, product: Product, required_quantity:
             ),
         )
 
-    return allocated_batches
+    return allocations
 
 
 def _restore_sale_item_stock(
@@ -273,7 +316,10 @@ def _reverse_sale(
                 reason=f"{target_status.value}: {reason}",
             )
 
+        TillLedgerService.reverse_sale(db, sale, sale.items, target_status, current_user)
         sale.status = target_status
+        if sale.customer_id is not None:
+            retention.reverse_customer_purchase(db, sale=sale)
         SyncOutboxService.record_event(
             db,
             event_type=SyncEventType.SALE_REVERSED,
@@ -322,354 +368,548 @@ def _reverse_sale(
         raise
 
 
-@router.post("", response_model=SaleWithItems, status_code=status.HTTP_201_CREATED)
-def create_sale(
-    sale_data: SaleCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """
-    Create a new sale transaction.
+def _utc_day_start(value: date) -> datetime:
+    return datetime.combine(value, time.min, tzinfo=timezone.utc)
 
-    Args:
-        sale_data: Sale data with items
-        db: Database session
-        current_user: Current authenticated user
 
-    Returns:
-        Created sale with items
+def _encode_sale_cursor(sale: Sale) -> str:
+    raw = f"{sale.created_at.isoformat()}|{sale.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-    Raises:
-        HTTPException: If product not found or insufficient stock
-    """
-    try:
-        require_operational_tenant_scope(
-            current_user,
-            app_mode=settings.APP_MODE,
-            deployment_profile=settings.POS_DEPLOYMENT_PROFILE,
-        )
-        linked_customer = _resolve_sale_customer(
-            db,
-            getattr(sale_data, "customer_id", None),
-            current_user,
-        )
 
-        # Calculate totals
-        subtotal = Decimal("0.00")
-        sale_items_data = []
-
-        for item in sale_data.items:
-            # Lock the product row first to keep stock checks and updates
-            # consistent across concurrent tills.
-            product_query = scope_query_to_user(
-                db.query(Product),
-                Product,
-                current_user,
-                app_mode=settings.APP_MODE,
-            )
-            product = product_query.filter(Product.id == item.product_id).with_for_update().first()
-            if not product:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Product with ID {item.product_id} not found"
-                )
+def _decode_sale_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, raw_id = raw.rsplit("|", 1)
+        cursor_created_at = datetime.fromisoformat(created_at)
+        sale_id = int(raw_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sales cursor",
+        ) from exc
+    if cursor_created_at.tzinfo is None:
+        # SQLite hands back naive UTC timestamps.
+        cursor_created_at = cursor_created_at.replace(tzinfo=timezone.utc)
+    return cursor_created_at, sale_id
 
-            if not product.is_active:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Product {product.name} is inactive and cannot be sold"
-                )
 
-            # Catalog compliance flags are retained as metadata for this
-            # deployment, but they do not block POS sales.
+def _find_sale_by_idempotency_key(
+    db: Session,
+    idempotency_key: Optional[str],
+    current_user: User,
+) -> Optional[Sale]:
+    if not idempotency_key:
+        return None
+    sale_query = scope_query_to_user(
+        db.query(Sale),
+        Sale,
+        current_user,
+        app_mode=settings.APP_MODE,
+    )
+    return sale_query.filter(Sale.idempotency_key == idempotency_key).first()
 
-            # ── Stock validation ──
 
-            InventoryService.recalculate_product_stock(db, product)
-            if product.total_stock < item.quantity:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Insufficient stock for product {product.name}. Available: {product.total_stock}"
-                )
+def _record_sale(
+    db: Session,
+    sale_data: SaleCreate,
+    current_user: User,
+) -> tuple[Sale, Optional[Customer]]:
+    """
+    Validate a sale, dispense its stock and stage every related row.
 
-            allocated_batches = _allocate_product_batches(db, product, item.quantity)
-            unit_price = _resolve_sale_unit_price(product, sale_data.pricing_mode)
-            line_discount = round_money(item.discount_amount)
-
-            # ── Reject item-level discount exceeding line subtotal (V2-P1-01) ──
-            line_subtotal = unit_price * Decimal(item.quantity)
-            if line_discount > line_subtotal:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=(
-                        f"Discount for '{product.name}' ({line_discount}) "
-                        f"exceeds the line subtotal ({line_subtotal})"
-                    ),
-                )
+    Does not commit; the caller owns the transaction (or savepoint).
+    """
+    linked_customer = _resolve_sale_customer(
+        db,
+        getattr(sale_data, "customer_id", None),
+        current_user,
+    )
 
-            quantity_remaining = item.quantity
-            discount_remaining = line_discount
+    # Calculate totals
+    subtotal = Decimal("0.00")
+    sale_items_data = []
+    # Lock the product and batch rows first to keep stock checks and updates
+    # consistent across concurrent tills.
+    products_by_id, batches_by_product = _lock_sale_stock(
+        db,
+        sorted({item.product_id for item in sale_data.items}),
+        current_user,
+    )
+    reserved_quantities: dict[int, int] = {}
 
-            # Group repeated batch allocations back into per-batch sale lines.
-            batch_quantities: List[tuple[ProductBatch, int]] = []
-            for batch in allocated_batches:
-                if batch_quantities and batch_quantities[-1][0].id == batch.id:
-                    existing_batch, existing_quantity = batch_quantities[-1]
-                    batch_quantities[-1] = (existing_batch, existing_quantity + 1)
-                else:
-                    batch_quantities.append((batch, 1))
+    for item in sale_data.items:
+        product = products_by_id.get(item.product_id)
+        if not product:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Product with ID {item.product_id} not found"
+            )
 
-            for batch, batch_quantity in batch_quantities:
-                batch_quantity_decimal = Decimal(batch_quantity)
-                batch_discount = Decimal("0.00")
-                if line_discount > 0:
-                    if quantity_remaining == batch_quantity:
-                        batch_discount = discount_remaining
-                    else:
-                        batch_discount = (
-                            line_discount * batch_quantity_decimal / Decimal(item.quantity)
-                        )
-                        if batch_discount > discount_remaining:
-                            batch_discount = discount_remaining
-
-                batch_total = round_money((unit_price * batch_quantity_decimal) - batch_discount)
-                subtotal += batch_total
-
-                sale_items_data.append({
-                    "product_id": item.product_id,
-                    "product_name": product.name,
-                    "dosage_form": product.dosage_form.value if product.dosage_form else None,
-                    "strength": product.strength,
-                    "batch_id": batch.id,
-                    "batch_number": batch.batch_number,
-                    "expiry_date": batch.expiry_date,
-                    "quantity": batch_quantity,
-                    "unit_price": round_money(unit_price),
-                    "discount_amount": round_money(batch_discount),
-                    "total_price": round_money(batch_total),
-                    "allocated_batch": batch,
-                    "product": product,
-                })
-
-                quantity_remaining -= batch_quantity
-                discount_remaining -= batch_discount
-
-        # Calculate final total
-        sale_level_discount = round_money(sale_data.discount_amount)
-        if sale_level_discount > subtotal:
+        if not product.is_active:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=(
-                    f"Sale-level discount ({sale_level_discount}) "
-                    f"exceeds subtotal ({subtotal})"
-                ),
+                detail=f"Product {product.name} is inactive and cannot be sold"
             )
 
-        total_amount_decimal = (
-            subtotal
-            - sale_level_discount
-            + round_money(sale_data.tax_amount)
-        )
-        total_amount = round_money(total_amount_decimal)
+        # Catalog compliance flags are retained as metadata for this
+        # deployment, but they do not block POS sales.
 
-        if total_amount < Decimal("0"):
+        # ── Stock validation ──
+
+        sellable_batches = batches_by_product[product.id]
+        available_stock = sum(
+            batch.quantity - reserved_quantities.get(batch.id, 0)
+            for batch in sellable_batches
+        )
+        if available_stock < item.quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Total amount cannot be negative. Check discounts.",
+                detail=f"Insufficient stock for product {product.name}. Available: {available_stock}"
             )
 
-        amount_paid = round_money(sale_data.amount_paid)
+        batch_quantities = _allocate_product_batches(
+            product,
+            sellable_batches,
+            item.quantity,
+            reserved_quantities,
+        )
+        unit_price = _resolve_sale_unit_price(product, sale_data.pricing_mode)
+        line_discount = round_money(item.discount_amount)
 
-        # Validate payment
-        if amount_paid < total_amount:
+        # ── Reject item-level discount exceeding line subtotal (V2-P1-01) ──
+        line_subtotal = unit_price * Decimal(item.quantity)
+        if line_discount > line_subtotal:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient payment. Total: {total_amount}, Paid: {amount_paid}"
+                detail=(
+                    f"Discount for '{product.name}' ({line_discount}) "
+                    f"exceeds the line subtotal ({line_subtotal})"
+                ),
             )
 
-        change_amount = round_money(amount_paid - total_amount)
+        quantity_remaining = item.quantity
+        discount_remaining = line_discount
 
-        # Use the database-assigned sale id to derive a transaction-safe invoice.
-        sale_occurred_at = datetime.now(timezone.utc)
-        db_sale = Sale(
-            invoice_number=f"PENDING-{uuid4().hex}",
-            user_id=current_user.id,
-            pricing_mode=sale_data.pricing_mode,
-            subtotal=round_money(subtotal),
-            discount_amount=sale_level_discount,
-            tax_amount=round_money(sale_data.tax_amount),
-            total_amount=total_amount,
-            payment_method=sale_data.payment_method,
-            amount_paid=amount_paid,
-            change_amount=change_amount,
-            customer_id=linked_customer.id if linked_customer else None,
-            customer_name=sale_data.customer_name,
-            customer_phone=sale_data.customer_phone,
-            customer_id_number=getattr(sale_data, 'customer_id_number', None),
-            customer_address=getattr(sale_data, 'customer_address', None),
-            momo_reference=getattr(sale_data, 'momo_reference', None),
-            momo_number=getattr(sale_data, 'momo_number', None),
-            prescription_number=getattr(sale_data, 'prescription_number', None),
-            doctor_name=getattr(sale_data, 'doctor_name', None),
-            has_prescription=getattr(sale_data, 'has_prescription', False),
-            notes=sale_data.notes,
-            created_at=sale_occurred_at,
+        for batch, batch_quantity in batch_quantities:
+            batch_quantity_decimal = Decimal(batch_quantity)
+            batch_discount = Decimal("0.00")
+            if line_discount > 0:
+                if quantity_remaining == batch_quantity:
+                    batch_discount = discount_remaining
+                else:
+                    batch_discount = (
+                        line_discount * batch_quantity_decimal / Decimal(item.quantity)
+                    )
+                    if batch_discount > discount_remaining:
+                        batch_discount = discount_remaining
+
+            batch_total = round_money((unit_price * batch_quantity_decimal) - batch_discount)
+            subtotal += batch_total
+
+            sale_items_data.append({
+                "product_id": item.product_id,
+                "product_name": product.name,
+                "dosage_form": product.dosage_form.value if product.dosage_form else None,
+                "strength": product.strength,
+                "batch_id": batch.id,
+                "batch_number": batch.batch_number,
+                "expiry_date": batch.expiry_date,
+                "quantity": batch_quantity,
+                "unit_price": round_money(unit_price),
+                "unit_cost": round_money(product.cost_price),
+                "discount_amount": round_money(batch_discount),
+                "total_price": round_money(batch_total),
+                "allocated_batch": batch,
+                "product": product,
+            })
+
+            quantity_remaining -= batch_quantity
+            discount_remaining -= batch_discount
+
+    # Calculate final total
+    sale_level_discount = round_money(sale_data.discount_amount)
+    if sale_level_discount > subtotal:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Sale-level discount ({sale_level_discount}) "
+                f"exceeds subtotal ({subtotal})"
+            ),
         )
 
-        # Tenant fields must be present before the first INSERT/flush.
-        apply_tenant_scope(db_sale, current_user, app_mode=settings.APP_MODE)
-        db.add(db_sale)
-        db.flush()  # Get sale ID from the database
-        db_sale.invoice_number = f"INV-{datetime.now(timezone.utc).strftime('%Y%m%d')}-{db_sale.id:06d}"
-
-        # Create sale items and update stock
-        touched_products = {}
-        movement_records = []
-        for item_data in sale_items_data:
-            allocated_batch = item_data["allocated_batch"]
-            product = item_data["product"]
-            sale_item_fields = {
-                key: value
-                for key, value in item_data.items()
-                if key not in {"allocated_batch", "product", "batch_id"}
-            }
-            sale_item = SaleItem(sale_id=db_sale.id, **sale_item_fields)
-            apply_tenant_scope(sale_item, current_user, app_mode=settings.APP_MODE)
-            db.add(sale_item)
+    total_amount_decimal = (
+        subtotal
+        - sale_level_discount
+        + round_money(sale_data.tax_amount)
+    )
+    total_amount = round_money(total_amount_decimal)
 
-            allocated_batch.quantity -= item_data["quantity"]
-            touched_products[product.id] = product
-            movement_records.append(
-                {
-                    "product": product,
-                    "batch_id": item_data["batch_id"],
-                    "quantity": item_data["quantity"],
-                    "reason": f"Sale {db_sale.invoice_number}",
-                }
-            )
+    if total_amount < Decimal("0"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Total amount cannot be negative. Check discounts.",
+        )
 
-        for product in touched_products.values():
-            InventoryService.recalculate_product_stock(db, product)
+    amount_paid = round_money(sale_data.amount_paid)
 
-        for record in movement_records:
-            product = record["product"]
-            InventoryService.record_movement(
-                db,
-                product_id=product.id,
-                batch_id=record["batch_id"],
-                movement_type=InventoryMovementType.SALE_DISPENSED,
-                quantity_delta=-record["quantity"],
-                stock_after=product.total_stock,
-                source_document_type="sale",
-                source_document_id=db_sale.id,
-                reason=record["reason"],
-                created_by=current_user.id,
-                organization_id=db_sale.organization_id,
-                branch_id=db_sale.branch_id,
-                source_device_id=db_sale.source_device_id,
-            )
+    # Validate payment
+    if amount_paid < total_amount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient payment. Total: {total_amount}, Paid: {amount_paid}"
+        )
 
-        SyncOutboxService.record_event(
-            db,
-            event_type=SyncEventType.SALE_CREATED,
-            aggregate_type="sale",
-            aggregate_id=db_sale.id,
-            organization_id=db_sale.organization_id,
-            branch_id=db_sale.branch_id,
-            source_device_id=db_sale.source_device_id,
-            payload={
-                "sale_id": db_sale.id,
-                "invoice_number": db_sale.invoice_number,
-                "occurred_at": db_sale.created_at.isoformat() if db_sale.created_at else None,
-                "pricing_mode": db_sale.pricing_mode.value,
-                "payment_method": db_sale.payment_method.value,
-                "subtotal": db_sale.subtotal,
-                "discount_amount": db_sale.discount_amount,
-                "tax_amount": db_sale.tax_amount,
-                "total_amount": db_sale.total_amount,
-                "user_id": current_user.id,
-                "items": [
-                    {
-                        "product_id": item["product_id"],
-                        "product_name": item["product_name"],
-                        "sku": item["product"].sku,
-                        "batch_id": item["batch_id"],
-                        "batch_number": item["batch_number"],
-                        "expiry_date": item["expiry_date"],
-                        "quantity": item["quantity"],
-                        "unit_price": item["unit_price"],
-                        "total_price": item["total_price"],
-                    }
-                    for item in sale_items_data
-                ],
-            },
+    change_amount = round_money(amount_paid - total_amount)
+
+    # Use the database-assigned sale id to derive a transaction-safe invoice.
+    sale_occurred_at = datetime.now(timezone.utc)
+    till_shift = TillLedgerService.shift_for_sale(db, current_user, business_date_of(sale_occurred_at))
+    db_sale = Sale(
+        invoice_number=f"PENDING-{uuid4().hex}",
+        idempotency_key=sale_data.idempotency_key,
+        till_shift_id=till_shift.id,
+        user_id=current_user.id,
+        pricing_mode=sale_data.pricing_mode,
+        subtotal=round_money(subtotal),
+        discount_amount=sale_level_discount,
+        tax_amount=round_money(sale_data.tax_amount),
+        total_amount=total_amount,
+        payment_method=sale_data.payment_method,
+        amount_paid=amount_paid,
+        change_amount=change_amount,
+        customer_id=linked_customer.id if linked_customer else None,
+        customer_name=sale_data.customer_name,
+        customer_phone=sale_data.customer_phone,
+        customer_id_number=getattr(sale_data, 'customer_id_number', None),
+        customer_address=getattr(sale_data, 'customer_address', None),
+        momo_reference=getattr(sale_data, 'momo_reference', None),
+        momo_number=getattr(sale_data, 'momo_number', None),
+        prescription_number=getattr(sale_data, 'prescription_number', None),
+        doctor_name=getattr(sale_data, 'doctor_name', None),
+        has_prescription=getattr(sale_data, 'has_prescription', False),
+        notes=sale_data.notes,
+        created_at=sale_occurred_at,
+    )
+
+    # Tenant fields must be present before the first INSERT/flush.
+    apply_tenant_scope(db_sale, current_user, app_mode=settings.APP_MODE)
+    db.add(db_sale)
+    db.flush()  # Get sale ID from the database
+    db_sale.invoice_number = f"INV-{datetime.now(timezone.utc).strftime('%Y%m%d')}-{db_sale.id:06d}"
+
+    # Create sale items and update stock
+    touched_products = {}
+    movement_records = []
+    sale_items = []
+    for item_data in sale_items_data:
+        allocated_batch = item_data["allocated_batch"]
+        product = item_data["product"]
+        sale_item_fields = {
+            key: value
+            for key, value in item_data.items()
+            if key not in {"allocated_batch", "product", "batch_id"}
+        }
+        sale_item = SaleItem(sale_id=db_sale.id, **sale_item_fields)
+        apply_tenant_scope(sale_item, current_user, app_mode=settings.APP_MODE)
+        db.add(sale_item)
+        sale_items.append(sale_item)
+
+        allocated_batch.quantity -= item_data["quantity"]
+        touched_products[product.id] = product
+        movement_records.append(
+            {
+                "product": product,
+                "batch_id": item_data["batch_id"],
+                "quantity": item_data["quantity"],
+                "reason": f"Sale {db_sale.invoice_number}",
+            }
         )
-        AuditService.log(
+
+    InventoryService.recalculate_products_stock(db, touched_products.values())
+    TillLedgerService.record_sale(db, db_sale, sale_items)
+
+    for record in movement_records:
+        product = record["product"]
+        InventoryService.record_movement(
             db,
-            action="create_sale",
-            user_id=current_user.id,
-            entity_type="sale",
-            entity_id=db_sale.id,
-            description=f"Completed sale {db_sale.invoice_number}",
-            extra_data={
-                "invoice_number": db_sale.invoice_number,
-                "total_amount": db_sale.total_amount,
-                "item_lines": len(sale_items_data),
-                "pricing_mode": db_sale.pricing_mode.value,
-            },
+            product_id=product.id,
+            batch_id=record["batch_id"],
+            movement_type=InventoryMovementType.SALE_DISPENSED,
+            quantity_delta=-record["quantity"],
+            stock_after=product.total_stock,
+            source_document_type="sale",
+            source_document_id=db_sale.id,
+            reason=record["reason"],
+            created_by=current_user.id,
             organization_id=db_sale.organization_id,
             branch_id=db_sale.branch_id,
             source_device_id=db_sale.source_device_id,
         )
+
+    if linked_customer is not None:
+        retention.record_customer_purchase(db, sale=db_sale)
+
+    SyncOutboxService.record_event(
+        db,
+        event_type=SyncEventType.SALE_CREATED,
+        aggregate_type="sale",
+        aggregate_id=db_sale.id,
+        organization_id=db_sale.organization_id,
+        branch_id=db_sale.branch_id,
+        source_device_id=db_sale.source_device_id,
+        payload={
+            "sale_id": db_sale.id,
+            "invoice_number": db_sale.invoice_number,
+            "occurred_at": db_sale.created_at.isoformat() if db_sale.created_at else None,
+            "pricing_mode": db_sale.pricing_mode.value,
+            "payment_method": db_sale.payment_method.value,
+            "subtotal": db_sale.subtotal,
+            "discount_amount": db_sale.discount_amount,
+            "tax_amount": db_sale.tax_amount,
+            "total_amount": db_sale.total_amount,
+            "user_id": current_user.id,
+            "items": [
+                {
+                    "product_id": item["product_id"],
+                    "product_name": item["product_name"],
+                    "sku": item["product"].sku,
+                    "batch_id": item["batch_id"],
+                    "batch_number": item["batch_number"],
+                    "expiry_date": item["expiry_date"],
+                    "quantity": item["quantity"],
+                    "unit_price": item["unit_price"],
+                    "total_price": item["total_price"],
+                }
+                for item in sale_items_data
+            ],
+        },
+    )
+    AuditService.log(
+        db,
+        action="create_sale",
+        user_id=current_user.id,
+        entity_type="sale",
+        entity_id=db_sale.id,
+        description=f"Completed sale {db_sale.invoice_number}",
+        extra_data={
+            "invoice_number": db_sale.invoice_number,
+            "total_amount": db_sale.total_amount,
+            "item_lines": len(sale_items_data),
+            "pricing_mode": db_sale.pricing_mode.value,
+        },
+        organization_id=db_sale.organization_id,
+        branch_id=db_sale.branch_id,
+        source_device_id=db_sale.source_device_id,
+    )
+
+    return db_sale, linked_customer
+
+
+def _run_post_sale_actions(
+    db: Session,
+    db_sale: Sale,
+    linked_customer: Optional[Customer],
+) -> None:
+    """Queue the customer receipt and schedule the follow-up; never fails the sale.
+
+    The receipt is only written to the outbound message queue here, so the
+    cashier never waits on the SMS provider.
+    """
+    if linked_customer and settings.CUSTOMER_RETENTION_ENABLED:
+        try:
+            if settings.CUSTOMER_RECEIPTS_ENABLED:
+                retention.queue_receipt(
+                    db,
+                    customer=linked_customer,
+                    sale=db_sale,
+                )
+            if settings.CUSTOMER_FOLLOWUPS_ENABLED:
+                retention.schedule_follow_up(
+                    db,
+                    customer=linked_customer,
+                    sale=db_sale,
+                )
+            db.commit()
+        except Exception as retention_err:
+            import logging
+            logging.getLogger(__name__).warning(
+                "Retention post-sale actions failed for sale %s: %s",
+                db_sale.invoice_number, retention_err,
+            )
+
+
+@router.post("", response_model=SaleWithItems, status_code=status.HTTP_201_CREATED)
+def create_sale(
+    sale_data: SaleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create a new sale transaction.
+
+    A repeated ``idempotency_key`` returns the sale it originally created
+    without dispensing stock again.
+
+    Args:
+        sale_data: Sale data with items
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Created sale with items
+
+    Raises:
+        HTTPException: If product not found or insufficient stock
+    """
+    try:
+        require_operational_tenant_scope(
+            current_user,
+            app_mode=settings.APP_MODE,
+            deployment_profile=settings.POS_DEPLOYMENT_PROFILE,
+        )
+        existing_sale = _find_sale_by_idempotency_key(db, sale_data.idempotency_key, current_user)
+        if existing_sale is not None:
+            return existing_sale
+
+        db_sale, linked_customer = _record_sale(db, sale_data, current_user)
         db.commit()
         db.refresh(db_sale)
+    except IntegrityError:
+        db.rollback()
+        # A concurrent retry with the same key committed first.
+        existing_sale = _find_sale_by_idempotency_key(db, sale_data.idempotency_key, current_user)
+        if existing_sale is not None:
+            return existing_sale
+        raise
+    except Exception:
+        db.rollback()
+        raise
+
+    _run_post_sale_actions(db, db_sale, linked_customer)
+    return db_sale
+
+
+@router.post("/batch", response_model=SaleBatchResult)
+def create_sales_batch(
+    batch: SaleBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Replay queued offline sales in one request.
+
+    Sales are recorded in order, each inside its own savepoint, so a sale
+    that fails validation (e.g. insufficient stock) is reported without
+    discarding the others. Keys that were already recorded come back as
+    ``duplicate`` with the original sale. Everything that succeeded is
+    committed once at the end.
+
+    Args:
+        batch: Queued sales, each with an idempotency key
+        db: Database session
+        current_user: Current authenticated user
 
-        # ── Customer retention: receipt + follow-up (non-fatal) ───────────
-        if linked_customer and settings.CUSTOMER_RETENTION_ENABLED:
+    Returns:
+        Per-sale outcomes in request order
+    """
+    require_operational_tenant_scope(
+        current_user,
+        app_mode=settings.APP_MODE,
+        deployment_profile=settings.POS_DEPLOYMENT_PROFILE,
+    )
+    outcomes: List[dict] = []
+    created: List[tuple[dict, Sale, Optional[Customer]]] = []
+    try:
+        for index, sale_data in enumerate(batch.sales):
+            outcome = {"index": index, "idempotency_key": sale_data.idempotency_key}
+            outcomes.append(outcome)
+            existing_sale = _find_sale_by_idempotency_key(db, sale_data.idempotency_key, current_user)
+            if existing_sale is not None:
+                outcome.update(outcome="duplicate", sale=existing_sale, status_code=status.HTTP_200_OK)
+                continue
+
+            savepoint = db.begin_nested()
             try:
-                if settings.CUSTOMER_RECEIPTS_ENABLED:
-                    retention.dispatch_receipt(
-                        db,
-                        customer=linked_customer,
-                        sale=db_sale,
-                    )
-                if settings.CUSTOMER_FOLLOWUPS_ENABLED:
-                    retention.schedule_follow_up(
-                        db,
-                        customer=linked_customer,
-                        sale=db_sale,
+                db_sale, linked_customer = _record_sale(db, sale_data, current_user)
+                savepoint.commit()
+            except HTTPException as exc:
+                savepoint.rollback()
+                outcome.update(outcome="failed", status_code=exc.status_code, error=str(exc.detail))
+                continue
+            except IntegrityError:
+                savepoint.rollback()
+                existing_sale = _find_sale_by_idempotency_key(db, sale_data.idempotency_key, current_user)
+                if existing_sale is not None:
+                    outcome.update(outcome="duplicate", sale=existing_sale, status_code=status.HTTP_200_OK)
+                else:
+                    outcome.update(
+                        outcome="failed",
+                        status_code=status.HTTP_409_CONFLICT,
+                        error="Idempotency key is already used by another sale",
                     )
-                db.commit()
-            except Exception as retention_err:
-                import logging
-                logging.getLogger(__name__).warning(
-                    "Retention post-sale actions failed for sale %s: %s",
-                    db_sale.invoice_number, retention_err,
-                )
-
-        return db_sale
+                continue
+            outcome.update(outcome="created", status_code=status.HTTP_201_CREATED)
+            created.append((outcome, db_sale, linked_customer))
+        db.commit()
     except Exception:
         db.rollback()
         raise
 
+    for outcome, db_sale, linked_customer in created:
+        db.refresh(db_sale)
+        outcome["sale"] = db_sale
+        _run_post_sale_actions(db, db_sale, linked_customer)
+
+    counts = {"created": 0, "duplicate": 0, "failed": 0}
+    for outcome in outcomes:
+        counts[outcome["outcome"]] += 1
+    return SaleBatchResult(
+        **counts,
+        results=[
+            SaleBatchOutcome(
+                index=outcome["index"],
+                idempotency_key=outcome["idempotency_key"],
+                outcome=outcome["outcome"],
+                sale=SaleWithItems.model_validate(outcome["sale"]) if outcome.get("sale") is not None else None,
+                status_code=outcome["status_code"],
+                error=outcome.get("error"),
+            )
+            for outcome in outcomes
+        ],
+    )
+
 
-@router.get("", response_model=List[SaleWithItems])
+# Sales history is browsing, not checkout; keep it off the pos_critical pool.
+@router.get(
+    "",
+    response_model=List[SaleWithItems],
+    dependencies=[Depends(use_workload(Workload.INTERACTIVE_READ))],
+)
 def list_sales(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    response: Response = None,
 ):
     """
-    List sales with pagination and date filtering.
+    List sales, newest first, with keyset pagination and date filtering.
+
+    When more sales follow, the ``X-Next-Cursor`` response header carries an
+    opaque cursor; pass it back as ``cursor`` to fetch the next page. Keyset
+    pages stay as fast deep into history as on the first page, unlike
+    ``skip``, which is kept for older clients.
 
     Args:
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored when ``cursor`` is given)
         limit: Maximum records to return
-        start_date: Filter by start date
-        end_date: Filter by end date
+        start_date: First UTC business day to include
+        end_date: Last UTC business day to include
+        cursor: Position returned by the previous page
         db: Database session
         current_user: Current authenticated user
 
@@ -683,13 +923,36 @@ def list_sales(
         app_mode=settings.APP_MODE,
     )
 
+    # Half-open UTC ranges keep ``created_at`` bare so its indexes apply.
     if start_date:
-        query = query.filter(func.date(Sale.created_at) >= start_date)
-
-    if end_date:
-        query = query.filter(func.date(Sale.created_at) <= end_date)
-
-    sales = query.order_by(Sale.created_at.desc()).offset(skip).limit(limit).all()
+        query = query.filter(Sale.created_at >= _utc_day_start(start_date))
+
+    created_before = _utc_day_start(end_date + timedelta(days=1)) if end_date else None
+    if cursor:
+        cursor_created_at, cursor_id = _decode_sale_cursor(cursor)
+        query = query.filter(tuple_(Sale.created_at, Sale.id) < tuple_(cursor_created_at, cursor_id))
+        # Also bound ``created_at`` by the cursor itself, replacing a looser
+        # end date, so the index range starts at the cursor on every planner.
+        if created_before is None or cursor_created_at < created_before:
+            query = query.filter(Sale.created_at <= cursor_created_at)
+            created_before = None
+    elif skip:
+        query = query.offset(skip)
+
+    if created_before is not None:
+        query = query.filter(Sale.created_at < created_before)
+
+    sales = query.options(
+        selectinload(Sale.items)
+    ).order_by(
+        Sale.created_at.desc(),
+        Sale.id.desc(),
+    ).limit(limit + 1).all()
+
+    if len(sales) > limit:
+        sales = sales[:limit]
+        if response is not None:
+            response.headers["X-Next-Cursor"] = _encode_sale_cursor(sales[-1])
     return sales
 
 
@@ -701,6 +964,10 @@ def get_today_sales_summary(
     """
     Get today's sales summary.
 
+    Reads the running totals of today's till shifts, so the cost does not
+    grow with the number of sales. Profit uses each line's cost price at the
+    time of sale.
+
     Args:
         db: Database session
         current_user: Current authenticated user
@@ -708,61 +975,30 @@ def get_today_sales_summary(
     Returns:
         Sales summary with totals
     """
-    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    totals = TillLedgerService.day_totals(db, current_user, datetime.now(timezone.utc).date())
+
+    return {
+        "total_sales": totals["completed_count"],
+        "total_revenue": float(totals["completed_amount"]),
+        "total_profit": float(totals["gross_profit"]),
+        "total_items_sold": totals["items_sold"],
+    }
 
-    sales_query = scope_query_to_user(
-        db.query(
-            func.count(Sale.id).label("total_sales"),
-            func.coalesce(func.sum(Sale.total_amount), 0).label("total_revenue"),
-        ),
-        Sale,
-        current_user,
-        app_mode=settings.APP_MODE,
-    )
-    sales_stats = sales_query.filter(
-        Sale.created_at >= today_start,
-        Sale.status == SaleStatus.COMPLETED,
-    ).one()
-
-    items_query = db.query(
-        func.coalesce(func.sum(SaleItem.quantity), 0)
-    ).join(
-        Sale, Sale.id == SaleItem.sale_id
-    )
-    items_query = scope_query_to_user(
-        items_query,
-        Sale,
-        current_user,
-        app_mode=settings.APP_MODE,
-    )
-    total_items_sold = items_query.filter(
-        Sale.created_at >= today_start,
-        Sale.status == SaleStatus.COMPLETED,
-    ).scalar() or 0
-
-    profit_query = db.query(
-        func.coalesce(func.sum((SaleItem.unit_price - Product.cost_price) * SaleItem.quantity), 0)
-    ).join(
-        Sale, Sale.id == SaleItem.sale_id
-    ).join(
-        Product, Product.id == SaleItem.product_id
-    )
-    profit_query = scope_query_to_user(
-        profit_query,
-        Sale,
-        current_user,
-        app_mode=settings.APP_MODE,
-    )
-    total_profit = profit_query.filter(
-        Sale.created_at >= today_start,
-        Sale.status == SaleStatus.COMPLETED,
-    ).scalar() or 0
 
+def _closeout_payload(business_date: date, totals: dict) -> dict:
     return {
-        "total_sales": int(sales_stats.total_sales or 0),
-        "total_revenue": float(to_decimal(sales_stats.total_revenue)),
-        "total_profit": float(to_decimal(total_profit)),
-        "total_items_sold": int(total_items_sold),
+        "business_date": business_date,
+        "completed_sales_count": totals["completed_count"],
+        "refunded_sales_count": totals["refunded_count"],
+        "cancelled_sales_count": totals["cancelled_count"],
+        "completed_revenue": float(totals["completed_amount"]),
+        "refunded_revenue": float(totals["refunded_amount"]),
+        "cancelled_revenue": float(totals["cancelled_amount"]),
+        "cash_revenue": float(totals["cash_amount"]),
+        "momo_revenue": float(totals["momo_amount"]),
+        "card_revenue": float(totals["card_amount"]),
+        "bank_transfer_revenue": float(totals["bank_transfer_amount"]),
+        "credit_revenue": float(totals["credit_amount"]),
     }
 
 
@@ -772,65 +1008,41 @@ def get_end_of_day_closeout(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_view_reports),
 ):
+    """
+    Closeout totals for a UTC business day, summed from its till shifts.
+
+    A sale voided or refunded while its shift was open moves from completed
+    to refunded/cancelled revenue on the day it was rung up. Once the shift
+    is closed, the reversal is booked on the day it was made instead.
+    """
     closeout_date = business_date or date.today()
+    totals = TillLedgerService.day_totals(db, current_user, closeout_date)
+    return _closeout_payload(closeout_date, totals)
 
-    status_query = db.query(
-        Sale.status,
-        func.count(Sale.id).label("count"),
-        func.coalesce(func.sum(Sale.total_amount), 0).label("amount"),
-    )
-    status_query = scope_query_to_user(
-        status_query,
-        Sale,
-        current_user,
-        app_mode=settings.APP_MODE,
-    )
-    status_rows = status_query.filter(
-        func.date(Sale.created_at) == closeout_date
-    ).group_by(
-        Sale.status
-    ).all()
-
-    status_totals = {
-        row.status: {"count": int(row.count or 0), "amount": float(to_decimal(row.amount))}
-        for row in status_rows
-    }
 
-    payment_query = db.query(
-        Sale.payment_method,
-        func.coalesce(func.sum(Sale.total_amount), 0).label("amount"),
-    )
-    payment_query = scope_query_to_user(
-        payment_query,
-        Sale,
-        current_user,
-        app_mode=settings.APP_MODE,
-    )
-    payment_rows = payment_query.filter(
-        func.date(Sale.created_at) == closeout_date,
-        Sale.status == SaleStatus.COMPLETED,
-    ).group_by(
-        Sale.payment_method
-    ).all()
-
-    payment_totals = {
-        row.payment_method: float(to_decimal(row.amount))
-        for row in payment_rows
-    }
+@router.get("/summary/closeout/verify", response_model=CloseoutVerification)
+def verify_end_of_day_closeout(
+    business_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_view_reports),
+):
+    """
+    Recompute a business day's closeout from the raw sales and report drift.
 
+    Any field where the till ledger disagrees with the sales themselves is
+    listed under ``drift``. Sales recorded outside checkout (for example
+    imported or edited directly in the database) show up here.
+    """
+    closeout_date = business_date or date.today()
+    ledger = TillLedgerService.day_totals(db, current_user, closeout_date)
+    recomputed = TillLedgerService.recompute_day_totals(db, current_user, closeout_date)
+    drift = TillLedgerService.drift(ledger, recomputed)
     return {
         "business_date": closeout_date,
-        "completed_sales_count": status_totals.get(SaleStatus.COMPLETED, {}).get("count", 0),
-        "refunded_sales_count": status_totals.get(SaleStatus.REFUNDED, {}).get("count", 0),
-        "cancelled_sales_count": status_totals.get(SaleStatus.CANCELLED, {}).get("count", 0),
-        "completed_revenue": status_totals.get(SaleStatus.COMPLETED, {}).get("amount", 0.0),
-        "refunded_revenue": status_totals.get(SaleStatus.REFUNDED, {}).get("amount", 0.0),
-        "cancelled_revenue": status_totals.get(SaleStatus.CANCELLED, {}).get("amount", 0.0),
-        "cash_revenue": payment_totals.get(PaymentMethod.CASH, 0.0),
-        "momo_revenue": payment_totals.get(PaymentMethod.MOMO, 0.0),
-        "card_revenue": payment_totals.get(PaymentMethod.CARD, 0.0),
-        "bank_transfer_revenue": payment_totals.get(PaymentMethod.BANK_TRANSFER, 0.0),
-        "credit_revenue": payment_totals.get(PaymentMethod.CREDIT, 0.0),
+        "in_balance": not drift,
+        "ledger": _closeout_payload(closeout_date, ledger),
+        "recomputed": _closeout_payload(closeout_date, recomputed),
+        "drift": drift,
     }
 
 
@@ -1,15 +1,19 @@
 """
 Stock take API endpoints.
 """
-from datetime import datetime, timezone
-from typing import List
+import csv
+from datetime import date, datetime, timezone
+import io
+from typing import Iterable, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import insert, or_
 from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.api.dependencies import get_current_active_user, require_perform_stock_take
 from app.db.base import get_db
-from app.models.inventory_movement import InventoryMovementType
+from app.models.inventory_movement import InventoryMovement, InventoryMovementType
 from app.models.product import Product, ProductBatch
 from app.models.stock_adjustment import AdjustmentType, StockAdjustment
 from app.models.stock_take import StockTake, StockTakeItem, StockTakeStatus
@@ -19,6 +23,7 @@ from app.schemas.stock_take import (
     StockTake as StockTakeSchema,
     StockTakeComplete,
     StockTakeCreate,
+    StockTakeItemCreate,
 )
 from app.services.audit_service import AuditService
 from app.services.inventory_service import InventoryService
@@ -78,6 +83,122 @@ def get_stock_take(
     return stock_take
 
 
+def _load_scoped_by_id(
+    db: Session,
+    model,
+    ids: Iterable[int],
+    current_user: User,
+    *,
+    lock: bool = False,
+) -> dict:
+    """Load every referenced row in one id-ordered query.
+
+    Locking in id order keeps concurrent full-store counts from deadlocking
+    each other.
+    """
+    query = scope_query_to_user(
+        db.query(model),
+        model,
+        current_user,
+        app_mode=settings.APP_MODE,
+    ).filter(model.id.in_(sorted(set(ids)))).order_by(model.id)
+    if lock:
+        query = query.with_for_update()
+    return {row.id: row for row in query.all()}
+
+
+def _record_stock_take(
+    db: Session,
+    current_user: User,
+    *,
+    reason: str,
+    notes: Optional[str],
+    items: List[StockTakeItemCreate],
+) -> StockTake:
+    seen_batch_ids: set[int] = set()
+    for item in items:
+        if item.batch_id in seen_batch_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Each batch can only appear once in a stock take",
+            )
+        seen_batch_ids.add(item.batch_id)
+
+    products = _load_scoped_by_id(db, Product, (item.product_id for item in items), current_user)
+    batches = _load_scoped_by_id(db, ProductBatch, seen_batch_ids, current_user)
+    for item in items:
+        if item.product_id not in products:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Product {item.product_id} not found",
+            )
+        batch = batches.get(item.batch_id)
+        if not batch or batch.product_id != item.product_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Batch does not belong to the selected product",
+            )
+
+    stock_take = StockTake(
+        reference=f"PENDING-STOCK-TAKE-{datetime.now(timezone.utc).timestamp()}",
+        reason=reason.strip(),
+        notes=notes,
+        created_by=current_user.id,
+    )
+    apply_tenant_scope(stock_take, current_user, app_mode=settings.APP_MODE)
+    db.add(stock_take)
+    db.flush()
+    stock_take.reference = f"STK-{datetime.now().strftime('%Y%m%d')}-{stock_take.id:06d}"
+
+    db.execute(
+        insert(StockTakeItem),
+        [
+            {
+                "organization_id": stock_take.organization_id,
+                "branch_id": stock_take.branch_id,
+                "stock_take_id": stock_take.id,
+                "product_id": item.product_id,
+                "batch_id": item.batch_id,
+                "expected_quantity": batches[item.batch_id].quantity,
+                "counted_quantity": item.counted_quantity,
+                "variance_quantity": item.counted_quantity - batches[item.batch_id].quantity,
+                "reason": item.reason,
+            }
+            for item in items
+        ],
+    )
+
+    SyncOutboxService.record_event(
+        db,
+        event_type=SyncEventType.STOCK_TAKE_CREATED,
+        aggregate_type="stock_take",
+        aggregate_id=stock_take.id,
+        organization_id=stock_take.organization_id,
+        branch_id=stock_take.branch_id,
+        source_device_id=stock_take.source_device_id,
+        payload={
+            "stock_take_id": stock_take.id,
+            "reference": stock_take.reference,
+            "reason": stock_take.reason,
+            "line_count": len(items),
+            "created_by": current_user.id,
+        },
+    )
+    AuditService.log(
+        db,
+        action="create_stock_take",
+        user_id=current_user.id,
+        entity_type="stock_take",
+        entity_id=stock_take.id,
+        description=f"Created stock take {stock_take.reference}",
+        extra_data={"line_count": len(items), "reason": stock_take.reason},
+        organization_id=stock_take.organization_id,
+        branch_id=stock_take.branch_id,
+        source_device_id=stock_take.source_device_id,
+    )
+    return stock_take
+
+
 @router.post("", response_model=StockTakeSchema, status_code=status.HTTP_201_CREATED)
 def create_stock_take(
     payload: StockTakeCreate,
@@ -86,93 +207,167 @@ def create_stock_take(
 ):
     """Create a stock take draft from batch-level physical counts."""
     try:
-        seen_batch_ids: set[int] = set()
-        stock_take = StockTake(
-            reference=f"PENDING-STOCK-TAKE-{datetime.now(timezone.utc).timestamp()}",
-            reason=payload.reason.strip(),
+        stock_take = _record_stock_take(
+            db,
+            current_user,
+            reason=payload.reason,
             notes=payload.notes,
-            created_by=current_user.id,
+            items=payload.items,
         )
-        apply_tenant_scope(stock_take, current_user, app_mode=settings.APP_MODE)
-        db.add(stock_take)
-        db.flush()
-        stock_take.reference = f"STK-{datetime.now().strftime('%Y%m%d')}-{stock_take.id:06d}"
+        db.commit()
+        db.refresh(stock_take)
+        return stock_take
+    except Exception:
+        db.rollback()
+        raise
 
-        for item in payload.items:
-            if item.batch_id in seen_batch_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Each batch can only appear once in a stock take",
-                )
-            seen_batch_ids.add(item.batch_id)
 
-            product_query = scope_query_to_user(
-                db.query(Product),
-                Product,
-                current_user,
-                app_mode=settings.APP_MODE,
-            )
-            product = product_query.filter(Product.id == item.product_id).first()
-            if not product:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Product {item.product_id} not found",
-                )
+def _csv_count_lines(
+    db: Session,
+    upload_file,
+    current_user: User,
+) -> List[StockTakeItemCreate]:
+    """Read handheld scanner counts from a CSV upload, one row at a time.
 
-            batch_query = scope_query_to_user(
-                db.query(ProductBatch),
-                ProductBatch,
-                current_user,
-                app_mode=settings.APP_MODE,
+    Each row needs ``counted_quantity`` and identifies its batch either by
+    ``batch_id`` or by ``batch_number`` with the product ``sku`` or
+    ``barcode``. ``product_id`` and ``reason`` are optional.
+    """
+    text_stream = io.TextIOWrapper(upload_file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text_stream)
+        fields = {name.strip().lower() for name in reader.fieldnames or []}
+        if "counted_quantity" not in fields or not (
+            "batch_id" in fields or ("batch_number" in fields and fields & {"sku", "barcode"})
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    "CSV needs a counted_quantity column and either batch_id "
+                    "or batch_number with sku or barcode"
+                ),
             )
-            batch = batch_query.filter(ProductBatch.id == item.batch_id).first()
-            if not batch or batch.product_id != product.id:
+
+        rows = []
+        for line_number, raw_row in enumerate(reader, start=2):
+            row = {
+                (key or "").strip().lower(): (value or "").strip()
+                for key, value in raw_row.items()
+            }
+            if not any(row.values()):
+                continue
+            try:
+                rows.append(
+                    {
+                        "line": line_number,
+                        "batch_id": int(row["batch_id"]) if row.get("batch_id") else None,
+                        "product_id": int(row["product_id"]) if row.get("product_id") else None,
+                        "batch_number": row.get("batch_number") or None,
+                        "product_code": row.get("sku") or row.get("barcode") or None,
+                        "counted_quantity": int(row["counted_quantity"]),
+                        "reason": row.get("reason") or None,
+                    }
+                )
+            except ValueError as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"CSV line {line_number}: quantities and ids must be whole numbers",
+                ) from exc
+            if len(rows) > settings.STOCK_TAKE_MAX_LINES:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Batch does not belong to the selected product",
+                    detail=f"A stock take can have at most {settings.STOCK_TAKE_MAX_LINES} lines",
                 )
+    except UnicodeDecodeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV must be UTF-8 encoded",
+        ) from exc
+    finally:
+        text_stream.detach()
 
-            expected_quantity = batch.quantity
-            counted_quantity = item.counted_quantity
-            stock_take_item = StockTakeItem(
-                stock_take_id=stock_take.id,
-                product_id=product.id,
-                batch_id=batch.id,
-                expected_quantity=expected_quantity,
-                counted_quantity=counted_quantity,
-                variance_quantity=counted_quantity - expected_quantity,
-                reason=item.reason,
-            )
-            apply_tenant_scope(stock_take_item, current_user, app_mode=settings.APP_MODE)
-            db.add(stock_take_item)
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV has no count lines",
+        )
 
-        SyncOutboxService.record_event(
-            db,
-            event_type=SyncEventType.STOCK_TAKE_CREATED,
-            aggregate_type="stock_take",
-            aggregate_id=stock_take.id,
-            organization_id=stock_take.organization_id,
-            branch_id=stock_take.branch_id,
-            source_device_id=stock_take.source_device_id,
-            payload={
-                "stock_take_id": stock_take.id,
-                "reference": stock_take.reference,
-                "reason": stock_take.reason,
-                "line_count": len(payload.items),
-                "created_by": current_user.id,
-            },
+    # Resolve batch_number + sku/barcode rows with one scoped query.
+    by_code = {}
+    batch_numbers = {row["batch_number"] for row in rows if row["batch_id"] is None and row["batch_number"]}
+    product_codes = {row["product_code"] for row in rows if row["batch_id"] is None and row["product_code"]}
+    if batch_numbers and product_codes:
+        batch_query = scope_query_to_user(
+            db.query(ProductBatch.id, ProductBatch.product_id, ProductBatch.batch_number, Product.sku, Product.barcode),
+            ProductBatch,
+            current_user,
+            app_mode=settings.APP_MODE,
+        ).join(Product, Product.id == ProductBatch.product_id)
+        for match in batch_query.filter(
+            ProductBatch.batch_number.in_(batch_numbers),
+            or_(Product.sku.in_(product_codes), Product.barcode.in_(product_codes)),
+        ).all():
+            for code in (match.sku, match.barcode):
+                if code:
+                    by_code[(code, match.batch_number)] = (match.product_id, match.id)
+
+    batch_products = {}
+    batch_ids = [row["batch_id"] for row in rows if row["batch_id"] is not None]
+    if batch_ids:
+        batch_query = scope_query_to_user(
+            db.query(ProductBatch.id, ProductBatch.product_id),
+            ProductBatch,
+            current_user,
+            app_mode=settings.APP_MODE,
         )
-        AuditService.log(
+        batch_products = dict(batch_query.filter(ProductBatch.id.in_(set(batch_ids))).all())
+
+    items = []
+    for row in rows:
+        if row["batch_id"] is not None:
+            product_id = row["product_id"] or batch_products.get(row["batch_id"])
+            batch_id = row["batch_id"]
+        else:
+            product_id, batch_id = by_code.get((row["product_code"], row["batch_number"]), (None, None))
+        if product_id is None or batch_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"CSV line {row['line']}: batch not found",
+            )
+        try:
+            items.append(
+                StockTakeItemCreate(
+                    product_id=product_id,
+                    batch_id=batch_id,
+                    counted_quantity=row["counted_quantity"],
+                    reason=row["reason"],
+                )
+            )
+        except ValidationError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"CSV line {row['line']}: {exc.errors()[0]['msg']}",
+            ) from exc
+    return items
+
+
+@router.post("/upload", response_model=StockTakeSchema, status_code=status.HTTP_201_CREATED)
+def upload_stock_take(
+    reason: str = Form(..., min_length=3, max_length=300),
+    notes: Optional[str] = Form(None),
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_perform_stock_take),
+):
+    """Create a stock take draft from a handheld scanner CSV export."""
+    try:
+        items = _csv_count_lines(db, file.file, current_user)
+        stock_take = _record_stock_take(
             db,
-            action="create_stock_take",
-            user_id=current_user.id,
-            entity_type="stock_take",
-            entity_id=stock_take.id,
-            description=f"Created stock take {stock_take.reference}",
-            extra_data={"line_count": len(payload.items), "reason": stock_take.reason},
-            organization_id=stock_take.organization_id,
-            branch_id=stock_take.branch_id,
-            source_device_id=stock_take.source_device_id,
+            current_user,
+            reason=reason,
+            notes=notes,
+            items=items,
         )
         db.commit()
         db.refresh(stock_take)
@@ -216,20 +411,23 @@ def complete_stock_take(
                 detail="Only draft stock takes can be completed",
             )
 
-        movement_count = 0
-        total_variance = 0
-        completed_lines = []
+        # Products before batches, as checkout locks them, each in id order.
+        # Only products whose stock changes are locked; unchanged lines just
+        # need their batch checked for staleness.
+        products = _load_scoped_by_id(
+            db,
+            Product,
+            (item.product_id for item in stock_take.items if item.variance_quantity != 0),
+            current_user,
+            lock=True,
+        )
+        batches = _load_scoped_by_id(
+            db, ProductBatch, (item.batch_id for item in stock_take.items), current_user, lock=True
+        )
 
+        changed_items = []
         for item in stock_take.items:
-            batch_query = scope_query_to_user(
-                db.query(ProductBatch),
-                ProductBatch,
-                current_user,
-                app_mode=settings.APP_MODE,
-            )
-            batch = batch_query.filter(
-                ProductBatch.id == item.batch_id
-            ).with_for_update().first()
+            batch = batches.get(item.batch_id)
             if not batch:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
@@ -243,69 +441,90 @@ def complete_stock_take(
                         "Create a new stock take for this batch."
                     ),
                 )
-
             if item.variance_quantity == 0:
                 continue
-
-            product_query = scope_query_to_user(
-                db.query(Product),
-                Product,
-                current_user,
-                app_mode=settings.APP_MODE,
-            )
-            product = product_query.filter(
-                Product.id == item.product_id
-            ).with_for_update().first()
-            if not product:
+            if item.product_id not in products:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail=f"Product {item.product_id} no longer exists",
                 )
+            changed_items.append(item)
 
+        today = date.today()
+        sellable_deltas = []
+        for item in changed_items:
+            batch = batches[item.batch_id]
             batch.quantity = item.counted_quantity
-            stock_after = InventoryService.recalculate_product_stock(db, product)
+            # Change in the product's sellable stock from this line alone.
+            sellable = not batch.is_quarantined and batch.expiry_date >= today
+            sellable_deltas.append(
+                (max(item.counted_quantity, 0) - max(item.expected_quantity, 0)) if sellable else 0
+            )
+        final_stock = InventoryService.recalculate_products_stock(
+            db, {item.product_id: products[item.product_id] for item in changed_items}.values()
+        )
+
+        # Each movement records the product's stock right after its own line,
+        # as if the lines had been applied one by one.
+        running_stock = dict(final_stock)
+        for item, delta in zip(changed_items, sellable_deltas):
+            running_stock[item.product_id] -= delta
+
+        completed_lines = []
+        adjustment_rows = []
+        movement_rows = []
+        for item, delta in zip(changed_items, sellable_deltas):
+            batch = batches[item.batch_id]
+            running_stock[item.product_id] += delta
+            stock_after = running_stock[item.product_id]
+            reason = item.reason or f"Stock take {stock_take.reference}"
             completed_lines.append(
                 {
-                    "product_id": product.id,
+                    "product_id": item.product_id,
                     "batch_id": batch.id,
                     "batch_number": batch.batch_number,
                     "expected_quantity": item.expected_quantity,
                     "counted_quantity": item.counted_quantity,
                     "variance_quantity": item.variance_quantity,
                     "stock_after": stock_after,
-                    "reason": item.reason or f"Stock take {stock_take.reference}",
+                    "reason": reason,
                 }
             )
-            adjustment = StockAdjustment(
-                product_id=product.id,
-                batch_id=batch.id,
-                adjustment_type=AdjustmentType.CORRECTION,
-                quantity=abs(item.variance_quantity),
-                reason=item.reason or f"Stock take {stock_take.reference}",
-                performed_by=current_user.id,
+            scope = {
+                "organization_id": stock_take.organization_id,
+                "branch_id": stock_take.branch_id,
+                "source_device_id": stock_take.source_device_id,
+            }
+            adjustment_rows.append(
+                {
+                    **scope,
+                    "product_id": item.product_id,
+                    "batch_id": batch.id,
+                    "adjustment_type": AdjustmentType.CORRECTION,
+                    "quantity": abs(item.variance_quantity),
+                    "reason": reason,
+                    "performed_by": current_user.id,
+                }
             )
-            adjustment.organization_id = stock_take.organization_id
-            adjustment.branch_id = stock_take.branch_id
-            adjustment.source_device_id = stock_take.source_device_id
-            db.add(adjustment)
-            db.flush()
-            InventoryService.record_movement(
-                db,
-                product_id=product.id,
-                batch_id=batch.id,
-                movement_type=InventoryMovementType.STOCK_CORRECTION,
-                quantity_delta=item.variance_quantity,
-                stock_after=stock_after,
-                source_document_type="stock_take",
-                source_document_id=stock_take.id,
-                reason=adjustment.reason,
-                created_by=current_user.id,
-                organization_id=stock_take.organization_id,
-                branch_id=stock_take.branch_id,
-                source_device_id=stock_take.source_device_id,
+            movement_rows.append(
+                {
+                    **scope,
+                    "product_id": item.product_id,
+                    "batch_id": batch.id,
+                    "movement_type": InventoryMovementType.STOCK_CORRECTION,
+                    "quantity_delta": item.variance_quantity,
+                    "stock_after": stock_after,
+                    "source_document_type": "stock_take",
+                    "source_document_id": stock_take.id,
+                    "reason": reason,
+                    "created_by": current_user.id,
+                }
             )
-            movement_count += 1
-            total_variance += item.variance_quantity
+        if changed_items:
+            db.execute(insert(StockAdjustment), adjustment_rows)
+            db.execute(insert(InventoryMovement), movement_rows)
+        movement_count = len(movement_rows)
+        total_variance = sum(item.variance_quantity for item in changed_items)
 
         stock_take.status = StockTakeStatus.COMPLETED
         stock_take.completed_by = current_user.id
@@ -7,17 +7,20 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
 from app.api.dependencies import require_admin
 from app.core.config import settings
-from app.db.base import get_db
+from app.db.base import get_async_db, get_db
+from app.db.workloads import Workload, use_workload
 from app.models.sync_ingestion import IngestedSyncEvent
 from app.models.tenancy import Device, DeviceStatus
 from app.schemas.cloud_projection import CloudProjectionRunResult, CloudProjectionStatus
 from app.schemas.sync_ingestion import SyncIngestionRequest, SyncIngestionResponse
 from app.services.cloud_projection_service import CloudProjectionService
 from app.services.sync_identity_service import build_aggregate_uid
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 from app.models.user import User
 
 router = APIRouter(prefix="/sync", tags=["Sync"])
@@ -25,7 +28,10 @@ router = APIRouter(prefix="/sync", tags=["Sync"])
 
 def _authenticate_device(db: Session, payload: SyncIngestionRequest, authorization: Optional[str]) -> Device:
     """Look up device, verify it is active, and validate its per-device token."""
-    device = db.query(Device).filter(Device.device_uid == payload.device_uid).first()
+    device = db.query(Device).options(
+        joinedload(Device.organization),
+        joinedload(Device.branch),
+    ).filter(Device.device_uid == payload.device_uid).first()
     if not device:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Device is not registered")
     if device.status != DeviceStatus.ACTIVE:
@@ -94,6 +100,7 @@ def ingest_sync_event(
     - same event ID and same payload hash returns the existing record
     - same event ID with different payload hash is rejected
     - same device sequence with a different event is rejected
+    - a sequence at or below the device's archive watermark is a duplicate
     """
     try:
         device = _authenticate_device(db, payload, authorization)
@@ -117,6 +124,7 @@ def ingest_sync_event(
                 )
             existing_by_event_id.duplicate_count += 1
             existing_by_event_id.last_duplicate_at = datetime.now(timezone.utc)
+            SyncIngestionStatsService.record(db, existing_by_event_id, duplicates=1)
             db.commit()
             db.refresh(existing_by_event_id)
             return SyncIngestionResponse(
@@ -128,6 +136,19 @@ def ingest_sync_event(
                 received_at=existing_by_event_id.received_at,
             )
 
+        if SyncIngestionStatsService.record_archived_duplicate(db, device, payload.local_sequence_number):
+            # The original row is in cold storage, so its payload hash can no
+            # longer be compared; the sequence watermark alone proves delivery.
+            db.commit()
+            return SyncIngestionResponse(
+                accepted=True,
+                duplicate=True,
+                event_id=payload.event_id,
+                ingested_event_id=None,
+                local_sequence_number=payload.local_sequence_number,
+                received_at=datetime.now(timezone.utc),
+            )
+
         existing_by_sequence = db.query(IngestedSyncEvent).filter(
             IngestedSyncEvent.source_device_id == device.id,
             IngestedSyncEvent.local_sequence_number == payload.local_sequence_number,
@@ -164,6 +185,7 @@ def ingest_sync_event(
             payload=payload.payload,
             payload_hash=payload.payload_hash,
             duplicate_count=0,
+            received_at=datetime.now(timezone.utc),
         )
         db.add(ingested)
         if settings.CLOUD_PROJECTION_ENABLED:
@@ -173,6 +195,15 @@ def ingest_sync_event(
                 ingested.projection_error = None
             except Exception as exc:
                 ingested.projection_error = str(exc)
+        SyncIngestionStatsService.record(
+            db,
+            ingested,
+            ingested=1,
+            projected=1 if ingested.projected_at else 0,
+            failed=1 if ingested.projection_error else 0,
+            received_at=ingested.received_at,
+            projected_at=ingested.projected_at,
+        )
         db.commit()
         db.refresh(ingested)
         return SyncIngestionResponse(
@@ -189,11 +220,11 @@ def ingest_sync_event(
 
 
 @router.get("/projection-status", response_model=CloudProjectionStatus)
-def get_projection_status(
-    db: Session = Depends(get_db),
+async def get_projection_status(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_admin),
 ):
-    status_payload = CloudProjectionService.status(db)
+    status_payload = await db.run_sync(CloudProjectionService.status)
     return CloudProjectionStatus(
         **{
             **status_payload,
@@ -204,7 +235,11 @@ def get_projection_status(
     )
 
 
-@router.post("/project", response_model=CloudProjectionRunResult)
+@router.post(
+    "/project",
+    response_model=CloudProjectionRunResult,
+    dependencies=[Depends(use_workload(Workload.REPORTING))],
+)
 def project_ingested_events(
     limit: int = 100,
     db: Session = Depends(get_db),
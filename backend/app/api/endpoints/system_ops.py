@@ -5,18 +5,21 @@ from datetime import datetime, timezone
 from pathlib import Path
 from io import StringIO
 import csv
+import hmac
 import json
 import os
 import platform
 import shutil
 import subprocess
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import require_admin, require_trigger_backup
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.password_pool import password_pool
 from app.db.base import SessionLocal, engine, get_db
 from app.models.activity_log import ActivityLog
 from app.models.restore_drill import RestoreDrill
@@ -241,6 +244,7 @@ def _build_system_diagnostics() -> SystemDiagnostics:
         sync_status = SyncUploadService.sync_status(db)
     finally:
         db.close()
+    password_stats = password_pool.stats()
     return SystemDiagnostics(
         platform=platform.system(),
         app_version=settings.APP_VERSION,
@@ -263,6 +267,11 @@ def _build_system_diagnostics() -> SystemDiagnostics:
         sync_failed_count=sync_status["failed_count"],
         sync_sent_count=sync_status["sent_count"],
         sync_last_sent_at=sync_status["last_sent_at"].isoformat() if sync_status["last_sent_at"] else None,
+        password_pool_workers=password_stats["workers"],
+        password_pool_in_flight=password_stats["in_flight"],
+        password_pool_queue_depth=password_stats["queue_depth"],
+        password_pool_max_queue_depth=password_stats["max_queue_depth"],
+        password_pool_rejected=password_stats["rejected"],
     )
 
 
@@ -363,6 +372,22 @@ def get_system_diagnostics(
     return _build_system_diagnostics()
 
 
+@router.get("/metrics", include_in_schema=False)
+def get_metrics(authorization: str | None = Header(default=None)):
+    """Prometheus scrape endpoint; authenticated by ``METRICS_BEARER_TOKEN``."""
+    if not settings.METRICS_BEARER_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics endpoint is not enabled")
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing metrics token")
+    raw_token = authorization.removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(raw_token.encode(), settings.METRICS_BEARER_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return Response(
+        content=metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @router.get("/sync-status", response_model=SyncStatus)
 def get_sync_status(
     current_user: User = Depends(require_trigger_backup),
@@ -382,7 +407,10 @@ def get_sync_status(
         db.close()
 
 
-@router.post("/sync-now", response_model=SyncRunResult)
+@router.post(
+    "/sync-now",
+    response_model=SyncRunResult,
+)
 def trigger_sync_now(
     current_user: User = Depends(require_trigger_backup),
 ):
@@ -393,7 +421,10 @@ def trigger_sync_now(
         db.close()
 
 
-@router.post("/cloud-sync-now", response_model=CloudSyncNowResult)
+@router.post(
+    "/cloud-sync-now",
+    response_model=CloudSyncNowResult,
+)
 def trigger_cloud_sync_now(
     include_inactive: bool = False,
     db: Session = Depends(get_db),
@@ -433,7 +464,10 @@ def trigger_cloud_sync_now(
         raise
 
 
-@router.post("/enqueue-cloud-snapshot", response_model=CloudSnapshotEnqueueResult)
+@router.post(
+    "/enqueue-cloud-snapshot",
+    response_model=CloudSnapshotEnqueueResult,
+)
 def enqueue_cloud_snapshot(
     include_inactive: bool = False,
     db: Session = Depends(get_db),
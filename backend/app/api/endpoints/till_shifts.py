@@ -0,0 +1,156 @@
+"""
+Till shift (drawer session) API endpoints.
+"""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.dependencies import get_current_active_user
+from app.core.app_mode import require_operational_tenant_scope, scope_query_to_user
+from app.core.config import settings
+from app.core.money import round_money
+from app.db.base import get_db
+from app.models.till_shift import TillShift, TillShiftStatus
+from app.models.user import User, UserPermission
+from app.schemas.till_shift import TillShift as TillShiftSchema, TillShiftClose, TillShiftOpen
+from app.services.audit_service import AuditService
+from app.services.till_ledger_service import TillLedgerService
+
+router = APIRouter(prefix="/till-shifts", tags=["Till Shifts"])
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+@router.get("/current", response_model=TillShiftSchema)
+def get_current_till_shift(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Get the caller's open drawer session for today."""
+    shift = TillLedgerService.open_shift_for(db, current_user, _today())
+    if shift is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No open till shift for today",
+        )
+    return shift
+
+
+@router.post("/open", response_model=TillShiftSchema, status_code=status.HTTP_201_CREATED)
+def open_till_shift(
+    payload: TillShiftOpen,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Open a drawer session with its opening float.
+
+    Opening is optional: the first sale of the day opens a shift with no
+    float if the cashier has not opened one.
+    """
+    require_operational_tenant_scope(
+        current_user,
+        app_mode=settings.APP_MODE,
+        deployment_profile=settings.POS_DEPLOYMENT_PROFILE,
+    )
+    business_date = _today()
+    try:
+        if TillLedgerService.open_shift_for(db, current_user, business_date) is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A till shift is already open for today",
+            )
+        shift = TillLedgerService.open_shift(
+            db,
+            current_user,
+            business_date,
+            opening_float=Decimal(str(payload.opening_float)),
+        )
+        AuditService.log(
+            db,
+            action="open_till_shift",
+            user_id=current_user.id,
+            entity_type="till_shift",
+            entity_id=shift.id,
+            description=f"Opened till shift for {business_date.isoformat()}",
+            extra_data={"opening_float": shift.opening_float},
+            organization_id=shift.organization_id,
+            branch_id=shift.branch_id,
+        )
+        db.commit()
+        db.refresh(shift)
+        return shift
+    except Exception:
+        db.rollback()
+        raise
+
+
+@router.post("/{shift_id}/close", response_model=TillShiftSchema)
+def close_till_shift(
+    shift_id: int,
+    payload: TillShiftClose,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Close a drawer session with the counted cash.
+
+    Cashiers close their own shift; users with report access can close any
+    shift in their scope. Sales after closing open a new shift.
+    """
+    try:
+        query = scope_query_to_user(
+            db.query(TillShift),
+            TillShift,
+            current_user,
+            app_mode=settings.APP_MODE,
+        )
+        shift = query.filter(TillShift.id == shift_id).with_for_update().first()
+        if not shift:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Till shift not found",
+            )
+        if (
+            shift.user_id != current_user.id
+            and UserPermission.VIEW_REPORTS.value not in current_user.effective_permissions
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permission required: {UserPermission.VIEW_REPORTS.value}",
+            )
+        if shift.status != TillShiftStatus.OPEN:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Till shift is already closed",
+            )
+
+        shift.status = TillShiftStatus.CLOSED
+        shift.closed_at = datetime.now(timezone.utc)
+        shift.closed_by = current_user.id
+        shift.counted_cash = round_money(payload.counted_cash)
+        AuditService.log(
+            db,
+            action="close_till_shift",
+            user_id=current_user.id,
+            entity_type="till_shift",
+            entity_id=shift.id,
+            description=f"Closed till shift for {shift.business_date.isoformat()}",
+            extra_data={
+                "counted_cash": shift.counted_cash,
+                "expected_cash": shift.expected_cash,
+                "cash_variance": shift.cash_variance,
+            },
+            organization_id=shift.organization_id,
+            branch_id=shift.branch_id,
+        )
+        db.commit()
+        db.refresh(shift)
+        return shift
+    except Exception:
+        db.rollback()
+        raise
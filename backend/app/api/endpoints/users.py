@@ -14,6 +14,7 @@ from app.core.app_mode import apply_tenant_scope, scope_query_to_user
 from app.core.config import settings
 from app.core.security import get_password_hash
 from app.services.audit_service import AuditService
+from app.services.principal_cache import principal_cache
 from app.services.sync_outbox_service import SyncOutboxService
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -147,6 +148,16 @@ def create_user(
     return db_user
 
 
+def _token_privileges(user: User) -> tuple:
+    """What an issued token grants: a change to any of these revokes it."""
+    return (
+        user.role,
+        sorted(user.permissions or []),
+        user.organization_id,
+        user.branch_id,
+    )
+
+
 @router.put("/{user_id}", response_model=UserSchema)
 def update_user(
     user_id: int,
@@ -202,6 +213,10 @@ def update_user(
                 detail="Managers cannot change user roles"
             )
 
+    # Tokens carry the principal other workers may have cached; changing
+    # what it grants must revoke them, not just refresh this worker's cache.
+    privileges_before = _token_privileges(db_user)
+
     # Update fields
     if normalized_username is not None:
         existing = scope_query_to_user(
@@ -249,12 +264,19 @@ def update_user(
     if user_data.permissions is not None:
         db_user.permissions = [permission.value for permission in user_data.permissions]
 
+    revoke_tokens = user_data.password is not None or (db_user.is_active and user_data.is_active is False)
+
     if user_data.is_active is not None:
         db_user.is_active = user_data.is_active
 
     if user_data.password is not None:
         db_user.hashed_password = get_password_hash(user_data.password)
 
+    revoke_tokens = revoke_tokens or _token_privileges(db_user) != privileges_before
+
+    if revoke_tokens:
+        db_user.token_version = (db_user.token_version or 0) + 1
+
     SyncOutboxService.record_event(
         db,
         event_type=SyncEventType.USER_UPDATED,
@@ -289,6 +311,7 @@ def update_user(
         branch_id=db_user.branch_id,
     )
     db.commit()
+    principal_cache.invalidate(db_user.id)
     db.refresh(db_user)
 
     return db_user
@@ -345,6 +368,7 @@ def delete_user(
     # financial and regulatory traceability.
     db_user.is_active = False
     db_user.hashed_password = "DEACTIVATED"
+    db_user.token_version = (db_user.token_version or 0) + 1
 
     SyncOutboxService.record_event(
         db,
@@ -372,3 +396,4 @@ def delete_user(
         branch_id=db_user.branch_id,
     )
     db.commit()
+    principal_cache.invalidate(db_user.id)
@@ -31,11 +31,60 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "pharma_user"
     POSTGRES_PASSWORD: str = ""
     ALLOW_SQLITE_IN_PRODUCTION: bool = False
+    # Per worker process, each workload class has its own pool (app/db/workloads.py)
+    # and the async reporting routes an asyncpg pool of the reporting size:
+    # total connections = workers x (sum of every pool + overflow below, with
+    # the reporting pair counted twice) = 2 x 43 with these defaults.
+    # DB_POOL_SIZE / DB_MAX_OVERFLOW size the interactive_read (default) pool.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POS_CRITICAL_POOL_SIZE: int = 6
+    DB_POS_CRITICAL_MAX_OVERFLOW: int = 4
+    # Device uploads to /sync/ingest on the hosted API.
+    DB_SYNC_INGEST_POOL_SIZE: int = 4
+    DB_SYNC_INGEST_MAX_OVERFLOW: int = 4
+    DB_REPORTING_POOL_SIZE: int = 3
+    DB_REPORTING_MAX_OVERFLOW: int = 2
+    # Scheduler jobs only, including the connection that holds the leadership lock.
+    DB_BACKGROUND_POOL_SIZE: int = 3
+    DB_BACKGROUND_MAX_OVERFLOW: int = 2
+    # Server connection limit; startup warns when WEB_CONCURRENCY workers'
+    # pools could open more than this.
+    DB_MAX_CONNECTIONS: int = 100
+    WEB_CONCURRENCY: int = 1
+    # PostgreSQL statement_timeout per workload class in milliseconds; 0 leaves
+    # the server default. The asyncio and replica pools use the reporting one.
+    DB_POS_CRITICAL_STATEMENT_TIMEOUT_MS: int = 10000
+    DB_INTERACTIVE_READ_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_SYNC_INGEST_STATEMENT_TIMEOUT_MS: int = 30000
+    DB_REPORTING_STATEMENT_TIMEOUT_MS: int = 120000
+    DB_BACKGROUND_STATEMENT_TIMEOUT_MS: int = 600000
+    # Optional streaming replica for reporting and AI analytics reads; reads
+    # fall back to the primary while it lags by more than the maximum.
+    READ_REPLICA_DATABASE_URL: Optional[str] = None
+    READ_REPLICA_MAX_LAG_SECONDS: float = 30.0
+    READ_REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    # Per worker, for AI chat and weekly report reads on the replica; the
+    # replica's asyncpg pool has the reporting pool's size.
+    READ_REPLICA_POOL_SIZE: int = 5
+    READ_REPLICA_MAX_OVERFLOW: int = 5
 
     # Security
     SECRET_KEY: Optional[str] = None
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Authenticated user (role, permissions, tenant) reused across requests.
+    AUTH_PRINCIPAL_CACHE_ENABLED: bool = True
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    AUTH_PRINCIPAL_SIGNED_CLAIMS: bool = False
+    # bcrypt runs in worker processes; 0 hashes on the request thread.
+    PASSWORD_HASH_POOL_WORKERS: int = 2
+    PASSWORD_HASH_POOL_MAX_QUEUE: int = 32
+    # Failed-login limiter: "database" is shared by every worker, "memory"
+    # only suits a single worker process.
+    LOGIN_RATE_LIMIT_STORE: str = "database"
+    LOGIN_RATE_LIMIT_MAX_ATTEMPTS: int = 5
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: int = 300
 
     # CORS — stored as raw string so pydantic-settings never tries to JSON-decode it.
     # Accepts: plain URL, comma-separated URLs, or JSON array. Use cors_origins property.
@@ -63,9 +112,17 @@ class Settings(BaseSettings):
 
     # Scheduler
     ENABLE_BACKGROUND_SCHEDULER: bool = True
+    # With several web workers only the holder of this PostgreSQL advisory
+    # lock runs scheduled jobs; the others take over if the leader dies.
+    SCHEDULER_LEADER_ELECTION: bool = True
+    SCHEDULER_LEADER_LOCK_KEY: int = 72_690_031
+    SCHEDULER_LEADER_RETRY_SECONDS: int = 15
     EXPIRY_CHECK_HOUR: int = 9
     LOW_STOCK_CHECK_HOUR: int = 10
 
+    # Upper bound on count lines in one CSV stock take upload.
+    STOCK_TAKE_MAX_LINES: int = 20_000
+
     # Cloud sync - Supabase Postgres target through backend/edge ingestion API
     CLOUD_SYNC_ENABLED: bool = False
     CLOUD_SYNC_INGEST_URL: Optional[str] = None
@@ -85,15 +142,30 @@ class Settings(BaseSettings):
     CLOUD_CATALOG_SNAPSHOT_SYNC_HOUR: int = 23
     CLOUD_CATALOG_SNAPSHOT_SYNC_MINUTE: int = 0
     CLOUD_SYNC_REQUIRE_TOKEN: bool = True
+    SYNC_OUTBOX_PRUNE_AFTER_DAYS: int = 30
     CLOUD_PROJECTION_ENABLED: bool = False
     CLOUD_PROJECTION_INTERVAL_MINUTES: int = 5
     CLOUD_PROJECTION_BATCH_SIZE: int = 100
+    SYNC_INGESTION_STATS_RECONCILE_HOUR: int = 2
+    SYNC_EVENT_ARCHIVE_ENABLED: bool = False
+    SYNC_EVENT_ARCHIVE_AFTER_DAYS: int = 90
+    SYNC_EVENT_ARCHIVE_DIR: str = "./sync_archive"
+    SYNC_EVENT_ARCHIVE_BATCH_SIZE: int = 5000
+    ADMIN_FLEET_SUMMARY_CACHE_ENABLED: bool = False
+    ADMIN_FLEET_SUMMARY_MAX_AGE_SECONDS: int = 300
 
     # AI manager assistant provider. Keys remain server-side only.
     AI_MANAGER_PROVIDER: str = "deterministic"  # deterministic, openai, claude, groq
     AI_MANAGER_MODEL: Optional[str] = None
     AI_MANAGER_TIMEOUT_SECONDS: int = 20
     AI_MANAGER_MAX_TOKENS: int = 700
+    AI_MANAGER_LATENCY_BUDGET_SECONDS: int = 45  # whole tool-use conversation per question
+    AI_TOOL_MAX_WORKERS: int = 4  # concurrent tool calls within one model turn
+    # Identical questions over identical evidence reuse one provider answer.
+    AI_RESPONSE_CACHE_ENABLED: bool = True
+    AI_RESPONSE_CACHE_TTL_SECONDS: int = 600
+    AI_RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    AI_RESPONSE_CACHE_PERSISTENT: bool = False
     AI_WEEKLY_REPORTS_ENABLED: bool = False
     AI_WEEKLY_REPORT_DAY: str = "sun"
     AI_WEEKLY_REPORT_HOUR: int = 19
@@ -143,6 +215,14 @@ class Settings(BaseSettings):
     # Follow-up scheduling
     CUSTOMER_FOLLOWUP_DAYS: int = 3        # Days after purchase before health follow-up
     CUSTOMER_FOLLOWUP_HOUR: int = 10       # Hour of day to dispatch follow-ups (local tz)
+    CUSTOMER_FOLLOWUP_DISPATCH_CHUNK_SIZE: int = 200   # Follow-ups claimed and committed per chunk
+    CUSTOMER_FOLLOWUP_DISPATCH_CONCURRENCY: int = 8    # Parallel provider sends per chunk
+    SMS_MAX_MESSAGES_PER_SECOND: float = 10.0          # Provider rate limit across workers; 0 = unpaced
+    # Outbound message queue (digital receipts are delivered off the checkout path)
+    OUTBOUND_MESSAGE_DISPATCH_INTERVAL_SECONDS: int = 30
+    OUTBOUND_MESSAGE_BATCH_SIZE: int = 100
+    OUTBOUND_MESSAGE_MAX_ATTEMPTS: int = 5
+    OUTBOUND_MESSAGE_RETRY_BASE_SECONDS: int = 60      # Doubles after each failed attempt
     CUSTOMER_RETENTION_ENABLED: Optional[bool] = None
     CUSTOMER_RECEIPTS_ENABLED: Optional[bool] = None
     CUSTOMER_FOLLOWUPS_ENABLED: Optional[bool] = None
@@ -160,6 +240,14 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "./logs/app.log"
 
+    # Metrics — per-route latency and SQL counts, served in Prometheus format
+    # at /api/system/metrics to scrapers presenting METRICS_BEARER_TOKEN
+    # (the endpoint is off while it is empty). Statements slower than
+    # SLOW_QUERY_THRESHOLD_MS are logged with normalized SQL; 0 disables.
+    METRICS_ENABLED: bool = True
+    METRICS_BEARER_TOKEN: str = ""
+    SLOW_QUERY_THRESHOLD_MS: int = 500
+
     @model_validator(mode="after")
     def finalize_settings(self):
         """Build derived settings and enforce production-safe defaults."""
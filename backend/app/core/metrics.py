@@ -0,0 +1,452 @@
+"""
+In-process request, SQL, and scheduler metrics in Prometheus text format.
+
+``RequestMetricsMiddleware`` times every HTTP request and labels it with the
+matched route template (``/api/sales/{sale_id}``), never the raw path, so
+label cardinality stays bounded. ``instrument_engine`` adds cursor hooks that
+count statements and database time against whichever request or scheduler job
+is running, and log statements slower than ``SLOW_QUERY_THRESHOLD_MS`` with
+their normalized SQL. ``timed_job`` wraps scheduler jobs the same way, and
+``instrument_pool`` exports each workload pool's saturation.
+
+Metrics live in the worker process that recorded them; with several web
+workers each one exports its own series.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+UNMATCHED_ROUTE = "<unmatched>"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+MAX_NORMALIZED_SQL_LENGTH = 1000
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        with self._lock:
+            return self._values.get(labelvalues, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+            for labels, value in items
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge:
+    """Point-in-time value keyed by label values."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = float(value)
+
+    def value(self, *labelvalues: str) -> Optional[float]:
+        with self._lock:
+            return self._values.get(labelvalues)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+            for labels, value in items
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        buckets: Tuple[float, ...],
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return int(series[len(self.buckets)]) if series else 0
+
+    def total(self, *labelvalues: str) -> float:
+        with self._lock:
+            series = self._series.get(labelvalues)
+            return series[-1] if series else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        lines = []
+        bucket_labelnames = self.labelnames + ("le",)
+        for labels, series in items:
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                bucket_labels = _format_labels(bucket_labelnames, labels + (_format_number(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {int(count)}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_number(float(series[-1]))}")
+            lines.append(f"{self.name}_count{label_text} {int(series[len(self.buckets)])}")
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsRegistry:
+    """The process's metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+# Module-level singleton shared by every request and job in the process.
+metrics = MetricsRegistry()
+
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by matched route.",
+    ("method", "route", "status"),
+)
+http_request_statements = metrics.histogram(
+    "http_request_db_statements",
+    "SQL statements executed per HTTP request.",
+    ("method", "route"),
+    buckets=STATEMENT_BUCKETS,
+)
+http_request_db_duration = metrics.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL per HTTP request.",
+    ("method", "route"),
+)
+slow_queries = metrics.counter(
+    "db_slow_queries_total",
+    "SQL statements slower than SLOW_QUERY_THRESHOLD_MS, by request route or job.",
+    ("source",),
+)
+scheduler_job_duration = metrics.histogram(
+    "scheduler_job_duration_seconds",
+    "Background scheduler job run time.",
+    ("job",),
+    buckets=JOB_BUCKETS,
+)
+replica_lag = metrics.gauge(
+    "db_replica_lag_seconds",
+    "Replication lag last measured on the read replica.",
+)
+read_routing = metrics.counter(
+    "db_read_routing_total",
+    "Reporting read sessions by the database they were routed to and why.",
+    ("target", "reason"),
+)
+pool_in_use = metrics.gauge(
+    "db_pool_connections_in_use",
+    "Connections checked out of each workload pool.",
+    ("pool",),
+)
+pool_capacity = metrics.gauge(
+    "db_pool_capacity",
+    "Pool size plus max overflow of each workload pool.",
+    ("pool",),
+)
+pool_saturation = metrics.gauge(
+    "db_pool_saturation_ratio",
+    "Checked-out connections over capacity, per workload pool; at 1 new checkouts wait.",
+    ("pool",),
+)
+
+
+class QueryTally:
+    """Statements and database time attributed to one request or job run."""
+
+    __slots__ = ("_scope", "_source", "statements", "db_seconds")
+
+    def __init__(self, *, scope: Optional[dict] = None, source: Optional[str] = None) -> None:
+        self._scope = scope
+        self._source = source
+        self.statements = 0
+        self.db_seconds = 0.0
+
+    @property
+    def source(self) -> str:
+        if self._source is not None:
+            return self._source
+        # Routing fills in scope["route"] before the endpoint runs any SQL.
+        return route_template(self._scope or {})
+
+
+_current_tally: ContextVar[Optional[QueryTally]] = ContextVar("query_tally", default=None)
+
+
+def current_tally() -> Optional[QueryTally]:
+    return _current_tally.get()
+
+
+def route_template(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_BIND_PARAMETER = re.compile(r"%\([^)]+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse literals, bind styles, and ``IN``/``VALUES`` lists to ``?``.
+
+    Statements that differ only in their parameters normalize to the same text,
+    so the slow-query log groups them.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAMETER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(?...)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    if len(normalized) > MAX_NORMALIZED_SQL_LENGTH:
+        normalized = normalized[:MAX_NORMALIZED_SQL_LENGTH] + "..."
+    return normalized
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("metrics_query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    tally = _current_tally.get()
+    if tally is not None:
+        tally.statements += 1
+        tally.db_seconds += elapsed
+    threshold_ms = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold_ms > 0 and elapsed * 1000 >= threshold_ms:
+        source = tally.source if tally is not None else "<background>"
+        slow_queries.inc(source)
+        slow_query_logger.warning(
+            "Slow query took %.1f ms in %s: %s",
+            elapsed * 1000,
+            source,
+            normalize_sql(statement),
+        )
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute.
+    started = context.connection.info.get("metrics_query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the statement-counting and slow-query hooks to ``engine``."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class _PoolUsage:
+    """Checked-out connection count for one pool, exported on every checkout and checkin."""
+
+    def __init__(self, pool: str, capacity: int) -> None:
+        self.pool = pool
+        self.capacity = capacity
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def checkout(self, *_args) -> None:
+        self._update(1)
+
+    def checkin(self, *_args) -> None:
+        self._update(-1)
+
+    def _update(self, delta: int) -> None:
+        with self._lock:
+            self.in_use += delta
+            in_use = self.in_use
+        pool_in_use.set(in_use, self.pool)
+        pool_capacity.set(self.capacity, self.pool)
+        pool_saturation.set(in_use / self.capacity if self.capacity else 0.0, self.pool)
+
+
+def instrument_pool(engine: Engine, pool: str, capacity: int) -> None:
+    """Export ``engine``'s pool usage and saturation under the ``pool`` label."""
+    usage = _PoolUsage(pool, capacity)
+    event.listen(engine, "checkout", usage.checkout)
+    event.listen(engine, "checkin", usage.checkin)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording latency and SQL usage per matched route."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        tally = QueryTally(scope=scope)
+        token = _current_tally.set(tally)
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_tally.reset(token)
+            method = scope.get("method", "")
+            route = route_template(scope)
+            http_request_duration.observe(elapsed, method, route, str(status_code))
+            http_request_statements.observe(tally.statements, method, route)
+            http_request_db_duration.observe(tally.db_seconds, method, route)
+
+
+def timed_job(job_id: str, func: Callable[[], Any]) -> Callable[[], Any]:
+    """Wrap a scheduler job so its run time and SQL are attributed to ``job_id``."""
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        token = _current_tally.set(QueryTally(source=f"job:{job_id}"))
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            scheduler_job_duration.observe(time.perf_counter() - started, job_id)
+            _current_tally.reset(token)
+
+    return run
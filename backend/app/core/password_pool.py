@@ -0,0 +1,107 @@
+"""
+Bounded process pool for bcrypt password hashing and verification.
+
+bcrypt is deliberately CPU-heavy. Run on the request threadpool, a burst of
+logins at shift change starves every other request of CPU. Hashes run in
+``PASSWORD_HASH_POOL_WORKERS`` spawned processes instead; at most
+``PASSWORD_HASH_POOL_MAX_QUEUE`` calls may wait for a worker and further calls
+are refused with ``PasswordPoolBusy`` so a login storm sheds load instead of
+queueing without bound. ``stats()`` reports the queue depth for diagnostics.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised when the password pool's wait queue is full."""
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    from app.core.security import verify_password
+
+    return verify_password(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    from app.core.security import get_password_hash
+
+    return get_password_hash(password)
+
+
+class PasswordHashPool:
+    """Run password hashes in worker processes with a bounded wait queue."""
+
+    def __init__(self, *, workers: int, max_queue: int) -> None:
+        self.workers = max(0, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {"submitted": 0, "completed": 0, "rejected": 0, "max_queue_depth": 0}
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(_verify, plain_password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.workers == 0:
+            return fn(*args)
+        with self._lock:
+            if self._in_flight - self.workers >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise PasswordPoolBusy("Password hashing queue is full")
+            self._in_flight += 1
+            self._stats["submitted"] += 1
+            self._stats["max_queue_depth"] = max(
+                self._stats["max_queue_depth"], self._in_flight - self.workers
+            )
+            executor = self._get_executor_locked()
+        try:
+            return executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._stats["completed"] += 1
+
+    def _get_executor_locked(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: the web process already runs scheduler and
+            # database threads whose locks a fork would copy mid-use.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "queue_depth": max(self._in_flight - self.workers, 0),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Module-level singleton; worker processes start on first use.
+password_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_POOL_WORKERS,
+    max_queue=settings.PASSWORD_HASH_POOL_MAX_QUEUE,
+)
@@ -1,25 +1,161 @@
 """
 Database session and base configuration.
 """
+import asyncio
+import logging
+from typing import Any, Callable, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import instrument_engine, instrument_pool
+from app.db.workloads import DEFAULT_WORKLOAD, Workload, current_workload, statement_timeout_connect_args
+
+logger = logging.getLogger(__name__)
+
+# Pool size, max overflow and statement_timeout (ms) of each workload class.
+_WORKLOAD_POOLS = {
+    Workload.POS_CRITICAL: (
+        settings.DB_POS_CRITICAL_POOL_SIZE,
+        settings.DB_POS_CRITICAL_MAX_OVERFLOW,
+        settings.DB_POS_CRITICAL_STATEMENT_TIMEOUT_MS,
+    ),
+    Workload.INTERACTIVE_READ: (
+        settings.DB_POOL_SIZE,
+        settings.DB_MAX_OVERFLOW,
+        settings.DB_INTERACTIVE_READ_STATEMENT_TIMEOUT_MS,
+    ),
+    Workload.SYNC_INGEST: (
+        settings.DB_SYNC_INGEST_POOL_SIZE,
+        settings.DB_SYNC_INGEST_MAX_OVERFLOW,
+        settings.DB_SYNC_INGEST_STATEMENT_TIMEOUT_MS,
+    ),
+    Workload.REPORTING: (
+        settings.DB_REPORTING_POOL_SIZE,
+        settings.DB_REPORTING_MAX_OVERFLOW,
+        settings.DB_REPORTING_STATEMENT_TIMEOUT_MS,
+    ),
+    Workload.BACKGROUND: (
+        settings.DB_BACKGROUND_POOL_SIZE,
+        settings.DB_BACKGROUND_MAX_OVERFLOW,
+        settings.DB_BACKGROUND_STATEMENT_TIMEOUT_MS,
+    ),
+}
+
+
+def _workload_engine(workload: Workload) -> Engine:
+    pool_size, max_overflow, statement_timeout_ms = _WORKLOAD_POOLS[workload]
+    workload_engine = create_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=1800,
+        pool_timeout=30,   # fail fast under extreme load rather than queuing indefinitely
+        connect_args=statement_timeout_connect_args(settings.DATABASE_URL, statement_timeout_ms),
+    )
+    instrument_engine(workload_engine)
+    instrument_pool(workload_engine, workload.value, pool_size + max_overflow)
+    return workload_engine
+
+
+# One engine, and so one connection pool, per workload class.
+workload_engines = {workload: _workload_engine(workload) for workload in Workload}
+# The default class's engine, for code that needs an engine rather than a session.
+engine = workload_engines[DEFAULT_WORKLOAD]
+
+
+class WorkloadSession(Session):
+    """Session bound to the pool of the workload class current when it is created."""
+
+    def __init__(self, bind=None, **kwargs):
+        self.workload = current_workload()
+        super().__init__(bind=bind if bind is not None else workload_engines[self.workload], **kwargs)
+
+
+# Create session factory
+SessionLocal = sessionmaker(class_=WorkloadSession, autocommit=False, autoflush=False)
+
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(database_url: str) -> URL:
+    """Map a sync database URL onto its asyncio driver (asyncpg, aiosqlite)."""
+    url = make_url(database_url)
+    url = url.set(drivername=_ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+    if url.get_backend_name() == "postgresql" and "sslmode" in url.query:
+        # asyncpg takes ``ssl`` where libpq takes ``sslmode``.
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": url.query["sslmode"]})
+    return url
+
+
+def async_pool_options(url: URL, pool_size: int, max_overflow: int) -> Dict[str, Any]:
+    """
+    Queue-pool sizing for an asyncio engine. aiosqlite engines use
+    ``NullPool``, which rejects sizing arguments, so they get none.
+    """
+    if url.get_backend_name() != "postgresql":
+        return {}
+    return {"pool_size": pool_size, "max_overflow": max_overflow, "pool_timeout": 30}
 
-# Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
+
+# Read-only reporting routes await their queries on this engine so slow cloud
+# reports do not hold threadpool threads that POS routes need. It is the
+# reporting class's asyncio pool and gets the reporting pool's size.
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
     pool_pre_ping=True,
     echo=settings.DEBUG,
-    pool_size=15,
-    max_overflow=30,
     pool_recycle=1800,
-    pool_timeout=30,   # fail fast under extreme load rather than queuing indefinitely
+    **async_pool_options(
+        async_database_url(settings.DATABASE_URL),
+        settings.DB_REPORTING_POOL_SIZE,
+        settings.DB_REPORTING_MAX_OVERFLOW,
+    ),
+    connect_args=statement_timeout_connect_args(
+        async_database_url(settings.DATABASE_URL),
+        settings.DB_REPORTING_STATEMENT_TIMEOUT_MS,
+    ),
+)
+instrument_engine(async_engine.sync_engine)
+instrument_pool(
+    async_engine.sync_engine,
+    "reporting_async",
+    settings.DB_REPORTING_POOL_SIZE + settings.DB_REPORTING_MAX_OVERFLOW,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def connections_per_worker() -> int:
+    """Primary connections one worker's pools can open, overflow included."""
+    workload_pools = sum(size + overflow for size, overflow, _ in _WORKLOAD_POOLS.values())
+    return workload_pools + settings.DB_REPORTING_POOL_SIZE + settings.DB_REPORTING_MAX_OVERFLOW
+
+
+def log_connection_budget() -> int:
+    """Log the pools' connection total and warn when the workers exceed the server limit."""
+    per_worker = connections_per_worker()
+    total = per_worker * settings.WEB_CONCURRENCY
+    logger.info(
+        "Database pools: %d primary connections per worker, %d for %d worker(s)",
+        per_worker,
+        total,
+        settings.WEB_CONCURRENCY,
+    )
+    if total > settings.DB_MAX_CONNECTIONS:
+        logger.warning(
+            "Database pools can open %d connections, over DB_MAX_CONNECTIONS=%d; "
+            "lower the DB_*_POOL_SIZE / DB_*_MAX_OVERFLOW settings or WEB_CONCURRENCY",
+            total,
+            settings.DB_MAX_CONNECTIONS,
+        )
+    return total
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 # Create declarative base
 Base = declarative_base()
@@ -35,3 +171,28 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency function to get an asyncio database session.
+    Used by read-only reporting routes; writes stay on ``get_db``.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def gather_reads(db: AsyncSession, *reads: Callable[[Session], Any]) -> list[Any]:
+    """
+    Run independent read callables concurrently and return their results in order.
+
+    Each callable receives a sync ``Session`` on its own pooled connection from
+    ``db``'s engine, so existing query code runs unchanged while the sub-queries
+    of one report overlap instead of queueing behind each other.
+    """
+
+    async def run(read: Callable[[Session], Any]) -> Any:
+        async with AsyncSession(db.bind, autoflush=False, expire_on_commit=False) as session:
+            return await session.run_sync(read)
+
+    return list(await asyncio.gather(*(run(read) for read in reads)))
@@ -0,0 +1,267 @@
+"""
+Read-replica routing for reporting and AI analytics reads.
+
+With ``READ_REPLICA_DATABASE_URL`` set, the cloud reports and the AI manager,
+briefing and weekly-report analytics read from a streaming replica, so report
+spikes stop competing with sync ingestion and projection writes on the
+primary. The replica is used only while its replication lag is within
+``READ_REPLICA_MAX_LAG_SECONDS``; when it is further behind or unreachable,
+reads fall back to the primary. Each routed session records where it read
+from and how stale that data may be, for report metadata.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from fastapi import Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import instrument_engine, read_routing, replica_lag
+from app.db.base import async_database_url, async_engine, async_pool_options
+from app.db.workloads import statement_timeout_connect_args
+
+logger = logging.getLogger(__name__)
+
+# Zero on a primary or a caught-up standby; otherwise time since the last
+# replayed commit. NULL on a standby whose WAL receiver is not streaming:
+# its receive and replay positions stop moving together, so it would read
+# as caught up while it falls further behind. Seeing the receiver's status
+# needs pg_read_all_stats on the replica's role.
+_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+@dataclass(frozen=True)
+class ReadTarget:
+    """Where a reporting session reads from, and how far behind that data may be."""
+
+    source: str
+    reason: str
+    staleness_seconds: float = 0.0
+
+    def metadata(self) -> Dict[str, object]:
+        return {"data_source": self.source, "data_staleness_seconds": round(self.staleness_seconds, 3)}
+
+    def headers(self) -> Dict[str, str]:
+        return {"X-Data-Source": self.source, "X-Data-Staleness-Seconds": f"{self.staleness_seconds:.3f}"}
+
+
+PRIMARY_TARGET = ReadTarget(source="primary", reason="no_replica")
+
+
+class ReadReplicaRouter:
+    """
+    Route reporting reads to the replica while its lag is acceptable.
+
+    Lag is measured at most once per ``check_interval_seconds`` per process,
+    by one probe at a time; the measurement is shared by the sync and asyncio
+    paths, and requests arriving while a probe runs use the previous one.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine],
+        async_engine: Optional[AsyncEngine],
+        *,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+    ) -> None:
+        self.engine = engine
+        self.async_engine = async_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.session_factory = (
+            sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine is not None else None
+        )
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._lag: Optional[float] = None
+        self._probing = False
+
+    @property
+    def configured(self) -> bool:
+        return self.engine is not None and self.async_engine is not None
+
+    def target(self) -> ReadTarget:
+        """Measure the replica's lag if due (blocking) and pick the read target."""
+        if self.configured and self._claim_probe():
+            try:
+                with self.engine.connect() as connection:
+                    self._record(self._measure_lag(connection))
+            except Exception:
+                logger.warning("Read replica lag check failed; reading from the primary", exc_info=True)
+                self._record(None)
+            finally:
+                self._release_probe()
+        return self._choose()
+
+    async def target_async(self) -> ReadTarget:
+        """Same as ``target`` on the asyncio engine, for ``async def`` routes."""
+        if self.configured and self._claim_probe():
+            try:
+                async with self.async_engine.connect() as connection:
+                    self._record(await connection.run_sync(self._measure_lag))
+            except Exception:
+                logger.warning("Read replica lag check failed; reading from the primary", exc_info=True)
+                self._record(None)
+            finally:
+                self._release_probe()
+        return self._choose()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._checked_at = None
+            self._lag = None
+            self._probing = False
+
+    def _measure_lag(self, connection: Connection) -> Optional[float]:
+        """Replica lag in seconds, or None while its WAL receiver is not streaming."""
+        if connection.dialect.name != "postgresql":
+            return 0.0
+        lag = connection.execute(_LAG_SQL).scalar()
+        if lag is None:
+            logger.warning("Read replica is not streaming WAL from the primary; reading from the primary")
+            return None
+        return float(lag)
+
+    def _claim_probe(self) -> bool:
+        """True if a lag check is due and no other caller is running one."""
+        with self._lock:
+            if self._probing:
+                return False
+            due = self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval_seconds
+            self._probing = due
+            return due
+
+    def _release_probe(self) -> None:
+        with self._lock:
+            self._probing = False
+
+    def _record(self, lag: Optional[float]) -> None:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._lag = lag
+        if lag is not None:
+            replica_lag.set(lag)
+
+    def _choose(self) -> ReadTarget:
+        if not self.configured:
+            target = PRIMARY_TARGET
+        else:
+            with self._lock:
+                lag = self._lag
+            if lag is None:
+                target = ReadTarget(source="primary", reason="replica_unavailable")
+            elif lag > self.max_lag_seconds:
+                target = ReadTarget(source="primary", reason="replica_lagging")
+            else:
+                target = ReadTarget(source="replica", reason="replica", staleness_seconds=lag)
+        read_routing.inc(target.source, target.reason)
+        return target
+
+
+def _build_router() -> ReadReplicaRouter:
+    replica_url = settings.READ_REPLICA_DATABASE_URL
+    if not replica_url:
+        return ReadReplicaRouter(
+            None,
+            None,
+            max_lag_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS,
+            check_interval_seconds=settings.READ_REPLICA_LAG_CHECK_SECONDS,
+        )
+    # The sync pool only serves AI chat, weekly report generation and
+    # scheduler jobs; the async pool serves the reporting routes.
+    timeout_ms = settings.DB_REPORTING_STATEMENT_TIMEOUT_MS
+    engine = create_engine(
+        replica_url,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        pool_size=settings.READ_REPLICA_POOL_SIZE,
+        max_overflow=settings.READ_REPLICA_MAX_OVERFLOW,
+        pool_recycle=1800,
+        pool_timeout=30,
+        connect_args=statement_timeout_connect_args(replica_url, timeout_ms),
+    )
+    replica_async_url = async_database_url(replica_url)
+    replica_async_engine = create_async_engine(
+        replica_async_url,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        pool_recycle=1800,
+        **async_pool_options(
+            replica_async_url,
+            settings.DB_REPORTING_POOL_SIZE,
+            settings.DB_REPORTING_MAX_OVERFLOW,
+        ),
+        connect_args=statement_timeout_connect_args(replica_async_url, timeout_ms),
+    )
+    instrument_engine(engine)
+    instrument_engine(replica_async_engine.sync_engine)
+    return ReadReplicaRouter(
+        engine,
+        replica_async_engine,
+        max_lag_seconds=settings.READ_REPLICA_MAX_LAG_SECONDS,
+        check_interval_seconds=settings.READ_REPLICA_LAG_CHECK_SECONDS,
+    )
+
+
+# Module-level singleton shared by every request and job in the process.
+read_replica_router = _build_router()
+
+
+def read_target(db) -> ReadTarget:
+    """The read target recorded on ``db`` (sync or async), primary if unrouted."""
+    return db.info.get("read_target", PRIMARY_TARGET)
+
+
+async def get_read_db(response: Response):
+    """
+    Dependency for read-only reporting routes: an asyncio session on the
+    replica when it is fresh enough, otherwise on the primary. The choice and
+    staleness are returned as ``X-Data-Source`` / ``X-Data-Staleness-Seconds``.
+    """
+    target = await read_replica_router.target_async()
+    engine = read_replica_router.async_engine if target.source == "replica" else async_engine
+    response.headers.update(target.headers())
+    async with AsyncSession(
+        engine,
+        autoflush=False,
+        expire_on_commit=False,
+        info={"read_target": target},
+    ) as db:
+        yield db
+
+
+@contextmanager
+def read_session(db: Session) -> Iterator[Session]:
+    """
+    Session for a service's analytics reads: the replica when it is fresh
+    enough, otherwise ``db`` itself. Writes must stay on ``db``.
+    """
+    if "read_target" in db.info:
+        yield db
+        return
+    target = read_replica_router.target()
+    if target.source != "replica":
+        yield db
+        return
+    session = read_replica_router.session_factory(info={"read_target": target})
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,96 @@
+"""
+Workload classes for database connection pools.
+
+Checkout, catalogue reads, device sync ingestion, reports and scheduler jobs
+each draw connections from their own pool with its own size limit and
+PostgreSQL ``statement_timeout``, so a long audit export or reconciliation job
+can only exhaust its own class's pool and never makes ``create_sale`` or a
+device's ``/sync/ingest`` wait for a connection. ``background`` is reserved
+for scheduler jobs and the scheduler's leader lock.
+
+The class is carried in a context variable. Routers are tagged when they are
+included (``use_workload``), scheduler jobs where they are defined
+(``in_workload``), and sessions from ``SessionLocal`` / ``get_db`` bind to
+the pool of the class that is current when they are created. Untagged work
+uses ``interactive_read``.
+"""
+from __future__ import annotations
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator
+
+from sqlalchemy.engine import make_url
+
+
+class Workload(str, Enum):
+    POS_CRITICAL = "pos_critical"
+    INTERACTIVE_READ = "interactive_read"
+    SYNC_INGEST = "sync_ingest"
+    REPORTING = "reporting"
+    BACKGROUND = "background"
+
+
+DEFAULT_WORKLOAD = Workload.INTERACTIVE_READ
+
+_current_workload: ContextVar[Workload] = ContextVar("db_workload", default=DEFAULT_WORKLOAD)
+
+
+def current_workload() -> Workload:
+    return _current_workload.get()
+
+
+@contextmanager
+def workload_scope(workload: Workload) -> Iterator[None]:
+    """Run the block's new database sessions in ``workload``'s pool."""
+    token = _current_workload.set(workload)
+    try:
+        yield
+    finally:
+        _current_workload.reset(token)
+
+
+def use_workload(workload: Workload) -> Callable[[], Any]:
+    """
+    Router/route dependency that tags a request with ``workload``.
+
+    It is ``async`` so it runs on the request's own task: the value it sets
+    is then copied into the threadpool where ``get_db`` and sync endpoints
+    run. A route-level tag runs after its router's and wins.
+    """
+
+    async def tag_workload() -> None:
+        _current_workload.set(workload)
+
+    tag_workload.workload = workload
+    return tag_workload
+
+
+def in_workload(workload: Workload) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator tagging a scheduler job: the sessions it opens use ``workload``'s pool."""
+
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with workload_scope(workload):
+                return func(*args, **kwargs)
+
+        return run
+
+    return decorate
+
+
+def statement_timeout_connect_args(database_url: Any, timeout_ms: int) -> Dict[str, Any]:
+    """
+    ``connect_args`` that set PostgreSQL's ``statement_timeout`` for every
+    session a pool opens (libpq ``options`` for psycopg, ``server_settings``
+    for asyncpg). Other databases have no statement timeout.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "postgresql" or timeout_ms <= 0:
+        return {}
+    if url.get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout_ms)}}
+    return {"options": f"-c statement_timeout={timeout_ms}"}
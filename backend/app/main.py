@@ -9,7 +9,11 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.core.app_mode import is_local_operational_write
+from app.core.metrics import RequestMetricsMiddleware
 from app.api import api_router
+from app.core.password_pool import password_pool
+from app.db.base import async_engine, log_connection_budget
+from app.db.read_replica import read_replica_router
 from app.services.scheduler import scheduler
 
 # Configure logging
@@ -24,6 +28,7 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup — migrations are run by render_start.sh before uvicorn launches.
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    log_connection_budget()
     scheduler.start()
 
     yield
@@ -31,6 +36,11 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down application")
     scheduler.stop()
+    password_pool.shutdown()
+    await async_engine.dispose()
+    if read_replica_router.configured:
+        read_replica_router.engine.dispose()
+        await read_replica_router.async_engine.dispose()
 
 
 # Create FastAPI application
@@ -48,6 +58,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["Authorization", "Content-Type", "Accept", "X-Requested-With"],
+    expose_headers=["X-Next-Cursor", "X-Data-Source", "X-Data-Staleness-Seconds"],
 )
 
 
@@ -71,6 +82,9 @@ async def cloud_reporting_write_guard(request: Request, call_next):
         )
     return await call_next(request)
 
+# Outermost, so recorded latency covers every other middleware.
+app.add_middleware(RequestMetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api")
 
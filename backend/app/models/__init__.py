@@ -2,21 +2,22 @@
 SQLAlchemy models package.
 Import all models here for Alembic auto-generation.
 """
-from app.models.user import User
+from app.models.user import LoginAttemptWindow, User
 from app.models.category import Category
 from app.models.supplier import Supplier
 from app.models.tenancy import Branch, Device, Organization
 from app.models.product import Product, ProductBatch
 from app.models.sale import Sale, SaleItem, SaleReversal
+from app.models.till_shift import TillShift
 from app.models.notification import Notification
 from app.models.activity_log import ActivityLog
 from app.models.stock_adjustment import StockAdjustment
 from app.models.inventory_movement import InventoryMovement
 from app.models.stock_take import StockTake, StockTakeItem
 from app.models.restore_drill import RestoreDrill
-from app.models.customer import Customer, CustomerFollowUp
+from app.models.customer import Customer, CustomerFollowUp, OutboundMessage
 from app.models.sync_event import SyncEvent, SyncEventCounter
-from app.models.sync_ingestion import IngestedSyncEvent
+from app.models.sync_ingestion import IngestedSyncEvent, SyncIngestionStats
 from app.models.ai_report import (
     AIExternalProviderSetting,
     AIFinding,
@@ -25,11 +26,13 @@ from app.models.ai_report import (
     AIWeeklyManagerReport,
     AIWeeklyReportDelivery,
     AIWeeklyReportDeliverySetting,
+    AIResponseCacheEntry,
     TelegramAlertLog,
 )
 from app.models.cloud_projection import (
     CloudBatchSnapshot,
     CloudDeviceHeartbeatSnapshot,
+    CloudFleetSummary,
     CloudInventoryMovementFact,
     CloudProductSnapshot,
     CloudReconciliationAcknowledgement,
@@ -38,6 +41,7 @@ from app.models.cloud_projection import (
 
 __all__ = [
     "User",
+    "LoginAttemptWindow",
     "Category",
     "Supplier",
     "Organization",
@@ -48,6 +52,7 @@ __all__ = [
     "Sale",
     "SaleItem",
     "SaleReversal",
+    "TillShift",
     "Notification",
     "ActivityLog",
     "StockAdjustment",
@@ -57,9 +62,11 @@ __all__ = [
     "RestoreDrill",
     "Customer",
     "CustomerFollowUp",
+    "OutboundMessage",
     "SyncEvent",
     "SyncEventCounter",
     "IngestedSyncEvent",
+    "SyncIngestionStats",
     "AIFinding",
     "AIChatSession",
     "AIChatMessage",
@@ -67,11 +74,13 @@ __all__ = [
     "AIWeeklyReportDelivery",
     "AIWeeklyReportDeliverySetting",
     "AIExternalProviderSetting",
+    "AIResponseCacheEntry",
     "TelegramAlertLog",
     "CloudSaleFact",
     "CloudInventoryMovementFact",
     "CloudProductSnapshot",
     "CloudBatchSnapshot",
     "CloudDeviceHeartbeatSnapshot",
+    "CloudFleetSummary",
     "CloudReconciliationAcknowledgement",
 ]
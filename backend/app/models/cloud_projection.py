@@ -1,5 +1,9 @@
 """
 Cloud reporting projection models built from ingested sync events.
+
+``source_event_id``/``last_source_event_id`` hold ``ingested_sync_events.id``
+without a foreign key: projected events are archived out of that table after
+``SYNC_EVENT_ARCHIVE_AFTER_DAYS``, while the facts they produced remain.
 """
 from sqlalchemy import Boolean, BigInteger, Column, Date, DateTime, ForeignKey, Integer, JSON, Numeric, String, Text, UniqueConstraint
 from sqlalchemy.sql import func
@@ -13,7 +17,7 @@ class CloudSaleFact(Base):
     __tablename__ = "cloud_sale_facts"
 
     id = Column(Integer, primary_key=True, index=True)
-    source_event_id = Column(Integer, ForeignKey("ingested_sync_events.id"), nullable=False, unique=True, index=True)
+    source_event_id = Column(Integer, nullable=False, unique=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
     branch_id = Column(Integer, ForeignKey("branches.id"), nullable=False, index=True)
     source_device_id = Column(Integer, ForeignKey("devices.id"), nullable=False, index=True)
@@ -36,7 +40,7 @@ class CloudInventoryMovementFact(Base):
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    source_event_id = Column(Integer, ForeignKey("ingested_sync_events.id"), nullable=False, index=True)
+    source_event_id = Column(Integer, nullable=False, index=True)
     line_number = Column(Integer, nullable=False)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
     branch_id = Column(Integer, ForeignKey("branches.id"), nullable=False, index=True)
@@ -72,7 +76,7 @@ class CloudProductSnapshot(Base):
     cost_price = Column(Numeric(12, 2), nullable=True)
     selling_price = Column(Numeric(12, 2), nullable=True)
     is_active = Column(Boolean, nullable=False, default=True, index=True)
-    last_source_event_id = Column(Integer, ForeignKey("ingested_sync_events.id"), nullable=False, index=True)
+    last_source_event_id = Column(Integer, nullable=False, index=True)
     payload = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -96,7 +100,7 @@ class CloudBatchSnapshot(Base):
     expiry_date = Column(Date, nullable=False, index=True)
     cost_price = Column(Numeric(12, 2), nullable=True)
     is_quarantined = Column(Boolean, nullable=False, default=False, index=True)
-    last_source_event_id = Column(Integer, ForeignKey("ingested_sync_events.id"), nullable=False, index=True)
+    last_source_event_id = Column(Integer, nullable=False, index=True)
     payload = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -161,7 +165,24 @@ class CloudDeviceHeartbeatSnapshot(Base):
     total_disk_bytes = Column(BigInteger, nullable=True)
     uptime_seconds = Column(Integer, nullable=True)
     server_time = Column(DateTime(timezone=True), nullable=False, index=True)
-    last_source_event_id = Column(Integer, ForeignKey("ingested_sync_events.id"), nullable=False, index=True)
+    last_source_event_id = Column(Integer, nullable=False, index=True)
     payload = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class CloudFleetSummary(Base):
+    """Materialized device and heartbeat rollup for the vendor command center.
+
+    A single row keyed by ``scope``, rebuilt whenever heartbeats are projected
+    so the command center can serve the fleet section without scanning every
+    device.
+    """
+
+    __tablename__ = "cloud_fleet_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String(50), nullable=False, unique=True, default="fleet")
+    generated_at = Column(DateTime(timezone=True), nullable=False)
+    payload = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -9,18 +9,21 @@ capture customer_name and customer_phone on the Sale record directly and do
 not build a registered customer base.
 """
 from enum import Enum as PyEnum
+import re
 
 from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    Numeric,
     String,
     Text,
     Enum as SQLEnum,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 
 from app.db.base import Base
@@ -43,11 +46,32 @@ class FollowUpStatus(str, PyEnum):
     RESPONDED = "responded"     # Customer replied
 
 
+class OutboundMessageStatus(str, PyEnum):
+    """Delivery state of a queued customer message."""
+    PENDING = "pending"     # Waiting for (or between) delivery attempts
+    SENT = "sent"           # Accepted by the SMS/WhatsApp provider
+    FAILED = "failed"       # All retries exhausted
+
+
 def _enum_values(enum_class):
     """Persist enum values (lowercase), matching the PostgreSQL migration."""
     return [member.value for member in enum_class]
 
 
+def normalize_phone(phone: str) -> str:
+    """Digits-only national form used for phone search.
+
+    ``+233 24 412 3456``, ``00233244123456`` and ``024-412-3456`` all become
+    ``0244123456``, so a cashier can type the number however it was written.
+    """
+    digits = re.sub(r"\D", "", phone or "")
+    if digits.startswith("00233"):
+        digits = digits[2:]
+    if digits.startswith("233"):
+        digits = "0" + digits[3:]
+    return digits
+
+
 class Customer(Base):
     """Registered pharmacy customer.
 
@@ -57,6 +81,22 @@ class Customer(Base):
     """
 
     __tablename__ = "customers"
+    __table_args__ = (
+        Index(
+            "ix_customers_org_phone_normalized",
+            "organization_id",
+            "phone_normalized",
+            postgresql_ops={"phone_normalized": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_customers_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+        # Branch customer list: active customers in name order.
+        Index("ix_customers_org_branch_active_name", "organization_id", "branch_id", "is_active", "full_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
@@ -65,6 +105,7 @@ class Customer(Base):
     # Identity
     full_name = Column(String(150), nullable=False)
     phone = Column(String(30), nullable=False, index=True)  # Primary contact + de-dup key
+    phone_normalized = Column(String(30), nullable=True)    # Digits-only search key, see normalize_phone()
     email = Column(String(200), nullable=True)
     date_of_birth = Column(String(20), nullable=True)       # ISO date string (YYYY-MM-DD)
     gender = Column(String(20), nullable=True)              # male / female / other / not_stated
@@ -95,6 +136,12 @@ class Customer(Base):
     # Preferred channel: sms, whatsapp, or none
     preferred_channel = Column(String(20), default="sms", nullable=False)
 
+    # Purchase counters over completed sales, maintained by checkout and
+    # void/refund so profile and list reads never aggregate the sales table.
+    purchase_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_purchase_at = Column(DateTime(timezone=True), nullable=True)
+    lifetime_spend = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)
+
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -103,6 +150,15 @@ class Customer(Base):
     sales = relationship("Sale", back_populates="customer")
     follow_ups = relationship("CustomerFollowUp", back_populates="customer", cascade="all, delete-orphan")
 
+    @validates("phone")
+    def _sync_phone_normalized(self, _key, phone):
+        self.phone_normalized = normalize_phone(phone)
+        return phone
+
+    @property
+    def total_purchases(self) -> int:
+        return self.purchase_count or 0
+
     def __repr__(self):
         return f"<Customer(id={self.id}, name='{self.full_name}', phone='{self.phone}')>"
 
@@ -154,3 +210,49 @@ class CustomerFollowUp(Base):
             f"<CustomerFollowUp(id={self.id}, customer_id={self.customer_id}, "
             f"sale_id={self.sale_id}, status='{self.status}')>"
         )
+
+
+class OutboundMessage(Base):
+    """Customer message queued for background delivery.
+
+    Checkout writes digital receipts here instead of calling the SMS provider
+    on the request path; the scheduler's message worker delivers pending rows
+    in batches and retries failures with backoff.
+    """
+
+    __tablename__ = "outbound_messages"
+    __table_args__ = (
+        Index("ix_outbound_messages_status_next_attempt", "status", "next_attempt_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    branch_id = Column(Integer, ForeignKey("branches.id"), nullable=True, index=True)
+
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False, index=True)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=True, index=True)
+
+    kind = Column(String(30), nullable=False, default="receipt")    # receipt
+    channel = Column(String(20), nullable=False)                    # sms or whatsapp
+    recipient = Column(String(30), nullable=False)
+    body = Column(Text, nullable=False)
+
+    # Delivery tracking
+    status = Column(
+        SQLEnum(OutboundMessageStatus, name="outboundmessagestatus", values_callable=_enum_values),
+        default=OutboundMessageStatus.PENDING,
+        nullable=False,
+    )
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String(200), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<OutboundMessage(id={self.id}, kind='{self.kind}', customer_id={self.customer_id}, "
+            f"status='{self.status}')>"
+        )
@@ -2,7 +2,7 @@
 Product and ProductBatch models for inventory management.
 Enhanced for professional pharmaceutical POS system.
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Date, ForeignKey, Enum as SQLEnum, Numeric, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Date, ForeignKey, Enum as SQLEnum, Numeric, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum
@@ -99,6 +99,8 @@ class Product(Base):
     __table_args__ = (
         UniqueConstraint("organization_id", "sku", name="uq_products_org_sku"),
         UniqueConstraint("organization_id", "barcode", name="uq_products_org_barcode"),
+        # Branch catalog: active products in name order.
+        Index("ix_products_org_branch_active_name", "organization_id", "branch_id", "is_active", "name"),
     )
 
     def __repr__(self):
@@ -109,6 +111,10 @@ class ProductBatch(Base):
     """Product batch for tracking expiries and batch-specific stock."""
 
     __tablename__ = "product_batches"
+    __table_args__ = (
+        # Branch expiry windows for the dashboard and expiring-stock lists.
+        Index("ix_product_batches_org_branch_expiry", "organization_id", "branch_id", "expiry_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
@@ -2,7 +2,7 @@
 Sales transaction models - Enhanced for professional pharmaceutical POS.
 Currency: GH₵ (Ghana Cedis)
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Enum as SQLEnum, Date, Numeric
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Enum as SQLEnum, Date, Numeric, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum
@@ -43,12 +43,33 @@ class Sale(Base):
     """Sales transaction header - Enhanced with professional features."""
 
     __tablename__ = "sales"
+    __table_args__ = (
+        # Branch sales history under the hosted (organization_id, branch_id)
+        # scope: date ranges plus the (created_at, id) keyset.
+        Index("ix_sales_org_branch_created_id", "organization_id", "branch_id", "created_at", "id"),
+        # Completed-sales date ranges summed by the dashboards.
+        Index("ix_sales_org_branch_status_created", "organization_id", "branch_id", "status", "created_at"),
+        # Offline queue keys are unique per branch; tills in different tenants
+        # can generate the same key.
+        UniqueConstraint(
+            "organization_id",
+            "branch_id",
+            "idempotency_key",
+            name="uq_sales_org_branch_idempotency_key",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
     branch_id = Column(Integer, ForeignKey("branches.id"), nullable=True, index=True)
     source_device_id = Column(Integer, ForeignKey("devices.id"), nullable=True, index=True)
     invoice_number = Column(String(50), unique=True, nullable=False, index=True)
+    # Client-generated key so offline queue replays never record a sale twice.
+    idempotency_key = Column(String(100), nullable=True, index=True)
+    # Drawer session whose running totals include this sale.
+    till_shift_id = Column(Integer, ForeignKey("till_shifts.id"), nullable=True, index=True)
+    # Shift that booked a void/refund made after ``till_shift_id`` was closed.
+    reversal_till_shift_id = Column(Integer, ForeignKey("till_shifts.id"), nullable=True, index=True)
 
     # Status
     status = Column(SQLEnum(SaleStatus), default=SaleStatus.COMPLETED, nullable=False)
@@ -117,7 +138,7 @@ class SaleItem(Base):
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
     branch_id = Column(Integer, ForeignKey("branches.id"), nullable=True, index=True)
-    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
 
     # Product snapshot at time of sale
@@ -132,6 +153,7 @@ class SaleItem(Base):
     # Pricing
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Numeric(12, 2), nullable=False)  # GH₵ per unit
+    unit_cost = Column(Numeric(12, 2))  # Product cost price at time of sale
     discount_amount = Column(Numeric(12, 2), default=0.0, nullable=False)
     total_price = Column(Numeric(12, 2), nullable=False)  # GH₵
 
@@ -1,7 +1,7 @@
 """
 Stock adjustment model for inventory corrections.
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum
@@ -23,6 +23,10 @@ class StockAdjustment(Base):
     """Stock adjustment for tracking inventory changes outside of sales."""
 
     __tablename__ = "stock_adjustments"
+    __table_args__ = (
+        # Branch adjustment review, newest first.
+        Index("ix_stock_adjustments_org_branch_created", "organization_id", "branch_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
@@ -43,3 +43,39 @@ class IngestedSyncEvent(Base):
 
     def __repr__(self):
         return f"<IngestedSyncEvent(id={self.id}, event_id='{self.event_id}')>"
+
+
+class SyncIngestionStats(Base):
+    """Running ingestion/projection counters for one source device.
+
+    Kept in step with ``ingested_sync_events`` by ingest and projection so
+    sync-health reads never aggregate the event log itself. Archived events
+    stay counted here after their rows are removed.
+    """
+
+    __tablename__ = "sync_ingestion_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            "organization_id",
+            "branch_id",
+            "source_device_id",
+            name="uq_sync_ingestion_stats_source",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False, index=True)
+    branch_id = Column(Integer, ForeignKey("branches.id"), nullable=False, index=True)
+    source_device_id = Column(Integer, ForeignKey("devices.id"), nullable=False, index=True)
+    ingested_count = Column(Integer, default=0, nullable=False)
+    projected_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    duplicate_count = Column(Integer, default=0, nullable=False)
+    last_received_at = Column(DateTime(timezone=True))
+    last_projected_at = Column(DateTime(timezone=True))
+    # Idempotency watermark: every sequence up to this one was accepted and
+    # has since been moved from ingested_sync_events to cold storage.
+    archived_through_sequence = Column(Integer, default=0, nullable=False)
+    archived_count = Column(Integer, default=0, nullable=False)
+    archived_duplicate_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
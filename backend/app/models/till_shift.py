@@ -0,0 +1,86 @@
+"""
+Till shift models: a cashier's drawer session with running sales totals.
+"""
+from enum import Enum
+
+from sqlalchemy import Column, Date, DateTime, Enum as SQLEnum, ForeignKey, Index, Integer, Numeric
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class TillShiftStatus(str, Enum):
+    """Lifecycle status for a drawer session."""
+
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class TillShift(Base):
+    """
+    One cashier's drawer session for one UTC business day.
+
+    Checkout and void/refund keep the totals current with relative UPDATEs,
+    so closeouts sum a handful of shift rows instead of the day's sales.
+    Reversals are booked against the shift that rang up the sale while it is
+    open; once it is closed they go to the reversing user's open shift, so a
+    counted drawer's expected cash and variance never change afterwards.
+    """
+
+    __tablename__ = "till_shifts"
+    __table_args__ = (
+        # Closeout and today-summary: every shift of a branch's business day.
+        Index("ix_till_shifts_org_branch_business_date", "organization_id", "branch_id", "business_date"),
+        # The cashier's open shift, looked up on every sale.
+        Index("ix_till_shifts_user_business_date_status", "user_id", "business_date", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
+    branch_id = Column(Integer, ForeignKey("branches.id"), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    business_date = Column(Date, nullable=False)
+    status = Column(SQLEnum(TillShiftStatus), default=TillShiftStatus.OPEN, nullable=False)
+    opened_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    closed_at = Column(DateTime(timezone=True), nullable=True)
+    closed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Drawer reconciliation (GH₵)
+    opening_float = Column(Numeric(12, 2), default=0, nullable=False)
+    counted_cash = Column(Numeric(12, 2), nullable=True)
+
+    # Running totals by final sale status
+    completed_count = Column(Integer, default=0, nullable=False)
+    completed_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    refunded_count = Column(Integer, default=0, nullable=False)
+    refunded_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    cancelled_count = Column(Integer, default=0, nullable=False)
+    cancelled_amount = Column(Numeric(12, 2), default=0, nullable=False)
+
+    # Completed sales only, by payment method
+    cash_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    momo_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    card_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    bank_transfer_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    credit_amount = Column(Numeric(12, 2), default=0, nullable=False)
+    items_sold = Column(Integer, default=0, nullable=False)
+    gross_profit = Column(Numeric(12, 2), default=0, nullable=False)
+
+    user = relationship("User", foreign_keys=[user_id])
+    closer = relationship("User", foreign_keys=[closed_by])
+
+    @property
+    def expected_cash(self):
+        """Cash that should be in the drawer: float plus completed cash sales."""
+        return (self.opening_float or 0) + (self.cash_amount or 0)
+
+    @property
+    def cash_variance(self):
+        """Counted minus expected cash once the drawer is counted (over > 0)."""
+        if self.counted_cash is None:
+            return None
+        return self.counted_cash - self.expected_cash
+
+    def __repr__(self):
+        return f"<TillShift(id={self.id}, user_id={self.user_id}, date={self.business_date}, status='{self.status}')>"
@@ -5,6 +5,8 @@ from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum as SQLEn
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum
+from functools import lru_cache
+from typing import Optional
 
 from app.db.base import Base
 
@@ -48,6 +50,22 @@ ROLE_DEFAULT_PERMISSIONS = {
 }
 
 
+@lru_cache(maxsize=256)
+def _effective_permissions(role: UserRole, permissions: Optional[tuple[str, ...]]) -> frozenset[str]:
+    if permissions is not None:
+        return frozenset(permissions)
+    return frozenset(ROLE_DEFAULT_PERMISSIONS.get(role, set()))
+
+
+def effective_permissions_for(role: UserRole, permissions: Optional[list[str]]) -> frozenset[str]:
+    """Explicit permissions when set, otherwise the role's defaults.
+
+    Users share a handful of role/permission combinations, so the resolved
+    sets are memoized instead of rebuilt on every permission check.
+    """
+    return _effective_permissions(role, tuple(permissions) if permissions is not None else None)
+
+
 class User(Base):
     """User model for system authentication and authorization."""
 
@@ -63,6 +81,9 @@ class User(Base):
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
     branch_id = Column(Integer, ForeignKey("branches.id"), nullable=True, index=True)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Bumped when credentials change or the user is deactivated; access tokens
+    # carry the version they were issued under and older ones are rejected.
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -85,8 +106,25 @@ class User(Base):
     )
 
     @property
-    def effective_permissions(self) -> set[str]:
+    def effective_permissions(self) -> frozenset[str]:
         """Return explicit permissions, falling back to role defaults."""
-        if self.permissions is not None:
-            return set(self.permissions)
-        return set(ROLE_DEFAULT_PERMISSIONS.get(self.role, set()))
+        return effective_permissions_for(self.role, self.permissions)
+
+
+class LoginAttemptWindow(Base):
+    """Sliding-window failed-login counter for one username.
+
+    Holds the failure counts of the current and previous fixed windows; the
+    limiter weights the previous window by how much of it still overlaps the
+    sliding window, so each check reads one row.
+    """
+
+    __tablename__ = "login_attempt_windows"
+
+    id = Column(Integer, primary_key=True, index=True)
+    username = Column(String(100), unique=True, nullable=False, index=True)
+    window_index = Column(Integer, nullable=False)
+    current_count = Column(Integer, default=0, nullable=False)
+    previous_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
@@ -20,6 +20,8 @@ class AIManagerDataScope(BaseModel):
     branch_id: Optional[int] = None
     period_days: int
     sources: List[str]
+    data_source: str = "primary"
+    data_staleness_seconds: float = 0.0
 
 
 class AIManagerChatResponse(BaseModel):
@@ -33,6 +35,7 @@ class AIManagerChatResponse(BaseModel):
     provider: str
     model: Optional[str] = None
     fallback_used: bool = False
+    cache: Dict[str, Any] = {}
     refused: bool = False
 
 
@@ -199,6 +202,8 @@ class AIManagerBriefing(BaseModel):
     finding_count: int
     findings: List[AIBriefingFinding]
     generated_at: str
+    data_source: str = "primary"
+    data_staleness_seconds: float = 0.0
 
 
 class AIFindingResponse(BaseModel):
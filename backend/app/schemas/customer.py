@@ -88,7 +88,9 @@ class Customer(BaseModel):
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
-    total_purchases: Optional[int] = None   # enriched at query time
+    total_purchases: Optional[int] = None   # completed sales, from Customer.purchase_count
+    last_purchase_at: Optional[datetime] = None
+    lifetime_spend: float = 0.0
 
     model_config = {"from_attributes": True}
 
@@ -121,3 +123,21 @@ class FollowUpSchema(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class OutboundMessageSchema(BaseModel):
+    id: int
+    customer_id: int
+    sale_id: Optional[int] = None
+    kind: str
+    channel: str
+    recipient: str
+    body: str
+    status: str
+    attempts: int
+    next_attempt_at: datetime
+    sent_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -1,9 +1,9 @@
 """
 Pydantic schemas for Sale and SaleItem models.
 """
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime, date
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from app.models.sale import PaymentMethod, SalePricingMode, SaleReversalType, SaleStatus
 
 
@@ -81,12 +81,15 @@ class SaleCreate(SaleBase):
     tax_amount: float = Field(0.0, ge=0)
     amount_paid: float = Field(..., gt=0)
     customer_id: Optional[int] = None     # Link to a registered Customer
+    # Replaying the same key returns the original sale instead of a new one.
+    idempotency_key: Optional[str] = Field(None, min_length=8, max_length=100)
 
 
 class Sale(SaleBase):
     """Schema for sale response."""
     id: int
     invoice_number: str
+    idempotency_key: Optional[str] = None
     subtotal: float
     discount_amount: float
     discount_percentage: float = 0.0
@@ -112,6 +115,36 @@ class SaleWithItems(Sale):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SaleBatchCreate(BaseModel):
+    """Offline queue replay: sales recorded in order, each under its own key."""
+    sales: List[SaleCreate] = Field(..., min_length=1, max_length=100)
+
+    @field_validator("sales")
+    @classmethod
+    def validate_idempotency_keys(cls, value):
+        if any(not sale.idempotency_key for sale in value):
+            raise ValueError("every sale in a batch needs an idempotency_key")
+        return value
+
+
+class SaleBatchOutcome(BaseModel):
+    """Result for one sale of a batch, in request order."""
+    index: int
+    idempotency_key: str
+    outcome: Literal["created", "duplicate", "failed"]
+    sale: Optional[SaleWithItems] = None
+    status_code: int
+    error: Optional[str] = None
+
+
+class SaleBatchResult(BaseModel):
+    """Per-sale outcomes of a batch replay."""
+    created: int
+    duplicate: int
+    failed: int
+    results: List[SaleBatchOutcome]
+
+
 class SaleReversal(BaseModel):
     """Sale reversal/refund response schema."""
     id: int
@@ -153,3 +186,20 @@ class EndOfDayCloseout(BaseModel):
     card_revenue: float
     bank_transfer_revenue: float
     credit_revenue: float
+
+
+class CloseoutDrift(BaseModel):
+    """One till-ledger total that disagrees with the raw sales."""
+    field: str
+    ledger: float
+    recomputed: float
+    difference: float
+
+
+class CloseoutVerification(BaseModel):
+    """Till-ledger closeout checked against a recomputation from sales."""
+    business_date: date
+    in_balance: bool
+    ledger: EndOfDayCloseout
+    recomputed: EndOfDayCloseout
+    drift: List[CloseoutDrift]
@@ -36,7 +36,7 @@ class SyncIngestionResponse(BaseModel):
     accepted: bool
     duplicate: bool
     event_id: str
-    ingested_event_id: int
+    ingested_event_id: Optional[int] = None
     local_sequence_number: int
     received_at: datetime
 
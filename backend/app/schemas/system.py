@@ -87,6 +87,11 @@ class SystemDiagnostics(BaseModel):
     sync_failed_count: int
     sync_sent_count: int
     sync_last_sent_at: Optional[str] = None
+    password_pool_workers: int = 0
+    password_pool_in_flight: int = 0
+    password_pool_queue_depth: int = 0
+    password_pool_max_queue_depth: int = 0
+    password_pool_rejected: int = 0
 
 
 class SyncStatus(BaseModel):
@@ -267,6 +267,15 @@ class CommandCenterOrganizationSummary(BaseModel):
     heartbeat_missing_count: int = 0
 
 
+class CommandCenterFleetSummary(BaseModel):
+    """Device reachability and heartbeat rollup; may be served from the materialized copy."""
+    generated_at: datetime
+    totals: CommandCenterTotals
+    last_heartbeat_at: Optional[datetime] = None
+    attention: List[CommandCenterAttentionItem] = []
+    organizations: List[CommandCenterOrganizationSummary] = []
+
+
 class AdminCommandCenterResponse(BaseModel):
     generated_at: datetime
     totals: CommandCenterTotals
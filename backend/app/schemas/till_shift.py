@@ -0,0 +1,52 @@
+"""
+Pydantic schemas for till shift (drawer session) workflows.
+"""
+from datetime import date, datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.models.till_shift import TillShiftStatus
+
+
+class TillShiftOpen(BaseModel):
+    """Open a drawer session with the cash placed in the till."""
+
+    opening_float: float = Field(0.0, ge=0)
+
+
+class TillShiftClose(BaseModel):
+    """Close a drawer session with the physically counted cash."""
+
+    counted_cash: float = Field(..., ge=0)
+
+
+class TillShift(BaseModel):
+    """Drawer session with its running sales totals."""
+
+    id: int
+    user_id: int
+    business_date: date
+    status: TillShiftStatus
+    opened_at: datetime
+    closed_at: Optional[datetime] = None
+    closed_by: Optional[int] = None
+    opening_float: float
+    counted_cash: Optional[float] = None
+    expected_cash: float
+    cash_variance: Optional[float] = None
+    completed_count: int
+    completed_amount: float
+    refunded_count: int
+    refunded_amount: float
+    cancelled_count: int
+    cancelled_amount: float
+    cash_amount: float
+    momo_amount: float
+    card_amount: float
+    bank_transfer_amount: float
+    credit_amount: float
+    items_sold: int
+    gross_profit: float
+
+    model_config = ConfigDict(from_attributes=True)
@@ -36,7 +36,7 @@ from __future__ import annotations
 import logging
 import os
 
-from app.services.message_adapter import DeliveryResult, MessageAdapter
+from app.services.message_adapter import DeliveryResult, MessageAdapter, OutgoingMessage
 
 logger = logging.getLogger(__name__)
 
@@ -108,6 +108,50 @@ class AfricasTalkingAdapter(MessageAdapter):
             logger.exception("[AT] Exception sending to %s", normalized)
             return DeliveryResult(success=False, error=str(exc))
 
+    def send_batch(self, messages: list[OutgoingMessage]) -> list[DeliveryResult]:
+        """Send a batch using AT's multi-recipient API.
+
+        Messages with identical text are sent in one API call; the per-number
+        ``Recipients`` entries in the response are mapped back to each message.
+        """
+        groups: dict[str, list[int]] = {}
+        for index, item in enumerate(messages):
+            groups.setdefault(item.message, []).append(index)
+
+        results: list[DeliveryResult] = [
+            DeliveryResult(success=False, error="Not sent") for _ in messages
+        ]
+        for message, indexes in groups.items():
+            numbers = [_normalize_ghana_number(messages[index].to) for index in indexes]
+            try:
+                response = self._sms.send(
+                    message=message,
+                    recipients=sorted(set(numbers)),
+                    sender_id=self._sender_id,
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("[AT] Exception sending batch to %d recipient(s)", len(numbers))
+                for index in indexes:
+                    results[index] = DeliveryResult(success=False, error=str(exc))
+                continue
+
+            by_number = {
+                rec.get("number"): rec
+                for rec in response.get("SMSMessageData", {}).get("Recipients", [])
+            }
+            for index, number in zip(indexes, numbers):
+                rec = by_number.get(number)
+                if rec is None:
+                    results[index] = DeliveryResult(success=False, error="No recipient entry in AT response")
+                elif rec.get("statusCode", 0) in (101, 102):
+                    results[index] = DeliveryResult(success=True, provider_message_id=rec.get("messageId", ""))
+                else:
+                    results[index] = DeliveryResult(
+                        success=False,
+                        error=rec.get("status", f"statusCode={rec.get('statusCode', 0)}"),
+                    )
+        return results
+
 
 def _normalize_ghana_number(phone: str) -> str:
     """Best-effort normalisation to E.164 for Ghana numbers.
@@ -4,10 +4,15 @@ On-demand CEO briefing: ranked findings from deterministic cloud analyzers.
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from functools import partial
+from typing import Any, Callable, Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.db.base import gather_reads
+from app.db.read_replica import ReadTarget, read_session, read_target
+
 from app.services.cloud_dead_stock_service import CloudDeadStockService
 from app.services.cloud_reconciliation_service import CloudReconciliationService
 from app.services.cloud_sales_trend_service import CloudSalesTrendService
@@ -30,45 +35,73 @@ class AIBriefingService:
         period_days: int,
         max_findings: int = 5,
     ) -> dict[str, Any]:
-        stock_velocity = CloudStockVelocityService.stock_velocity(
-            db,
-            organization_id=organization_id,
-            branch_id=branch_id,
-            period_days=period_days,
-            limit=50,
-            include_stable=False,
-        )
-        dead_stock = CloudDeadStockService.dead_stock(
-            db,
+        reads = AIBriefingService._analyzer_reads(organization_id, branch_id, period_days)
+        with read_session(db) as read_db:
+            results = [read(read_db) for read in reads]
+            target = read_target(read_db)
+        return AIBriefingService._assemble(
+            results,
+            target,
             organization_id=organization_id,
             branch_id=branch_id,
             period_days=period_days,
-            limit=50,
+            max_findings=max_findings,
         )
-        revenue_comparison = CloudSalesTrendService.revenue_comparison(
-            db,
+
+    @staticmethod
+    async def briefing_async(
+        db: AsyncSession,
+        *,
+        organization_id: int,
+        branch_id: Optional[int],
+        period_days: int,
+        max_findings: int = 5,
+    ) -> dict[str, Any]:
+        """Same briefing as ``briefing``, with the six analyzers queried concurrently."""
+        reads = AIBriefingService._analyzer_reads(organization_id, branch_id, period_days)
+        return AIBriefingService._assemble(
+            await gather_reads(db, *reads),
+            read_target(db),
             organization_id=organization_id,
             branch_id=branch_id,
             period_days=period_days,
-            limit=20,
-        )
-        stock_risk = AIManagerService._stock_risk_summary(
-            db,
-            organization_id=organization_id,
-            branch_id=branch_id,
-        )
-        sync_health = AIManagerService._sync_health(
-            db,
-            organization_id=organization_id,
-            branch_id=branch_id,
-        )
-        reconciliation = CloudReconciliationService.reconcile(
-            db,
-            organization_id=organization_id,
-            branch_id=branch_id,
-            limit=10,
+            max_findings=max_findings,
         )
 
+    @staticmethod
+    def _analyzer_reads(
+        organization_id: int,
+        branch_id: Optional[int],
+        period_days: int,
+    ) -> list[Callable[[Session], Any]]:
+        scope = {"organization_id": organization_id, "branch_id": branch_id}
+        return [
+            partial(
+                CloudStockVelocityService.stock_velocity,
+                **scope,
+                period_days=period_days,
+                limit=50,
+                include_stable=False,
+            ),
+            partial(CloudDeadStockService.dead_stock, **scope, period_days=period_days, limit=50),
+            partial(CloudSalesTrendService.revenue_comparison, **scope, period_days=period_days, limit=20),
+            partial(AIManagerService._stock_risk_summary, **scope),
+            partial(AIManagerService._sync_health, **scope),
+            partial(CloudReconciliationService.reconcile, **scope, limit=10),
+        ]
+
+    @staticmethod
+    def _assemble(
+        results: list[Any],
+        target: ReadTarget,
+        *,
+        organization_id: int,
+        branch_id: Optional[int],
+        period_days: int,
+        max_findings: int,
+    ) -> dict[str, Any]:
+        stock_velocity, dead_stock, revenue_comparison, stock_risk, sync_health, reconciliation = results
+
         findings: list[dict[str, Any]] = []
         findings.extend(AIBriefingService._velocity_findings(stock_velocity))
         findings.extend(AIBriefingService._expiry_findings(stock_risk))
@@ -91,6 +124,7 @@ class AIBriefingService:
             "finding_count": len(findings),
             "findings": top_findings,
             "generated_at": datetime.now(timezone.utc).isoformat(),
+            **target.metadata(),
         }
 
     # --- Finding generators ---
@@ -7,15 +7,25 @@ import json
 import logging
 import threading
 import time
-from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
 from app.core.config import settings
+from app.services.ai_response_cache import build_cache_key, response_cache
 
 logger = logging.getLogger(__name__)
 
 
+class AIProviderUnavailable(RuntimeError):
+    """Raised when an external provider cannot produce an answer."""
+
+
+class AIToolLoopBudgetExceeded(AIProviderUnavailable):
+    """Raised when a tool-use conversation runs past its latency budget."""
+
+
 class _LLMCircuitBreaker:
     """Simple per-process circuit breaker for LLM provider calls.
 
@@ -88,6 +98,24 @@ _circuit_breaker = _LLMCircuitBreaker(
 )
 
 
+_tool_executor: Optional[ThreadPoolExecutor] = None
+_tool_executor_lock = threading.Lock()
+
+
+def _get_tool_executor() -> ThreadPoolExecutor:
+    """Shared bounded pool for concurrent tool calls within one model turn."""
+    global _tool_executor
+    with _tool_executor_lock:
+        if _tool_executor is None:
+            _tool_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.AI_TOOL_MAX_WORKERS),
+                thread_name_prefix="ai-tool",
+            )
+        return _tool_executor
+
+
+ToolEventCallback = Callable[[Dict[str, Any]], None]
+
 
 class AIManagerLLMProvider:
     """Minimal HTTP adapter for OpenAI, Claude, and Groq text responses."""
@@ -137,6 +165,8 @@ class AIManagerLLMProvider:
         provider: Optional[str] = None,
         model: Optional[str] = None,
         conversation_history: Optional[List[Dict[str, str]]] = None,
+        cache_evidence: Any = None,
+        cache_scope: Optional[str] = None,
     ) -> Dict[str, Any]:
         has_provider_override = provider is not None
         provider = (provider or AIManagerLLMProvider.configured_provider()).strip().lower()
@@ -163,6 +193,32 @@ class AIManagerLLMProvider:
                 "fallback_used": True,
             }
 
+        return AIManagerLLMProvider._cached_call(
+            lambda: AIManagerLLMProvider._generate_answer_uncached(
+                prompt=prompt,
+                deterministic_answer=deterministic_answer,
+                provider=provider,
+                model=model,
+                history=history,
+            ),
+            provider=provider,
+            model=model,
+            system_prompt=AIManagerLLMProvider._system_instructions(),
+            question=prompt,
+            evidence=cache_evidence,
+            history=history,
+            scope=cache_scope,
+        )
+
+    @staticmethod
+    def _generate_answer_uncached(
+        *,
+        prompt: str,
+        deterministic_answer: str,
+        provider: str,
+        model: Optional[str],
+        history: List[Dict[str, str]],
+    ) -> Dict[str, Any]:
         try:
             # Circuit breaker — skip LLM if provider is repeatedly failing
             if _circuit_breaker.is_open():
@@ -214,8 +270,25 @@ class AIManagerLLMProvider:
         provider: Optional[str] = None,
         model: Optional[str] = None,
         fallback_summary: str,
+        cache_evidence: Any = None,
+        cache_scope: Optional[str] = None,
+        on_event: Optional[ToolEventCallback] = None,
     ) -> Dict[str, Any]:
-        """Tool-use entry point. The LLM calls registered tools to fetch business data."""
+        """Tool-use entry point. The LLM calls registered tools to fetch business data.
+
+        ``cache_evidence`` should be the prefetched tool payload the answer is
+        grounded in; identical questions over identical evidence are served
+        from the response cache instead of a new provider round trip. An
+        answer whose conversation ran a live tool query is not stored, since
+        the key cannot cover data fetched after it was built. The dispatcher
+        lists its live queries in a ``live_calls`` attribute; without one,
+        every tool call counts as live.
+
+        Tool calls requested in one model turn run concurrently when the
+        dispatcher is marked ``parallel_safe``. ``on_event`` receives progress
+        events (tool calls, partial answer text) as they happen, and the whole
+        conversation is bounded by ``AI_MANAGER_LATENCY_BUDGET_SECONDS``.
+        """
         provider = (provider or AIManagerLLMProvider.configured_provider()).strip().lower()
         if model is not None:
             model = model.strip() or None
@@ -232,6 +305,52 @@ class AIManagerLLMProvider:
             }
 
         history = conversation_history or []
+
+        def answer() -> Dict[str, Any]:
+            live_calls = getattr(tool_dispatcher, "live_calls", None)
+            live_before = len(live_calls) if live_calls is not None else 0
+            result = AIManagerLLMProvider._generate_answer_with_tools_uncached(
+                message=message,
+                system_prompt=system_prompt,
+                tools=tools,
+                tool_dispatcher=tool_dispatcher,
+                history=history,
+                provider=provider,
+                model=model,
+                fallback_summary=fallback_summary,
+                on_event=on_event,
+            )
+            if live_calls is None:
+                live_tool_calls = len(result.get("tool_trace", []))
+            else:
+                live_tool_calls = len(live_calls) - live_before
+            return {**result, "live_tool_calls": live_tool_calls}
+
+        return AIManagerLLMProvider._cached_call(
+            answer,
+            provider=provider,
+            model=model,
+            system_prompt=system_prompt,
+            question=message,
+            evidence={"tools": [t.get("function", t).get("name") for t in tools], "evidence": cache_evidence},
+            history=history,
+            scope=cache_scope,
+        )
+
+    @staticmethod
+    def _generate_answer_with_tools_uncached(
+        *,
+        message: str,
+        system_prompt: str,
+        tools: List[Dict[str, Any]],
+        tool_dispatcher: Callable[[str, Dict[str, Any]], Any],
+        history: List[Dict[str, str]],
+        provider: str,
+        model: Optional[str],
+        fallback_summary: str,
+        on_event: Optional[ToolEventCallback] = None,
+    ) -> Dict[str, Any]:
+        deadline = time.monotonic() + settings.AI_MANAGER_LATENCY_BUDGET_SECONDS
         try:
             # Circuit breaker — avoid LLM calls when provider is degraded
             if _circuit_breaker.is_open():
@@ -259,6 +378,8 @@ class AIManagerLLMProvider:
                     model=model or "",
                     url=url,
                     api_key=api_key,
+                    deadline=deadline,
+                    on_event=on_event,
                 )
             elif provider == "claude":
                 answer, tool_trace = AIManagerLLMProvider._claude_tool_loop(
@@ -268,11 +389,27 @@ class AIManagerLLMProvider:
                     tool_dispatcher=tool_dispatcher,
                     history=history,
                     model=model or "",
+                    deadline=deadline,
+                    on_event=on_event,
                 )
             else:
                 raise AIProviderUnavailable(f"Unsupported provider: {provider}")
 
             _circuit_breaker.record_success()
+        except AIToolLoopBudgetExceeded:
+            # Slow tools are not a provider fault, so the breaker is untouched.
+            logger.warning(
+                "[LLM] Tool-use conversation exceeded %s s latency budget — returning fallback.",
+                settings.AI_MANAGER_LATENCY_BUDGET_SECONDS,
+            )
+            return {
+                "answer": fallback_summary,
+                "provider": provider,
+                "model": model,
+                "fallback_used": True,
+                "tool_trace": [],
+                "budget_exceeded": True,
+            }
         except Exception:
             _circuit_breaker.record_failure()
             return {
@@ -291,6 +428,51 @@ class AIManagerLLMProvider:
             "tool_trace": tool_trace,
         }
 
+    @staticmethod
+    def _cached_call(
+        call: Callable[[], Dict[str, Any]],
+        *,
+        provider: str,
+        model: Optional[str],
+        system_prompt: str,
+        question: str,
+        evidence: Any,
+        history: List[Dict[str, str]],
+        scope: Optional[str],
+    ) -> Dict[str, Any]:
+        """Serve a provider call through the shared response cache.
+
+        Concurrent identical requests wait for the first one instead of issuing
+        their own upstream call. Fallback answers and answers built on live
+        tool queries are returned but never stored.
+        """
+        if not settings.AI_RESPONSE_CACHE_ENABLED:
+            return {**call(), "cache": {"status": "bypass"}}
+
+        key = build_cache_key(
+            provider=provider,
+            model=model,
+            system_prompt=system_prompt,
+            question=question,
+            evidence=evidence,
+            history=history,
+            scope=scope,
+        )
+        result, status = response_cache.get_or_compute(
+            key,
+            call,
+            cacheable=lambda value: (
+                not value.get("fallback_used")
+                and not value.get("circuit_open")
+                and not value.get("live_tool_calls")
+            ),
+            provider=provider,
+            model=model,
+        )
+        if status != "miss":
+            logger.info("[AI cache] %s for %s/%s key=%s", status, provider, model, key[:12])
+        return {**result, "cache": {"status": status, "key": key[:16]}}
+
     @staticmethod
     def _openai_tool_loop(
         *,
@@ -302,6 +484,8 @@ class AIManagerLLMProvider:
         model: str,
         url: str,
         api_key: str,
+        deadline: Optional[float] = None,
+        on_event: Optional[ToolEventCallback] = None,
     ) -> tuple[str, List[Dict[str, Any]]]:
         messages: List[Dict[str, Any]] = [{"role": "system", "content": system_prompt}]
         messages.extend({"role": m["role"], "content": m["content"]} for m in history)
@@ -320,7 +504,7 @@ class AIManagerLLMProvider:
                 "max_tokens": settings.AI_MANAGER_MAX_TOKENS,
                 "temperature": 0.2,
             }
-            with httpx.Client(timeout=settings.AI_MANAGER_TIMEOUT_SECONDS) as client:
+            with httpx.Client(timeout=AIManagerLLMProvider._request_timeout(deadline)) as client:
                 response = client.post(url, json=payload, headers=headers)
                 response.raise_for_status()
                 data = response.json()
@@ -329,14 +513,20 @@ class AIManagerLLMProvider:
             messages.append(assistant_message)
             if choice.get("finish_reason") != "tool_calls":
                 return (assistant_message.get("content") or "").strip(), tool_trace
-            for tc in assistant_message.get("tool_calls", []):
-                name = tc["function"]["name"]
-                args = json.loads(tc["function"]["arguments"] or "{}")
-                result = tool_dispatcher(name, args)
+            if assistant_message.get("content"):
+                AIManagerLLMProvider._emit(on_event, {"type": "partial_answer", "text": assistant_message["content"].strip()})
+            calls = [
+                (tc["id"], tc["function"]["name"], json.loads(tc["function"]["arguments"] or "{}"))
+                for tc in assistant_message.get("tool_calls", [])
+            ]
+            results = AIManagerLLMProvider._execute_tool_calls(
+                calls, tool_dispatcher, deadline=deadline, on_event=on_event,
+            )
+            for (call_id, name, args), result in zip(calls, results):
                 tool_trace.append({"tool": name, "arguments": args, "result": result})
                 messages.append({
                     "role": "tool",
-                    "tool_call_id": tc["id"],
+                    "tool_call_id": call_id,
                     "content": json.dumps(result, default=str),
                 })
         return "", tool_trace
@@ -350,6 +540,8 @@ class AIManagerLLMProvider:
         tool_dispatcher: Callable[[str, Dict[str, Any]], Any],
         history: List[Dict[str, str]],
         model: str,
+        deadline: Optional[float] = None,
+        on_event: Optional[ToolEventCallback] = None,
     ) -> tuple[str, List[Dict[str, Any]]]:
         messages: List[Dict[str, Any]] = [{"role": m["role"], "content": m["content"]} for m in history]
         messages.append({"role": "user", "content": message})
@@ -368,7 +560,7 @@ class AIManagerLLMProvider:
                 "max_tokens": settings.AI_MANAGER_MAX_TOKENS,
                 "temperature": 0.2,
             }
-            with httpx.Client(timeout=settings.AI_MANAGER_TIMEOUT_SECONDS) as client:
+            with httpx.Client(timeout=AIManagerLLMProvider._request_timeout(deadline)) as client:
                 response = client.post(AIManagerLLMProvider.CLAUDE_URL, json=payload, headers=headers)
                 response.raise_for_status()
                 data = response.json()
@@ -379,20 +571,90 @@ class AIManagerLLMProvider:
                     if block.get("type") == "text" and block.get("text"):
                         return block["text"].strip(), tool_trace
                 return "", tool_trace
-            tool_results = []
             for block in content_blocks:
-                if block.get("type") != "tool_use":
-                    continue
-                result = tool_dispatcher(block["name"], block.get("input", {}))
-                tool_trace.append({"tool": block["name"], "arguments": block.get("input", {}), "result": result})
+                if block.get("type") == "text" and block.get("text"):
+                    AIManagerLLMProvider._emit(on_event, {"type": "partial_answer", "text": block["text"].strip()})
+            calls = [
+                (block["id"], block["name"], block.get("input", {}))
+                for block in content_blocks
+                if block.get("type") == "tool_use"
+            ]
+            results = AIManagerLLMProvider._execute_tool_calls(
+                calls, tool_dispatcher, deadline=deadline, on_event=on_event,
+            )
+            tool_results = []
+            for (call_id, name, args), result in zip(calls, results):
+                tool_trace.append({"tool": name, "arguments": args, "result": result})
                 tool_results.append({
                     "type": "tool_result",
-                    "tool_use_id": block["id"],
+                    "tool_use_id": call_id,
                     "content": json.dumps(result, default=str),
                 })
             messages.append({"role": "user", "content": tool_results})
         return "", tool_trace
 
+    @staticmethod
+    def _execute_tool_calls(
+        calls: List[Tuple[str, str, Dict[str, Any]]],
+        tool_dispatcher: Callable[[str, Dict[str, Any]], Any],
+        *,
+        deadline: Optional[float],
+        on_event: Optional[ToolEventCallback],
+    ) -> List[Any]:
+        """Run one model turn's tool calls and return results in request order.
+
+        Independent calls run concurrently on the shared tool pool when the
+        dispatcher is ``parallel_safe`` (each call uses its own DB session);
+        otherwise they run sequentially on the caller's thread.
+        """
+
+        def _run(name: str, args: Dict[str, Any]) -> Any:
+            AIManagerLLMProvider._emit(on_event, {"type": "tool_call", "tool": name, "arguments": args})
+            started = time.monotonic()
+            result = tool_dispatcher(name, args)
+            AIManagerLLMProvider._emit(on_event, {
+                "type": "tool_result",
+                "tool": name,
+                "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+            })
+            return result
+
+        if len(calls) <= 1 or not getattr(tool_dispatcher, "parallel_safe", False):
+            results = []
+            for _call_id, name, args in calls:
+                AIManagerLLMProvider._request_timeout(deadline)
+                results.append(_run(name, args))
+            return results
+
+        executor = _get_tool_executor()
+        futures = [executor.submit(_run, name, args) for _call_id, name, args in calls]
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        _done, pending = wait(futures, timeout=timeout)
+        if pending:
+            for future in pending:
+                future.cancel()
+            raise AIToolLoopBudgetExceeded(f"{len(pending)} tool call(s) still running at the latency budget")
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _request_timeout(deadline: Optional[float]) -> float:
+        """HTTP timeout for the next round trip, capped by the remaining budget."""
+        if deadline is None:
+            return float(settings.AI_MANAGER_TIMEOUT_SECONDS)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AIToolLoopBudgetExceeded("Latency budget exhausted before the next step")
+        return min(float(settings.AI_MANAGER_TIMEOUT_SECONDS), remaining)
+
+    @staticmethod
+    def _emit(on_event: Optional[ToolEventCallback], event: Dict[str, Any]) -> None:
+        if on_event is None:
+            return
+        try:
+            on_event(event)
+        except Exception:
+            logger.debug("[LLM] Tool event listener failed", exc_info=True)
+
     @staticmethod
     def _to_anthropic_tools(openai_tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Convert OpenAI function-calling format to Anthropic tool-use format."""
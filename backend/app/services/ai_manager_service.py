@@ -9,15 +9,15 @@ from decimal import Decimal
 from typing import Any, Callable, Dict, List, Optional
 
 from sqlalchemy import case, func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.config import settings
+from app.db.read_replica import read_session, read_target
 from app.models.cloud_projection import (
-    CloudBatchSnapshot,
     CloudInventoryMovementFact,
     CloudProductSnapshot,
     CloudSaleFact,
 )
-from app.models.sync_ingestion import IngestedSyncEvent
 from app.models.tenancy import Branch
 from app.models.user import User
 from app.services.ai_llm_provider import AIManagerLLMProvider
@@ -25,8 +25,10 @@ from app.services.ai_provider_policy_service import AIProviderPolicyService
 from app.services.cloud_dead_stock_service import CloudDeadStockService
 from app.services.cloud_reconciliation_service import CloudReconciliationService
 from app.services.cloud_sales_trend_service import CloudSalesTrendService
+from app.services.cloud_stock_report_service import CloudStockReportService
 from app.services.cloud_stock_velocity_service import CloudStockVelocityService
 from app.services.customer_analytics_service import CustomerAnalyticsService
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 
 TOOL_SCHEMAS: List[Dict[str, Any]] = [
@@ -266,6 +268,34 @@ class AIManagerService:
         period_days: int,
         current_user: Optional[User] = None,
         conversation_history: Optional[List[Dict[str, Any]]] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Answer from the read replica when it is fresh enough, otherwise from ``db``."""
+        with read_session(db) as read_db:
+            result = AIManagerService._answer(
+                read_db,
+                message=message,
+                organization_id=organization_id,
+                branch_id=branch_id,
+                period_days=period_days,
+                current_user=current_user,
+                conversation_history=conversation_history,
+                on_event=on_event,
+            )
+            result["data_scope"].update(read_target(read_db).metadata())
+        return result
+
+    @staticmethod
+    def _answer(
+        db: Session,
+        *,
+        message: str,
+        organization_id: int,
+        branch_id: Optional[int],
+        period_days: int,
+        current_user: Optional[User],
+        conversation_history: Optional[List[Dict[str, Any]]],
+        on_event: Optional[Callable[[Dict[str, Any]], None]],
     ) -> Dict[str, Any]:
         effective_branch_id = AIManagerService._effective_branch_id(current_user, branch_id)
         normalized_message = message.strip().lower()
@@ -396,11 +426,19 @@ class AIManagerService:
                     branch_id=effective_branch_id,
                     reporting_window=reporting_window,
                     prefetched=tool_results,
+                    session_factory=(
+                        sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False)
+                        if settings.AI_TOOL_MAX_WORKERS > 1
+                        else None
+                    ),
                 ),
                 conversation_history=conversation_history or [],
                 provider=provider,
                 model=model,
                 fallback_summary=deterministic_answer,
+                cache_evidence=tool_results,
+                cache_scope=f"org:{organization_id}:branch:{effective_branch_id}",
+                on_event=on_event,
             )
         else:
             provider_result = {
@@ -409,6 +447,7 @@ class AIManagerService:
                 "model": model,
                 "fallback_used": False,
                 "tool_trace": [],
+                "cache": {"status": "bypass"},
             }
 
         verification = AIManagerService._verify_answer_numbers(
@@ -448,6 +487,7 @@ class AIManagerService:
             "provider": provider_result["provider"],
             "model": provider_result["model"],
             "fallback_used": provider_result["fallback_used"],
+            "cache": provider_result.get("cache", {"status": "bypass"}),
             "refused": False,
         }
 
@@ -550,10 +590,17 @@ class AIManagerService:
         branch_id: Optional[int],
         reporting_window: Dict[str, Any],
         prefetched: Dict[str, Any],
+        session_factory: Optional[Callable[[], Session]] = None,
     ) -> Callable[[str, Dict[str, Any]], Any]:
         """Return a dispatcher that serves pre-fetched data for the default period and
-        executes fresh DB queries when the LLM requests today/yesterday."""
+        executes fresh DB queries when the LLM requests today/yesterday.
+
+        With ``session_factory`` every fresh query runs in its own short-lived
+        session, so the provider may execute several tool calls concurrently.
+        Fresh queries are listed in ``live_calls`` so their answers are not
+        served from the response cache."""
         period_days = int(reporting_window["period_days"])
+        live_calls: List[str] = []
         _CACHE_MAP = {
             "get_sales_summary": "sales_summary",
             "get_branch_sales": "branch_sales",
@@ -580,13 +627,24 @@ class AIManagerService:
 
         def _dispatch(tool_name: str, arguments: Dict[str, Any]) -> Any:
             period = arguments.get("period", "period")
-            limit = int(arguments.get("limit", 10))
 
             if period == "period":
                 cache_key = _CACHE_MAP.get(tool_name)
                 if cache_key and cache_key in prefetched:
                     return prefetched[cache_key]
 
+            live_calls.append(tool_name)
+            if session_factory is None:
+                return _query(db, tool_name, arguments)
+            tool_db = session_factory()
+            try:
+                return _query(tool_db, tool_name, arguments)
+            finally:
+                tool_db.close()
+
+        def _query(db: Session, tool_name: str, arguments: Dict[str, Any]) -> Any:
+            period = arguments.get("period", "period")
+            limit = int(arguments.get("limit", 10))
             start_at, end_at = _resolve_window(period)
 
             if tool_name == "get_sales_summary":
@@ -646,6 +704,8 @@ class AIManagerService:
                 )
             return {"error": f"Unknown tool: {tool_name}"}
 
+        _dispatch.parallel_safe = session_factory is not None
+        _dispatch.live_calls = live_calls
         return _dispatch
 
     @staticmethod
@@ -863,26 +923,14 @@ class AIManagerService:
         organization_id: int,
         branch_id: Optional[int],
     ) -> Dict[str, Any]:
-        query = db.query(IngestedSyncEvent).filter(IngestedSyncEvent.organization_id == organization_id)
-        if branch_id is not None:
-            query = query.filter(IngestedSyncEvent.branch_id == branch_id)
-
-        row = query.with_entities(
-            func.count(IngestedSyncEvent.id).label("ingested_event_count"),
-            func.coalesce(func.sum(case((IngestedSyncEvent.projected_at.is_not(None), 1), else_=0)), 0).label("projected_event_count"),
-            func.coalesce(func.sum(case((IngestedSyncEvent.projection_error.is_not(None), 1), else_=0)), 0).label("projection_failed_count"),
-            func.coalesce(func.sum(IngestedSyncEvent.duplicate_count), 0).label("duplicate_delivery_count"),
-            func.max(IngestedSyncEvent.received_at).label("last_received_at"),
-            func.max(IngestedSyncEvent.projected_at).label("last_projected_at"),
-        ).one()
-
+        totals = SyncIngestionStatsService.totals(db, organization_id=organization_id, branch_id=branch_id)
         return {
-            "ingested_event_count": int(row.ingested_event_count or 0),
-            "projected_event_count": int(row.projected_event_count or 0),
-            "projection_failed_count": int(row.projection_failed_count or 0),
-            "duplicate_delivery_count": int(row.duplicate_delivery_count or 0),
-            "last_received_at": row.last_received_at.isoformat() if row.last_received_at else None,
-            "last_projected_at": row.last_projected_at.isoformat() if row.last_projected_at else None,
+            "ingested_event_count": totals["ingested_event_count"],
+            "projected_event_count": totals["projected_event_count"],
+            "projection_failed_count": totals["projection_failed_count"],
+            "duplicate_delivery_count": totals["duplicate_delivery_count"],
+            "last_received_at": totals["last_received_at"].isoformat() if totals["last_received_at"] else None,
+            "last_projected_at": totals["last_projected_at"].isoformat() if totals["last_projected_at"] else None,
         }
 
     @staticmethod
@@ -893,55 +941,54 @@ class AIManagerService:
         branch_id: Optional[int],
         expiry_warning_days: int = 90,
     ) -> Dict[str, Any]:
-        product_query = db.query(CloudProductSnapshot).filter(
-            CloudProductSnapshot.organization_id == organization_id,
-            CloudProductSnapshot.is_active.is_(True),
-        )
-        batch_query = db.query(CloudBatchSnapshot).filter(
-            CloudBatchSnapshot.organization_id == organization_id,
-            CloudBatchSnapshot.quantity > 0,
-            CloudBatchSnapshot.is_quarantined.is_(False),
-        )
-        if branch_id is not None:
-            product_query = product_query.filter(CloudProductSnapshot.branch_id == branch_id)
-            batch_query = batch_query.filter(CloudBatchSnapshot.branch_id == branch_id)
-
         today = date.today()
         warning_date = today + timedelta(days=expiry_warning_days)
-        products = product_query.all()
-        batches = batch_query.all()
+        scope = {"organization_id": organization_id, "branch_id": branch_id}
+        product_counts = CloudStockReportService.product_risk_counts(db, **scope)
+        batch_counts = CloudStockReportService.batch_risk_counts(
+            db,
+            **scope,
+            today=today,
+            warning_date=warning_date,
+        )
         low_stock_products = [
-            {"product_id": product.local_product_id, "name": product.name, "stock": product.total_stock}
-            for product in products
-            if 0 < product.total_stock <= product.low_stock_threshold
+            {"product_id": product["product_id"], "name": product["product_name"], "stock": product["total_stock"]}
+            for product in CloudStockReportService.low_stock_products(db, **scope, limit=10, status="low_stock")
         ]
         out_of_stock_products = [
-            {"product_id": product.local_product_id, "name": product.name, "stock": product.total_stock}
-            for product in products
-            if product.total_stock <= 0
+            {"product_id": product["product_id"], "name": product["product_name"], "stock": product["total_stock"]}
+            for product in CloudStockReportService.low_stock_products(db, **scope, limit=10, status="out_of_stock")
         ]
         expiry_batches = [
             {
-                "product_id": batch.local_product_id,
-                "batch_id": batch.local_batch_id,
-                "batch_number": batch.batch_number,
-                "quantity": batch.quantity,
-                "expiry_date": batch.expiry_date.isoformat(),
-                "days_until_expiry": (batch.expiry_date - today).days,
-                "status": "expired" if batch.expiry_date < today else "near_expiry",
+                key: batch[key]
+                for key in (
+                    "product_id",
+                    "batch_id",
+                    "batch_number",
+                    "quantity",
+                    "expiry_date",
+                    "days_until_expiry",
+                    "status",
+                )
             }
-            for batch in batches
-            if batch.expiry_date <= warning_date
+            for batch in CloudStockReportService.expiry_batches(
+                db,
+                **scope,
+                today=today,
+                warning_date=warning_date,
+                limit=10,
+            )
         ]
         return {
-            "low_stock_count": len(low_stock_products),
-            "out_of_stock_count": len(out_of_stock_products),
-            "near_expiry_batch_count": sum(1 for batch in expiry_batches if batch["status"] == "near_expiry"),
-            "expired_batch_count": sum(1 for batch in expiry_batches if batch["status"] == "expired"),
+            "low_stock_count": product_counts["low_stock_count"],
+            "out_of_stock_count": product_counts["out_of_stock_count"],
+            "near_expiry_batch_count": batch_counts["near_expiry_batch_count"],
+            "expired_batch_count": batch_counts["expired_batch_count"],
             "expiry_warning_days": expiry_warning_days,
-            "low_stock_products": low_stock_products[:10],
-            "out_of_stock_products": out_of_stock_products[:10],
-            "expiry_batches": expiry_batches[:10],
+            "low_stock_products": low_stock_products,
+            "out_of_stock_products": out_of_stock_products,
+            "expiry_batches": expiry_batches,
         }
 
     @staticmethod
@@ -0,0 +1,316 @@
+"""
+Deterministic response cache for external AI provider calls.
+
+Identical questions over identical evidence within the TTL reuse one provider
+answer, and concurrent identical requests are coalesced into one upstream call.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Keys whose values change on every request without changing the evidence
+# itself (for example the rolling "now" end of a reporting window). Window
+# bounds are still covered by the window label and period length.
+VOLATILE_EVIDENCE_KEYS = frozenset({"generated_at", "start_at", "end_at", "checked_at"})
+VOLATILE_EVIDENCE_SUFFIXES = ("_period_start", "_period_end")
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case and collapse whitespace so trivial rephrasings share a key."""
+    return re.sub(r"\s+", " ", (question or "").strip().lower()).rstrip("?.! ")
+
+
+def evidence_hash(evidence: Any) -> str:
+    """Stable SHA-256 over the evidence payload, ignoring volatile timestamps."""
+    canonical = json.dumps(
+        _strip_volatile(evidence),
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            str(key): _strip_volatile(child)
+            for key, child in value.items()
+            if key not in VOLATILE_EVIDENCE_KEYS
+            and not str(key).endswith(VOLATILE_EVIDENCE_SUFFIXES)
+        }
+    if isinstance(value, (list, tuple)):
+        return [_strip_volatile(child) for child in value]
+    return value
+
+
+def build_cache_key(
+    *,
+    provider: str,
+    model: Optional[str],
+    system_prompt: str,
+    question: str,
+    evidence: Any = None,
+    history: Optional[List[Dict[str, Any]]] = None,
+    scope: Optional[str] = None,
+) -> str:
+    parts = {
+        "provider": provider,
+        "model": model or "",
+        "scope": scope or "",
+        "system": hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest(),
+        "question": normalize_question(question),
+        "evidence": evidence_hash(evidence),
+        "history": evidence_hash(
+            [{"role": m.get("role"), "content": m.get("content")} for m in (history or [])]
+        ),
+    }
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+class _InFlight:
+    """One pending upstream call that identical concurrent requests wait on."""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class SQLAlchemyResponseCacheStore:
+    """Optional persistent second tier backed by ``ai_response_cache_entries``.
+
+    Uses its own short-lived sessions so cache reads and writes never join
+    (or roll back with) the caller's transaction.
+    """
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None) -> None:
+        self._session_factory = session_factory
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.db.base import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return ``(payload, remaining_ttl)``; a database error counts as a miss."""
+        from app.models.ai_report import AIResponseCacheEntry
+
+        db = None
+        try:
+            db = self._session()
+            entry = (
+                db.query(AIResponseCacheEntry)
+                .filter(AIResponseCacheEntry.cache_key == key)
+                .first()
+            )
+            if entry is None:
+                return None
+            expires_at = entry.expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            if remaining <= 0:
+                return None
+            return dict(entry.payload or {}), remaining
+        except Exception:
+            logger.warning("[AI cache] Failed to read cache entry %s", key[:12], exc_info=True)
+            return None
+        finally:
+            if db is not None:
+                db.close()
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float, *, provider: str, model: Optional[str]) -> None:
+        """Persist an answer; a database error is logged and the entry skipped."""
+        from app.models.ai_report import AIResponseCacheEntry
+
+        db = None
+        try:
+            db = self._session()
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+            entry = (
+                db.query(AIResponseCacheEntry)
+                .filter(AIResponseCacheEntry.cache_key == key)
+                .first()
+            )
+            if entry is None:
+                entry = AIResponseCacheEntry(cache_key=key)
+                db.add(entry)
+            entry.provider = provider
+            entry.model = model
+            entry.payload = value
+            entry.expires_at = expires_at
+            db.commit()
+        except Exception:
+            if db is not None:
+                db.rollback()
+            logger.warning("[AI cache] Failed to persist cache entry %s", key[:12], exc_info=True)
+        finally:
+            if db is not None:
+                db.close()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; run hourly by the scheduler."""
+        from app.models.ai_report import AIResponseCacheEntry
+
+        db = self._session()
+        try:
+            deleted = (
+                db.query(AIResponseCacheEntry)
+                .filter(AIResponseCacheEntry.expires_at <= datetime.now(timezone.utc))
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return int(deleted or 0)
+        finally:
+            db.close()
+
+
+class AIResponseCache:
+    """Thread-safe TTL + LRU cache with in-flight request coalescing.
+
+    Only successful provider answers are stored; fallbacks are never cached so
+    a recovered provider is used on the next request.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 600.0,
+        max_entries: int = 512,
+        store: Optional[SQLAlchemyResponseCacheStore] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.store = store
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "stores": 0, "evictions": 0}
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Dict[str, Any]],
+        *,
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda value: True,
+        provider: str = "",
+        model: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Return ``(value, status)`` where status is hit, coalesced or miss.
+
+        Exceptions raised by ``compute`` propagate to the caller and to every
+        coalesced waiter of the same key.
+        """
+        with self._lock:
+            cached = self._get_locked(key)
+            if cached is not None:
+                self._stats["hits"] += 1
+                return cached, "hit"
+            pending = self._in_flight.get(key)
+            if pending is None:
+                pending = _InFlight()
+                self._in_flight[key] = pending
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            with self._lock:
+                self._stats["coalesced"] += 1
+            return dict(pending.value or {}), "coalesced"
+
+        try:
+            persisted = self.store.get(key) if self.store is not None else None
+            if persisted is not None:
+                value, remaining = persisted
+                with self._lock:
+                    self._put_locked(key, value, remaining)
+                    self._stats["hits"] += 1
+                pending.value = value
+                return dict(value), "hit"
+
+            with self._lock:
+                self._stats["misses"] += 1
+            value = compute()
+            pending.value = value
+            if cacheable(value):
+                with self._lock:
+                    self._put_locked(key, value, self.ttl_seconds)
+                    self._stats["stores"] += 1
+                if self.store is not None:
+                    self.store.set(key, value, self.ttl_seconds, provider=provider, model=model)
+            return value, "miss"
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            pending.event.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def keys(self) -> Iterable[str]:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def _get_locked(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return dict(value)
+
+    def _put_locked(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        self._entries[key] = (self._clock() + ttl_seconds, dict(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+
+def _build_default_cache() -> AIResponseCache:
+    return AIResponseCache(
+        ttl_seconds=float(settings.AI_RESPONSE_CACHE_TTL_SECONDS),
+        max_entries=int(settings.AI_RESPONSE_CACHE_MAX_ENTRIES),
+        store=SQLAlchemyResponseCacheStore() if settings.AI_RESPONSE_CACHE_PERSISTENT else None,
+    )
+
+
+# Module-level singleton — shared across all requests in the same process,
+# like the provider circuit breaker.
+response_cache = _build_default_cache()
@@ -11,11 +11,10 @@ from sqlalchemy import case, func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.db.read_replica import read_session, read_target
 from app.models.ai_report import AIWeeklyManagerReport
 from app.models.cloud_projection import (
-    CloudBatchSnapshot,
     CloudInventoryMovementFact,
-    CloudProductSnapshot,
     CloudSaleFact,
 )
 from app.models.sync_ingestion import IngestedSyncEvent
@@ -25,6 +24,8 @@ from app.services.ai_llm_provider import AIManagerLLMProvider
 from app.services.ai_manager_service import AIManagerService
 from app.services.ai_provider_policy_service import AIProviderPolicyService
 from app.services.cloud_reconciliation_service import CloudReconciliationService
+from app.services.cloud_stock_report_service import CloudStockReportService
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 
 class AIWeeklyReportService:
@@ -56,15 +57,18 @@ class AIWeeklyReportService:
             if existing_report is not None:
                 return existing_report
 
-        tool_results = AIWeeklyReportService._collect_tool_results(
-            db,
-            organization_id=organization_id,
-            branch_id=branch_id,
-            performance_start=performance_start,
-            performance_end=performance_end,
-            action_start=action_start,
-            action_end=action_end,
-        )
+        # Analytics read from the replica when it is fresh enough; the report is written to ``db``.
+        with read_session(db) as read_db:
+            tool_results = AIWeeklyReportService._collect_tool_results(
+                read_db,
+                organization_id=organization_id,
+                branch_id=branch_id,
+                performance_start=performance_start,
+                performance_end=performance_end,
+                action_start=action_start,
+                action_end=action_end,
+            )
+            data_freshness = read_target(read_db).metadata()
         sections = AIWeeklyReportService._build_sections(
             tool_results=tool_results,
             performance_start=performance_start,
@@ -97,6 +101,8 @@ class AIWeeklyReportService:
             deterministic_answer=deterministic_summary,
             provider=provider_policy["provider"],
             model=provider_policy["model"],
+            cache_evidence=tool_results,
+            cache_scope=f"org:{organization_id}:branch:{branch_id}",
         )
 
         report = AIWeeklyManagerReport(
@@ -111,7 +117,7 @@ class AIWeeklyReportService:
             title=AIWeeklyReportService._title(performance_start, performance_end, action_start, action_end),
             executive_summary=provider_result["answer"],
             sections=sections,
-            tool_results=tool_results,
+            tool_results={**tool_results, "data_freshness": data_freshness},
             safety_notes=AIManagerService._safety_notes(),
             provider=provider_result["provider"],
             model=provider_result["model"],
@@ -386,70 +392,30 @@ class AIWeeklyReportService:
         current_date: date,
         action_end: date,
     ) -> Dict[str, Any]:
-        product_query = db.query(CloudProductSnapshot).filter(
-            CloudProductSnapshot.organization_id == organization_id,
-            CloudProductSnapshot.is_active.is_(True),
-        )
-        batch_query = db.query(CloudBatchSnapshot, CloudProductSnapshot).join(
-            CloudProductSnapshot,
-            (CloudProductSnapshot.organization_id == CloudBatchSnapshot.organization_id)
-            & (CloudProductSnapshot.branch_id == CloudBatchSnapshot.branch_id)
-            & (CloudProductSnapshot.local_product_id == CloudBatchSnapshot.local_product_id),
-        ).filter(
-            CloudBatchSnapshot.organization_id == organization_id,
-            CloudBatchSnapshot.quantity > 0,
-            CloudBatchSnapshot.is_quarantined.is_(False),
-            CloudBatchSnapshot.expiry_date <= action_end,
-            CloudProductSnapshot.is_active.is_(True),
-        )
-        if branch_id is not None:
-            product_query = product_query.filter(CloudProductSnapshot.branch_id == branch_id)
-            batch_query = batch_query.filter(CloudBatchSnapshot.branch_id == branch_id)
-
-        products = product_query.all()
-        low_stock_rows = sorted(
-            [product for product in products if product.total_stock <= product.low_stock_threshold],
-            key=lambda product: (product.total_stock, product.name),
+        scope = {"organization_id": organization_id, "branch_id": branch_id}
+        product_counts = CloudStockReportService.product_risk_counts(db, **scope)
+        batch_counts = CloudStockReportService.batch_risk_counts(
+            db,
+            **scope,
+            today=current_date,
+            warning_date=action_end,
+            active_products_only=True,
         )
-        expiry_rows = batch_query.order_by(CloudBatchSnapshot.expiry_date.asc(), CloudProductSnapshot.name.asc()).all()
-        expiring_batches = [
-            {
-                "branch_id": batch.branch_id,
-                "product_id": batch.local_product_id,
-                "product_name": product.name,
-                "sku": product.sku,
-                "batch_id": batch.local_batch_id,
-                "batch_number": batch.batch_number,
-                "quantity": batch.quantity,
-                "expiry_date": batch.expiry_date.isoformat(),
-                "days_until_expiry": (batch.expiry_date - current_date).days,
-                "value_at_risk": float((batch.cost_price or 0) * batch.quantity),
-                "status": "expired" if batch.expiry_date < current_date else "near_expiry",
-            }
-            for batch, product in expiry_rows
-        ]
-        low_stock_products = [
-            {
-                "branch_id": product.branch_id,
-                "product_id": product.local_product_id,
-                "product_name": product.name,
-                "sku": product.sku,
-                "total_stock": product.total_stock,
-                "low_stock_threshold": product.low_stock_threshold,
-                "reorder_level": product.reorder_level,
-                "units_needed": max((product.reorder_level or product.low_stock_threshold) - product.total_stock, 0),
-                "status": "out_of_stock" if product.total_stock <= 0 else "low_stock",
-            }
-            for product in low_stock_rows
-        ]
         return {
-            "low_stock_count": sum(1 for product in low_stock_products if product["status"] == "low_stock"),
-            "out_of_stock_count": sum(1 for product in low_stock_products if product["status"] == "out_of_stock"),
-            "near_expiry_batch_count": sum(1 for batch in expiring_batches if batch["status"] == "near_expiry"),
-            "expired_batch_count": sum(1 for batch in expiring_batches if batch["status"] == "expired"),
-            "value_at_risk": round(sum(batch["value_at_risk"] for batch in expiring_batches), 2),
-            "low_stock_products": low_stock_products[:25],
-            "expiry_batches": expiring_batches[:25],
+            "low_stock_count": product_counts["low_stock_count"],
+            "out_of_stock_count": product_counts["out_of_stock_count"],
+            "near_expiry_batch_count": batch_counts["near_expiry_batch_count"],
+            "expired_batch_count": batch_counts["expired_batch_count"],
+            "value_at_risk": batch_counts["value_at_risk"],
+            "low_stock_products": CloudStockReportService.low_stock_products(db, **scope, limit=25),
+            "expiry_batches": CloudStockReportService.expiry_batches(
+                db,
+                **scope,
+                today=current_date,
+                warning_date=action_end,
+                limit=25,
+                active_products_only=True,
+            ),
         }
 
     @staticmethod
@@ -461,29 +427,22 @@ class AIWeeklyReportService:
         start: datetime,
         end: datetime,
     ) -> Dict[str, Any]:
-        base_query = db.query(IngestedSyncEvent).filter(IngestedSyncEvent.organization_id == organization_id)
-        window_query = base_query.filter(IngestedSyncEvent.received_at >= start, IngestedSyncEvent.received_at <= end)
+        totals = SyncIngestionStatsService.totals(db, organization_id=organization_id, branch_id=branch_id)
+        window_query = db.query(func.count(IngestedSyncEvent.id)).filter(
+            IngestedSyncEvent.organization_id == organization_id,
+            IngestedSyncEvent.received_at >= start,
+            IngestedSyncEvent.received_at <= end,
+        )
         if branch_id is not None:
-            base_query = base_query.filter(IngestedSyncEvent.branch_id == branch_id)
             window_query = window_query.filter(IngestedSyncEvent.branch_id == branch_id)
-
-        all_row = base_query.with_entities(
-            func.count(IngestedSyncEvent.id).label("ingested_event_count"),
-            func.coalesce(func.sum(case((IngestedSyncEvent.projected_at.is_not(None), 1), else_=0)), 0).label("projected_event_count"),
-            func.coalesce(func.sum(case((IngestedSyncEvent.projection_error.is_not(None), 1), else_=0)), 0).label("projection_failed_count"),
-            func.coalesce(func.sum(IngestedSyncEvent.duplicate_count), 0).label("duplicate_delivery_count"),
-            func.max(IngestedSyncEvent.received_at).label("last_received_at"),
-            func.max(IngestedSyncEvent.projected_at).label("last_projected_at"),
-        ).one()
-        window_row = window_query.with_entities(func.count(IngestedSyncEvent.id).label("events_received_in_period")).one()
         return {
-            "ingested_event_count": int(all_row.ingested_event_count or 0),
-            "projected_event_count": int(all_row.projected_event_count or 0),
-            "projection_failed_count": int(all_row.projection_failed_count or 0),
-            "duplicate_delivery_count": int(all_row.duplicate_delivery_count or 0),
-            "events_received_in_period": int(window_row.events_received_in_period or 0),
-            "last_received_at": all_row.last_received_at.isoformat() if all_row.last_received_at else None,
-            "last_projected_at": all_row.last_projected_at.isoformat() if all_row.last_projected_at else None,
+            "ingested_event_count": totals["ingested_event_count"],
+            "projected_event_count": totals["projected_event_count"],
+            "projection_failed_count": totals["projection_failed_count"],
+            "duplicate_delivery_count": totals["duplicate_delivery_count"],
+            "events_received_in_period": int(window_query.scalar() or 0),
+            "last_received_at": totals["last_received_at"].isoformat() if totals["last_received_at"] else None,
+            "last_projected_at": totals["last_projected_at"].isoformat() if totals["last_projected_at"] else None,
         }
 
     @staticmethod
@@ -10,6 +10,7 @@ from typing import Any, Optional
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.cloud_projection import (
     CloudBatchSnapshot,
     CloudDeviceHeartbeatSnapshot,
@@ -19,6 +20,8 @@ from app.models.cloud_projection import (
 )
 from app.models.sync_event import SyncEventType
 from app.models.sync_ingestion import IngestedSyncEvent
+from app.services.fleet_summary_service import FleetSummaryService
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 
 class CloudProjectionService:
@@ -43,18 +46,12 @@ class CloudProjectionService:
 
     @staticmethod
     def status(db: Session) -> dict[str, Any]:
-        unprojected_count = db.query(IngestedSyncEvent).filter(
-            IngestedSyncEvent.projected_at.is_(None),
-            IngestedSyncEvent.projection_error.is_(None),
-        ).count()
-        projected_count = db.query(IngestedSyncEvent).filter(IngestedSyncEvent.projected_at.is_not(None)).count()
-        failed_count = db.query(IngestedSyncEvent).filter(IngestedSyncEvent.projection_error.is_not(None)).count()
-        last_projected_at = db.query(func.max(IngestedSyncEvent.projected_at)).scalar()
+        totals = SyncIngestionStatsService.totals(db)
         return {
-            "unprojected_count": unprojected_count,
-            "projected_count": projected_count,
-            "failed_count": failed_count,
-            "last_projected_at": last_projected_at,
+            "unprojected_count": totals["unprojected_event_count"],
+            "projected_count": totals["projected_event_count"],
+            "failed_count": totals["projection_failed_count"],
+            "last_projected_at": totals["last_projected_at"],
         }
 
     @staticmethod
@@ -74,6 +71,7 @@ class CloudProjectionService:
         projected = 0
         failed = 0
         skipped = 0
+        heartbeats_projected = False
 
         for event in events:
             attempted += 1
@@ -81,18 +79,25 @@ class CloudProjectionService:
                 was_projected = CloudProjectionService.project_event(db, event)
                 if was_projected:
                     projected += 1
+                    heartbeats_projected = heartbeats_projected or event.event_type == SyncEventType.SYSTEM_HEARTBEAT
                 else:
                     skipped += 1
                 event.projected_at = datetime.now(timezone.utc)
                 event.projection_error = None
+                SyncIngestionStatsService.record(db, event, projected=1, projected_at=event.projected_at)
                 db.commit()
             except Exception as exc:
                 db.rollback()
                 event = db.query(IngestedSyncEvent).filter(IngestedSyncEvent.id == event.id).one()
                 event.projection_error = str(exc)
+                SyncIngestionStatsService.record(db, event, failed=1)
                 failed += 1
                 db.commit()
 
+        if heartbeats_projected and settings.ADMIN_FLEET_SUMMARY_CACHE_ENABLED:
+            FleetSummaryService.refresh(db)
+            db.commit()
+
         return {
             "attempted": attempted,
             "projected": projected,
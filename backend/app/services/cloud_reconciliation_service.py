@@ -9,6 +9,7 @@ import hashlib
 import json
 from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
 from app.models.cloud_projection import (
@@ -22,6 +23,7 @@ from app.models.sync_event import SyncEventType
 from app.models.sync_ingestion import IngestedSyncEvent
 from app.services.cloud_projection_service import CloudProjectionService
 from app.services.audit_service import AuditService
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 
 class CloudReconciliationService:
@@ -425,6 +427,14 @@ class CloudReconciliationService:
                 was_projected = CloudProjectionService.project_event(db, event)
                 event.projected_at = datetime.now(timezone.utc)
                 event.projection_error = None
+                # A failed event moves from the failed to the projected counter.
+                SyncIngestionStatsService.record(
+                    db,
+                    event,
+                    projected=1,
+                    failed=-1,
+                    projected_at=event.projected_at,
+                )
                 if was_projected:
                     repaired += 1
                 else:
@@ -456,13 +466,18 @@ class CloudReconciliationService:
         branch_id: Optional[int],
         limit: int,
     ) -> Dict[str, Any]:
+        # Outer join: once the archive job has moved a sale's event to cold
+        # storage, the fact's own copy of the payload is the only source left.
         query = (
             db.query(CloudSaleFact, IngestedSyncEvent)
-            .join(IngestedSyncEvent, CloudSaleFact.source_event_id == IngestedSyncEvent.id)
-            .filter(
-                CloudSaleFact.organization_id == organization_id,
-                IngestedSyncEvent.event_type == SyncEventType.SALE_CREATED,
+            .outerjoin(
+                IngestedSyncEvent,
+                and_(
+                    CloudSaleFact.source_event_id == IngestedSyncEvent.id,
+                    IngestedSyncEvent.event_type == SyncEventType.SALE_CREATED,
+                ),
             )
+            .filter(CloudSaleFact.organization_id == organization_id)
         )
         if branch_id is not None:
             query = query.filter(CloudSaleFact.branch_id == branch_id)
@@ -473,16 +488,23 @@ class CloudReconciliationService:
         details: List[dict] = []
         for fact, event in rows:
             attempted += 1
+            detail = {
+                "event_id": event.event_id if event is not None else None,
+                "sale_fact_id": fact.id,
+                "source": "event" if event is not None else "sale_fact_payload",
+            }
             try:
-                items = event.payload.get("items") if isinstance(event.payload, dict) else None
+                payload = event.payload if event is not None else fact.payload
+                items = payload.get("items") if isinstance(payload, dict) else None
                 if not isinstance(items, list):
                     skipped += 1
                     details.append(
                         {
-                            "event_id": event.event_id,
-                            "sale_fact_id": fact.id,
+                            **detail,
                             "status": "skipped",
-                            "reason": "sale payload has no item list",
+                            "reason": "sale payload has no item list"
+                            if event is not None
+                            else "source event is archived and the sale fact payload has no item list",
                         }
                     )
                     continue
@@ -492,8 +514,7 @@ class CloudReconciliationService:
                     skipped += 1
                     details.append(
                         {
-                            "event_id": event.event_id,
-                            "sale_fact_id": fact.id,
+                            **detail,
                             "status": "already_correct",
                             "item_count": fact.item_count,
                         }
@@ -502,12 +523,11 @@ class CloudReconciliationService:
 
                 previous_units = fact.item_count
                 fact.item_count = expected_units
-                fact.payload = event.payload
+                fact.payload = payload
                 repaired += 1
                 details.append(
                     {
-                        "event_id": event.event_id,
-                        "sale_fact_id": fact.id,
+                        **detail,
                         "status": "repaired",
                         "previous_item_count": previous_units,
                         "item_count": expected_units,
@@ -517,8 +537,7 @@ class CloudReconciliationService:
                 failed += 1
                 details.append(
                     {
-                        "event_id": getattr(event, "event_id", None),
-                        "sale_fact_id": getattr(fact, "id", None),
+                        **detail,
                         "status": "failed",
                         "error": str(exc),
                     }
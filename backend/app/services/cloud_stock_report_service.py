@@ -0,0 +1,244 @@
+"""
+Set-based stock value and stock risk queries over projected cloud snapshots.
+
+Totals are computed with SQL aggregates and lists with ``LIMIT``ed ordered
+queries, so callers never hydrate every product or batch snapshot of a tenant.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from app.models.cloud_projection import CloudBatchSnapshot, CloudProductSnapshot
+
+
+class CloudStockReportService:
+    """Shared stock queries for cloud reports, the AI manager and weekly reports."""
+
+    @staticmethod
+    def _product_filters(organization_id: int, branch_id: Optional[int]) -> list[Any]:
+        filters = [
+            CloudProductSnapshot.organization_id == organization_id,
+            CloudProductSnapshot.is_active.is_(True),
+        ]
+        if branch_id is not None:
+            filters.append(CloudProductSnapshot.branch_id == branch_id)
+        return filters
+
+    @staticmethod
+    def _batch_query(
+        db: Session,
+        *columns: Any,
+        organization_id: int,
+        branch_id: Optional[int],
+        active_products_only: bool,
+        with_product_columns: bool = False,
+    ):
+        product_join = and_(
+            CloudProductSnapshot.organization_id == CloudBatchSnapshot.organization_id,
+            CloudProductSnapshot.branch_id == CloudBatchSnapshot.branch_id,
+            CloudProductSnapshot.local_product_id == CloudBatchSnapshot.local_product_id,
+        )
+        query = db.query(*columns).select_from(CloudBatchSnapshot)
+        if active_products_only:
+            query = query.join(CloudProductSnapshot, product_join).filter(
+                CloudProductSnapshot.is_active.is_(True)
+            )
+        elif with_product_columns:
+            query = query.outerjoin(CloudProductSnapshot, product_join)
+        query = query.filter(
+            CloudBatchSnapshot.organization_id == organization_id,
+            CloudBatchSnapshot.quantity > 0,
+            CloudBatchSnapshot.is_quarantined.is_(False),
+        )
+        if branch_id is not None:
+            query = query.filter(CloudBatchSnapshot.branch_id == branch_id)
+        return query
+
+    @staticmethod
+    def stock_value(
+        db: Session,
+        *,
+        organization_id: int,
+        branch_id: Optional[int],
+    ) -> dict[str, Any]:
+        """Capital tied up in active, in-stock products at cost and retail price."""
+        row = db.query(
+            func.count(CloudProductSnapshot.id).label("total_active_products"),
+            func.count(CloudProductSnapshot.cost_price).label("products_valued"),
+            func.coalesce(
+                func.sum(CloudProductSnapshot.cost_price * CloudProductSnapshot.total_stock), 0
+            ).label("total_cost_value"),
+            func.coalesce(
+                func.sum(CloudProductSnapshot.selling_price * CloudProductSnapshot.total_stock), 0
+            ).label("total_retail_value"),
+        ).filter(
+            *CloudStockReportService._product_filters(organization_id, branch_id),
+            CloudProductSnapshot.total_stock > 0,
+        ).one()
+        return {
+            "total_cost_value": round(float(row.total_cost_value or 0), 2),
+            "total_retail_value": round(float(row.total_retail_value or 0), 2),
+            "products_valued": int(row.products_valued or 0),
+            "total_active_products": int(row.total_active_products or 0),
+        }
+
+    @staticmethod
+    def product_risk_counts(
+        db: Session,
+        *,
+        organization_id: int,
+        branch_id: Optional[int],
+    ) -> dict[str, int]:
+        stock = CloudProductSnapshot.total_stock
+        row = db.query(
+            func.coalesce(
+                func.sum(case((and_(stock > 0, stock <= CloudProductSnapshot.low_stock_threshold), 1), else_=0)), 0
+            ).label("low_stock_count"),
+            func.coalesce(func.sum(case((stock <= 0, 1), else_=0)), 0).label("out_of_stock_count"),
+            func.coalesce(func.sum(case((stock > 0, stock), else_=0)), 0).label("total_quantity_on_hand"),
+        ).filter(*CloudStockReportService._product_filters(organization_id, branch_id)).one()
+        return {
+            "low_stock_count": int(row.low_stock_count or 0),
+            "out_of_stock_count": int(row.out_of_stock_count or 0),
+            "total_quantity_on_hand": int(row.total_quantity_on_hand or 0),
+        }
+
+    @staticmethod
+    def batch_risk_counts(
+        db: Session,
+        *,
+        organization_id: int,
+        branch_id: Optional[int],
+        today: date,
+        warning_date: date,
+        active_products_only: bool = False,
+    ) -> dict[str, Any]:
+        expiry = CloudBatchSnapshot.expiry_date
+        row = CloudStockReportService._batch_query(
+            db,
+            func.coalesce(
+                func.sum(case((and_(expiry >= today, expiry <= warning_date), 1), else_=0)), 0
+            ).label("near_expiry_batch_count"),
+            func.coalesce(func.sum(case((expiry < today, 1), else_=0)), 0).label("expired_batch_count"),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (
+                            expiry <= warning_date,
+                            func.coalesce(CloudBatchSnapshot.cost_price, 0) * CloudBatchSnapshot.quantity,
+                        ),
+                        else_=0,
+                    )
+                ),
+                0,
+            ).label("value_at_risk"),
+            organization_id=organization_id,
+            branch_id=branch_id,
+            active_products_only=active_products_only,
+        ).one()
+        return {
+            "near_expiry_batch_count": int(row.near_expiry_batch_count or 0),
+            "expired_batch_count": int(row.expired_batch_count or 0),
+            "value_at_risk": round(float(row.value_at_risk or 0), 2),
+        }
+
+    @staticmethod
+    def low_stock_products(
+        db: Session,
+        *,
+        organization_id: int,
+        branch_id: Optional[int],
+        limit: int,
+        status: Optional[str] = None,
+    ) -> list[dict[str, Any]]:
+        """Products at or below threshold, lowest stock first.
+
+        ``status`` narrows the list to ``"low_stock"`` (stock above zero) or
+        ``"out_of_stock"``; by default both are returned.
+        """
+        stock = CloudProductSnapshot.total_stock
+        query = db.query(
+            CloudProductSnapshot.branch_id,
+            CloudProductSnapshot.local_product_id,
+            CloudProductSnapshot.name,
+            CloudProductSnapshot.sku,
+            stock,
+            CloudProductSnapshot.low_stock_threshold,
+            CloudProductSnapshot.reorder_level,
+        ).filter(*CloudStockReportService._product_filters(organization_id, branch_id))
+        if status == "out_of_stock":
+            query = query.filter(stock <= 0)
+        else:
+            query = query.filter(stock <= CloudProductSnapshot.low_stock_threshold)
+            if status == "low_stock":
+                query = query.filter(stock > 0)
+        rows = query.order_by(stock.asc(), CloudProductSnapshot.name.asc()).limit(limit).all()
+        return [
+            {
+                "branch_id": row.branch_id,
+                "product_id": row.local_product_id,
+                "product_name": row.name,
+                "sku": row.sku,
+                "total_stock": row.total_stock,
+                "low_stock_threshold": row.low_stock_threshold,
+                "reorder_level": row.reorder_level,
+                "units_needed": max((row.reorder_level or row.low_stock_threshold) - row.total_stock, 0),
+                "status": "out_of_stock" if row.total_stock <= 0 else "low_stock",
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def expiry_batches(
+        db: Session,
+        *,
+        organization_id: int,
+        branch_id: Optional[int],
+        today: date,
+        warning_date: date,
+        limit: int,
+        active_products_only: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Expired and near-expiry batches, soonest expiry first."""
+        rows = CloudStockReportService._batch_query(
+            db,
+            CloudBatchSnapshot.branch_id,
+            CloudBatchSnapshot.local_product_id,
+            CloudBatchSnapshot.local_batch_id,
+            CloudBatchSnapshot.batch_number,
+            CloudBatchSnapshot.quantity,
+            CloudBatchSnapshot.expiry_date,
+            CloudBatchSnapshot.cost_price,
+            CloudProductSnapshot.name,
+            CloudProductSnapshot.sku,
+            organization_id=organization_id,
+            branch_id=branch_id,
+            active_products_only=active_products_only,
+            with_product_columns=True,
+        ).filter(
+            CloudBatchSnapshot.expiry_date <= warning_date,
+        ).order_by(
+            CloudBatchSnapshot.expiry_date.asc(),
+            CloudProductSnapshot.name.asc(),
+            CloudBatchSnapshot.id.asc(),
+        ).limit(limit).all()
+        return [
+            {
+                "branch_id": row.branch_id,
+                "product_id": row.local_product_id,
+                "product_name": row.name,
+                "sku": row.sku,
+                "batch_id": row.local_batch_id,
+                "batch_number": row.batch_number,
+                "quantity": row.quantity,
+                "expiry_date": row.expiry_date.isoformat(),
+                "days_until_expiry": (row.expiry_date - today).days,
+                "value_at_risk": float((row.cost_price or 0) * row.quantity),
+                "status": "expired" if row.expiry_date < today else "near_expiry",
+            }
+            for row in rows
+        ]
@@ -3,21 +3,34 @@ Customer retention service.
 
 Responsibilities:
   1. Create follow-up records when a sale is linked to a customer.
-  2. Dispatch digital receipts immediately after a sale completes.
+  2. Queue digital receipts after a sale completes and deliver them in the
+     background (batched, with retries).
   3. Send scheduled health follow-up messages (called by scheduler).
   4. Mark follow-ups as sent / failed.
+  5. Keep the per-customer purchase counters in step with sales and reversals.
 """
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from sqlalchemy import case, func, or_, select, update
 from sqlalchemy.orm import Session
 
-from app.models.customer import ConsentStatus, Customer, CustomerFollowUp, FollowUpStatus
-from app.models.sale import Sale
-from app.services.message_adapter import get_adapter
+from app.models.customer import (
+    ConsentStatus,
+    Customer,
+    CustomerFollowUp,
+    FollowUpStatus,
+    OutboundMessage,
+    OutboundMessageStatus,
+)
+from app.models.sale import Sale, SaleStatus
+from app.services.message_adapter import OutgoingMessage, compose_receipt, get_adapter
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +39,53 @@ DEFAULT_FOLLOW_UP_DAYS = 3
 MAX_FOLLOW_UP_ATTEMPTS = 3
 
 
+def record_customer_purchase(db: Session, *, sale: Sale) -> None:
+    """Count a completed sale against its customer's purchase counters.
+
+    A single relative UPDATE, so concurrent tills selling to the same
+    customer never lose an increment.
+    """
+    db.execute(
+        update(Customer)
+        .where(Customer.id == sale.customer_id)
+        .values(
+            purchase_count=Customer.purchase_count + 1,
+            lifetime_spend=Customer.lifetime_spend + sale.total_amount,
+            last_purchase_at=case(
+                (
+                    or_(Customer.last_purchase_at.is_(None), Customer.last_purchase_at < sale.created_at),
+                    sale.created_at,
+                ),
+                else_=Customer.last_purchase_at,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reverse_customer_purchase(db: Session, *, sale: Sale) -> None:
+    """Take a voided/refunded sale back out of its customer's counters."""
+    latest_completed = (
+        select(func.max(Sale.created_at))
+        .where(
+            Sale.customer_id == sale.customer_id,
+            Sale.status == SaleStatus.COMPLETED,
+            Sale.id != sale.id,
+        )
+        .scalar_subquery()
+    )
+    db.execute(
+        update(Customer)
+        .where(Customer.id == sale.customer_id)
+        .values(
+            purchase_count=case((Customer.purchase_count > 0, Customer.purchase_count - 1), else_=0),
+            lifetime_spend=Customer.lifetime_spend - sale.total_amount,
+            last_purchase_at=latest_completed,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
 def _can_send(customer: Customer, channel: str) -> bool:
     """Return True if the customer has granted consent for the given channel."""
     if channel == "sms":
@@ -66,53 +126,47 @@ def schedule_follow_up(
     return follow_up
 
 
-def dispatch_receipt(
+def queue_receipt(
     db: Session,
     *,
     customer: Customer,
     sale: Sale,
     pharmacy_name: str = "PharmaPOS",
-) -> bool:
-    """Send a digital receipt immediately after sale completion.
+) -> Optional[OutboundMessage]:
+    """Queue a digital receipt for background delivery after sale completion.
 
-    Returns True if the message was dispatched (or stubbed), False if
-    consent was not granted or if the send failed.
+    Returns the queued message, or None if the customer has not consented on
+    their preferred channel. The caller commits; ``deliver_outbound_messages``
+    sends it.
     """
     channel = customer.preferred_channel or "sms"
     if not _can_send(customer, channel):
         logger.info(
-            "Receipt not sent for sale %s — customer %s has no %s consent",
+            "Receipt not queued for sale %s — customer %s has no %s consent",
             sale.invoice_number, customer.id, channel,
         )
-        return False
+        return None
 
-    adapter = get_adapter()
-    items_summary = _summarize_items(sale)
-
-    try:
-        result = adapter.send_receipt(
-            to=customer.phone,
+    message = OutboundMessage(
+        organization_id=customer.organization_id,
+        branch_id=sale.branch_id if sale.branch_id is not None else customer.branch_id,
+        customer_id=customer.id,
+        sale_id=sale.id,
+        kind="receipt",
+        channel=channel,
+        recipient=customer.phone,
+        body=compose_receipt(
             invoice_number=sale.invoice_number,
-            items_summary=items_summary,
+            items_summary=_summarize_items(sale),
             total=f"GH\u20b5 {sale.total_amount:.2f}",
             pharmacy_name=pharmacy_name,
             channel=channel,
-        )
-        if result.success:
-            sale.receipt_sent = True
-            logger.info(
-                "Receipt sent for sale %s via %s (msg_id=%s)",
-                sale.invoice_number, channel, result.provider_message_id,
-            )
-            return True
-        else:
-            logger.warning(
-                "Receipt send failed for sale %s: %s", sale.invoice_number, result.error
-            )
-            return False
-    except Exception as exc:
-        logger.error("Receipt dispatch error for sale %s: %s", sale.invoice_number, exc)
-        return False
+        ),
+        status=OutboundMessageStatus.PENDING,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(message)
+    return message
 
 
 def _summarize_items(sale: Sale) -> str:
@@ -127,71 +181,261 @@ def _summarize_items(sale: Sale) -> str:
     return ", ".join(parts)
 
 
-def process_pending_follow_ups(db: Session, *, pharmacy_name: str = "PharmaPOS") -> dict:
-    """Send all due follow-up messages. Called by the scheduler every hour.
+class _SendPacer:
+    """Spaces sends evenly so concurrent workers stay under a provider rate limit."""
+
+    def __init__(self, max_per_second: float):
+        self._interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _claim_follow_up_chunk(
+    db: Session,
+    *,
+    now: datetime,
+    after_id: int,
+    chunk_size: int,
+) -> list[CustomerFollowUp]:
+    """Lock the next due follow-ups, skipping rows another worker holds.
 
-    Returns a dict with counts: { sent, skipped, failed, total_processed }.
+    ``FOR UPDATE SKIP LOCKED`` is a no-op on SQLite, which has one writer.
     """
-    now = datetime.now(timezone.utc)
-    pending = (
+    return (
         db.query(CustomerFollowUp)
         .filter(
             CustomerFollowUp.status == FollowUpStatus.PENDING,
             CustomerFollowUp.scheduled_at <= now,
+            CustomerFollowUp.id > after_id,
         )
+        .order_by(CustomerFollowUp.id)
+        .limit(chunk_size)
+        .with_for_update(skip_locked=True)
         .all()
     )
 
-    sent = skipped = failed = 0
-    adapter = get_adapter()
 
-    for follow_up in pending:
-        customer = db.get(Customer, follow_up.customer_id)
-        if not customer or not customer.is_active:
-            follow_up.status = FollowUpStatus.SKIPPED
-            skipped += 1
-            continue
+def process_pending_follow_ups(
+    db: Session,
+    *,
+    pharmacy_name: str = "PharmaPOS",
+    chunk_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    max_per_second: Optional[float] = None,
+) -> dict:
+    """Send all due follow-up messages. Called by the scheduler every hour.
 
-        if not _can_send(customer, follow_up.channel):
-            follow_up.status = FollowUpStatus.SKIPPED
-            skipped += 1
-            continue
+    Due follow-ups are claimed ``chunk_size`` at a time with their customers
+    and sales preloaded, sent through a pool of ``concurrency`` workers paced
+    to ``max_per_second``, and committed per chunk, so a crash late in a large
+    run keeps every status already recorded and releases the claimed rows.
+
+    Returns a dict with counts: { sent, skipped, failed, total_processed }
+    plus { chunks, duration_seconds, messages_per_second }.
+    """
+    from app.core.config import settings as _settings
 
-        sale = db.get(Sale, follow_up.sale_id)
-        days_since = (now - sale.created_at.replace(tzinfo=timezone.utc)).days if sale else 3
+    chunk_size = max(1, chunk_size or _settings.CUSTOMER_FOLLOWUP_DISPATCH_CHUNK_SIZE)
+    concurrency = max(1, concurrency or _settings.CUSTOMER_FOLLOWUP_DISPATCH_CONCURRENCY)
+    if max_per_second is None:
+        max_per_second = _settings.SMS_MAX_MESSAGES_PER_SECOND
 
+    started = time.monotonic()
+    now = datetime.now(timezone.utc)
+    sent = skipped = failed = processed = chunks = attempted = 0
+    adapter = get_adapter()
+    pacer = _SendPacer(max_per_second)
+
+    def _send(job: dict):
+        pacer.wait()
         try:
-            result = adapter.send_follow_up(
-                to=customer.phone,
-                customer_name=customer.full_name.split()[0],  # first name only
+            return adapter.send_follow_up(
+                to=job["to"],
+                customer_name=job["customer_name"],
                 pharmacy_name=pharmacy_name,
-                days_since_purchase=days_since,
-                channel=follow_up.channel,
+                days_since_purchase=job["days_since_purchase"],
+                channel=job["channel"],
+            )
+        except Exception as exc:
+            logger.error("Follow-up %s dispatch error: %s", job["follow_up_id"], exc)
+            return exc
+
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="follow-up-send") as pool:
+        while True:
+            chunk = _claim_follow_up_chunk(db, now=now, after_id=last_id, chunk_size=chunk_size)
+            if not chunk:
+                break
+            chunks += 1
+            processed += len(chunk)
+            last_id = chunk[-1].id
+
+            customer_ids = {follow_up.customer_id for follow_up in chunk}
+            sale_ids = {follow_up.sale_id for follow_up in chunk}
+            customers = {
+                customer.id: customer
+                for customer in db.query(Customer).filter(Customer.id.in_(customer_ids))
+            }
+            sale_times = dict(
+                db.query(Sale.id, Sale.created_at).filter(Sale.id.in_(sale_ids)).all()
+            )
+
+            jobs = []
+            for follow_up in chunk:
+                customer = customers.get(follow_up.customer_id)
+                if not customer or not customer.is_active or not _can_send(customer, follow_up.channel):
+                    follow_up.status = FollowUpStatus.SKIPPED
+                    skipped += 1
+                    continue
+                sale_at = sale_times.get(follow_up.sale_id)
+                jobs.append(
+                    (
+                        follow_up,
+                        {
+                            "follow_up_id": follow_up.id,
+                            "to": customer.phone,
+                            "customer_name": customer.full_name.split()[0],  # first name only
+                            "days_since_purchase": (
+                                (now - sale_at.replace(tzinfo=timezone.utc)).days if sale_at else 3
+                            ),
+                            "channel": follow_up.channel,
+                        },
+                    )
+                )
+
+            results = pool.map(_send, [job for _follow_up, job in jobs])
+            for (follow_up, _job), result in zip(jobs, results):
+                attempted += 1
+                follow_up.attempts += 1
+                if isinstance(result, Exception):
+                    follow_up.last_error = str(result)
+                    if follow_up.attempts >= MAX_FOLLOW_UP_ATTEMPTS:
+                        follow_up.status = FollowUpStatus.FAILED
+                        failed += 1
+                    continue
+                follow_up.sent_at = now
+                if result.success:
+                    follow_up.status = FollowUpStatus.SENT
+                    follow_up.provider_message_id = result.provider_message_id
+                    sent += 1
+                else:
+                    follow_up.last_error = result.error
+                    if follow_up.attempts >= MAX_FOLLOW_UP_ATTEMPTS:
+                        follow_up.status = FollowUpStatus.FAILED
+                        failed += 1
+                    # else stays PENDING for next run
+
+            # Commit per chunk: persists progress and releases the row locks.
+            db.commit()
+
+    duration = time.monotonic() - started
+    logger.info(
+        "Follow-up run: %d sent, %d skipped, %d failed (of %d pending) in %d chunk(s), %.1fs",
+        sent, skipped, failed, processed, chunks, duration,
+    )
+    return {
+        "sent": sent,
+        "skipped": skipped,
+        "failed": failed,
+        "total_processed": processed,
+        "chunks": chunks,
+        "duration_seconds": round(duration, 3),
+        "messages_per_second": round(attempted / duration, 1) if duration > 0 else 0.0,
+    }
+
+
+def deliver_outbound_messages(
+    db: Session,
+    *,
+    batch_size: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    retry_base_seconds: Optional[int] = None,
+) -> dict:
+    """Deliver queued customer messages. Called by the scheduler.
+
+    Due messages are claimed ``batch_size`` at a time with ``FOR UPDATE SKIP
+    LOCKED``, handed to the adapter's ``send_batch`` (one multi-recipient call
+    per distinct text on providers that support it) and committed per batch.
+    Failures are retried with exponential backoff until ``max_attempts``.
+
+    Returns a dict with counts: { sent, retrying, failed, batches }.
+    """
+    from app.core.config import settings as _settings
+
+    batch_size = max(1, batch_size or _settings.OUTBOUND_MESSAGE_BATCH_SIZE)
+    max_attempts = max_attempts or _settings.OUTBOUND_MESSAGE_MAX_ATTEMPTS
+    if retry_base_seconds is None:
+        retry_base_seconds = _settings.OUTBOUND_MESSAGE_RETRY_BASE_SECONDS
+
+    now = datetime.now(timezone.utc)
+    adapter = get_adapter()
+    sent = retrying = failed = batches = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(OutboundMessage)
+            .filter(
+                OutboundMessage.status == OutboundMessageStatus.PENDING,
+                OutboundMessage.next_attempt_at <= now,
+                OutboundMessage.id > last_id,
             )
-            follow_up.attempts += 1
-            follow_up.sent_at = now
+            .order_by(OutboundMessage.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not batch:
+            break
+        batches += 1
+        last_id = batch[-1].id
 
+        results = adapter.send_batch(
+            [OutgoingMessage(to=message.recipient, message=message.body, channel=message.channel) for message in batch]
+        )
+        delivered_sale_ids = []
+        for message, result in zip(batch, results):
+            message.attempts += 1
             if result.success:
-                follow_up.status = FollowUpStatus.SENT
-                follow_up.provider_message_id = result.provider_message_id
+                message.status = OutboundMessageStatus.SENT
+                message.sent_at = now
+                message.provider_message_id = result.provider_message_id
+                message.last_error = None
+                if message.sale_id is not None:
+                    delivered_sale_ids.append(message.sale_id)
                 sent += 1
-            else:
-                follow_up.last_error = result.error
-                if follow_up.attempts >= MAX_FOLLOW_UP_ATTEMPTS:
-                    follow_up.status = FollowUpStatus.FAILED
-                    failed += 1
-                # else stays PENDING for next run
-        except Exception as exc:
-            follow_up.attempts += 1
-            follow_up.last_error = str(exc)
-            if follow_up.attempts >= MAX_FOLLOW_UP_ATTEMPTS:
-                follow_up.status = FollowUpStatus.FAILED
+            elif message.attempts >= max_attempts:
+                message.status = OutboundMessageStatus.FAILED
+                message.last_error = result.error
                 failed += 1
-            logger.error("Follow-up %s dispatch error: %s", follow_up.id, exc)
+            else:
+                message.last_error = result.error
+                message.next_attempt_at = now + timedelta(
+                    seconds=retry_base_seconds * 2 ** (message.attempts - 1)
+                )
+                retrying += 1
 
-    db.commit()
-    logger.info(
-        "Follow-up run: %d sent, %d skipped, %d failed (of %d pending)",
-        sent, skipped, failed, len(pending),
-    )
-    return {"sent": sent, "skipped": skipped, "failed": failed, "total_processed": len(pending)}
+        if delivered_sale_ids:
+            db.execute(
+                update(Sale)
+                .where(Sale.id.in_(delivered_sale_ids))
+                .values(receipt_sent=True)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+    if batches:
+        logger.info(
+            "Outbound messages: %d sent, %d retrying, %d failed in %d batch(es)",
+            sent, retrying, failed, batches,
+        )
+    return {"sent": sent, "retrying": retrying, "failed": failed, "batches": batches}
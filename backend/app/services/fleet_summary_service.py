@@ -0,0 +1,379 @@
+"""
+Device reachability and heartbeat rollup for the vendor command center.
+
+The fleet section is built from three column-only queries (organizations,
+branches, and devices outer-joined to their heartbeat snapshot) and rolled up
+in one pass, so no ORM objects or lazy relationships are loaded per device.
+When ``ADMIN_FLEET_SUMMARY_CACHE_ENABLED`` is on, the rollup is also stored in
+``cloud_fleet_summaries`` whenever heartbeats are projected and the command
+center serves that copy while it is younger than
+``ADMIN_FLEET_SUMMARY_MAX_AGE_SECONDS``.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.cloud_projection import CloudDeviceHeartbeatSnapshot, CloudFleetSummary
+from app.models.tenancy import Branch, Device, DeviceStatus, Organization
+from app.schemas.tenancy import (
+    CommandCenterAttentionItem,
+    CommandCenterFleetSummary,
+    CommandCenterOrganizationSummary,
+    CommandCenterTotals,
+)
+
+FLEET_SCOPE = "fleet"
+# The command center shows at most this many attention items, so a stored
+# summary never needs more than the top slice of its own items.
+ATTENTION_LIMIT = 16
+SEVERITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _sync_status(last_seen_at: Optional[datetime], *, now: datetime) -> str:
+    last_seen_at = _aware(last_seen_at)
+    if last_seen_at is None:
+        return "never"
+    age = now - last_seen_at
+    if age <= timedelta(hours=1):
+        return "fresh"
+    if age <= timedelta(hours=24):
+        return "delayed"
+    return "stale"
+
+
+def _empty_rollup() -> Dict[str, Any]:
+    return {
+        "device_count": 0,
+        "active": 0,
+        "stale": 0,
+        "never": 0,
+        "latest_seen": None,
+        "heartbeats": 0,
+        "recent_heartbeats": 0,
+        "critical": 0,
+        "warning": 0,
+        "last_heartbeat": None,
+    }
+
+
+def sort_attention(items: List[CommandCenterAttentionItem]) -> List[CommandCenterAttentionItem]:
+    return sorted(
+        items,
+        key=lambda item: (
+            SEVERITY_RANK.get(item.severity, 9),
+            _aware(item.last_seen_at) or datetime.min.replace(tzinfo=timezone.utc),
+            item.title,
+        ),
+    )[:ATTENTION_LIMIT]
+
+
+class FleetSummaryService:
+    """Build, store and read the command center's fleet rollup."""
+
+    @staticmethod
+    def compute(db: Session, *, now: Optional[datetime] = None) -> CommandCenterFleetSummary:
+        now = now or datetime.now(timezone.utc)
+        stale_cutoff = now - timedelta(hours=24)
+        heartbeat_stale_cutoff = now - timedelta(minutes=30)
+
+        orgs = db.query(Organization.id, Organization.name, Organization.is_active).order_by(Organization.name).all()
+        branches = (
+            db.query(
+                Branch.id,
+                Branch.organization_id,
+                Branch.name,
+                Branch.is_active,
+                Organization.name.label("organization_name"),
+            )
+            .outerjoin(Organization, Organization.id == Branch.organization_id)
+            .order_by(Branch.organization_id, Branch.name)
+            .all()
+        )
+        devices = (
+            db.query(
+                Device.id,
+                Device.organization_id,
+                Device.branch_id,
+                Device.name,
+                Device.status,
+                Device.last_seen_at,
+                Organization.name.label("organization_name"),
+                Branch.name.label("branch_name"),
+                CloudDeviceHeartbeatSnapshot.id.label("heartbeat_id"),
+                CloudDeviceHeartbeatSnapshot.readiness_status,
+                CloudDeviceHeartbeatSnapshot.server_time,
+            )
+            .outerjoin(Organization, Organization.id == Device.organization_id)
+            .outerjoin(Branch, Branch.id == Device.branch_id)
+            .outerjoin(CloudDeviceHeartbeatSnapshot, CloudDeviceHeartbeatSnapshot.source_device_id == Device.id)
+            .order_by(Device.organization_id, Device.branch_id, Device.name)
+            .all()
+        )
+
+        def is_recent(device) -> bool:
+            last_seen_at = _aware(device.last_seen_at)
+            return last_seen_at is not None and last_seen_at >= stale_cutoff
+
+        def device_item(device, **fields: Any) -> CommandCenterAttentionItem:
+            return CommandCenterAttentionItem(
+                organization_id=device.organization_id,
+                organization_name=device.organization_name,
+                branch_id=device.branch_id,
+                branch_name=device.branch_name,
+                device_id=device.id,
+                device_name=device.name,
+                **fields,
+            )
+
+        active_devices = [d for d in devices if d.status == DeviceStatus.ACTIVE]
+        stale_devices = [d for d in active_devices if d.last_seen_at is not None and not is_recent(d)]
+        never_synced_devices = [d for d in active_devices if d.last_seen_at is None]
+        attention: List[CommandCenterAttentionItem] = []
+
+        device_count_by_branch: Dict[int, int] = {}
+        healthy_count_by_branch: Dict[int, int] = {}
+        for device in devices:
+            device_count_by_branch[device.branch_id] = device_count_by_branch.get(device.branch_id, 0) + 1
+            if device.status == DeviceStatus.ACTIVE and is_recent(device):
+                healthy_count_by_branch[device.branch_id] = healthy_count_by_branch.get(device.branch_id, 0) + 1
+
+        branches_without_devices = 0
+        branches_without_healthy_device = 0
+        branch_count_by_org: Dict[int, int] = {}
+        for branch in branches:
+            branch_count_by_org[branch.organization_id] = branch_count_by_org.get(branch.organization_id, 0) + 1
+            branch_fields = {
+                "organization_id": branch.organization_id,
+                "organization_name": branch.organization_name,
+                "branch_id": branch.id,
+                "branch_name": branch.name,
+            }
+            if not device_count_by_branch.get(branch.id):
+                branches_without_devices += 1
+                branches_without_healthy_device += 1
+                attention.append(CommandCenterAttentionItem(
+                    severity="high",
+                    kind="branch_without_device",
+                    title=f"{branch.name} has no device",
+                    detail="This branch cannot sync until at least one local machine is provisioned.",
+                    **branch_fields,
+                ))
+            elif not healthy_count_by_branch.get(branch.id) and branch.is_active:
+                branches_without_healthy_device += 1
+                attention.append(CommandCenterAttentionItem(
+                    severity="high",
+                    kind="branch_without_healthy_device",
+                    title=f"{branch.name} has no healthy device",
+                    detail="No active device has contacted the cloud in the last 24 hours.",
+                    **branch_fields,
+                ))
+
+        for device in sorted(
+            never_synced_devices + stale_devices,
+            key=lambda d: _aware(d.last_seen_at) or datetime.min.replace(tzinfo=timezone.utc),
+        )[:12]:
+            status_label = _sync_status(device.last_seen_at, now=now)
+            attention.append(device_item(
+                device,
+                severity="medium" if status_label == "stale" else "high",
+                kind=f"device_{status_label}",
+                title=f"{device.name} is {status_label}",
+                detail=(
+                    "Device has never completed a cloud sync."
+                    if status_label == "never"
+                    else "Device has not contacted the cloud in more than 24 hours."
+                ),
+                last_seen_at=device.last_seen_at,
+            ))
+
+        heartbeat_counts = {"ready": 0, "warning": 0, "critical": 0, "stale": 0, "missing": 0}
+        org_rollups: Dict[int, Dict[str, Any]] = {}
+        last_heartbeat_at = None
+        for device in devices:
+            rollup = org_rollups.setdefault(device.organization_id, _empty_rollup())
+            rollup["device_count"] += 1
+            last_seen_at = _aware(device.last_seen_at)
+            if last_seen_at is not None and (rollup["latest_seen"] is None or last_seen_at > rollup["latest_seen"]):
+                rollup["latest_seen"] = last_seen_at
+            if device.status != DeviceStatus.ACTIVE:
+                continue
+            rollup["active"] += 1
+            if last_seen_at is None:
+                rollup["never"] += 1
+            elif last_seen_at < stale_cutoff:
+                rollup["stale"] += 1
+
+            if device.heartbeat_id is None:
+                heartbeat_counts["missing"] += 1
+                attention.append(device_item(
+                    device,
+                    severity="medium",
+                    kind="heartbeat_missing",
+                    title=f"{device.name} has no heartbeat",
+                    detail="Device sync reached the cloud before local diagnostics heartbeat telemetry was available.",
+                    last_seen_at=device.last_seen_at,
+                ))
+                continue
+
+            rollup["heartbeats"] += 1
+            heartbeat_at = _aware(device.server_time)
+            if heartbeat_at is not None:
+                if last_heartbeat_at is None or heartbeat_at > last_heartbeat_at:
+                    last_heartbeat_at = heartbeat_at
+                if rollup["last_heartbeat"] is None or heartbeat_at > rollup["last_heartbeat"]:
+                    rollup["last_heartbeat"] = heartbeat_at
+            if heartbeat_at < heartbeat_stale_cutoff:
+                heartbeat_counts["stale"] += 1
+                attention.append(device_item(
+                    device,
+                    severity="medium",
+                    kind="heartbeat_stale",
+                    title=f"{device.name} heartbeat is stale",
+                    detail="The device has not uploaded recent local diagnostics telemetry.",
+                    last_seen_at=device.server_time,
+                ))
+                continue
+
+            rollup["recent_heartbeats"] += 1
+            if device.readiness_status == "ready":
+                heartbeat_counts["ready"] += 1
+            elif device.readiness_status == "critical":
+                heartbeat_counts["critical"] += 1
+                rollup["critical"] += 1
+                attention.append(device_item(
+                    device,
+                    severity="critical",
+                    kind="heartbeat_critical",
+                    title=f"{device.name} local health is critical",
+                    detail="Heartbeat reports a database, scheduler, or core local service failure.",
+                    last_seen_at=device.server_time,
+                ))
+            elif device.readiness_status == "warning":
+                heartbeat_counts["warning"] += 1
+                rollup["warning"] += 1
+                attention.append(device_item(
+                    device,
+                    severity="medium",
+                    kind="heartbeat_warning",
+                    title=f"{device.name} local health needs review",
+                    detail="Heartbeat reports stale backup/restore verification, failed sync events, or old unsent outbox data.",
+                    last_seen_at=device.server_time,
+                ))
+
+        organizations: List[CommandCenterOrganizationSummary] = []
+        for org in orgs:
+            rollup = org_rollups.get(org.id) or _empty_rollup()
+            heartbeat_stale_count = rollup["heartbeats"] - rollup["recent_heartbeats"]
+            heartbeat_missing_count = rollup["active"] - rollup["heartbeats"]
+            readiness_status = "unknown"
+            sync_status = "unknown"
+            if rollup["active"]:
+                if rollup["critical"]:
+                    readiness_status = "critical"
+                elif rollup["warning"] or heartbeat_stale_count or heartbeat_missing_count:
+                    readiness_status = "warning"
+                elif rollup["recent_heartbeats"]:
+                    readiness_status = "ready"
+                latest_seen = rollup["latest_seen"]
+                if rollup["never"]:
+                    sync_status = "never"
+                elif rollup["stale"]:
+                    sync_status = "stale"
+                elif latest_seen and latest_seen >= now - timedelta(hours=1):
+                    sync_status = "fresh"
+                else:
+                    sync_status = "delayed"
+
+            organizations.append(CommandCenterOrganizationSummary(
+                organization_id=org.id,
+                organization_name=org.name,
+                branch_count=branch_count_by_org.get(org.id, 0),
+                device_count=rollup["device_count"],
+                active_device_count=rollup["active"],
+                stale_device_count=rollup["stale"],
+                never_synced_device_count=rollup["never"],
+                last_seen_at=rollup["latest_seen"],
+                sync_status=sync_status,
+                readiness_status=readiness_status,
+                last_heartbeat_at=rollup["last_heartbeat"],
+                heartbeat_critical_count=rollup["critical"],
+                heartbeat_warning_count=rollup["warning"],
+                heartbeat_stale_count=heartbeat_stale_count,
+                heartbeat_missing_count=heartbeat_missing_count,
+            ))
+
+        totals = CommandCenterTotals(
+            total_pharmacies=len(orgs),
+            active_pharmacies=sum(1 for org in orgs if org.is_active),
+            total_branches=len(branches),
+            active_branches=sum(1 for branch in branches if branch.is_active),
+            total_devices=len(devices),
+            active_devices=len(active_devices),
+            disabled_devices=sum(1 for d in devices if d.status == DeviceStatus.DISABLED),
+            retired_devices=sum(1 for d in devices if d.status == DeviceStatus.RETIRED),
+            synced_last_24h=sum(1 for d in active_devices if is_recent(d)),
+            stale_devices=len(stale_devices),
+            never_synced_devices=len(never_synced_devices),
+            branches_without_devices=branches_without_devices,
+            branches_without_healthy_device=branches_without_healthy_device,
+            heartbeat_ready_devices=heartbeat_counts["ready"],
+            heartbeat_warning_devices=heartbeat_counts["warning"],
+            heartbeat_critical_devices=heartbeat_counts["critical"],
+            heartbeat_stale_devices=heartbeat_counts["stale"],
+            heartbeat_missing_devices=heartbeat_counts["missing"],
+        )
+
+        return CommandCenterFleetSummary(
+            generated_at=now,
+            totals=totals,
+            last_heartbeat_at=last_heartbeat_at,
+            attention=sort_attention(attention),
+            organizations=organizations,
+        )
+
+    @staticmethod
+    def refresh(db: Session) -> CommandCenterFleetSummary:
+        """Recompute and store the fleet summary; the caller commits."""
+        summary = FleetSummaryService.compute(db)
+        row = db.query(CloudFleetSummary).filter(CloudFleetSummary.scope == FLEET_SCOPE).one_or_none()
+        if row is None:
+            row = CloudFleetSummary(scope=FLEET_SCOPE)
+            db.add(row)
+        row.generated_at = summary.generated_at
+        row.payload = summary.model_dump(mode="json")
+        db.flush()
+        return summary
+
+    @staticmethod
+    def load(db: Session, *, max_age_seconds: int, now: Optional[datetime] = None) -> Optional[CommandCenterFleetSummary]:
+        """Return the stored summary if it is fresh enough, else ``None``."""
+        now = now or datetime.now(timezone.utc)
+        row = db.query(CloudFleetSummary).filter(CloudFleetSummary.scope == FLEET_SCOPE).one_or_none()
+        if row is None or _aware(row.generated_at) < now - timedelta(seconds=max_age_seconds):
+            return None
+        return CommandCenterFleetSummary.model_validate(row.payload)
+
+    @staticmethod
+    def get(db: Session, *, now: datetime) -> CommandCenterFleetSummary:
+        """The fleet summary for the command center, cached when enabled."""
+        if settings.ADMIN_FLEET_SUMMARY_CACHE_ENABLED:
+            cached = FleetSummaryService.load(
+                db,
+                max_age_seconds=settings.ADMIN_FLEET_SUMMARY_MAX_AGE_SECONDS,
+                now=now,
+            )
+            if cached is not None:
+                return cached
+        return FleetSummaryService.compute(db, now=now)
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from base64 import urlsafe_b64decode
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 import hashlib
@@ -11,17 +12,25 @@ from pathlib import Path
 import struct
 import subprocess
 import tempfile
-from typing import Any, Callable, Optional
+import threading
+from typing import Any, BinaryIO, Callable, Optional
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import make_url
 
 
 BACKUP_MAGIC = b"PHARMA_POS_BACKUP_V1\n"
+# V2 objects are a sequence of independently authenticated AES-GCM frames so
+# they can be produced from a stream without knowing the total size up front.
+STREAM_BACKUP_MAGIC = b"PHARMA_POS_BACKUP_V2\n"
 BACKUP_TAG_SIZE = 16
 CHUNK_SIZE = 1024 * 1024
+MULTIPART_MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_UPLOAD_PART_SIZE = 16 * 1024 * 1024
 
 
 @dataclass(frozen=True)
@@ -36,6 +45,9 @@ class HostedBackupConfig:
     secret_access_key: str
     daily_retention_days: int = 35
     monthly_retention_days: int = 366
+    upload_part_size_bytes: int = DEFAULT_UPLOAD_PART_SIZE
+    upload_concurrency: int = 4
+    base_retention_count: int = 2
 
     @classmethod
     def from_env(cls) -> "HostedBackupConfig":
@@ -74,6 +86,18 @@ class HostedBackupConfig:
             monthly_retention_days=int(
                 os.getenv("BACKUP_MONTHLY_RETENTION_DAYS", "366")
             ),
+            upload_part_size_bytes=max(
+                MULTIPART_MIN_PART_SIZE,
+                int(os.getenv("BACKUP_UPLOAD_PART_SIZE_MB", "16")) * 1024 * 1024,
+            ),
+            upload_concurrency=max(
+                1,
+                int(os.getenv("BACKUP_UPLOAD_CONCURRENCY", "4")),
+            ),
+            base_retention_count=max(
+                1,
+                int(os.getenv("BACKUP_BASE_RETENTION_COUNT", "2")),
+            ),
         )
 
     def encryption_key_bytes(self) -> bytes:
@@ -94,6 +118,80 @@ def sha256_file(path: Path) -> str:
     return digest.hexdigest()
 
 
+class ChunkedBackupEncryptor:
+    """Incremental AES-256-GCM encryption into the V2 framed backup format.
+
+    Layout: magic, header length, authenticated JSON header, then frames of
+    ``[4-byte length][ciphertext + tag]``. Each frame uses a unique nonce
+    (random prefix + frame counter) and authenticates the header, its index,
+    and a final-frame flag, so reordering or truncation fails decryption.
+    """
+
+    def __init__(self, encryption_key: bytes, header: dict[str, Any]) -> None:
+        self._aead = AESGCM(encryption_key)
+        self._nonce_prefix = os.urandom(8)
+        self.header = {
+            **header,
+            "algorithm": "AES-256-GCM-CHUNKED",
+            "nonce_prefix": self._nonce_prefix.hex(),
+            "chunk_size": CHUNK_SIZE,
+        }
+        self._header_bytes = json.dumps(
+            self.header,
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode()
+        self._buffer = bytearray()
+        self._index = 0
+        self._plaintext_digest = hashlib.sha256()
+        self.plaintext_size = 0
+
+    def preamble(self) -> bytes:
+        return (
+            STREAM_BACKUP_MAGIC
+            + struct.pack(">I", len(self._header_bytes))
+            + self._header_bytes
+        )
+
+    def update(self, data: bytes) -> bytes:
+        self._plaintext_digest.update(data)
+        self.plaintext_size += len(data)
+        self._buffer.extend(data)
+        frames = []
+        # Keep at least one byte buffered so the final frame is never empty
+        # unless the whole stream is.
+        while len(self._buffer) > CHUNK_SIZE:
+            frames.append(self._frame(bytes(self._buffer[:CHUNK_SIZE]), final=False))
+            del self._buffer[:CHUNK_SIZE]
+        return b"".join(frames)
+
+    def finalize(self) -> bytes:
+        frame = self._frame(bytes(self._buffer), final=True)
+        self._buffer.clear()
+        return frame
+
+    @property
+    def plaintext_sha256(self) -> str:
+        return self._plaintext_digest.hexdigest()
+
+    def _frame(self, plaintext: bytes, *, final: bool) -> bytes:
+        ciphertext = self._aead.encrypt(
+            _frame_nonce(self._nonce_prefix, self._index),
+            plaintext,
+            _frame_aad(self._header_bytes, self._index, final),
+        )
+        self._index += 1
+        return struct.pack(">I", len(ciphertext)) + ciphertext
+
+
+def _frame_nonce(prefix: bytes, index: int) -> bytes:
+    return prefix + struct.pack(">I", index)
+
+
+def _frame_aad(header_bytes: bytes, index: int, final: bool) -> bytes:
+    return header_bytes + struct.pack(">IB", index, 1 if final else 0)
+
+
 def encrypt_backup(
     source: Path,
     destination: Path,
@@ -101,82 +199,267 @@ def encrypt_backup(
     encryption_key: bytes,
     header: dict[str, Any],
 ) -> dict[str, Any]:
-    nonce = os.urandom(12)
-    complete_header = {
-        **header,
-        "algorithm": "AES-256-GCM",
-        "nonce": nonce.hex(),
-        "plaintext_sha256": sha256_file(source),
-    }
-    header_bytes = json.dumps(
-        complete_header,
-        sort_keys=True,
-        separators=(",", ":"),
-    ).encode()
-    encryptor = Cipher(
-        algorithms.AES(encryption_key),
-        modes.GCM(nonce),
-    ).encryptor()
-    encryptor.authenticate_additional_data(header_bytes)
-
+    encryptor = ChunkedBackupEncryptor(encryption_key, header)
+    encrypted_digest = hashlib.sha256()
     with source.open("rb") as source_handle, destination.open("wb") as output:
-        output.write(BACKUP_MAGIC)
-        output.write(struct.pack(">I", len(header_bytes)))
-        output.write(header_bytes)
-        for chunk in iter(lambda: source_handle.read(CHUNK_SIZE), b""):
-            output.write(encryptor.update(chunk))
-        output.write(encryptor.finalize())
-        output.write(encryptor.tag)
+        for block in iter_encrypted(encryptor, source_handle):
+            encrypted_digest.update(block)
+            output.write(block)
 
     return {
-        **complete_header,
-        "encrypted_sha256": sha256_file(destination),
+        **encryptor.header,
+        "plaintext_sha256": encryptor.plaintext_sha256,
+        "plaintext_size_bytes": encryptor.plaintext_size,
+        "encrypted_sha256": encrypted_digest.hexdigest(),
         "encrypted_size_bytes": destination.stat().st_size,
     }
 
 
+def iter_encrypted(encryptor: ChunkedBackupEncryptor, reader: BinaryIO):
+    yield encryptor.preamble()
+    for chunk in iter(lambda: reader.read(CHUNK_SIZE), b""):
+        block = encryptor.update(chunk)
+        if block:
+            yield block
+    yield encryptor.finalize()
+
+
 def decrypt_backup(
     source: Path,
     destination: Path,
     *,
     encryption_key: bytes,
+    expected_plaintext_sha256: Optional[str] = None,
 ) -> dict[str, Any]:
+    """Decrypt a V1 or V2 hosted backup object and verify its plaintext checksum.
+
+    V1 objects carry the checksum in their header; for V2 objects the caller
+    may pass the manifest's ``plaintext_sha256``. The returned header always
+    includes the checksum of the restored plaintext.
+    """
     with source.open("rb") as encrypted:
-        if encrypted.read(len(BACKUP_MAGIC)) != BACKUP_MAGIC:
+        magic = encrypted.read(len(BACKUP_MAGIC))
+        if magic == STREAM_BACKUP_MAGIC:
+            with destination.open("wb") as output:
+                try:
+                    header = _decrypt_stream_body(encrypted, output, encryption_key=encryption_key)
+                except Exception:
+                    output.close()
+                    destination.unlink(missing_ok=True)
+                    raise
+        elif magic == BACKUP_MAGIC:
+            header = _decrypt_v1_body(encrypted, destination, encryption_key=encryption_key)
+        else:
             raise ValueError("Unsupported hosted backup format")
-        header_size = struct.unpack(">I", encrypted.read(4))[0]
-        header_bytes = encrypted.read(header_size)
-        header = json.loads(header_bytes)
-        ciphertext_start = encrypted.tell()
-        encrypted.seek(0, os.SEEK_END)
-        ciphertext_end = encrypted.tell() - BACKUP_TAG_SIZE
-        if ciphertext_end < ciphertext_start:
-            raise ValueError("Hosted backup is truncated")
-        encrypted.seek(ciphertext_end)
-        tag = encrypted.read(BACKUP_TAG_SIZE)
-        encrypted.seek(ciphertext_start)
-
-        decryptor = Cipher(
-            algorithms.AES(encryption_key),
-            modes.GCM(bytes.fromhex(header["nonce"]), tag),
-        ).decryptor()
-        decryptor.authenticate_additional_data(header_bytes)
-        remaining = ciphertext_end - ciphertext_start
-        with destination.open("wb") as output:
-            while remaining:
-                chunk = encrypted.read(min(CHUNK_SIZE, remaining))
-                if not chunk:
-                    raise ValueError("Hosted backup ciphertext is truncated")
-                output.write(decryptor.update(chunk))
-                remaining -= len(chunk)
-            output.write(decryptor.finalize())
-
-    if sha256_file(destination) != header["plaintext_sha256"]:
+
+    actual = sha256_file(destination)
+    expected = expected_plaintext_sha256 or header.get("plaintext_sha256")
+    if expected and actual != expected:
         destination.unlink(missing_ok=True)
         raise ValueError("Decrypted backup checksum does not match manifest")
+    return {**header, "plaintext_sha256": actual}
+
+
+def decrypt_backup_stream(
+    reader: BinaryIO,
+    writer: BinaryIO,
+    *,
+    encryption_key: bytes,
+) -> dict[str, Any]:
+    """Decrypt a V2 object from any readable stream (for example an S3 body)."""
+    if reader.read(len(STREAM_BACKUP_MAGIC)) != STREAM_BACKUP_MAGIC:
+        raise ValueError("Unsupported hosted backup format")
+    return _decrypt_stream_body(reader, writer, encryption_key=encryption_key)
+
+
+def _read_exact(reader: BinaryIO, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = reader.read(size - len(data))
+        if not chunk:
+            break
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _decrypt_stream_body(
+    reader: BinaryIO,
+    writer: BinaryIO,
+    *,
+    encryption_key: bytes,
+) -> dict[str, Any]:
+    header_size = struct.unpack(">I", _read_exact(reader, 4))[0]
+    header_bytes = _read_exact(reader, header_size)
+    header = json.loads(header_bytes)
+    nonce_prefix = bytes.fromhex(header["nonce_prefix"])
+    aead = AESGCM(encryption_key)
+
+    def _next_frame() -> Optional[bytes]:
+        length_bytes = _read_exact(reader, 4)
+        if not length_bytes:
+            return None
+        if len(length_bytes) != 4:
+            raise ValueError("Hosted backup frame header is truncated")
+        length = struct.unpack(">I", length_bytes)[0]
+        frame = _read_exact(reader, length)
+        if len(frame) != length:
+            raise ValueError("Hosted backup ciphertext is truncated")
+        return frame
+
+    index = 0
+    frame = _next_frame()
+    if frame is None:
+        raise ValueError("Hosted backup is truncated")
+    while frame is not None:
+        following = _next_frame()
+        writer.write(
+            aead.decrypt(
+                _frame_nonce(nonce_prefix, index),
+                frame,
+                _frame_aad(header_bytes, index, following is None),
+            )
+        )
+        index += 1
+        frame = following
     return header
 
 
+def _decrypt_v1_body(
+    encrypted: BinaryIO,
+    destination: Path,
+    *,
+    encryption_key: bytes,
+) -> dict[str, Any]:
+    header_size = struct.unpack(">I", encrypted.read(4))[0]
+    header_bytes = encrypted.read(header_size)
+    header = json.loads(header_bytes)
+    ciphertext_start = encrypted.tell()
+    encrypted.seek(0, os.SEEK_END)
+    ciphertext_end = encrypted.tell() - BACKUP_TAG_SIZE
+    if ciphertext_end < ciphertext_start:
+        raise ValueError("Hosted backup is truncated")
+    encrypted.seek(ciphertext_end)
+    tag = encrypted.read(BACKUP_TAG_SIZE)
+    encrypted.seek(ciphertext_start)
+
+    decryptor = Cipher(
+        algorithms.AES(encryption_key),
+        modes.GCM(bytes.fromhex(header["nonce"]), tag),
+    ).decryptor()
+    decryptor.authenticate_additional_data(header_bytes)
+    remaining = ciphertext_end - ciphertext_start
+    with destination.open("wb") as output:
+        while remaining:
+            chunk = encrypted.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ValueError("Hosted backup ciphertext is truncated")
+            output.write(decryptor.update(chunk))
+            remaining -= len(chunk)
+        output.write(decryptor.finalize())
+    return header
+
+
+class MultipartStreamUploader:
+    """Parallel S3 multipart upload fed from a byte stream with bounded memory.
+
+    At most ``concurrency`` parts are in flight; ``write`` blocks once that
+    many are pending, so memory stays near ``(concurrency + 1) * part_size``.
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        *,
+        bucket: str,
+        key: str,
+        part_size: int,
+        concurrency: int,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[dict[str, str]] = None,
+    ) -> None:
+        self._s3 = s3_client
+        self.bucket = bucket
+        self.key = key
+        self._part_size = max(MULTIPART_MIN_PART_SIZE, part_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, concurrency),
+            thread_name_prefix="backup-upload",
+        )
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._buffer = bytearray()
+        self._futures: list[Future] = []
+        self._digest = hashlib.sha256()
+        self.size = 0
+        response = s3_client.create_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            ContentType=content_type,
+            Metadata=metadata or {},
+        )
+        self._upload_id = response["UploadId"]
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    @property
+    def part_count(self) -> int:
+        return len(self._futures)
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        self._digest.update(data)
+        self.size += len(data)
+        self._buffer.extend(data)
+        while len(self._buffer) >= self._part_size:
+            self._submit(bytes(self._buffer[: self._part_size]))
+            del self._buffer[: self._part_size]
+
+    def complete(self) -> None:
+        if self._buffer or not self._futures:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        try:
+            parts = [future.result() for future in self._futures]
+        finally:
+            self._executor.shutdown(wait=True)
+        self._s3.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+
+    def abort(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._s3.abort_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+        )
+
+    def _submit(self, body: bytes) -> None:
+        for future in self._futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+        self._slots.acquire()
+        part_number = len(self._futures) + 1
+        future = self._executor.submit(self._upload_part, part_number, body)
+        future.add_done_callback(lambda _future: self._slots.release())
+        self._futures.append(future)
+
+    def _upload_part(self, part_number: int, body: bytes) -> dict[str, Any]:
+        response = self._s3.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+
 def database_revision(database_url: str) -> str:
     engine = create_engine(database_url, pool_pre_ping=True)
     try:
@@ -190,24 +473,19 @@ def database_revision(database_url: str) -> str:
         engine.dispose()
 
 
-def _pg_dump_command(database_url: str, destination: Path) -> tuple[list[str], dict[str, str]]:
+def libpq_connection_arguments(database_url: str) -> tuple[list[str], dict[str, str]]:
+    """Host/port/user arguments and a password-carrying environment for
+    PostgreSQL client tools, so the password never appears on a command line."""
     url = make_url(database_url)
     if not url.host or not url.database or not url.username:
         raise ValueError("DATABASE_URL must include host, database, and username")
-    command = [
-        "pg_dump",
+    arguments = [
         "-h",
         url.host,
         "-p",
         str(url.port or 5432),
         "-U",
         url.username,
-        "-d",
-        url.database,
-        "-F",
-        "c",
-        "-f",
-        str(destination),
     ]
     environment = os.environ.copy()
     if url.password:
@@ -215,6 +493,28 @@ def _pg_dump_command(database_url: str, destination: Path) -> tuple[list[str], d
     sslmode = url.query.get("sslmode")
     if sslmode:
         environment["PGSSLMODE"] = sslmode
+    return arguments, environment
+
+
+def _pg_dump_command(
+    database_url: str,
+    destination: Optional[Path] = None,
+) -> tuple[list[str], dict[str, str]]:
+    """Build a password-safe ``pg_dump`` invocation.
+
+    Without ``destination`` the custom-format dump is written to stdout.
+    """
+    arguments, environment = libpq_connection_arguments(database_url)
+    command = [
+        "pg_dump",
+        *arguments,
+        "-d",
+        make_url(database_url).database,
+        "-F",
+        "c",
+    ]
+    if destination is not None:
+        command.extend(["-f", str(destination)])
     return command, environment
 
 
@@ -261,14 +561,62 @@ def prune_prefix(
     return deleted
 
 
+def stream_command_output(
+    command: list[str],
+    environment: dict[str, str],
+    *,
+    encryptor: ChunkedBackupEncryptor,
+    uploader: MultipartStreamUploader,
+    popen: Callable[..., subprocess.Popen] = subprocess.Popen,
+) -> None:
+    """Pipe a PostgreSQL client tool's stdout through encryption into S3.
+
+    stderr goes to a temporary file so a chatty tool cannot block on a full
+    pipe. Any failure kills the process and aborts the multipart upload.
+    """
+    with tempfile.TemporaryFile(prefix="pharma-hosted-backup-stderr-") as stderr_file:
+        process = popen(
+            command,
+            env=environment,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+        )
+        try:
+            for block in iter_encrypted(encryptor, process.stdout):
+                uploader.write(block)
+            returncode = process.wait()
+            if returncode != 0:
+                stderr_file.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode,
+                    command,
+                    stderr=stderr_file.read().decode(errors="replace"),
+                )
+            if encryptor.plaintext_size == 0:
+                raise RuntimeError(f"{command[0]} completed without producing backup data")
+            uploader.complete()
+        except BaseException:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            uploader.abort()
+            raise
+
+
 def create_hosted_backup(
     config: HostedBackupConfig,
     *,
     s3_client=None,
     now: Optional[datetime] = None,
     revision: Optional[str] = None,
-    runner: Callable[..., subprocess.CompletedProcess] = subprocess.run,
+    popen: Callable[..., subprocess.Popen] = subprocess.Popen,
 ) -> dict[str, Any]:
+    """Stream ``pg_dump`` through hashing and encryption into S3.
+
+    The dump is never written to local disk: stdout is hashed, encrypted in
+    frames, and uploaded as a parallel multipart object. The monthly copy is
+    a server-side managed copy of the daily object, in parts once it is large.
+    """
     now = now or datetime.now(timezone.utc)
     revision = revision or database_revision(config.database_url)
     s3_client = s3_client or build_s3_client(config)
@@ -277,75 +625,83 @@ def create_hosted_backup(
     tenant_prefix = f"tenants/{config.organization_uid}"
     daily_key = f"{tenant_prefix}/daily/{now:%Y/%m}/{backup_id}.dump.enc"
 
-    with tempfile.TemporaryDirectory(prefix="pharma-hosted-backup-") as temp_dir:
-        temp_path = Path(temp_dir)
-        dump_path = temp_path / f"{backup_id}.dump"
-        encrypted_path = temp_path / f"{backup_id}.dump.enc"
-        command, environment = _pg_dump_command(config.database_url, dump_path)
-        runner(
-            command,
-            env=environment,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        if not dump_path.exists() or dump_path.stat().st_size == 0:
-            raise RuntimeError("pg_dump completed without creating a backup file")
-
-        manifest = encrypt_backup(
-            dump_path,
-            encrypted_path,
-            encryption_key=config.encryption_key_bytes(),
-            header={
-                "backup_id": backup_id,
-                "organization_uid": config.organization_uid,
-                "schema_revision": revision,
-                "created_at": now.isoformat(),
-                "database_name": make_url(config.database_url).database,
-                "format": "postgresql-custom",
-            },
+    encryptor = ChunkedBackupEncryptor(
+        config.encryption_key_bytes(),
+        header={
+            "backup_id": backup_id,
+            "organization_uid": config.organization_uid,
+            "schema_revision": revision,
+            "created_at": now.isoformat(),
+            "database_name": make_url(config.database_url).database,
+            "format": "postgresql-custom",
+        },
+    )
+    object_metadata = {
+        "backup-id": backup_id,
+        "organization-uid": config.organization_uid,
+        "schema-revision": revision,
+        "backup-format": "v2",
+    }
+    uploader = MultipartStreamUploader(
+        s3_client,
+        bucket=config.bucket,
+        key=daily_key,
+        part_size=config.upload_part_size_bytes,
+        concurrency=config.upload_concurrency,
+        metadata=object_metadata,
+    )
+    command, environment = _pg_dump_command(config.database_url)
+    stream_command_output(
+        command,
+        environment,
+        encryptor=encryptor,
+        uploader=uploader,
+        popen=popen,
+    )
+
+    manifest = {
+        **encryptor.header,
+        "plaintext_sha256": encryptor.plaintext_sha256,
+        "plaintext_size_bytes": encryptor.plaintext_size,
+        "encrypted_sha256": uploader.sha256,
+        "encrypted_size_bytes": uploader.size,
+        "upload_part_count": uploader.part_count,
+        "object_key": daily_key,
+    }
+    s3_client.put_object(
+        Bucket=config.bucket,
+        Key=f"{daily_key}.json",
+        Body=json.dumps(manifest, sort_keys=True).encode(),
+        ContentType="application/json",
+    )
+
+    monthly_key = None
+    if now.day == 1:
+        monthly_key = (
+            f"{tenant_prefix}/monthly/{now:%Y/%m}/{backup_id}.dump.enc"
         )
-        manifest["object_key"] = daily_key
-        s3_client.upload_file(
-            str(encrypted_path),
+        # A single CopyObject is limited to 5 GB; the managed copy switches
+        # to UploadPartCopy above the threshold. Multipart copies do not carry
+        # the source metadata over, so it is passed again.
+        s3_client.copy(
+            {"Bucket": config.bucket, "Key": daily_key},
             config.bucket,
-            daily_key,
-            ExtraArgs={
-                "ContentType": "application/octet-stream",
-                "Metadata": {
-                    "backup-id": backup_id,
-                    "organization-uid": config.organization_uid,
-                    "schema-revision": revision,
-                    "encrypted-sha256": manifest["encrypted_sha256"],
-                },
-            },
+            monthly_key,
+            ExtraArgs={"ContentType": "application/octet-stream", "Metadata": object_metadata},
+            Config=TransferConfig(
+                multipart_threshold=config.upload_part_size_bytes,
+                multipart_chunksize=config.upload_part_size_bytes,
+                max_concurrency=config.upload_concurrency,
+            ),
         )
+        monthly_manifest = {**manifest, "object_key": monthly_key}
         s3_client.put_object(
             Bucket=config.bucket,
-            Key=f"{daily_key}.json",
-            Body=json.dumps(manifest, sort_keys=True).encode(),
+            Key=f"{monthly_key}.json",
+            Body=json.dumps(monthly_manifest, sort_keys=True).encode(),
             ContentType="application/json",
         )
 
-        monthly_key = None
-        if now.day == 1:
-            monthly_key = (
-                f"{tenant_prefix}/monthly/{now:%Y/%m}/{backup_id}.dump.enc"
-            )
-            s3_client.upload_file(
-                str(encrypted_path),
-                config.bucket,
-                monthly_key,
-                ExtraArgs={"ContentType": "application/octet-stream"},
-            )
-            monthly_manifest = {**manifest, "object_key": monthly_key}
-            s3_client.put_object(
-                Bucket=config.bucket,
-                Key=f"{monthly_key}.json",
-                Body=json.dumps(monthly_manifest, sort_keys=True).encode(),
-                ContentType="application/json",
-            )
-
     deleted_daily = prune_prefix(
         s3_client,
         bucket=config.bucket,
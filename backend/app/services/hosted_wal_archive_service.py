@@ -0,0 +1,501 @@
+"""Incremental hosted backups: encrypted base backups plus archived WAL.
+
+A *chain* is one ``pg_basebackup`` tar plus every WAL segment archived from
+the chain's start segment onwards. Replaying a chain's WAL on top of its base
+restores the tenant to any point in time after the base backup completed, so
+upload volume follows the write rate instead of the database size.
+
+Object layout (next to the nightly ``daily/`` and ``monthly/`` dumps)::
+
+    tenants/<uid>/chains/<chain_id>/base.tar.enc
+    tenants/<uid>/chains/<chain_id>/chain.json
+    tenants/<uid>/wal/<segment>.enc
+
+WAL archiving needs ``archive_mode``/``archive_command`` on the server, so
+this mode is for self-managed PostgreSQL tenants. Managed databases keep the
+provider's point-in-time recovery plus the nightly logical dump.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+import re
+import subprocess
+import tarfile
+import tempfile
+from typing import Any, Callable, Optional
+
+from botocore.exceptions import ClientError
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+from app.services.hosted_backup_service import (
+    CHUNK_SIZE,
+    ChunkedBackupEncryptor,
+    HostedBackupConfig,
+    MultipartStreamUploader,
+    build_s3_client,
+    database_revision,
+    decrypt_backup_stream,
+    iter_encrypted,
+    libpq_connection_arguments,
+    sha256_file,
+    stream_command_output,
+)
+
+
+WAL_SEGMENT_SIZE = 16 * 1024 * 1024
+WAL_SEGMENT_NAME = re.compile(r"^([0-9A-F]{8})([0-9A-F]{8})([0-9A-F]{8})$")
+CHAIN_MANIFEST_NAME = "chain.json"
+BASE_BACKUP_NAME = "base.tar.enc"
+
+
+def _tenant_prefix(config: HostedBackupConfig) -> str:
+    return f"tenants/{config.organization_uid}"
+
+
+def _chain_prefix(config: HostedBackupConfig, chain_id: str) -> str:
+    return f"{_tenant_prefix(config)}/chains/{chain_id}"
+
+
+def _wal_key(config: HostedBackupConfig, file_name: str) -> str:
+    return f"{_tenant_prefix(config)}/wal/{file_name}.enc"
+
+
+def parse_wal_segment_name(name: str) -> tuple[int, int, int]:
+    """Split ``TTTTTTTTXXXXXXXXYYYYYYYY`` into timeline, log and segment."""
+    match = WAL_SEGMENT_NAME.match(name)
+    if not match:
+        raise ValueError(f"Not a WAL segment file name: {name}")
+    return tuple(int(part, 16) for part in match.groups())  # type: ignore[return-value]
+
+
+def next_wal_segment_name(name: str, segment_size: int = WAL_SEGMENT_SIZE) -> str:
+    timeline, log, segment = parse_wal_segment_name(name)
+    segment += 1
+    if segment >= 0x100000000 // segment_size:
+        log += 1
+        segment = 0
+    return f"{timeline:08X}{log:08X}{segment:08X}"
+
+
+def current_wal_file(database_url: str) -> str:
+    """Name of the WAL segment currently being written on the server."""
+    engine = create_engine(database_url, pool_pre_ping=True)
+    try:
+        with engine.connect() as connection:
+            return str(
+                connection.execute(
+                    text("SELECT pg_walfile_name(pg_current_wal_lsn())")
+                ).scalar_one()
+            )
+    finally:
+        engine.dispose()
+
+
+def _pg_basebackup_command(
+    database_url: str,
+    label: str,
+) -> tuple[list[str], dict[str, str]]:
+    """Build a ``pg_basebackup`` invocation that writes one tar to stdout.
+
+    WAL is not bundled (``-X none``): the server waits for the backup's WAL to
+    be archived, and the archive is what makes the base backup consistent.
+    """
+    arguments, environment = libpq_connection_arguments(database_url)
+    command = [
+        "pg_basebackup",
+        *arguments,
+        "-D",
+        "-",
+        "-F",
+        "t",
+        "-X",
+        "none",
+        "--checkpoint=fast",
+        "-l",
+        label,
+    ]
+    return command, environment
+
+
+def _put_json(s3_client, *, bucket: str, key: str, payload: dict[str, Any]) -> None:
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=json.dumps(payload, sort_keys=True).encode(),
+        ContentType="application/json",
+    )
+
+
+def _list_keys(s3_client, *, bucket: str, prefix: str) -> list[str]:
+    keys: list[str] = []
+    continuation_token: Optional[str] = None
+    while True:
+        request: dict[str, Any] = {"Bucket": bucket, "Prefix": prefix}
+        if continuation_token:
+            request["ContinuationToken"] = continuation_token
+        response = s3_client.list_objects_v2(**request)
+        keys.extend(item["Key"] for item in response.get("Contents", []))
+        if not response.get("IsTruncated"):
+            return keys
+        continuation_token = response["NextContinuationToken"]
+
+
+def _delete_keys(s3_client, *, bucket: str, keys: list[str]) -> int:
+    for start in range(0, len(keys), 1000):
+        batch = keys[start:start + 1000]
+        s3_client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+    return len(keys)
+
+
+def create_base_backup(
+    config: HostedBackupConfig,
+    *,
+    s3_client=None,
+    now: Optional[datetime] = None,
+    revision: Optional[str] = None,
+    start_wal_file: Optional[str] = None,
+    popen: Callable[..., subprocess.Popen] = subprocess.Popen,
+) -> dict[str, Any]:
+    """Stream an encrypted ``pg_basebackup`` tar into S3 and open a new chain.
+
+    ``start_wal_file`` is read from the server before the backup starts, so it
+    is never later than the segment holding the backup's start checkpoint.
+    """
+    now = now or datetime.now(timezone.utc)
+    revision = revision or database_revision(config.database_url)
+    start_wal_file = start_wal_file or current_wal_file(config.database_url)
+    parse_wal_segment_name(start_wal_file)
+    s3_client = s3_client or build_s3_client(config)
+    chain_id = f"{now:%Y%m%dT%H%M%SZ}-{revision}"
+    chain_prefix = _chain_prefix(config, chain_id)
+    base_key = f"{chain_prefix}/{BASE_BACKUP_NAME}"
+
+    encryptor = ChunkedBackupEncryptor(
+        config.encryption_key_bytes(),
+        header={
+            "backup_id": chain_id,
+            "organization_uid": config.organization_uid,
+            "schema_revision": revision,
+            "created_at": now.isoformat(),
+            "database_name": make_url(config.database_url).database,
+            "format": "postgresql-base-tar",
+        },
+    )
+    uploader = MultipartStreamUploader(
+        s3_client,
+        bucket=config.bucket,
+        key=base_key,
+        part_size=config.upload_part_size_bytes,
+        concurrency=config.upload_concurrency,
+        metadata={
+            "backup-id": chain_id,
+            "organization-uid": config.organization_uid,
+            "schema-revision": revision,
+            "backup-format": "v2",
+        },
+    )
+    command, environment = _pg_basebackup_command(
+        config.database_url,
+        label=f"pharma-pos-{chain_id}",
+    )
+    stream_command_output(
+        command,
+        environment,
+        encryptor=encryptor,
+        uploader=uploader,
+        popen=popen,
+    )
+
+    manifest = {
+        **encryptor.header,
+        "chain_id": chain_id,
+        "plaintext_sha256": encryptor.plaintext_sha256,
+        "plaintext_size_bytes": encryptor.plaintext_size,
+        "encrypted_sha256": uploader.sha256,
+        "encrypted_size_bytes": uploader.size,
+        "upload_part_count": uploader.part_count,
+        "object_key": base_key,
+        "start_wal_file": start_wal_file,
+        "wal_prefix": f"{_tenant_prefix(config)}/wal/",
+        "wal_segment_size_bytes": WAL_SEGMENT_SIZE,
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    _put_json(
+        s3_client,
+        bucket=config.bucket,
+        key=f"{chain_prefix}/{CHAIN_MANIFEST_NAME}",
+        payload=manifest,
+    )
+    pruned = prune_wal_chains(
+        config,
+        s3_client=s3_client,
+        keep=config.base_retention_count,
+    )
+    return {**manifest, **pruned}
+
+
+def archive_wal_segment(
+    config: HostedBackupConfig,
+    segment_path: Path,
+    *,
+    file_name: Optional[str] = None,
+    s3_client=None,
+) -> dict[str, Any]:
+    """Encrypt and upload one WAL segment or timeline history file.
+
+    Intended as ``archive_command`` (``%p`` and ``%f``). Re-archiving an
+    identical file succeeds so PostgreSQL can retry after a lost response;
+    different content under an already archived name is refused.
+    """
+    file_name = file_name or segment_path.name
+    s3_client = s3_client or build_s3_client(config)
+    key = _wal_key(config, file_name)
+    plaintext_sha256 = sha256_file(segment_path)
+
+    try:
+        existing = s3_client.head_object(Bucket=config.bucket, Key=key)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") not in {"404", "NoSuchKey", "NotFound"}:
+            raise
+    else:
+        if existing.get("Metadata", {}).get("plaintext-sha256") == plaintext_sha256:
+            return {"object_key": key, "file_name": file_name, "status": "already_archived"}
+        raise RuntimeError(f"WAL file {file_name} is already archived with different content")
+
+    encryptor = ChunkedBackupEncryptor(
+        config.encryption_key_bytes(),
+        header={
+            "organization_uid": config.organization_uid,
+            "wal_file": file_name,
+            "format": "postgresql-wal",
+        },
+    )
+    body = io.BytesIO()
+    with segment_path.open("rb") as segment:
+        for block in iter_encrypted(encryptor, segment):
+            body.write(block)
+    s3_client.put_object(
+        Bucket=config.bucket,
+        Key=key,
+        Body=body.getvalue(),
+        Metadata={
+            "organization-uid": config.organization_uid,
+            "plaintext-sha256": plaintext_sha256,
+            "backup-format": "v2",
+        },
+    )
+    return {
+        "object_key": key,
+        "file_name": file_name,
+        "status": "archived",
+        "plaintext_sha256": plaintext_sha256,
+        "encrypted_size_bytes": body.tell(),
+    }
+
+
+def fetch_wal_segment(
+    config: HostedBackupConfig,
+    file_name: str,
+    destination: Path,
+    *,
+    s3_client=None,
+) -> bool:
+    """Download and decrypt one archived WAL file for ``restore_command``.
+
+    Returns ``False`` when the file was never archived, which is how recovery
+    learns it has reached the end of the archive.
+    """
+    s3_client = s3_client or build_s3_client(config)
+    try:
+        response = s3_client.get_object(Bucket=config.bucket, Key=_wal_key(config, file_name))
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+            return False
+        raise
+
+    partial = destination.with_name(f".{destination.name}.partial")
+    try:
+        with partial.open("wb") as output:
+            decrypt_backup_stream(
+                response["Body"],
+                output,
+                encryption_key=config.encryption_key_bytes(),
+            )
+        expected = response.get("Metadata", {}).get("plaintext-sha256")
+        if expected and sha256_file(partial) != expected:
+            raise ValueError(f"Restored WAL file {file_name} does not match its archive checksum")
+        partial.replace(destination)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return True
+
+
+def list_chains(config: HostedBackupConfig, *, s3_client=None) -> list[dict[str, Any]]:
+    """Chain manifests for the tenant, oldest first."""
+    s3_client = s3_client or build_s3_client(config)
+    manifests = []
+    for key in _list_keys(
+        s3_client,
+        bucket=config.bucket,
+        prefix=f"{_tenant_prefix(config)}/chains/",
+    ):
+        if key.endswith(f"/{CHAIN_MANIFEST_NAME}"):
+            body = s3_client.get_object(Bucket=config.bucket, Key=key)["Body"].read()
+            manifests.append(json.loads(body))
+    return sorted(manifests, key=lambda manifest: manifest["chain_id"])
+
+
+def list_archived_wal(config: HostedBackupConfig, *, s3_client=None) -> list[str]:
+    """Archived WAL segment names (history files excluded), in replay order."""
+    s3_client = s3_client or build_s3_client(config)
+    prefix = f"{_tenant_prefix(config)}/wal/"
+    names = (
+        key[len(prefix):].removesuffix(".enc")
+        for key in _list_keys(s3_client, bucket=config.bucket, prefix=prefix)
+    )
+    return sorted(name for name in names if WAL_SEGMENT_NAME.match(name))
+
+
+def describe_chain(
+    config: HostedBackupConfig,
+    chain: dict[str, Any],
+    *,
+    s3_client=None,
+    archived_wal: Optional[list[str]] = None,
+) -> dict[str, Any]:
+    """Report how far a chain can be replayed without hitting a WAL gap."""
+    if archived_wal is None:
+        archived_wal = list_archived_wal(config, s3_client=s3_client)
+    available = set(archived_wal)
+    segment_size = int(chain.get("wal_segment_size_bytes") or WAL_SEGMENT_SIZE)
+    expected = chain["start_wal_file"]
+    last_contiguous = None
+    count = 0
+    while expected in available:
+        last_contiguous = expected
+        count += 1
+        expected = next_wal_segment_name(expected, segment_size)
+    newer = [name for name in archived_wal if name > expected]
+    return {
+        "chain_id": chain["chain_id"],
+        "start_wal_file": chain["start_wal_file"],
+        "last_contiguous_wal_file": last_contiguous,
+        "contiguous_wal_segments": count,
+        "first_missing_wal_file": expected if newer else None,
+        "restorable": last_contiguous is not None,
+    }
+
+
+def prepare_point_in_time_restore(
+    config: HostedBackupConfig,
+    *,
+    target_time: datetime,
+    data_dir: Path,
+    restore_command: str,
+    chain_id: Optional[str] = None,
+    s3_client=None,
+) -> dict[str, Any]:
+    """Lay down a base backup in ``data_dir`` configured to replay to ``target_time``.
+
+    Picks the newest chain whose base backup completed at or before the target
+    (or ``chain_id``), extracts it, and writes ``recovery.signal`` plus the
+    recovery settings. Starting PostgreSQL on ``data_dir`` performs the replay.
+    """
+    if target_time.tzinfo is None:
+        raise ValueError("target_time must be timezone-aware")
+    s3_client = s3_client or build_s3_client(config)
+    chains = list_chains(config, s3_client=s3_client)
+    if chain_id is not None:
+        candidates = [chain for chain in chains if chain["chain_id"] == chain_id]
+    else:
+        candidates = [
+            chain
+            for chain in chains
+            if datetime.fromisoformat(chain["completed_at"]) <= target_time
+        ]
+    if not candidates:
+        raise ValueError("No base backup chain covers the requested restore point")
+    chain = candidates[-1]
+    status = describe_chain(config, chain, s3_client=s3_client)
+    if not status["restorable"]:
+        raise ValueError(f"Chain {chain['chain_id']} has no archived WAL to replay")
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    if any(data_dir.iterdir()):
+        raise ValueError(f"Restore data directory {data_dir} is not empty")
+
+    response = s3_client.get_object(Bucket=config.bucket, Key=chain["object_key"])
+    with tempfile.TemporaryFile(prefix="pharma-hosted-base-") as base_tar:
+        decrypt_backup_stream(
+            response["Body"],
+            base_tar,
+            encryption_key=config.encryption_key_bytes(),
+        )
+        base_tar.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: base_tar.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+        if digest.hexdigest() != chain["plaintext_sha256"]:
+            raise ValueError("Decrypted base backup checksum does not match chain manifest")
+        base_tar.seek(0)
+        with tarfile.open(fileobj=base_tar, mode="r:") as archive:
+            archive.extractall(data_dir, filter="data")
+
+    (data_dir / "recovery.signal").touch()
+    with (data_dir / "postgresql.auto.conf").open("a", encoding="utf-8") as conf:
+        conf.write(
+            "\n# Added by hosted point-in-time restore\n"
+            f"restore_command = '{restore_command}'\n"
+            f"recovery_target_time = '{target_time.isoformat()}'\n"
+            "recovery_target_action = 'promote'\n"
+        )
+    os.chmod(data_dir, 0o700)
+    return {
+        **status,
+        "data_dir": str(data_dir),
+        "target_time": target_time.isoformat(),
+        "schema_revision": chain.get("schema_revision"),
+    }
+
+
+def prune_wal_chains(
+    config: HostedBackupConfig,
+    *,
+    s3_client=None,
+    keep: int,
+) -> dict[str, int]:
+    """Keep the newest ``keep`` chains and the WAL the oldest of them needs."""
+    s3_client = s3_client or build_s3_client(config)
+    chains = list_chains(config, s3_client=s3_client)
+    if len(chains) <= keep:
+        return {"deleted_chains": 0, "deleted_wal_files": 0}
+    stale, kept = chains[:-keep], chains[-keep:]
+    stale_keys: list[str] = []
+    for chain in stale:
+        stale_keys.extend(
+            _list_keys(
+                s3_client,
+                bucket=config.bucket,
+                prefix=f"{_chain_prefix(config, chain['chain_id'])}/",
+            )
+        )
+    _delete_keys(s3_client, bucket=config.bucket, keys=stale_keys)
+
+    oldest_needed = kept[0]["start_wal_file"]
+    stale_wal = [
+        _wal_key(config, name)
+        for name in list_archived_wal(config, s3_client=s3_client)
+        if name < oldest_needed
+    ]
+    _delete_keys(s3_client, bucket=config.bucket, keys=stale_wal)
+    return {"deleted_chains": len(stale), "deleted_wal_files": len(stale_wal)}
@@ -2,8 +2,9 @@
 Inventory service helpers for batch-aware stock calculations.
 """
 from datetime import date
-from typing import Optional
+from typing import Iterable, Optional
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.models.inventory_movement import InventoryMovement, InventoryMovementType
@@ -13,14 +14,21 @@ from app.models.product import Product, ProductBatch
 class InventoryService:
     """Helpers for maintaining sellable stock based on valid batches."""
 
+    @staticmethod
+    def sellable_batch_criteria() -> tuple:
+        """Filters selecting batches that can still be sold today."""
+        return (
+            ProductBatch.quantity > 0,
+            ProductBatch.is_quarantined == False,
+            ProductBatch.expiry_date >= date.today(),
+        )
+
     @staticmethod
     def sellable_batches_query(db: Session, product_id: int):
         """Return the base query for sellable product batches."""
         return db.query(ProductBatch).filter(
             ProductBatch.product_id == product_id,
-            ProductBatch.quantity > 0,
-            ProductBatch.is_quarantined == False,
-            ProductBatch.expiry_date >= date.today(),
+            *InventoryService.sellable_batch_criteria(),
         )
 
     @staticmethod
@@ -43,6 +51,26 @@ class InventoryService:
         product.total_stock = total_stock
         return total_stock
 
+    @staticmethod
+    def recalculate_products_stock(db: Session, products: Iterable[Product]) -> dict[int, int]:
+        """Recalculate sellable stock for many products with one grouped query.
+
+        Pending batch changes are flushed first because the sum runs in SQL.
+        """
+        products_by_id = {product.id: product for product in products}
+        if not products_by_id:
+            return {}
+        db.flush()
+        totals = dict(
+            db.query(ProductBatch.product_id, func.sum(ProductBatch.quantity)).filter(
+                ProductBatch.product_id.in_(products_by_id),
+                *InventoryService.sellable_batch_criteria(),
+            ).group_by(ProductBatch.product_id).all()
+        )
+        for product_id, product in products_by_id.items():
+            product.total_stock = int(totals.get(product_id) or 0)
+        return {product_id: product.total_stock for product_id, product in products_by_id.items()}
+
     @staticmethod
     def record_movement(
         db: Session,
@@ -0,0 +1,178 @@
+"""
+Failed-login rate limiting shared across worker processes.
+
+Each username keeps a sliding-window counter: failure counts for the current
+and previous fixed windows, with the previous one weighted by how much of it
+still overlaps the sliding window. A check reads one row and a failure is one
+relative UPDATE, however many attempts are in the window. The ``database``
+store keeps counters in ``login_attempt_windows`` so every worker sees the same
+limit; the ``memory`` store is the single-process fallback.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import LoginAttemptWindow
+
+# (window_index, current_count, previous_count)
+WindowCounts = Tuple[int, int, int]
+
+
+class InMemoryLoginAttemptStore:
+    """Per-process counters for single-worker deployments."""
+
+    def __init__(self) -> None:
+        self._windows: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def counts(self, db: Session, username: str) -> Optional[WindowCounts]:
+        with self._lock:
+            window = self._windows.get(username)
+            return tuple(window) if window is not None else None
+
+    def record(self, db: Session, username: str, window_index: int) -> None:
+        with self._lock:
+            window = self._windows.get(username)
+            if window is None:
+                self._windows[username] = [window_index, 1, 0]
+                return
+            self._windows[username] = _advance(window[0], window[1], window[2], window_index)
+
+    def purge(self, db: Session, before_window: int) -> int:
+        with self._lock:
+            stale = [username for username, window in self._windows.items() if window[0] < before_window]
+            for username in stale:
+                del self._windows[username]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+
+class DatabaseLoginAttemptStore:
+    """Counters in ``login_attempt_windows``; writes commit the caller's session."""
+
+    def counts(self, db: Session, username: str) -> Optional[WindowCounts]:
+        row = db.query(
+            LoginAttemptWindow.window_index,
+            LoginAttemptWindow.current_count,
+            LoginAttemptWindow.previous_count,
+        ).filter(LoginAttemptWindow.username == username).first()
+        return (row.window_index, row.current_count, row.previous_count) if row else None
+
+    def record(self, db: Session, username: str, window_index: int) -> None:
+        # SET expressions read the pre-update row, so the window rolls over
+        # and counts in one statement without a read-modify-write race.
+        statement = update(LoginAttemptWindow).where(
+            LoginAttemptWindow.username == username
+        ).values(
+            previous_count=case(
+                (LoginAttemptWindow.window_index == window_index, LoginAttemptWindow.previous_count),
+                (LoginAttemptWindow.window_index == window_index - 1, LoginAttemptWindow.current_count),
+                else_=0,
+            ),
+            current_count=case(
+                (LoginAttemptWindow.window_index == window_index, LoginAttemptWindow.current_count + 1),
+                else_=1,
+            ),
+            window_index=window_index,
+            updated_at=datetime.now(timezone.utc),
+        ).execution_options(synchronize_session=False)
+        if not db.execute(statement).rowcount:
+            savepoint = db.begin_nested()
+            try:
+                db.add(LoginAttemptWindow(
+                    username=username,
+                    window_index=window_index,
+                    current_count=1,
+                    previous_count=0,
+                ))
+                db.flush()
+                savepoint.commit()
+            except IntegrityError:
+                savepoint.rollback()
+                db.execute(statement)
+        db.commit()
+
+    def purge(self, db: Session, before_window: int) -> int:
+        deleted = db.query(LoginAttemptWindow).filter(
+            LoginAttemptWindow.window_index < before_window
+        ).delete(synchronize_session=False)
+        db.commit()
+        return int(deleted or 0)
+
+
+def _advance(stored_window: int, current: int, previous: int, window_index: int) -> List[int]:
+    if stored_window == window_index:
+        return [window_index, current + 1, previous]
+    if stored_window == window_index - 1:
+        return [window_index, 1, current]
+    return [window_index, 1, 0]
+
+
+class LoginRateLimiter:
+    """Sliding-window failed-login limiter over a pluggable store."""
+
+    def __init__(
+        self,
+        store,
+        *,
+        max_attempts: int,
+        window_seconds: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.store = store
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self._clock = clock
+
+    def attempts(self, db: Session, username: str) -> float:
+        """Estimated failures for ``username`` within the sliding window."""
+        counts = self.store.counts(db, username)
+        if counts is None:
+            return 0.0
+        stored_window, current, previous = counts
+        now = self._clock()
+        window_index = int(now // self.window_seconds)
+        overlap = 1.0 - (now % self.window_seconds) / self.window_seconds
+        if stored_window == window_index:
+            return current + previous * overlap
+        if stored_window == window_index - 1:
+            return current * overlap
+        return 0.0
+
+    def is_limited(self, db: Session, username: str) -> bool:
+        return self.attempts(db, username) >= self.max_attempts
+
+    def record_failure(self, db: Session, username: str) -> None:
+        self.store.record(db, username, int(self._clock() // self.window_seconds))
+
+    def purge_expired(self, db: Session) -> int:
+        """Drop counters whose windows no longer overlap the sliding window."""
+        return self.store.purge(db, int(self._clock() // self.window_seconds) - 1)
+
+
+def _build_default_limiter() -> LoginRateLimiter:
+    store = (
+        InMemoryLoginAttemptStore()
+        if settings.LOGIN_RATE_LIMIT_STORE == "memory"
+        else DatabaseLoginAttemptStore()
+    )
+    return LoginRateLimiter(
+        store,
+        max_attempts=settings.LOGIN_RATE_LIMIT_MAX_ATTEMPTS,
+        window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+    )
+
+
+# Module-level singleton shared by every request in the process.
+login_rate_limiter = _build_default_limiter()
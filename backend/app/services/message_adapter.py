@@ -55,6 +55,30 @@ class DeliveryResult:
     error: str | None = None
 
 
+@dataclass
+class OutgoingMessage:
+    """One message handed to ``MessageAdapter.send_batch``."""
+    to: str
+    message: str
+    channel: str = "sms"
+
+
+def compose_receipt(*, invoice_number: str, items_summary: str, total: str,
+                    pharmacy_name: str, channel: str = "sms") -> str:
+    """Digital receipt text, truncated to a single SMS unit on the sms channel."""
+    msg = (
+        f"Receipt {invoice_number}\n"
+        f"{pharmacy_name}\n"
+        f"{items_summary}\n"
+        f"Total: {total}\n"
+        f"Thank you for your purchase."
+    )
+    # Truncate to 160 chars for SMS single-message delivery
+    if channel == "sms" and len(msg) > 160:
+        msg = msg[:157] + "..."
+    return msg
+
+
 class MessageAdapter(ABC):
     """Abstract base for SMS/WhatsApp delivery providers."""
 
@@ -79,18 +103,29 @@ class MessageAdapter(ABC):
         Default implementation builds the message text and delegates to send().
         Override if the provider supports rich templates.
         """
-        msg = (
-            f"Receipt {invoice_number}\n"
-            f"{pharmacy_name}\n"
-            f"{items_summary}\n"
-            f"Total: {total}\n"
-            f"Thank you for your purchase."
+        msg = compose_receipt(
+            invoice_number=invoice_number,
+            items_summary=items_summary,
+            total=total,
+            pharmacy_name=pharmacy_name,
+            channel=channel,
         )
-        # Truncate to 160 chars for SMS single-message delivery
-        if channel == "sms" and len(msg) > 160:
-            msg = msg[:157] + "..."
         return self.send(to=to, message=msg, channel=channel)
 
+    def send_batch(self, messages: list[OutgoingMessage]) -> list[DeliveryResult]:
+        """Send several messages, returning one result per message in order.
+
+        Default implementation sends one at a time. Override when the provider
+        has a bulk API so a queue worker can deliver a batch in fewer calls.
+        """
+        results = []
+        for item in messages:
+            try:
+                results.append(self.send(to=item.to, message=item.message, channel=item.channel))
+            except Exception as exc:  # noqa: BLE001
+                results.append(DeliveryResult(success=False, error=str(exc)))
+        return results
+
     def send_follow_up(self, *, to: str, customer_name: str, pharmacy_name: str,
                        days_since_purchase: int, channel: str = "sms") -> DeliveryResult:
         """Compose and send a health follow-up message.
@@ -1,9 +1,9 @@
 """
 Notification service for creating and managing system notifications.
 """
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timedelta, date, timezone
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 import httpx
 import logging
 
@@ -90,6 +90,34 @@ class NotificationService:
         except Exception as e:
             logger.error(f"Failed to send webhook: {str(e)}")
 
+    @staticmethod
+    def _recently_notified_ids(
+        db: Session,
+        type: NotificationType,
+        since: datetime,
+    ) -> set[int]:
+        """Entity ids that already have a ``type`` notification since ``since``."""
+        return {
+            related_entity_id
+            for (related_entity_id,) in db.query(Notification.related_entity_id).filter(
+                Notification.type == type,
+                Notification.related_entity_id.isnot(None),
+                Notification.created_at >= since,
+            ).all()
+        }
+
+    @staticmethod
+    def _create_notifications(db: Session, notifications: List[Notification]) -> None:
+        """Insert ``notifications`` in one commit, then send their webhooks."""
+        if not notifications:
+            return
+        db.add_all(notifications)
+        db.commit()
+
+        if settings.ENABLE_EMAIL_NOTIFICATIONS and settings.N8N_WEBHOOK_URL:
+            for notification in notifications:
+                NotificationService.send_webhook(notification)
+
     @staticmethod
     def check_expiring_products(db: Session):
         """
@@ -100,35 +128,35 @@ class NotificationService:
         """
         expiry_threshold = date.today() + timedelta(days=settings.EXPIRY_WARNING_DAYS)
 
-        expiring_batches = db.query(ProductBatch).filter(
+        expiring_batches = db.query(ProductBatch).options(
+            joinedload(ProductBatch.product)
+        ).filter(
             ProductBatch.expiry_date <= expiry_threshold,
             ProductBatch.expiry_date >= date.today(),
             ProductBatch.quantity > 0
         ).all()
 
+        # Skip batches already notified in the last day
+        notified = NotificationService._recently_notified_ids(
+            db,
+            NotificationType.EXPIRY,
+            datetime.now(timezone.utc) - timedelta(days=1),
+        )
+        notifications = []
         for batch in expiring_batches:
-            # Check if notification already exists for this batch
-            existing = db.query(Notification).filter(
-                Notification.type == NotificationType.EXPIRY,
-                Notification.related_entity_id == batch.id,
-                Notification.created_at >= datetime.now(timezone.utc) - timedelta(days=1)
-            ).first()
-
-            if not existing:
-                days_until_expiry = (batch.expiry_date - date.today()).days
-                product = batch.product
-
-                priority = NotificationPriority.CRITICAL if days_until_expiry <= 7 else NotificationPriority.HIGH
-
-                NotificationService.create_notification(
-                    db=db,
-                    type=NotificationType.EXPIRY,
-                    title=f"Product Expiring Soon: {product.name}",
-                    message=f"Batch {batch.batch_number} expires in {days_until_expiry} days. "
-                           f"Quantity: {batch.quantity}",
-                    priority=priority,
-                    related_entity_id=batch.id
-                )
+            if batch.id in notified:
+                continue
+            days_until_expiry = (batch.expiry_date - date.today()).days
+            priority = NotificationPriority.CRITICAL if days_until_expiry <= 7 else NotificationPriority.HIGH
+            notifications.append(Notification(
+                type=NotificationType.EXPIRY,
+                title=f"Product Expiring Soon: {batch.product.name}",
+                message=f"Batch {batch.batch_number} expires in {days_until_expiry} days. "
+                       f"Quantity: {batch.quantity}",
+                priority=priority,
+                related_entity_id=batch.id,
+            ))
+        NotificationService._create_notifications(db, notifications)
 
         logger.info(f"Checked expiring products. Found {len(expiring_batches)} batches.")
 
@@ -145,26 +173,26 @@ class NotificationService:
             Product.is_active == True
         ).all()
 
+        # Skip products already notified in the last day
+        notified = NotificationService._recently_notified_ids(
+            db,
+            NotificationType.LOW_STOCK,
+            datetime.now(timezone.utc) - timedelta(days=1),
+        )
+        notifications = []
         for product in low_stock_products:
-            # Check if notification already exists for this product
-            existing = db.query(Notification).filter(
-                Notification.type == NotificationType.LOW_STOCK,
-                Notification.related_entity_id == product.id,
-                Notification.created_at >= datetime.now(timezone.utc) - timedelta(days=1)
-            ).first()
-
-            if not existing:
-                priority = NotificationPriority.CRITICAL if product.total_stock == 0 else NotificationPriority.HIGH
-
-                NotificationService.create_notification(
-                    db=db,
-                    type=NotificationType.LOW_STOCK,
-                    title=f"Low Stock Alert: {product.name}",
-                    message=f"Current stock: {product.total_stock}. "
-                           f"Threshold: {product.low_stock_threshold}",
-                    priority=priority,
-                    related_entity_id=product.id
-                )
+            if product.id in notified:
+                continue
+            priority = NotificationPriority.CRITICAL if product.total_stock == 0 else NotificationPriority.HIGH
+            notifications.append(Notification(
+                type=NotificationType.LOW_STOCK,
+                title=f"Low Stock Alert: {product.name}",
+                message=f"Current stock: {product.total_stock}. "
+                       f"Threshold: {product.low_stock_threshold}",
+                priority=priority,
+                related_entity_id=product.id,
+            ))
+        NotificationService._create_notifications(db, notifications)
 
         logger.info(f"Checked low stock. Found {len(low_stock_products)} products.")
 
@@ -181,23 +209,24 @@ class NotificationService:
             Product.is_active == True
         ).all()
 
-        for product in out_of_stock_products:
-            # Check if notification already exists for this product
-            existing = db.query(Notification).filter(
-                Notification.type == NotificationType.OUT_OF_STOCK,
-                Notification.related_entity_id == product.id,
-                Notification.created_at >= datetime.now(timezone.utc) - timedelta(days=1)
-            ).first()
-
-            if not existing:
-                NotificationService.create_notification(
-                    db=db,
-                    type=NotificationType.OUT_OF_STOCK,
-                    title=f"Out of Stock: {product.name}",
-                    message=f"Product is completely out of stock. Immediate reorder required.",
-                    priority=NotificationPriority.CRITICAL,
-                    related_entity_id=product.id
-                )
+        # Skip products already notified in the last day
+        notified = NotificationService._recently_notified_ids(
+            db,
+            NotificationType.OUT_OF_STOCK,
+            datetime.now(timezone.utc) - timedelta(days=1),
+        )
+        notifications = [
+            Notification(
+                type=NotificationType.OUT_OF_STOCK,
+                title=f"Out of Stock: {product.name}",
+                message=f"Product is completely out of stock. Immediate reorder required.",
+                priority=NotificationPriority.CRITICAL,
+                related_entity_id=product.id,
+            )
+            for product in out_of_stock_products
+            if product.id not in notified
+        ]
+        NotificationService._create_notifications(db, notifications)
 
         logger.info(f"Checked out of stock. Found {len(out_of_stock_products)} products.")
 
@@ -215,25 +244,26 @@ class NotificationService:
             Product.reorder_level > 0
         ).all()
 
-        for product in overstock_products:
-            # Check if notification already exists for this product
-            existing = db.query(Notification).filter(
-                Notification.type == NotificationType.OVERSTOCK,
-                Notification.related_entity_id == product.id,
-                Notification.created_at >= datetime.now(timezone.utc) - timedelta(days=7)  # Check weekly
-            ).first()
-
-            if not existing:
-                NotificationService.create_notification(
-                    db=db,
-                    type=NotificationType.OVERSTOCK,
-                    title=f"Overstock Alert: {product.name}",
-                    message=f"Current stock: {product.total_stock}. "
-                           f"Recommended level: {product.reorder_level}. "
-                           f"Consider reducing orders or running promotions.",
-                    priority=NotificationPriority.LOW,
-                    related_entity_id=product.id
-                )
+        # Skip products already notified this week
+        notified = NotificationService._recently_notified_ids(
+            db,
+            NotificationType.OVERSTOCK,
+            datetime.now(timezone.utc) - timedelta(days=7),
+        )
+        notifications = [
+            Notification(
+                type=NotificationType.OVERSTOCK,
+                title=f"Overstock Alert: {product.name}",
+                message=f"Current stock: {product.total_stock}. "
+                       f"Recommended level: {product.reorder_level}. "
+                       f"Consider reducing orders or running promotions.",
+                priority=NotificationPriority.LOW,
+                related_entity_id=product.id,
+            )
+            for product in overstock_products
+            if product.id not in notified
+        ]
+        NotificationService._create_notifications(db, notifications)
 
         logger.info(f"Checked overstock. Found {len(overstock_products)} products.")
 
@@ -249,39 +279,42 @@ class NotificationService:
 
         dead_stock_threshold = datetime.now(timezone.utc) - timedelta(days=settings.DEAD_STOCK_DAYS)
 
-        # Get all active products
-        active_products = db.query(Product).filter(Product.is_active == True).all()
-
-        dead_stock_products = []
-        for product in active_products:
-            # Check if product has any sales since threshold
-            recent_sale = db.query(SaleItem).filter(
-                SaleItem.product_id == product.id
-            ).join(Sale).filter(
+        # Products with any sale since the threshold, in one query
+        recently_sold = {
+            product_id
+            for (product_id,) in db.query(SaleItem.product_id).join(Sale).filter(
                 Sale.created_at >= dead_stock_threshold
-            ).first()
-
-            if not recent_sale and product.total_stock > 0:
-                dead_stock_products.append(product)
-
-                # Check if notification already exists
-                existing = db.query(Notification).filter(
-                    Notification.type == NotificationType.DEAD_STOCK,
-                    Notification.related_entity_id == product.id,
-                    Notification.created_at >= datetime.now(timezone.utc) - timedelta(days=7)  # Check weekly
-                ).first()
-
-                if not existing:
-                    NotificationService.create_notification(
-                        db=db,
-                        type=NotificationType.DEAD_STOCK,
-                        title=f"Dead Stock Alert: {product.name}",
-                        message=f"No sales in {settings.DEAD_STOCK_DAYS} days. "
-                               f"Current stock: {product.total_stock}. "
-                               f"Consider discounting or discontinuing.",
-                        priority=NotificationPriority.MEDIUM,
-                        related_entity_id=product.id
-                    )
+            ).distinct().all()
+        }
+        dead_stock_products = [
+            product
+            for product in db.query(Product).filter(
+                Product.is_active == True,
+                Product.total_stock > 0,
+            ).all()
+            if product.id not in recently_sold
+        ]
+
+        # Skip products already notified this week
+        notified = NotificationService._recently_notified_ids(
+            db,
+            NotificationType.DEAD_STOCK,
+            datetime.now(timezone.utc) - timedelta(days=7),
+        )
+        notifications = [
+            Notification(
+                type=NotificationType.DEAD_STOCK,
+                title=f"Dead Stock Alert: {product.name}",
+                message=f"No sales in {settings.DEAD_STOCK_DAYS} days. "
+                       f"Current stock: {product.total_stock}. "
+                       f"Consider discounting or discontinuing.",
+                priority=NotificationPriority.MEDIUM,
+                related_entity_id=product.id,
+            )
+            for product in dead_stock_products
+            if product.id not in notified
+        ]
+        NotificationService._create_notifications(db, notifications)
 
         logger.info(f"Checked dead stock. Found {len(dead_stock_products)} products.")
 
@@ -295,32 +328,33 @@ class NotificationService:
         """
         near_expiry_threshold = date.today() + timedelta(days=7)
 
-        near_expiry_batches = db.query(ProductBatch).filter(
+        near_expiry_batches = db.query(ProductBatch).options(
+            joinedload(ProductBatch.product)
+        ).filter(
             ProductBatch.expiry_date <= near_expiry_threshold,
             ProductBatch.expiry_date >= date.today(),
             ProductBatch.quantity > 0
         ).all()
 
+        # Skip batches already notified in the last 12 hours (checked twice daily)
+        notified = NotificationService._recently_notified_ids(
+            db,
+            NotificationType.NEAR_EXPIRY,
+            datetime.now(timezone.utc) - timedelta(hours=12),
+        )
+        notifications = []
         for batch in near_expiry_batches:
-            # Check if notification already exists for this batch
-            existing = db.query(Notification).filter(
-                Notification.type == NotificationType.NEAR_EXPIRY,
-                Notification.related_entity_id == batch.id,
-                Notification.created_at >= datetime.now(timezone.utc) - timedelta(hours=12)  # Check twice daily
-            ).first()
-
-            if not existing:
-                days_until_expiry = (batch.expiry_date - date.today()).days
-                product = batch.product
-
-                NotificationService.create_notification(
-                    db=db,
-                    type=NotificationType.NEAR_EXPIRY,
-                    title=f"URGENT: {product.name} Expiring in {days_until_expiry} days",
-                    message=f"Batch {batch.batch_number} expires on {batch.expiry_date}. "
-                           f"Quantity: {batch.quantity}. Immediate action required!",
-                    priority=NotificationPriority.CRITICAL,
-                    related_entity_id=batch.id
-                )
+            if batch.id in notified:
+                continue
+            days_until_expiry = (batch.expiry_date - date.today()).days
+            notifications.append(Notification(
+                type=NotificationType.NEAR_EXPIRY,
+                title=f"URGENT: {batch.product.name} Expiring in {days_until_expiry} days",
+                message=f"Batch {batch.batch_number} expires on {batch.expiry_date}. "
+                       f"Quantity: {batch.quantity}. Immediate action required!",
+                priority=NotificationPriority.CRITICAL,
+                related_entity_id=batch.id,
+            ))
+        NotificationService._create_notifications(db, notifications)
 
         logger.info(f"Checked near expiry. Found {len(near_expiry_batches)} batches.")
@@ -0,0 +1,164 @@
+"""
+Short-lived cache of authenticated principals.
+
+Every authenticated request used to load its user row and rebuild the user's
+effective permissions. The principal keeps what authorization needs -- role,
+effective permissions, organization and branch -- keyed by user id and token
+version for ``AUTH_PRINCIPAL_CACHE_TTL_SECONDS``. ``users.py`` invalidates a
+user's entries on update, deactivation and deletion; other worker processes
+pick the change up when their entry expires.
+
+With ``AUTH_PRINCIPAL_SIGNED_CLAIMS`` the login token also carries the
+principal, and requests trust those signed claims without any lookup until
+the same TTL has passed since the token was issued.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User, UserRole, effective_permissions_for
+
+PRINCIPAL_CLAIM = "principal"
+
+
+@dataclass(frozen=True)
+class AuthenticatedPrincipal:
+    """The authorization-relevant fields of one user at one token version."""
+
+    user_id: int
+    token_version: int
+    username: str
+    full_name: str
+    role: UserRole
+    permissions: Optional[Tuple[str, ...]]
+    effective_permissions: FrozenSet[str]
+    organization_id: Optional[int]
+    branch_id: Optional[int]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedPrincipal":
+        return cls(
+            user_id=user.id,
+            token_version=user.token_version or 0,
+            username=user.username,
+            full_name=user.full_name,
+            role=user.role,
+            permissions=tuple(user.permissions) if user.permissions is not None else None,
+            effective_permissions=user.effective_permissions,
+            organization_id=user.organization_id,
+            branch_id=user.branch_id,
+            is_active=user.is_active,
+        )
+
+    def to_claims(self) -> Dict[str, Any]:
+        return {
+            "username": self.username,
+            "full_name": self.full_name,
+            "role": self.role.value,
+            "permissions": list(self.permissions) if self.permissions is not None else None,
+            "organization_id": self.organization_id,
+            "branch_id": self.branch_id,
+        }
+
+    @classmethod
+    def from_claims(cls, user_id: int, token_version: int, claims: Dict[str, Any]) -> "AuthenticatedPrincipal":
+        role = UserRole(claims["role"])
+        permissions = claims.get("permissions")
+        return cls(
+            user_id=user_id,
+            token_version=token_version,
+            username=claims["username"],
+            full_name=claims["full_name"],
+            role=role,
+            permissions=tuple(permissions) if permissions is not None else None,
+            effective_permissions=effective_permissions_for(role, permissions),
+            organization_id=claims.get("organization_id"),
+            branch_id=claims.get("branch_id"),
+            # Claims are only issued to active users.
+            is_active=True,
+        )
+
+    def attach(self, db: Session) -> User:
+        """Return the principal as a ``User`` bound to ``db`` without a SELECT.
+
+        Columns the principal does not hold (email, timestamps, the password
+        hash) load on first access.
+        """
+        user = User(
+            id=self.user_id,
+            username=self.username,
+            full_name=self.full_name,
+            role=self.role,
+            permissions=list(self.permissions) if self.permissions is not None else None,
+            organization_id=self.organization_id,
+            branch_id=self.branch_id,
+            is_active=self.is_active,
+            token_version=self.token_version,
+        )
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+
+class PrincipalCache:
+    """Thread-safe TTL + LRU map of ``(user_id, token_version)`` to principal."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 2048,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[float, AuthenticatedPrincipal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, token_version: int) -> Optional[AuthenticatedPrincipal]:
+        key = (user_id, token_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, principal: AuthenticatedPrincipal) -> None:
+        key = (principal.user_id, principal.token_version)
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop every cached version of ``user_id``."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Module-level singleton shared by every request in the process.
+principal_cache = PrincipalCache(ttl_seconds=float(settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS))
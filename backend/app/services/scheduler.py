@@ -8,13 +8,19 @@ from pytz import timezone
 
 from sqlalchemy.orm import Session
 
-from app.db.base import SessionLocal
+from app.core.metrics import timed_job
+from app.db.base import SessionLocal, workload_engines
+from app.db.workloads import Workload, in_workload
 from app.services.ai_report_delivery_service import AIReportDeliveryService
 from app.services.ai_weekly_report_service import AIWeeklyReportService
 from app.services.cloud_projection_service import CloudProjectionService
 from app.services.full_snapshot_sync_service import FullSnapshotSyncService
+from app.services.login_rate_limiter import login_rate_limiter
 from app.services.notification_service import NotificationService
+from app.services.scheduler_leadership import LeaderElector, SchedulerLeaderLock
 from app.services.system_heartbeat_service import SystemHeartbeatService
+from app.services.sync_event_archive_service import SyncEventArchiveService
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 from app.services.sync_upload_service import SyncUploadService
 from app.core.config import settings
 
@@ -28,6 +34,7 @@ class SchedulerService:
         # Configure scheduler with explicit timezone
         tz = timezone(getattr(settings, 'TIMEZONE', 'UTC'))
         self.scheduler = BackgroundScheduler(timezone=tz)
+        self.elector = None
 
     def start(self):
         """Start the background scheduler."""
@@ -39,7 +46,7 @@ class SchedulerService:
         tz = timezone(getattr(settings, 'TIMEZONE', 'UTC'))
         
         # Schedule expiry checks
-        self.scheduler.add_job(
+        self._add_job(
             self.check_expiring_products,
             CronTrigger(hour=settings.EXPIRY_CHECK_HOUR, minute=0, timezone=tz),
             id="check_expiring_products",
@@ -48,7 +55,7 @@ class SchedulerService:
         )
 
         # Schedule low stock checks
-        self.scheduler.add_job(
+        self._add_job(
             self.check_low_stock,
             CronTrigger(hour=settings.LOW_STOCK_CHECK_HOUR, minute=0, timezone=tz),
             id="check_low_stock",
@@ -57,7 +64,7 @@ class SchedulerService:
         )
 
         # Schedule near expiry checks (critical - check twice daily)
-        self.scheduler.add_job(
+        self._add_job(
             self.check_near_expiry,
             CronTrigger(hour="8,20", minute=0, timezone=tz),
             id="check_near_expiry",
@@ -66,7 +73,7 @@ class SchedulerService:
         )
 
         # Schedule dead stock checks (weekly - Monday at 11 AM)
-        self.scheduler.add_job(
+        self._add_job(
             self.check_dead_stock,
             CronTrigger(day_of_week="mon", hour=11, minute=0, timezone=tz),
             id="check_dead_stock",
@@ -75,7 +82,7 @@ class SchedulerService:
         )
 
         # Schedule overstock checks (weekly - Monday at 11:30 AM)
-        self.scheduler.add_job(
+        self._add_job(
             self.check_overstock,
             CronTrigger(day_of_week="mon", hour=11, minute=30, timezone=tz),
             id="check_overstock",
@@ -83,9 +90,29 @@ class SchedulerService:
             replace_existing=True,
         )
 
+        if settings.LOGIN_RATE_LIMIT_STORE == "database":
+            self._add_job(
+                self.purge_login_attempts,
+                "interval",
+                hours=1,
+                id="purge_login_attempts",
+                name="Purge expired login attempt counters",
+                replace_existing=True,
+            )
+
+        if settings.AI_RESPONSE_CACHE_ENABLED and settings.AI_RESPONSE_CACHE_PERSISTENT:
+            self._add_job(
+                self.purge_ai_response_cache,
+                "interval",
+                hours=1,
+                id="purge_ai_response_cache",
+                name="Purge expired AI response cache entries",
+                replace_existing=True,
+            )
+
         # Every operational deployment can publish its transactional outbox.
         if settings.CLOUD_SYNC_ENABLED:
-            self.scheduler.add_job(
+            self._add_job(
                 self.enqueue_system_heartbeat,
                 "interval",
                 minutes=settings.CLOUD_HEARTBEAT_INTERVAL_MINUTES,
@@ -93,7 +120,7 @@ class SchedulerService:
                 name="Enqueue system heartbeat",
                 replace_existing=True,
             )
-            self.scheduler.add_job(
+            self._add_job(
                 self.upload_sync_events,
                 "interval",
                 minutes=settings.CLOUD_SYNC_INTERVAL_MINUTES,
@@ -102,7 +129,7 @@ class SchedulerService:
                 replace_existing=True,
             )
             if settings.CLOUD_CATALOG_SNAPSHOT_SYNC_ENABLED:
-                self.scheduler.add_job(
+                self._add_job(
                     self.nightly_cloud_catalog_sync,
                     CronTrigger(
                         hour=settings.CLOUD_CATALOG_SNAPSHOT_SYNC_HOUR,
@@ -113,6 +140,13 @@ class SchedulerService:
                     name="Nightly cloud catalog sync",
                     replace_existing=True,
                 )
+            self._add_job(
+                self.prune_acknowledged_sync_events,
+                CronTrigger(hour=4, minute=0, timezone=tz),
+                id="prune_acknowledged_sync_events",
+                name="Prune acknowledged sync events",
+                replace_existing=True,
+            )
 
         # Projection belongs only to the central reporting deployment.
         from app.core.app_mode import is_cloud_reporting_mode
@@ -120,7 +154,7 @@ class SchedulerService:
             settings.CLOUD_PROJECTION_ENABLED
             and is_cloud_reporting_mode(settings.APP_MODE)
         ):
-            self.scheduler.add_job(
+            self._add_job(
                 self.project_cloud_events,
                 "interval",
                 minutes=settings.CLOUD_PROJECTION_INTERVAL_MINUTES,
@@ -129,8 +163,25 @@ class SchedulerService:
                 replace_existing=True,
             )
 
+        if is_cloud_reporting_mode(settings.APP_MODE):
+            self._add_job(
+                self.reconcile_sync_ingestion_stats,
+                CronTrigger(hour=settings.SYNC_INGESTION_STATS_RECONCILE_HOUR, minute=15, timezone=tz),
+                id="reconcile_sync_ingestion_stats",
+                name="Reconcile sync ingestion counters",
+                replace_existing=True,
+            )
+            if settings.SYNC_EVENT_ARCHIVE_ENABLED:
+                self._add_job(
+                    self.archive_ingested_sync_events,
+                    CronTrigger(hour=settings.SYNC_INGESTION_STATS_RECONCILE_HOUR, minute=45, timezone=tz),
+                    id="archive_ingested_sync_events",
+                    name="Archive projected sync events",
+                    replace_existing=True,
+                )
+
         if settings.AI_WEEKLY_REPORTS_ENABLED:
-            self.scheduler.add_job(
+            self._add_job(
                 self.generate_weekly_ai_reports,
                 CronTrigger(
                     day_of_week=settings.AI_WEEKLY_REPORT_DAY,
@@ -144,7 +195,7 @@ class SchedulerService:
             )
 
         if settings.TELEGRAM_ALERTS_ENABLED and settings.TELEGRAM_BOT_TOKEN:
-            self.scheduler.add_job(
+            self._add_job(
                 self.push_telegram_alerts,
                 "interval",
                 minutes=settings.TELEGRAM_ALERT_INTERVAL_MINUTES,
@@ -154,7 +205,7 @@ class SchedulerService:
             )
 
         if settings.AI_DAILY_BRIEFING_ENABLED:
-            self.scheduler.add_job(
+            self._add_job(
                 self.send_daily_briefing,
                 CronTrigger(hour=settings.AI_DAILY_BRIEFING_HOUR, minute=0, timezone=tz),
                 id="send_daily_briefing",
@@ -163,7 +214,7 @@ class SchedulerService:
             )
 
         if settings.AI_WEEKLY_REPORT_DELIVERY_RETRY_ENABLED:
-            self.scheduler.add_job(
+            self._add_job(
                 self.retry_weekly_ai_report_deliveries,
                 "interval",
                 minutes=settings.AI_WEEKLY_REPORT_DELIVERY_RETRY_INTERVAL_MINUTES,
@@ -172,8 +223,18 @@ class SchedulerService:
                 replace_existing=True,
             )
 
+        if settings.CUSTOMER_RETENTION_ENABLED and settings.CUSTOMER_RECEIPTS_ENABLED:
+            self._add_job(
+                self.deliver_outbound_messages,
+                "interval",
+                seconds=settings.OUTBOUND_MESSAGE_DISPATCH_INTERVAL_SECONDS,
+                id="deliver_outbound_messages",
+                name="Deliver queued customer messages",
+                replace_existing=True,
+            )
+
         if settings.CUSTOMER_FOLLOWUPS_ENABLED:
-            self.scheduler.add_job(
+            self._add_job(
                 self.dispatch_customer_follow_ups,
                 "interval",
                 hours=1,
@@ -182,20 +243,50 @@ class SchedulerService:
                 replace_existing=True,
             )
 
-        self.scheduler.start()
+        if settings.SCHEDULER_LEADER_ELECTION:
+            # Jobs stay paused until this worker holds the leadership lock, so
+            # running several web workers never duplicates scheduled work.
+            self.scheduler.start(paused=True)
+            self.elector = LeaderElector(
+                SchedulerLeaderLock(
+                    workload_engines[Workload.BACKGROUND],
+                    settings.SCHEDULER_LEADER_LOCK_KEY,
+                ),
+                on_elected=self.scheduler.resume,
+                on_demoted=self.scheduler.pause,
+                retry_seconds=settings.SCHEDULER_LEADER_RETRY_SECONDS,
+            )
+            self.elector.start()
+        else:
+            self.scheduler.start()
         logger.info(f"Background scheduler started with timezone: {tz}")
         
         # Log next run times for debugging
         for job in self.scheduler.get_jobs():
             logger.info(f"Job '{job.name}' - Next run: {job.next_run_time}")
 
+    def _add_job(self, func, trigger, *, id: str, **kwargs):
+        """Register ``func`` with its run time exported as ``scheduler_job_duration_seconds``."""
+        self.scheduler.add_job(timed_job(id, func), trigger, id=id, **kwargs)
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether scheduled jobs run in this process."""
+        if not self.scheduler.running:
+            return False
+        return self.elector.is_leader if self.elector is not None else True
+
     def stop(self):
         """Stop the background scheduler."""
+        if self.elector is not None:
+            self.elector.stop()
+            self.elector = None
         if self.scheduler.running:
             self.scheduler.shutdown()
             logger.info("Background scheduler stopped")
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def check_expiring_products():
         """Task to check for expiring products."""
         db: Session = SessionLocal()
@@ -208,6 +299,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def check_low_stock():
         """Task to check for low stock products."""
         db: Session = SessionLocal()
@@ -220,6 +312,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def check_out_of_stock():
         """Task to check for out of stock products."""
         db: Session = SessionLocal()
@@ -232,6 +325,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def check_near_expiry():
         """Task to check for products expiring within 7 days."""
         db: Session = SessionLocal()
@@ -244,6 +338,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def check_dead_stock():
         """Task to check for dead stock products."""
         db: Session = SessionLocal()
@@ -256,6 +351,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def check_overstock():
         """Task to check for overstocked products."""
         db: Session = SessionLocal()
@@ -268,6 +364,35 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
+    def purge_login_attempts():
+        """Task to delete failed-login counters that have aged out of the window."""
+        db: Session = SessionLocal()
+        try:
+            deleted = login_rate_limiter.purge_expired(db)
+            logger.info("Purged %s expired login attempt counter(s)", deleted)
+        except Exception:
+            db.rollback()
+            logger.exception("Error in login attempt purge task")
+        finally:
+            db.close()
+
+    @staticmethod
+    @in_workload(Workload.BACKGROUND)
+    def purge_ai_response_cache():
+        """Task to delete persisted AI answers whose TTL has passed."""
+        from app.services.ai_response_cache import response_cache
+
+        if response_cache.store is None:
+            return
+        try:
+            deleted = response_cache.store.purge_expired()
+            logger.info("Purged %s expired AI response cache entries", deleted)
+        except Exception:
+            logger.exception("Error in AI response cache purge task")
+
+    @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def upload_sync_events():
         """Task to upload pending local sync events to the cloud ingestion API."""
         db: Session = SessionLocal()
@@ -281,6 +406,22 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
+    def prune_acknowledged_sync_events():
+        """Task to delete local outbox events the cloud acknowledged long ago."""
+        db: Session = SessionLocal()
+        try:
+            logger.info("Running acknowledged sync event prune task")
+            result = SyncUploadService.prune_acknowledged(db)
+            logger.info("Acknowledged sync event prune result: %s", result)
+        except Exception:
+            db.rollback()
+            logger.exception("Error in acknowledged sync event prune task")
+        finally:
+            db.close()
+
+    @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def nightly_cloud_catalog_sync():
         """Queue a full local catalog snapshot and upload it after closing time."""
         db: Session = SessionLocal()
@@ -299,6 +440,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def enqueue_system_heartbeat():
         """Task to record local installation telemetry into the sync outbox."""
         db: Session = SessionLocal()
@@ -318,6 +460,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def project_cloud_events():
         """Task to project accepted cloud sync events into reporting tables."""
         db: Session = SessionLocal()
@@ -334,6 +477,36 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
+    def reconcile_sync_ingestion_stats():
+        """Task to verify the sync ingestion counters against the event log."""
+        db: Session = SessionLocal()
+        try:
+            logger.info("Running sync ingestion counter reconciliation task")
+            result = SyncIngestionStatsService.reconcile(db)
+            logger.info("Sync ingestion counter reconciliation result: %s", result)
+        except Exception:
+            logger.exception("Error in sync ingestion counter reconciliation task")
+        finally:
+            db.close()
+
+    @staticmethod
+    @in_workload(Workload.BACKGROUND)
+    def archive_ingested_sync_events():
+        """Task to move old projected sync events to cold storage."""
+        db: Session = SessionLocal()
+        try:
+            logger.info("Running sync event archive task")
+            result = SyncEventArchiveService.archive(db)
+            logger.info("Sync event archive result: %s", result)
+        except Exception:
+            db.rollback()
+            logger.exception("Error in sync event archive task")
+        finally:
+            db.close()
+
+    @staticmethod
+    @in_workload(Workload.REPORTING)
     def generate_weekly_ai_reports():
         """Task to generate saved weekly manager reports for active organizations."""
         db: Session = SessionLocal()
@@ -350,6 +523,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.REPORTING)
     def push_telegram_alerts():
         """Task to detect business anomalies and push Telegram alerts to the CEO."""
         db: Session = SessionLocal()
@@ -364,6 +538,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.REPORTING)
     def send_daily_briefing():
         """Task to send the daily morning briefing to all orgs with Telegram configured."""
         db: Session = SessionLocal()
@@ -378,6 +553,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def retry_weekly_ai_report_deliveries():
         """Task to retry transient failed weekly report deliveries."""
         db: Session = SessionLocal()
@@ -391,6 +567,7 @@ class SchedulerService:
             db.close()
 
     @staticmethod
+    @in_workload(Workload.BACKGROUND)
     def dispatch_customer_follow_ups():
         """Hourly task: send all due customer health follow-up messages.
 
@@ -404,8 +581,10 @@ class SchedulerService:
             pharmacy_name = getattr(_settings, "APP_NAME", "PharmaPOS")
             result = process_pending_follow_ups(db, pharmacy_name=pharmacy_name)
             logger.info(
-                "Follow-up dispatch: sent=%s skipped=%s failed=%s total=%s",
+                "Follow-up dispatch: sent=%s skipped=%s failed=%s total=%s chunks=%s "
+                "duration=%ss rate=%s/s",
                 result["sent"], result["skipped"], result["failed"], result["total_processed"],
+                result["chunks"], result["duration_seconds"], result["messages_per_second"],
             )
         except Exception:
             logger.exception("Error in customer follow-up dispatch task")
@@ -413,5 +592,18 @@ class SchedulerService:
             db.close()
 
 
+    @staticmethod
+    @in_workload(Workload.BACKGROUND)
+    def deliver_outbound_messages():
+        """Deliver queued customer messages (digital receipts) in batches."""
+        db: Session = SessionLocal()
+        try:
+            from app.services.customer_retention_service import deliver_outbound_messages
+            deliver_outbound_messages(db)
+        except Exception:
+            logger.exception("Error in outbound message delivery task")
+        finally:
+            db.close()
+
 # Global scheduler instance
 scheduler = SchedulerService()
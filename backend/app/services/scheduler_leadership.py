@@ -0,0 +1,140 @@
+"""
+Scheduler leadership for multi-worker deployments.
+
+Every worker process registers the same APScheduler jobs, but only the process
+holding the leadership lock runs them. On PostgreSQL the lock is a
+session-level advisory lock held on a dedicated connection, so it is released
+as soon as the leader process (or its connection) dies and another worker
+takes over on its next retry. Non-PostgreSQL engines (the SQLite test
+database) have no advisory locks, so the lone process is always the leader.
+"""
+import logging
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerLeaderLock:
+    """A PostgreSQL session advisory lock kept on its own connection."""
+
+    def __init__(self, engine: Engine, lock_key: int):
+        self.engine = engine
+        self.lock_key = lock_key
+        self._connection: Optional[Connection] = None
+
+    @property
+    def uses_advisory_lock(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def try_acquire(self) -> bool:
+        if not self.uses_advisory_lock:
+            return True
+        try:
+            if self._connection is None:
+                # Autocommit so the lock holder is never left idle in a transaction.
+                self._connection = self.engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            acquired = bool(
+                self._connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key}
+                ).scalar()
+            )
+        except Exception:
+            logger.warning("Scheduler leadership lock attempt failed", exc_info=True)
+            self._discard_connection()
+            return False
+        if not acquired:
+            # Keep followers from pinning a pooled connection between attempts.
+            self._discard_connection()
+        return acquired
+
+    def is_held(self) -> bool:
+        """Whether the lock is still ours, i.e. its session is still alive."""
+        if not self.uses_advisory_lock:
+            return True
+        if self._connection is None:
+            return False
+        try:
+            self._connection.execute(text("SELECT 1"))
+            return True
+        except Exception:
+            logger.warning("Scheduler leadership connection lost", exc_info=True)
+            self._discard_connection()
+            return False
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key})
+        except Exception:
+            logger.warning("Scheduler leadership lock release failed", exc_info=True)
+        finally:
+            self._discard_connection()
+
+    def _discard_connection(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            self._connection.invalidate()
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+
+class LeaderElector:
+    """Background loop that keeps trying to become (and stay) the leader."""
+
+    def __init__(
+        self,
+        lock: SchedulerLeaderLock,
+        *,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        retry_seconds: float,
+    ):
+        self.lock = lock
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.retry_seconds = retry_seconds
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        # The first attempt is synchronous so a single-worker deployment has
+        # its jobs active as soon as startup completes.
+        self.tick()
+        self._thread = threading.Thread(target=self._run, name="scheduler-leader-elector", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.retry_seconds + 5)
+        if self.is_leader:
+            self.is_leader = False
+            self.on_demoted()
+        self.lock.release()
+
+    def tick(self) -> None:
+        if self.is_leader:
+            if not self.lock.is_held():
+                self.is_leader = False
+                logger.warning("Lost scheduler leadership; pausing scheduled jobs")
+                self.on_demoted()
+        elif self.lock.try_acquire():
+            self.is_leader = True
+            logger.info("Acquired scheduler leadership; scheduled jobs will run in this process")
+            self.on_elected()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.retry_seconds):
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Scheduler leader election tick failed")
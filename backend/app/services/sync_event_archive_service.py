@@ -0,0 +1,190 @@
+"""
+Cold-storage archival for ``ingested_sync_events``.
+
+Projected events only matter to idempotency once they are old: the reporting
+tables already hold their effect. The archive job moves each device's oldest
+projected events, as a contiguous run of sequence numbers, into gzip JSONL
+files under ``SYNC_EVENT_ARCHIVE_DIR`` and deletes the rows. The device's
+``sync_ingestion_stats`` row keeps ``archived_through_sequence`` so a late
+re-upload of an archived event is still answered as a duplicate, and the
+``archived_*`` counts keep sync-health totals unchanged.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.sync_ingestion import IngestedSyncEvent, SyncIngestionStats
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "event_id",
+    "organization_id",
+    "branch_id",
+    "source_device_id",
+    "deployment_uid",
+    "local_sequence_number",
+    "event_type",
+    "aggregate_type",
+    "aggregate_id",
+    "aggregate_uid",
+    "schema_version",
+    "payload",
+    "payload_hash",
+    "duplicate_count",
+    "last_duplicate_at",
+    "projected_at",
+    "received_at",
+)
+
+
+def _archive_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+class SyncEventArchiveService:
+    """Move old projected sync events to compressed cold storage."""
+
+    @staticmethod
+    def archive_path(stats: SyncIngestionStats, first_sequence: int, last_sequence: int) -> Path:
+        return (
+            Path(settings.SYNC_EVENT_ARCHIVE_DIR)
+            / f"org_{stats.organization_id}"
+            / f"device_{stats.source_device_id}"
+            / f"{first_sequence:012d}-{last_sequence:012d}.jsonl.gz"
+        )
+
+    @staticmethod
+    def _write(path: Path, events: List[IngestedSyncEvent]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(temp_path, "wt", encoding="utf-8") as handle:
+            for event in events:
+                record = {column: _archive_value(getattr(event, column)) for column in ARCHIVED_COLUMNS}
+                handle.write(json.dumps(record, sort_keys=True) + "\n")
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _archivable(
+        db: Session,
+        stats: SyncIngestionStats,
+        cutoff: datetime,
+        batch_size: int,
+    ) -> List[IngestedSyncEvent]:
+        source_filter = (
+            IngestedSyncEvent.organization_id == stats.organization_id,
+            IngestedSyncEvent.branch_id == stats.branch_id,
+            IngestedSyncEvent.source_device_id == stats.source_device_id,
+        )
+        # The watermark may only advance over a contiguous prefix, so stop at
+        # the first event that is still recent, unprojected or failed.
+        blocker = db.query(func.min(IngestedSyncEvent.local_sequence_number)).filter(
+            *source_filter,
+            or_(
+                IngestedSyncEvent.projected_at.is_(None),
+                IngestedSyncEvent.projection_error.isnot(None),
+                IngestedSyncEvent.received_at >= cutoff,
+            ),
+        ).scalar()
+        query = db.query(IngestedSyncEvent).filter(
+            *source_filter,
+            IngestedSyncEvent.local_sequence_number > stats.archived_through_sequence,
+        )
+        if blocker is not None:
+            query = query.filter(IngestedSyncEvent.local_sequence_number < blocker)
+        candidates = query.order_by(IngestedSyncEvent.local_sequence_number.asc()).limit(batch_size).all()
+        # A sequence number the cloud never received is not a row, so it can
+        # not block above: stop at the first gap, or a late upload of the
+        # missing event would be answered as an archived duplicate.
+        events: List[IngestedSyncEvent] = []
+        for event in candidates:
+            if event.local_sequence_number != stats.archived_through_sequence + 1 + len(events):
+                break
+            events.append(event)
+        return events
+
+    @staticmethod
+    def archive(
+        db: Session,
+        *,
+        older_than_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, int]:
+        """Archive projected events older than the cutoff, one file per batch.
+
+        The file is written before the rows are deleted; a run interrupted in
+        between leaves the rows in place and the next run rewrites the range.
+        """
+        days = older_than_days if older_than_days is not None else settings.SYNC_EVENT_ARCHIVE_AFTER_DAYS
+        limit = batch_size or settings.SYNC_EVENT_ARCHIVE_BATCH_SIZE
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=days)
+
+        devices = 0
+        archived = 0
+        files = 0
+        stats_ids = [row.id for row in db.query(SyncIngestionStats.id).order_by(SyncIngestionStats.id).all()]
+        for stats_id in stats_ids:
+            device_archived = 0
+            while True:
+                stats = db.get(SyncIngestionStats, stats_id)
+                events = SyncEventArchiveService._archivable(db, stats, cutoff, limit)
+                if not events:
+                    break
+                first_sequence = events[0].local_sequence_number
+                last_sequence = events[-1].local_sequence_number
+                SyncEventArchiveService._write(
+                    SyncEventArchiveService.archive_path(stats, first_sequence, last_sequence),
+                    events,
+                )
+
+                # Lock the events before the counter row, the same order a
+                # duplicate ingest takes, and re-read their duplicate counts.
+                event_ids = [event.id for event in events]
+                duplicates = sum(
+                    row.duplicate_count or 0
+                    for row in db.query(IngestedSyncEvent.duplicate_count).filter(
+                        IngestedSyncEvent.id.in_(event_ids)
+                    ).with_for_update().all()
+                )
+                db.query(IngestedSyncEvent).filter(
+                    IngestedSyncEvent.id.in_(event_ids)
+                ).delete(synchronize_session=False)
+                stats = db.query(SyncIngestionStats).filter(
+                    SyncIngestionStats.id == stats_id
+                ).with_for_update().populate_existing().one()
+                stats.archived_through_sequence = last_sequence
+                stats.archived_count += len(events)
+                stats.archived_duplicate_count += duplicates
+                db.commit()
+
+                files += 1
+                device_archived += len(events)
+                if len(events) < limit:
+                    break
+            if device_archived:
+                devices += 1
+                archived += device_archived
+                logger.info(
+                    "Archived %s sync event(s) for device %s through sequence %s",
+                    device_archived,
+                    stats.source_device_id,
+                    stats.archived_through_sequence,
+                )
+
+        return {"devices": devices, "archived": archived, "files": files}
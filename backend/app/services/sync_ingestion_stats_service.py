@@ -0,0 +1,281 @@
+"""
+Per-device ingestion counters behind every cloud sync-health surface.
+
+``ingested_sync_events`` is the largest cloud table and only grows, so
+projection status, sync-health reports, the AI tools and the vendor command
+center read ``sync_ingestion_stats`` instead of aggregating it. Ingest and
+projection adjust the counters with relative UPDATEs in the same transaction
+as the event change; a daily reconciliation recomputes them from the event
+log and repairs any drift.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import case, func, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.sync_ingestion import IngestedSyncEvent, SyncIngestionStats
+from app.models.tenancy import Device
+
+logger = logging.getLogger(__name__)
+
+StatsKey = Tuple[int, int, int]
+COUNTER_FIELDS = ("ingested_count", "projected_count", "failed_count", "duplicate_count")
+TIMESTAMP_FIELDS = ("last_received_at", "last_projected_at")
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _later(column, value: datetime):
+    return case((or_(column.is_(None), column < value), value), else_=column)
+
+
+class SyncIngestionStatsService:
+    """Maintain and read ``sync_ingestion_stats``."""
+
+    @staticmethod
+    def record(
+        db: Session,
+        event: IngestedSyncEvent,
+        *,
+        ingested: int = 0,
+        projected: int = 0,
+        failed: int = 0,
+        duplicates: int = 0,
+        received_at: Optional[datetime] = None,
+        projected_at: Optional[datetime] = None,
+    ) -> None:
+        """Apply counter deltas for ``event``'s source device; the caller commits."""
+        key_filter = (
+            SyncIngestionStats.organization_id == event.organization_id,
+            SyncIngestionStats.branch_id == event.branch_id,
+            SyncIngestionStats.source_device_id == event.source_device_id,
+        )
+        values: Dict[str, Any] = {
+            "ingested_count": SyncIngestionStats.ingested_count + ingested,
+            "projected_count": SyncIngestionStats.projected_count + projected,
+            "failed_count": SyncIngestionStats.failed_count + failed,
+            "duplicate_count": SyncIngestionStats.duplicate_count + duplicates,
+        }
+        if received_at is not None:
+            values["last_received_at"] = _later(SyncIngestionStats.last_received_at, received_at)
+        if projected_at is not None:
+            values["last_projected_at"] = _later(SyncIngestionStats.last_projected_at, projected_at)
+        statement = update(SyncIngestionStats).where(*key_filter).values(**values).execution_options(
+            synchronize_session=False
+        )
+        if db.execute(statement).rowcount:
+            return
+
+        # First event from this device: create its row. A concurrent ingest
+        # may win the insert, in which case the UPDATE above now applies.
+        savepoint = db.begin_nested()
+        try:
+            db.add(SyncIngestionStats(
+                organization_id=event.organization_id,
+                branch_id=event.branch_id,
+                source_device_id=event.source_device_id,
+                ingested_count=ingested,
+                projected_count=projected,
+                failed_count=failed,
+                duplicate_count=duplicates,
+                last_received_at=received_at,
+                last_projected_at=projected_at,
+            ))
+            db.flush()
+            savepoint.commit()
+        except IntegrityError:
+            savepoint.rollback()
+            db.execute(statement)
+
+    @staticmethod
+    def record_archived_duplicate(db: Session, device: Device, local_sequence_number: int) -> bool:
+        """Count a re-upload of an event already moved to cold storage.
+
+        Returns False when ``local_sequence_number`` is above the device's
+        archive watermark, i.e. the event was never archived.
+        """
+        statement = update(SyncIngestionStats).where(
+            SyncIngestionStats.organization_id == device.organization_id,
+            SyncIngestionStats.branch_id == device.branch_id,
+            SyncIngestionStats.source_device_id == device.id,
+            SyncIngestionStats.archived_through_sequence >= local_sequence_number,
+        ).values(
+            duplicate_count=SyncIngestionStats.duplicate_count + 1,
+            archived_duplicate_count=SyncIngestionStats.archived_duplicate_count + 1,
+        ).execution_options(synchronize_session=False)
+        return bool(db.execute(statement).rowcount)
+
+    @staticmethod
+    def totals(
+        db: Session,
+        *,
+        organization_id: Optional[int] = None,
+        branch_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        query = db.query(
+            func.coalesce(func.sum(SyncIngestionStats.ingested_count), 0).label("ingested"),
+            func.coalesce(func.sum(SyncIngestionStats.projected_count), 0).label("projected"),
+            func.coalesce(func.sum(SyncIngestionStats.failed_count), 0).label("failed"),
+            func.coalesce(func.sum(SyncIngestionStats.duplicate_count), 0).label("duplicates"),
+            func.max(SyncIngestionStats.last_received_at).label("last_received_at"),
+            func.max(SyncIngestionStats.last_projected_at).label("last_projected_at"),
+        )
+        if organization_id is not None:
+            query = query.filter(SyncIngestionStats.organization_id == organization_id)
+        if branch_id is not None:
+            query = query.filter(SyncIngestionStats.branch_id == branch_id)
+        return SyncIngestionStatsService._health(query.one())
+
+    @staticmethod
+    def totals_by_organization(db: Session) -> Dict[int, Dict[str, Any]]:
+        rows = db.query(
+            SyncIngestionStats.organization_id,
+            func.sum(SyncIngestionStats.ingested_count).label("ingested"),
+            func.sum(SyncIngestionStats.projected_count).label("projected"),
+            func.sum(SyncIngestionStats.failed_count).label("failed"),
+            func.sum(SyncIngestionStats.duplicate_count).label("duplicates"),
+            func.max(SyncIngestionStats.last_received_at).label("last_received_at"),
+            func.max(SyncIngestionStats.last_projected_at).label("last_projected_at"),
+        ).group_by(SyncIngestionStats.organization_id).all()
+        return {int(row.organization_id): SyncIngestionStatsService._health(row) for row in rows}
+
+    @staticmethod
+    def _health(row) -> Dict[str, Any]:
+        ingested = int(row.ingested or 0)
+        projected = int(row.projected or 0)
+        failed = int(row.failed or 0)
+        return {
+            "ingested_event_count": ingested,
+            "projected_event_count": projected,
+            "projection_failed_count": failed,
+            "unprojected_event_count": max(ingested - projected - failed, 0),
+            "duplicate_delivery_count": int(row.duplicates or 0),
+            "last_received_at": _aware(row.last_received_at),
+            "last_projected_at": _aware(row.last_projected_at),
+        }
+
+    @staticmethod
+    def _event_aggregates(db: Session, *filters: Any) -> Dict[StatsKey, Dict[str, Any]]:
+        rows = db.query(
+            IngestedSyncEvent.organization_id,
+            IngestedSyncEvent.branch_id,
+            IngestedSyncEvent.source_device_id,
+            func.count(IngestedSyncEvent.id).label("ingested_count"),
+            func.count(IngestedSyncEvent.projected_at).label("projected_count"),
+            func.count(IngestedSyncEvent.projection_error).label("failed_count"),
+            func.coalesce(func.sum(IngestedSyncEvent.duplicate_count), 0).label("duplicate_count"),
+            func.max(IngestedSyncEvent.received_at).label("last_received_at"),
+            func.max(IngestedSyncEvent.projected_at).label("last_projected_at"),
+        ).filter(*filters).group_by(
+            IngestedSyncEvent.organization_id,
+            IngestedSyncEvent.branch_id,
+            IngestedSyncEvent.source_device_id,
+        ).all()
+        return {
+            (int(row.organization_id), int(row.branch_id), int(row.source_device_id)): {
+                **{field: int(getattr(row, field) or 0) for field in COUNTER_FIELDS},
+                **{field: _aware(getattr(row, field)) for field in TIMESTAMP_FIELDS},
+            }
+            for row in rows
+        }
+
+    @staticmethod
+    def _stored(row: Optional[SyncIngestionStats]) -> Dict[str, Any]:
+        if row is None:
+            return {
+                **{field: 0 for field in COUNTER_FIELDS},
+                **{field: None for field in TIMESTAMP_FIELDS},
+            }
+        return {
+            **{field: int(getattr(row, field) or 0) for field in COUNTER_FIELDS},
+            **{field: _aware(getattr(row, field)) for field in TIMESTAMP_FIELDS},
+        }
+
+    @staticmethod
+    def _expected(
+        aggregates: Optional[Dict[str, Any]],
+        row: Optional[SyncIngestionStats],
+    ) -> Dict[str, Any]:
+        """Counter values implied by the live events plus the archived ones."""
+        expected = dict(aggregates or SyncIngestionStatsService._stored(None))
+        if row is None or not row.archived_count:
+            return expected
+        # Archived events were projected, so they count as ingested and
+        # projected; their timestamps survive only on the counter row.
+        expected["ingested_count"] += int(row.archived_count or 0)
+        expected["projected_count"] += int(row.archived_count or 0)
+        expected["duplicate_count"] += int(row.archived_duplicate_count or 0)
+        for field in TIMESTAMP_FIELDS:
+            values = [value for value in (expected[field], _aware(getattr(row, field))) if value is not None]
+            expected[field] = max(values) if values else None
+        return expected
+
+    @staticmethod
+    def reconcile(db: Session, *, repair: bool = True) -> Dict[str, int]:
+        """Compare the counters with the event log and repair any drift.
+
+        Mismatched sources are recomputed under a row lock on their counter
+        row, so an ingest racing the repair is counted exactly once. Events
+        moved to cold storage are accounted for by the row's ``archived_*``
+        columns, which reconciliation never rewrites.
+        """
+        actual = SyncIngestionStatsService._event_aggregates(db)
+        stored = {
+            (row.organization_id, row.branch_id, row.source_device_id): row
+            for row in db.query(SyncIngestionStats).all()
+        }
+        mismatched = [
+            key for key in set(actual) | set(stored)
+            if SyncIngestionStatsService._stored(stored.get(key))
+            != SyncIngestionStatsService._expected(actual.get(key), stored.get(key))
+        ]
+
+        repaired = 0
+        for key in sorted(mismatched):
+            organization_id, branch_id, source_device_id = key
+            logger.warning(
+                "Sync ingestion counters drifted for organization %s branch %s device %s",
+                organization_id,
+                branch_id,
+                source_device_id,
+            )
+            if not repair:
+                continue
+            row = db.query(SyncIngestionStats).filter(
+                SyncIngestionStats.organization_id == organization_id,
+                SyncIngestionStats.branch_id == branch_id,
+                SyncIngestionStats.source_device_id == source_device_id,
+            ).with_for_update().one_or_none()
+            values = SyncIngestionStatsService._expected(
+                SyncIngestionStatsService._event_aggregates(
+                    db,
+                    IngestedSyncEvent.organization_id == organization_id,
+                    IngestedSyncEvent.branch_id == branch_id,
+                    IngestedSyncEvent.source_device_id == source_device_id,
+                ).get(key),
+                row,
+            )
+            if row is None:
+                row = SyncIngestionStats(
+                    organization_id=organization_id,
+                    branch_id=branch_id,
+                    source_device_id=source_device_id,
+                )
+                db.add(row)
+            for field, value in values.items():
+                setattr(row, field, value)
+            db.commit()
+            repaired += 1
+
+        return {"checked": len(set(actual) | set(stored)), "mismatched": len(mismatched), "repaired": repaired}
@@ -3,10 +3,11 @@ Local sync upload worker helpers.
 """
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 import httpx
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -217,3 +218,29 @@ class SyncUploadService:
                 db.commit()
 
         return {"attempted": attempted, "sent": sent, "failed": failed, "skipped": skipped, "message": "Sync run complete"}
+
+    @staticmethod
+    def prune_acknowledged(db: Session, *, older_than_days: Optional[int] = None) -> dict[str, Any]:
+        """Delete SENT outbox rows the cloud acknowledged more than N days ago.
+
+        Only rows at or below the acknowledged watermark -- the sequence just
+        before the oldest event still awaiting delivery -- are removed, so the
+        retained outbox is always a contiguous tail. Sequence numbers come from
+        ``sync_event_counters`` and are never reused after a prune.
+        """
+        days = older_than_days if older_than_days is not None else settings.SYNC_OUTBOX_PRUNE_AFTER_DAYS
+        oldest_undelivered = db.query(func.min(SyncEvent.local_sequence_number)).filter(
+            SyncEvent.status != SyncEventStatus.SENT
+        ).scalar()
+        if oldest_undelivered is not None:
+            watermark = oldest_undelivered - 1
+        else:
+            watermark = db.query(func.max(SyncEvent.local_sequence_number)).scalar() or 0
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        deleted = db.query(SyncEvent).filter(
+            SyncEvent.status == SyncEventStatus.SENT,
+            SyncEvent.local_sequence_number <= watermark,
+            SyncEvent.acknowledged_at < cutoff,
+        ).delete(synchronize_session=False)
+        db.commit()
+        return {"watermark": watermark, "deleted": deleted}
@@ -516,6 +516,7 @@ def seed_tenant_database(
         admin.email = admin_email.lower()
         admin.full_name = admin_full_name
         admin.hashed_password = get_password_hash(tenant_secrets.admin_password)
+        admin.token_version = (admin.token_version or 0) + 1
         admin.branch_id = None
         admin.is_active = True
 
@@ -0,0 +1,312 @@
+"""
+Till ledger: per-shift running sales totals behind closeouts and summaries.
+
+Checkout books each sale into the cashier's open shift for the sale's UTC
+business day, opening one on the first sale if needed. Void/refund moves the
+sale from the completed totals into the refunded/cancelled totals of that
+same shift while it is open. Once the shift is closed its counted drawer is
+final, so the reversal is booked into the reversing user's open shift for the
+day of the reversal instead (``Sale.reversal_till_shift_id``): that drawer
+pays the refund out and that day's totals carry it. Every change is one
+relative UPDATE of a single shift row, so tills never contend on a shared
+counter and concurrent sales never lose an increment.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import and_, case, func, or_, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.app_mode import apply_tenant_scope, scope_query_to_user
+from app.core.config import settings
+from app.core.money import round_money, to_decimal
+from app.models.sale import PaymentMethod, Sale, SaleItem, SaleStatus
+from app.models.till_shift import TillShift, TillShiftStatus
+from app.models.user import User
+
+PAYMENT_COLUMNS = {
+    PaymentMethod.CASH: "cash_amount",
+    PaymentMethod.MOMO: "momo_amount",
+    PaymentMethod.CARD: "card_amount",
+    PaymentMethod.BANK_TRANSFER: "bank_transfer_amount",
+    PaymentMethod.CREDIT: "credit_amount",
+}
+STATUS_COLUMNS = {
+    SaleStatus.COMPLETED: ("completed_count", "completed_amount"),
+    SaleStatus.REFUNDED: ("refunded_count", "refunded_amount"),
+    SaleStatus.CANCELLED: ("cancelled_count", "cancelled_amount"),
+}
+COUNT_COLUMNS = ("completed_count", "refunded_count", "cancelled_count", "items_sold")
+TOTAL_COLUMNS = (
+    "completed_count",
+    "completed_amount",
+    "refunded_count",
+    "refunded_amount",
+    "cancelled_count",
+    "cancelled_amount",
+    *PAYMENT_COLUMNS.values(),
+    "items_sold",
+    "gross_profit",
+)
+
+LedgerTotals = Dict[str, Union[int, Decimal]]
+
+
+def business_date_of(moment: datetime) -> date:
+    """UTC business day a sale timestamp belongs to."""
+    if moment.tzinfo is None:
+        # SQLite hands back naive UTC timestamps.
+        return moment.date()
+    return moment.astimezone(timezone.utc).date()
+
+
+def _line_totals(items: Iterable[SaleItem]) -> tuple[int, Decimal]:
+    units = 0
+    profit = Decimal("0.00")
+    for item in items:
+        units += item.quantity
+        profit += (to_decimal(item.unit_price) - to_decimal(item.unit_cost or 0)) * item.quantity
+    return units, round_money(profit)
+
+
+class TillLedgerService:
+    """Maintain and read the per-shift till ledger."""
+
+    @staticmethod
+    def open_shift_for(db: Session, user: User, business_date: date) -> Optional[TillShift]:
+        """Return the user's open shift for ``business_date``, if any."""
+        query = scope_query_to_user(
+            db.query(TillShift),
+            TillShift,
+            user,
+            app_mode=settings.APP_MODE,
+        )
+        return query.filter(
+            TillShift.user_id == user.id,
+            TillShift.business_date == business_date,
+            TillShift.status == TillShiftStatus.OPEN,
+        ).order_by(TillShift.id.desc()).first()
+
+    @staticmethod
+    def open_shift(
+        db: Session,
+        user: User,
+        business_date: date,
+        opening_float: Decimal = Decimal("0.00"),
+    ) -> TillShift:
+        """Stage a new open shift for ``user``. Does not commit."""
+        shift = TillShift(
+            user_id=user.id,
+            business_date=business_date,
+            status=TillShiftStatus.OPEN,
+            opened_at=datetime.now(timezone.utc),
+            opening_float=round_money(opening_float),
+        )
+        apply_tenant_scope(shift, user, app_mode=settings.APP_MODE)
+        db.add(shift)
+        db.flush()
+        return shift
+
+    @staticmethod
+    def shift_for_sale(db: Session, user: User, business_date: date) -> TillShift:
+        """Return the shift a new sale is booked into, opening one if needed."""
+        return (
+            TillLedgerService.open_shift_for(db, user, business_date)
+            or TillLedgerService.open_shift(db, user, business_date)
+        )
+
+    @staticmethod
+    def record_sale(db: Session, sale: Sale, items: Iterable[SaleItem]) -> None:
+        """Add a completed sale to its shift's running totals."""
+        if sale.till_shift_id is None:
+            return
+        units, profit = _line_totals(items)
+        payment_column = PAYMENT_COLUMNS[sale.payment_method]
+        db.execute(
+            update(TillShift)
+            .where(TillShift.id == sale.till_shift_id)
+            .values({
+                "completed_count": TillShift.completed_count + 1,
+                "completed_amount": TillShift.completed_amount + sale.total_amount,
+                payment_column: getattr(TillShift, payment_column) + sale.total_amount,
+                "items_sold": TillShift.items_sold + units,
+                "gross_profit": TillShift.gross_profit + profit,
+            })
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def reverse_sale(
+        db: Session,
+        sale: Sale,
+        items: Iterable[SaleItem],
+        target_status: SaleStatus,
+        user: User,
+    ) -> None:
+        """
+        Move a completed sale into the refunded or cancelled totals.
+
+        The sale's own shift takes the reversal while it is open. A closed
+        shift is left as counted: the reversal goes into ``user``'s open
+        shift for today, which is recorded on the sale.
+        """
+        if sale.till_shift_id is None:
+            return
+        shift_id = sale.till_shift_id
+        booked_shift = db.get(TillShift, shift_id)
+        if booked_shift is None or booked_shift.status != TillShiftStatus.OPEN:
+            today = business_date_of(datetime.now(timezone.utc))
+            shift_id = TillLedgerService.shift_for_sale(db, user, today).id
+            sale.reversal_till_shift_id = shift_id
+        units, profit = _line_totals(items)
+        payment_column = PAYMENT_COLUMNS[sale.payment_method]
+        count_column, amount_column = STATUS_COLUMNS[target_status]
+        db.execute(
+            update(TillShift)
+            .where(TillShift.id == shift_id)
+            .values({
+                "completed_count": TillShift.completed_count - 1,
+                "completed_amount": TillShift.completed_amount - sale.total_amount,
+                payment_column: getattr(TillShift, payment_column) - sale.total_amount,
+                "items_sold": TillShift.items_sold - units,
+                "gross_profit": TillShift.gross_profit - profit,
+                count_column: getattr(TillShift, count_column) + 1,
+                amount_column: getattr(TillShift, amount_column) + sale.total_amount,
+            })
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def day_totals(db: Session, user: User, business_date: date) -> LedgerTotals:
+        """Sum the ledger over every shift of ``business_date`` visible to ``user``."""
+        query = db.query(*[
+            func.coalesce(func.sum(getattr(TillShift, column)), 0).label(column)
+            for column in TOTAL_COLUMNS
+        ])
+        query = scope_query_to_user(
+            query,
+            TillShift,
+            user,
+            app_mode=settings.APP_MODE,
+        )
+        row = query.filter(TillShift.business_date == business_date).one()
+        return _normalize_totals(row._mapping)
+
+    @staticmethod
+    def recompute_day_totals(db: Session, user: User, business_date: date) -> LedgerTotals:
+        """
+        Recompute ``day_totals`` from the raw sales, for drift checks.
+
+        Every sale rung up on the day counts as completed, and every reversal
+        booked on the day moves its sale from completed to refunded or
+        cancelled: a sale reversed in its own shift nets out on the day it was
+        rung up, one reversed after that shift closed on the reversal's day.
+        """
+        day_start = datetime.combine(business_date, time.min, tzinfo=timezone.utc)
+        day_end = day_start + timedelta(days=1)
+        rung_up = and_(
+            Sale.created_at >= day_start,
+            Sale.created_at < day_end,
+            Sale.status.in_(list(STATUS_COLUMNS)),
+        )
+        reversal_shift = aliased(TillShift)
+        reversed_today = and_(
+            Sale.status.in_([SaleStatus.REFUNDED, SaleStatus.CANCELLED]),
+            or_(
+                and_(
+                    Sale.reversal_till_shift_id.is_(None),
+                    Sale.created_at >= day_start,
+                    Sale.created_at < day_end,
+                ),
+                reversal_shift.business_date == business_date,
+            ),
+        )
+
+        def sale_sums(condition, prefix: str):
+            return [
+                func.coalesce(func.sum(case((condition, 1), else_=0)), 0).label(f"{prefix}count"),
+                func.coalesce(func.sum(case((condition, Sale.total_amount), else_=0)), 0).label(f"{prefix}amount"),
+                *[
+                    func.coalesce(
+                        func.sum(case((condition & (Sale.payment_method == method), Sale.total_amount), else_=0)),
+                        0,
+                    ).label(f"{prefix}{column}")
+                    for method, column in PAYMENT_COLUMNS.items()
+                ],
+            ]
+
+        def status_sums(sale_status: SaleStatus):
+            count_column, amount_column = STATUS_COLUMNS[sale_status]
+            matches = reversed_today & (Sale.status == sale_status)
+            return [
+                func.coalesce(func.sum(case((matches, 1), else_=0)), 0).label(count_column),
+                func.coalesce(func.sum(case((matches, Sale.total_amount), else_=0)), 0).label(amount_column),
+            ]
+
+        sales_query = db.query(
+            *sale_sums(rung_up, "rung_up_"),
+            *sale_sums(reversed_today, "reversed_"),
+            *status_sums(SaleStatus.REFUNDED),
+            *status_sums(SaleStatus.CANCELLED),
+        ).outerjoin(reversal_shift, reversal_shift.id == Sale.reversal_till_shift_id)
+        sales_query = scope_query_to_user(
+            sales_query,
+            Sale,
+            user,
+            app_mode=settings.APP_MODE,
+        )
+        sales = sales_query.filter(or_(rung_up, reversed_today)).one()._mapping
+
+        line_profit = (SaleItem.unit_price - func.coalesce(SaleItem.unit_cost, 0)) * SaleItem.quantity
+        items_query = db.query(
+            func.coalesce(func.sum(case((rung_up, SaleItem.quantity), else_=0)), 0).label("rung_up_items"),
+            func.coalesce(func.sum(case((reversed_today, SaleItem.quantity), else_=0)), 0).label("reversed_items"),
+            func.coalesce(func.sum(case((rung_up, line_profit), else_=0)), 0).label("rung_up_profit"),
+            func.coalesce(func.sum(case((reversed_today, line_profit), else_=0)), 0).label("reversed_profit"),
+        ).join(Sale, Sale.id == SaleItem.sale_id).outerjoin(
+            reversal_shift,
+            reversal_shift.id == Sale.reversal_till_shift_id,
+        )
+        items_query = scope_query_to_user(
+            items_query,
+            Sale,
+            user,
+            app_mode=settings.APP_MODE,
+        )
+        items = items_query.filter(or_(rung_up, reversed_today)).one()._mapping
+
+        totals = {
+            "completed_count": sales["rung_up_count"] - sales["reversed_count"],
+            "completed_amount": to_decimal(sales["rung_up_amount"]) - to_decimal(sales["reversed_amount"]),
+            "refunded_count": sales["refunded_count"],
+            "refunded_amount": sales["refunded_amount"],
+            "cancelled_count": sales["cancelled_count"],
+            "cancelled_amount": sales["cancelled_amount"],
+            "items_sold": items["rung_up_items"] - items["reversed_items"],
+            "gross_profit": to_decimal(items["rung_up_profit"]) - to_decimal(items["reversed_profit"]),
+        }
+        for column in PAYMENT_COLUMNS.values():
+            totals[column] = to_decimal(sales[f"rung_up_{column}"]) - to_decimal(sales[f"reversed_{column}"])
+        return _normalize_totals(totals)
+
+    @staticmethod
+    def drift(ledger: LedgerTotals, recomputed: LedgerTotals) -> List[dict]:
+        """List every ledger total that disagrees with the recomputed one."""
+        return [
+            {
+                "field": column,
+                "ledger": float(ledger[column]),
+                "recomputed": float(recomputed[column]),
+                "difference": float(ledger[column] - recomputed[column]),
+            }
+            for column in TOTAL_COLUMNS
+            if ledger[column] != recomputed[column]
+        ]
+
+
+def _normalize_totals(values) -> LedgerTotals:
+    return {
+        column: int(values[column] or 0) if column in COUNT_COLUMNS else round_money(values[column] or 0)
+        for column in TOTAL_COLUMNS
+    }
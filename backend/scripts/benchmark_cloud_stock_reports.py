@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Benchmark the cloud stock value and stock risk queries on a large tenant.
+
+Seeds a throwaway database (in-memory SQLite unless ``--database-url`` points
+at a scratch PostgreSQL) with ``--products`` product snapshots and one batch
+per product, then compares loading every snapshot into Python against the
+SQL aggregates used by ``CloudStockReportService``.
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, timedelta
+import json
+from pathlib import Path
+import random
+import sys
+import time
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.models.cloud_projection import CloudBatchSnapshot, CloudProductSnapshot  # noqa: E402
+from app.models.sync_event import SyncEventType  # noqa: E402
+from app.models.sync_ingestion import IngestedSyncEvent  # noqa: E402
+from app.models.tenancy import Branch, Device, DeviceStatus, Organization  # noqa: E402
+from app.services.cloud_stock_report_service import CloudStockReportService  # noqa: E402
+
+
+def _seed(session, *, products: int, branches: int) -> int:
+    organization = Organization(name="Benchmark Org")
+    session.add(organization)
+    session.flush()
+    branch_rows = [
+        Branch(organization_id=organization.id, name=f"Branch {index}", code=f"BR{index}")
+        for index in range(branches)
+    ]
+    session.add_all(branch_rows)
+    session.flush()
+    device = Device(
+        organization_id=organization.id,
+        branch_id=branch_rows[0].id,
+        device_uid="benchmark-device",
+        name="Benchmark Server",
+        status=DeviceStatus.ACTIVE,
+    )
+    session.add(device)
+    session.flush()
+    event = IngestedSyncEvent(
+        event_id="00000000-0000-4000-8000-000000000001",
+        organization_id=organization.id,
+        branch_id=branch_rows[0].id,
+        source_device_id=device.id,
+        deployment_uid=device.deployment_uid,
+        local_sequence_number=1,
+        event_type=SyncEventType.PRODUCT_CREATED,
+        aggregate_type="product",
+        aggregate_id=1,
+        aggregate_uid="benchmark-product-1",
+        schema_version=1,
+        payload={},
+        payload_hash="0" * 64,
+        duplicate_count=0,
+    )
+    session.add(event)
+    session.flush()
+
+    rng = random.Random(20261019)
+    today = date.today()
+    product_rows = []
+    batch_rows = []
+    for index in range(products):
+        branch_id = branch_rows[index % branches].id
+        product_rows.append(
+            {
+                "organization_id": organization.id,
+                "branch_id": branch_id,
+                "local_product_id": index,
+                "name": f"Product {index:06d}",
+                "sku": f"SKU-{index:06d}",
+                "total_stock": rng.randint(-2, 200),
+                "low_stock_threshold": 10,
+                "reorder_level": 25,
+                "cost_price": round(rng.uniform(0.5, 50), 2),
+                "selling_price": round(rng.uniform(1, 90), 2),
+                "is_active": rng.random() > 0.05,
+                "last_source_event_id": event.id,
+                "payload": {},
+            }
+        )
+        batch_rows.append(
+            {
+                "organization_id": organization.id,
+                "branch_id": branch_id,
+                "local_product_id": index,
+                "local_batch_id": index,
+                "batch_number": f"B-{index:06d}",
+                "quantity": rng.randint(0, 100),
+                "expiry_date": today + timedelta(days=rng.randint(-30, 720)),
+                "cost_price": round(rng.uniform(0.5, 50), 2),
+                "is_quarantined": False,
+                "last_source_event_id": event.id,
+                "payload": {},
+            }
+        )
+    for start in range(0, products, 10_000):
+        session.execute(insert(CloudProductSnapshot), product_rows[start:start + 10_000])
+        session.execute(insert(CloudBatchSnapshot), batch_rows[start:start + 10_000])
+    session.commit()
+    return organization.id
+
+
+def _python_loop_reports(session, organization_id: int, today: date, warning_date: date) -> None:
+    """The previous implementation: hydrate every snapshot and loop in Python."""
+    products = session.query(CloudProductSnapshot).filter(
+        CloudProductSnapshot.organization_id == organization_id,
+        CloudProductSnapshot.is_active.is_(True),
+    ).all()
+    batches = session.query(CloudBatchSnapshot).filter(
+        CloudBatchSnapshot.organization_id == organization_id,
+        CloudBatchSnapshot.quantity > 0,
+        CloudBatchSnapshot.is_quarantined.is_(False),
+    ).all()
+    sum(float(p.cost_price or 0) * max(p.total_stock, 0) for p in products if p.total_stock > 0)
+    sorted(
+        [p for p in products if p.total_stock <= p.low_stock_threshold],
+        key=lambda p: (p.total_stock, p.name),
+    )[:25]
+    sum(1 for b in batches if today <= b.expiry_date <= warning_date)
+    sorted([b for b in batches if b.expiry_date <= warning_date], key=lambda b: b.expiry_date)[:25]
+
+
+def _aggregate_reports(session, organization_id: int, today: date, warning_date: date) -> None:
+    scope = {"organization_id": organization_id, "branch_id": None}
+    CloudStockReportService.stock_value(session, **scope)
+    CloudStockReportService.product_risk_counts(session, **scope)
+    CloudStockReportService.batch_risk_counts(session, **scope, today=today, warning_date=warning_date)
+    CloudStockReportService.low_stock_products(session, **scope, limit=25)
+    CloudStockReportService.expiry_batches(session, **scope, today=today, warning_date=warning_date, limit=25)
+
+
+def _time(label: str, func, repeat: int) -> dict[str, float]:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return {"label": label, "best_ms": round(min(durations) * 1000, 1), "mean_ms": round(sum(durations) / repeat * 1000, 1)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--branches", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    engine_kwargs = {}
+    if args.database_url.startswith("sqlite"):
+        engine_kwargs = {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+    engine = create_engine(args.database_url, **engine_kwargs)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        organization_id = _seed(session, products=args.products, branches=args.branches)
+        today = date.today()
+        warning_date = today + timedelta(days=90)
+        results = [
+            _time(
+                "python_loops",
+                lambda: (_python_loop_reports(session, organization_id, today, warning_date), session.expunge_all()),
+                args.repeat,
+            ),
+            _time(
+                "sql_aggregates",
+                lambda: _aggregate_reports(session, organization_id, today, warning_date),
+                args.repeat,
+            ),
+        ]
+    finally:
+        session.close()
+        if args.database_url.startswith("sqlite"):
+            engine.dispose()
+    print(json.dumps({"products": args.products, "results": results}, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Benchmark the sales history listing on a large branch.
+
+Seeds a throwaway database (in-memory SQLite unless ``--database-url`` points
+at a scratch PostgreSQL) with ``--sales`` one-item sales spread over a year,
+then fetches a page of a month-wide date filter at increasing depths with the
+previous query (``func.date`` filters, ``OFFSET``, lazily loaded items) and
+with the current one (half-open ranges, keyset cursor, ``selectinload``).
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime, time as day_time, timedelta, timezone
+import json
+from pathlib import Path
+import sys
+import time
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.api.endpoints.sales import _encode_sale_cursor, list_sales  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.db.base import Base  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.models.category import Category  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.sale import Sale, SaleItem  # noqa: E402
+from app.models.tenancy import Branch, Organization  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+
+PAGE_SIZE = 50
+CHUNK = 20_000
+
+
+def _seed(session, *, sales: int, start: datetime) -> int:
+    organization = Organization(name="Benchmark Org")
+    session.add(organization)
+    session.flush()
+    branch = Branch(organization_id=organization.id, name="Benchmark Branch", code="BR0")
+    category = Category(name="Benchmark")
+    session.add_all([branch, category])
+    session.flush()
+    user = User(
+        username="bench",
+        email="bench@example.com",
+        hashed_password="x",
+        full_name="Bench",
+        role=UserRole.CASHIER,
+        organization_id=organization.id,
+        branch_id=branch.id,
+    )
+    product = Product(
+        organization_id=organization.id,
+        branch_id=branch.id,
+        name="Benchmark Product",
+        sku="BENCH-001",
+        category_id=category.id,
+        cost_price=1,
+        selling_price=2,
+    )
+    session.add_all([user, product])
+    session.flush()
+
+    step = timedelta(days=365) / sales
+    for first in range(0, sales, CHUNK):
+        ids = range(first + 1, min(first + CHUNK, sales) + 1)
+        session.execute(
+            insert(Sale),
+            [
+                {
+                    "id": sale_id,
+                    "organization_id": organization.id,
+                    "branch_id": branch.id,
+                    "invoice_number": f"INV-{sale_id:08d}",
+                    "user_id": user.id,
+                    "subtotal": 2,
+                    "total_amount": 2,
+                    "amount_paid": 2,
+                    "created_at": start + step * sale_id,
+                }
+                for sale_id in ids
+            ],
+        )
+        session.execute(
+            insert(SaleItem),
+            [
+                {
+                    "organization_id": organization.id,
+                    "branch_id": branch.id,
+                    "sale_id": sale_id,
+                    "product_id": product.id,
+                    "product_name": product.name,
+                    "quantity": 1,
+                    "unit_price": 2,
+                    "total_price": 2,
+                }
+                for sale_id in ids
+            ],
+        )
+    session.commit()
+    return user
+
+
+def _offset_page(session, branch_id: int, start_date: date, end_date: date, depth: int) -> int:
+    """The previous implementation."""
+    sales = session.query(Sale).filter(
+        Sale.branch_id == branch_id,
+        func.date(Sale.created_at) >= start_date,
+        func.date(Sale.created_at) <= end_date,
+    ).order_by(Sale.created_at.desc()).offset(depth).limit(PAGE_SIZE).all()
+    return sum(len(sale.items) for sale in sales)
+
+
+def _keyset_page(session, user, start_date: date, end_date: date, cursor) -> int:
+    sales = list_sales(
+        skip=0,
+        limit=PAGE_SIZE,
+        start_date=start_date,
+        end_date=end_date,
+        cursor=cursor,
+        db=session,
+        current_user=user,
+    )
+    return sum(len(sale.items) for sale in sales)
+
+
+def _cursor_at(session, start_date: date, end_date: date, depth: int):
+    if depth == 0:
+        return None
+    sale = session.query(Sale).filter(
+        Sale.created_at >= datetime.combine(start_date, day_time.min, tzinfo=timezone.utc),
+        Sale.created_at < datetime.combine(end_date + timedelta(days=1), day_time.min, tzinfo=timezone.utc),
+    ).order_by(Sale.created_at.desc(), Sale.id.desc()).offset(depth - 1).limit(1).one()
+    return _encode_sale_cursor(sale)
+
+
+def _time(func, repeat: int) -> dict[str, float]:
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return {"best_ms": round(min(durations) * 1000, 1), "mean_ms": round(sum(durations) / repeat * 1000, 1)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sales", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+    # Hosted mode, so the listing is scoped to the user's branch as in production.
+    settings.APP_MODE = "online_pos"
+
+    engine_kwargs = {}
+    if args.database_url.startswith("sqlite"):
+        engine_kwargs = {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+    engine = create_engine(args.database_url, **engine_kwargs)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    try:
+        seed_started = time.perf_counter()
+        user = _seed(session, sales=args.sales, start=start)
+        session.refresh(user)
+        seed_seconds = round(time.perf_counter() - seed_started, 1)
+        # The last full month of the seeded year: ~1/12 of all sales.
+        start_date, end_date = date(2026, 9, 1), date(2026, 9, 30)
+        month_sales = session.query(func.count(Sale.id)).filter(
+            Sale.created_at >= datetime.combine(start_date, day_time.min, tzinfo=timezone.utc),
+            Sale.created_at < datetime.combine(end_date + timedelta(days=1), day_time.min, tzinfo=timezone.utc),
+        ).scalar()
+        results = []
+        for depth in (0, month_sales // 10, month_sales // 2, max(month_sales - PAGE_SIZE, 0)):
+            cursor = _cursor_at(session, start_date, end_date, depth)
+            offset_timing = _time(
+                lambda: (_offset_page(session, user.branch_id, start_date, end_date, depth), session.expunge_all()),
+                args.repeat,
+            )
+            keyset_timing = _time(
+                lambda: (_keyset_page(session, user, start_date, end_date, cursor), session.expunge_all()),
+                args.repeat,
+            )
+            results.append({"depth": depth, "offset_lazy": offset_timing, "keyset_selectin": keyset_timing})
+    finally:
+        session.close()
+        if args.database_url.startswith("sqlite"):
+            engine.dispose()
+    print(
+        json.dumps(
+            {"sales": args.sales, "month_sales": month_sales, "seed_seconds": seed_seconds, "results": results},
+            sort_keys=True,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Time the hot request and job paths against a synthetic dataset.
+
+Seeds a throwaway database (in-memory SQLite unless ``--database-url`` points
+at an empty scratch PostgreSQL) with ``synthetic_dataset.py`` at ``--scale``,
+then times, in this order:
+
+- ``create_sale``: checkout of one to three in-stock products
+- ``product_search``: the paginated catalog search
+- ``dashboard_kpis``: the dashboard KPI cards
+- ``sync_ingest``: ``POST /sync/ingest`` of a new sale event
+- ``project_pending``: ``CloudProjectionService.project_pending`` batches
+  until every seeded event is projected
+- ``cloud_reconcile``: ``CloudReconciliationService.reconcile`` for one
+  organization
+- ``ai_briefing``: the deterministic AI manager briefing for one organization
+
+Endpoints run in hosted mode as a manager or cashier of the first branch,
+each call in its own session like a request. The results are printed as JSON
+and, with ``--output``, written to a file; pass an earlier file as
+``--baseline`` to add per-benchmark p50 ratios against it.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable
+import uuid
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.api.endpoints.dashboard import get_dashboard_kpis  # noqa: E402
+from app.api.endpoints.products import list_products_catalog  # noqa: E402
+from app.api.endpoints.sales import create_sale  # noqa: E402
+from app.api.endpoints.sync import ingest_sync_event  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.sync_event import SyncEventType  # noqa: E402
+from app.models.tenancy import Branch, Device, Organization  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.sale import SaleCreate, SaleItemCreate  # noqa: E402
+from app.schemas.sync_ingestion import SyncIngestionRequest  # noqa: E402
+from app.services.ai_briefing_service import AIBriefingService  # noqa: E402
+from app.services.cloud_projection_service import CloudProjectionService  # noqa: E402
+from app.services.cloud_reconciliation_service import CloudReconciliationService  # noqa: E402
+from app.services.sync_identity_service import build_aggregate_uid  # noqa: E402
+from app.services.sync_outbox_service import SyncOutboxService  # noqa: E402
+from synthetic_dataset import Dataset, DatasetProfile, FORMULARY, generate  # noqa: E402
+
+PROJECTION_BATCH = 500
+
+
+def _summary(durations: list[float]) -> dict[str, float]:
+    ordered = sorted(durations)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 2),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+def _measure(session_factory, repeat: int, call: Callable[[Any, int], Any]) -> dict[str, float]:
+    """Run ``call(session, run)`` ``repeat`` times, each in a fresh session."""
+    durations = []
+    for run in range(repeat):
+        session = session_factory()
+        try:
+            started = time.perf_counter()
+            call(session, run)
+            durations.append(time.perf_counter() - started)
+        finally:
+            session.close()
+    return _summary(durations)
+
+
+def _bench_create_sale(session_factory, dataset: Dataset, repeat: int, rng: random.Random) -> dict[str, float]:
+    branch = dataset.branches[0]
+    with session_factory() as session:
+        products = [
+            (row.id, float(row.selling_price))
+            for row in session.query(Product.id, Product.selling_price).filter(
+                Product.branch_id == branch.branch_id,
+                Product.is_active.is_(True),
+                Product.total_stock >= 3 * repeat,
+            ).order_by(Product.total_stock.desc()).limit(50)
+        ]
+    if not products:
+        raise RuntimeError("no product has enough stock for the create_sale runs; raise --scale")
+
+    def call(session, _run):
+        lines = rng.sample(products, min(len(products), rng.randint(1, 3)))
+        sale = SaleCreate(
+            items=[
+                SaleItemCreate(product_id=product_id, quantity=1, unit_price=price)
+                for product_id, price in lines
+            ],
+            amount_paid=sum(price for _product_id, price in lines),
+        )
+        create_sale(sale, db=session, current_user=session.get(User, branch.cashier_id))
+
+    return _measure(session_factory, repeat, call)
+
+
+def _bench_product_search(session_factory, dataset: Dataset, repeat: int) -> dict[str, float]:
+    branch = dataset.branches[0]
+    terms = [entry[0].split()[0][:5].lower() for entry in FORMULARY]
+
+    def call(session, run):
+        list_products_catalog(
+            q=terms[run % len(terms)],
+            skip=0,
+            limit=25,
+            category_id=None,
+            is_active=True,
+            db=session,
+            current_user=session.get(User, branch.cashier_id),
+        )
+
+    return _measure(session_factory, repeat, call)
+
+
+def _bench_dashboard_kpis(session_factory, dataset: Dataset, repeat: int) -> dict[str, float]:
+    branch = dataset.branches[0]
+
+    def call(session, _run):
+        get_dashboard_kpis(db=session, current_user=session.get(User, branch.manager_id))
+
+    return _measure(session_factory, repeat, call)
+
+
+def _bench_sync_ingest(session_factory, dataset: Dataset, repeat: int, rng: random.Random) -> dict[str, float]:
+    branch = dataset.branches[0]
+    device_id = branch.device_ids[0]
+    with session_factory() as session:
+        device = session.get(Device, device_id)
+        organization = session.get(Organization, branch.organization_id)
+        branch_row = session.get(Branch, branch.branch_id)
+        identity = {
+            "organization_id": branch.organization_id,
+            "branch_id": branch.branch_id,
+            "organization_uid": organization.organization_uid,
+            "branch_uid": branch_row.branch_uid,
+            "deployment_uid": device.deployment_uid,
+            "device_uid": device.device_uid,
+        }
+
+    def call(session, _run):
+        sequence = branch.next_sequence[device_id]
+        branch.next_sequence[device_id] += 1
+        # Local ids far above the seeded ones, as if rung up after seeding.
+        sale_id = 10_000_000 + sequence
+        payload = SyncOutboxService._json_safe({
+            "sale_id": sale_id,
+            "invoice_number": f"BENCH-{sequence:08d}",
+            "occurred_at": datetime.now(timezone.utc),
+            "payment_method": "cash",
+            "total_amount": "12.50",
+            "items": [],
+        })
+        request = SyncIngestionRequest(
+            **identity,
+            event_id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            local_sequence_number=sequence,
+            event_type=SyncEventType.SALE_CREATED,
+            aggregate_type="sale",
+            aggregate_id=sale_id,
+            aggregate_uid=build_aggregate_uid(identity["deployment_uid"], "sale", sale_id),
+            payload=payload,
+            payload_hash=SyncOutboxService._payload_hash(payload),
+        )
+        ingest_sync_event(request, authorization=None, db=session)
+
+    return _measure(session_factory, repeat, call)
+
+
+def _bench_project_pending(session_factory) -> dict[str, Any]:
+    durations = []
+    projected = 0
+    failed = 0
+    while True:
+        session = session_factory()
+        try:
+            started = time.perf_counter()
+            result = CloudProjectionService.project_pending(session, limit=PROJECTION_BATCH)
+            elapsed = time.perf_counter() - started
+        finally:
+            session.close()
+        if not result["attempted"]:
+            break
+        durations.append(elapsed)
+        projected += result["projected"]
+        failed += result["failed"]
+    summary = _summary(durations) if durations else {"runs": 0}
+    total = sum(durations)
+    return {
+        **summary,
+        "batch_size": PROJECTION_BATCH,
+        "projected": projected,
+        "failed": failed,
+        "events_per_second": round(projected / total, 1) if total else None,
+    }
+
+
+def _bench_cloud_reconcile(session_factory, dataset: Dataset, repeat: int) -> dict[str, float]:
+    organization_id = dataset.branches[0].organization_id
+
+    def call(session, _run):
+        CloudReconciliationService.reconcile(session, organization_id=organization_id, branch_id=None, limit=100)
+
+    return _measure(session_factory, repeat, call)
+
+
+def _bench_ai_briefing(session_factory, dataset: Dataset, repeat: int) -> dict[str, float]:
+    organization_id = dataset.branches[0].organization_id
+
+    def call(session, _run):
+        AIBriefingService.briefing(session, organization_id=organization_id, branch_id=None, period_days=30)
+
+    return _measure(session_factory, repeat, call)
+
+
+def _compare(benchmarks: dict[str, dict], baseline: dict[str, Any]) -> dict[str, dict[str, float]]:
+    comparison = {}
+    for name, result in benchmarks.items():
+        previous = baseline["benchmarks"].get(name, {}).get("p50_ms")
+        if previous and result.get("p50_ms") is not None:
+            comparison[name] = {
+                "baseline_p50_ms": previous,
+                "p50_ms": result["p50_ms"],
+                "p50_ratio": round(result["p50_ms"] / previous, 3),
+            }
+    return comparison
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--scale", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", type=Path, help="write the JSON results to this file")
+    parser.add_argument("--baseline", type=Path, help="earlier results file to compare against")
+    args = parser.parse_args()
+    # Hosted mode, so endpoints are scoped to the user's branch as in production.
+    settings.APP_MODE = "online_pos"
+    settings.CLOUD_SYNC_REQUIRE_TOKEN = False
+
+    engine_kwargs = {}
+    if args.database_url.startswith("sqlite"):
+        engine_kwargs = {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+    engine = create_engine(args.database_url, **engine_kwargs)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    rng = random.Random(args.seed)
+    try:
+        seed_started = time.perf_counter()
+        with session_factory() as session:
+            dataset = generate(session, DatasetProfile.for_scale(args.scale), seed=args.seed)
+        seed_seconds = round(time.perf_counter() - seed_started, 1)
+
+        benchmarks = {
+            "create_sale": _bench_create_sale(session_factory, dataset, args.repeat, rng),
+            "product_search": _bench_product_search(session_factory, dataset, args.repeat),
+            "dashboard_kpis": _bench_dashboard_kpis(session_factory, dataset, args.repeat),
+            "sync_ingest": _bench_sync_ingest(session_factory, dataset, args.repeat, rng),
+            "project_pending": _bench_project_pending(session_factory),
+            "cloud_reconcile": _bench_cloud_reconcile(session_factory, dataset, args.repeat),
+            "ai_briefing": _bench_ai_briefing(session_factory, dataset, args.repeat),
+        }
+    finally:
+        engine.dispose()
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "profile": asdict(dataset.profile),
+        "dataset": {**dataset.counts, "seed_seconds": seed_seconds},
+        "benchmarks": benchmarks,
+    }
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        # Ratios only mean something between runs of the same scale and database.
+        results["baseline"] = {key: baseline.get(key) for key in ("created_at", "database", "scale", "seed")}
+        results["comparison"] = _compare(benchmarks, baseline)
+    rendered = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(rendered + "\n")
+    print(rendered)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Checkout load test against a running backend.
+
+Simulates ``--concurrency`` tills creating one-item sales for ``--duration``
+seconds and prints throughput and latency percentiles as JSON. Run it once per
+``WEB_CONCURRENCY`` setting against a disposable PostgreSQL-backed deployment
+to see how checkout throughput scales with worker processes, for example::
+
+    WEB_CONCURRENCY=1 ./scripts/render_start.sh &
+    python scripts/load_test_checkout.py --username cashier --password ... --product-id 1
+    WEB_CONCURRENCY=4 ./scripts/render_start.sh &
+    python scripts/load_test_checkout.py --username cashier --password ... --product-id 1
+
+The product needs enough stock for every sale the run creates.
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import json
+import statistics
+import threading
+import time
+
+import httpx
+
+
+def _login(base_url: str, username: str, password: str) -> str:
+    response = httpx.post(
+        f"{base_url}/api/auth/login",
+        data={"username": username, "password": password},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def _till(
+    base_url: str,
+    token: str,
+    payload: dict,
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+    lock: threading.Lock,
+) -> None:
+    with httpx.Client(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=30,
+    ) as client:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status_code = client.post("/api/sales", json=payload).status_code
+            except httpx.HTTPError:
+                status_code = 0
+            elapsed = time.perf_counter() - started
+            with lock:
+                if status_code == 201:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(status_code)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--product-id", type=int, required=True)
+    parser.add_argument("--unit-price", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    token = _login(args.base_url, args.username, args.password)
+    payload = {
+        "payment_method": "cash",
+        "amount_paid": args.unit_price,
+        "items": [{"product_id": args.product_id, "quantity": 1, "unit_price": args.unit_price}],
+    }
+    latencies: list[float] = []
+    errors: list[int] = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(_till, args.base_url, token, payload, deadline, latencies, errors, lock)
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+
+    def percentile(fraction: float) -> float | None:
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 1)
+
+    print(
+        json.dumps(
+            {
+                "concurrency": args.concurrency,
+                "duration_seconds": round(elapsed, 1),
+                "completed_sales": len(latencies),
+                "failed_requests": len(errors),
+                "error_statuses": sorted(set(errors)),
+                "sales_per_second": round(len(latencies) / elapsed, 1),
+                "latency_ms": {
+                    "mean": round(statistics.mean(ordered) * 1000, 1) if ordered else None,
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "p99": percentile(0.99),
+                },
+            },
+            sort_keys=True,
+        )
+    )
+    return 0 if latencies else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Concurrent cloud report load test against a running backend.
+
+Runs ``--concurrency`` report clients cycling through the cloud report and AI
+briefing endpoints for ``--duration`` seconds, optionally while ``--tills``
+tills keep creating one-item sales, and prints report throughput plus report
+and checkout latency percentiles as JSON. Seed a disposable PostgreSQL
+database with ``scripts/synthetic_dataset.py`` and run it against the same
+data before and after a change to compare, for example::
+
+    python scripts/load_test_cloud_reports.py --username owner --password ... \\
+        --organization-id 1 --concurrency 64
+    python scripts/load_test_cloud_reports.py --username owner --password ... \\
+        --organization-id 1 --concurrency 64 --tills 8 --till-username cashier \\
+        --till-password ... --product-id 1
+
+The reports are ``async def`` routes on the asyncio engine, so report
+concurrency is bounded by ``DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW``
+rather than the 40 threadpool threads that checkout shares.
+"""
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import json
+import statistics
+import threading
+import time
+
+import httpx
+
+REPORT_PATHS = (
+    "/api/cloud-reports/sales-summary",
+    "/api/cloud-reports/stock-risk-summary",
+    "/api/cloud-reports/low-stock",
+    "/api/cloud-reports/expiry-risk",
+    "/api/cloud-reports/stock-velocity",
+    "/api/cloud-reports/revenue-comparison",
+    "/api/cloud-reports/dead-stock",
+    "/api/cloud-reports/profit-summary",
+    "/api/cloud-reports/stock-value",
+    "/api/cloud-reports/stockout-impact",
+    "/api/ai-manager/briefing",
+)
+
+
+def _login(base_url: str, username: str, password: str) -> str:
+    response = httpx.post(
+        f"{base_url}/api/auth/login",
+        data={"username": username, "password": password},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def _worker(
+    base_url: str,
+    token: str,
+    requests,
+    expected_status: int,
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+    lock: threading.Lock,
+) -> None:
+    with httpx.Client(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=60,
+    ) as client:
+        while time.perf_counter() < deadline:
+            method, path, kwargs = next(requests)
+            started = time.perf_counter()
+            try:
+                status_code = client.request(method, path, **kwargs).status_code
+            except httpx.HTTPError:
+                status_code = 0
+            elapsed = time.perf_counter() - started
+            with lock:
+                if status_code == expected_status:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(status_code)
+
+
+def _summary(latencies: list[float], errors: list[int], elapsed: float) -> dict:
+    ordered = sorted(latencies)
+
+    def percentile(fraction: float) -> float | None:
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 1)
+
+    return {
+        "completed": len(latencies),
+        "failed_requests": len(errors),
+        "error_statuses": sorted(set(errors)),
+        "per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.mean(ordered) * 1000, 1) if ordered else None,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--tills", type=int, default=0, help="Checkout clients running alongside the reports.")
+    parser.add_argument("--till-username")
+    parser.add_argument("--till-password")
+    parser.add_argument("--product-id", type=int)
+    parser.add_argument("--unit-price", type=float, default=1.0)
+    args = parser.parse_args()
+    if args.tills and not (args.till_username and args.till_password and args.product_id):
+        parser.error("--tills needs --till-username, --till-password and --product-id")
+
+    report_token = _login(args.base_url, args.username, args.password)
+    params = {"params": {"organization_id": args.organization_id}}
+    report_requests = itertools.cycle([("GET", path, params) for path in REPORT_PATHS])
+    report_latencies: list[float] = []
+    report_errors: list[int] = []
+
+    till_latencies: list[float] = []
+    till_errors: list[int] = []
+    if args.tills:
+        till_token = _login(args.base_url, args.till_username, args.till_password)
+        sale = {
+            "payment_method": "cash",
+            "amount_paid": args.unit_price,
+            "items": [{"product_id": args.product_id, "quantity": 1, "unit_price": args.unit_price}],
+        }
+        till_requests = itertools.repeat(("POST", "/api/sales", {"json": sale}))
+
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    with ThreadPoolExecutor(max_workers=args.concurrency + args.tills) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(
+                _worker, args.base_url, report_token, report_requests, 200,
+                deadline, report_latencies, report_errors, lock,
+            )
+        for _ in range(args.tills):
+            pool.submit(
+                _worker, args.base_url, till_token, till_requests, 201,
+                deadline, till_latencies, till_errors, lock,
+            )
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "concurrency": args.concurrency,
+        "duration_seconds": round(elapsed, 1),
+        "reports": _summary(report_latencies, report_errors, elapsed),
+    }
+    if args.tills:
+        result["tills"] = args.tills
+        result["checkout"] = _summary(till_latencies, till_errors, elapsed)
+    print(json.dumps(result, sort_keys=True))
+    return 0 if report_latencies else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,4 +4,6 @@ set -euo pipefail
 echo "Running database migrations..."
 python -m alembic upgrade head
 echo "Migrations complete. Starting server..."
-exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}"
+# WEB_CONCURRENCY > 1 runs several worker processes; scheduled jobs still run
+# in exactly one of them (see SCHEDULER_LEADER_ELECTION).
+exec uvicorn app.main:app --host 0.0.0.0 --port "${PORT:-8000}" --workers "${WEB_CONCURRENCY:-1}"
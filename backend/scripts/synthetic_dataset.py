@@ -0,0 +1,713 @@
+#!/usr/bin/env python3
+"""Generate a synthetic multi-branch pharmacy dataset at a chosen scale.
+
+``--scale 1`` is four branches of a mid-sized pharmacy, two per organization:
+400 products, 300 customers and ~40 sales a day for 90 days per branch, a
+branch server plus a till device, and the sync events those devices would
+have uploaded. Volumes grow linearly with the scale: more branches above 0.25,
+smaller branches below it.
+
+The data follows the shapes that matter for performance. Product demand is
+Zipf-distributed. Sales cluster in the morning and evening peaks, and sales
+are thinner on Sundays. Each product's batches are received over the history
+with staggered expiries. Each sale line draws from its product's batches
+first-expiry-first-out, the same as checkout, so old batches run down,
+some expire with stock on hand, and a few sit in quarantine. Every stock
+change is mirrored in ``inventory_movements`` and in an unprojected
+``ingested_sync_events`` row, so the cloud projection can rebuild the same
+state.
+
+Point ``--database-url`` at an empty scratch database. In-memory SQLite is
+only useful when imported by ``benchmark_suite.py``, which seeds and measures
+in the same process.
+"""
+from __future__ import annotations
+
+import argparse
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate
+import json
+import logging
+from pathlib import Path
+import random
+import sys
+import time
+import uuid
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, insert, update  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.security import get_password_hash  # noqa: E402
+from app.db.base import Base  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.models.category import Category  # noqa: E402
+from app.models.customer import Customer, normalize_phone  # noqa: E402
+from app.models.inventory_movement import InventoryMovement, InventoryMovementType  # noqa: E402
+from app.models.product import DosageForm, PrescriptionStatus, Product, ProductBatch  # noqa: E402
+from app.models.sale import PaymentMethod, Sale, SaleItem, SaleStatus  # noqa: E402
+from app.models.sync_event import SyncEventType  # noqa: E402
+from app.models.sync_ingestion import IngestedSyncEvent  # noqa: E402
+from app.models.till_shift import TillShift, TillShiftStatus  # noqa: E402
+from app.models.tenancy import Branch, Device, DeviceStatus, Organization  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.services.till_ledger_service import PAYMENT_COLUMNS  # noqa: E402
+from app.services.sync_identity_service import build_aggregate_uid  # noqa: E402
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService  # noqa: E402
+from app.services.sync_outbox_service import SyncOutboxService  # noqa: E402
+
+CHUNK = 5_000
+
+# (generic name, strengths, dosage form, category, prescription status)
+FORMULARY = (
+    ("Paracetamol", ("500mg", "1g"), DosageForm.TABLET, "Analgesics", PrescriptionStatus.OTC),
+    ("Ibuprofen", ("200mg", "400mg"), DosageForm.TABLET, "Analgesics", PrescriptionStatus.OTC),
+    ("Diclofenac", ("50mg", "75mg"), DosageForm.TABLET, "Analgesics", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Amoxicillin", ("250mg", "500mg"), DosageForm.CAPSULE, "Antibiotics", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Ciprofloxacin", ("500mg",), DosageForm.TABLET, "Antibiotics", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Metronidazole", ("200mg", "400mg"), DosageForm.TABLET, "Antibiotics", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Artemether/Lumefantrine", ("20/120mg", "80/480mg"), DosageForm.TABLET, "Antimalarials", PrescriptionStatus.OTC),
+    ("Artesunate/Amodiaquine", ("100/270mg",), DosageForm.TABLET, "Antimalarials", PrescriptionStatus.OTC),
+    ("Amlodipine", ("5mg", "10mg"), DosageForm.TABLET, "Cardiovascular", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Lisinopril", ("10mg", "20mg"), DosageForm.TABLET, "Cardiovascular", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Metformin", ("500mg", "850mg"), DosageForm.TABLET, "Antidiabetics", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Glibenclamide", ("5mg",), DosageForm.TABLET, "Antidiabetics", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Omeprazole", ("20mg",), DosageForm.CAPSULE, "Gastrointestinal", PrescriptionStatus.OTC),
+    ("Oral Rehydration Salts", ("20.5g",), DosageForm.POWDER, "Gastrointestinal", PrescriptionStatus.OTC),
+    ("Loperamide", ("2mg",), DosageForm.CAPSULE, "Gastrointestinal", PrescriptionStatus.OTC),
+    ("Cough Syrup", ("100ml", "200ml"), DosageForm.SYRUP, "Cough & Cold", PrescriptionStatus.OTC),
+    ("Cetirizine", ("10mg",), DosageForm.TABLET, "Cough & Cold", PrescriptionStatus.OTC),
+    ("Vitamin C", ("500mg", "1000mg"), DosageForm.TABLET, "Vitamins & Supplements", PrescriptionStatus.OTC),
+    ("Multivitamin", ("200ml",), DosageForm.SYRUP, "Vitamins & Supplements", PrescriptionStatus.OTC),
+    ("Ferrous Sulphate", ("200mg",), DosageForm.TABLET, "Vitamins & Supplements", PrescriptionStatus.OTC),
+    ("Folic Acid", ("5mg",), DosageForm.TABLET, "Vitamins & Supplements", PrescriptionStatus.OTC),
+    ("Hydrocortisone Cream", ("1%",), DosageForm.CREAM, "Dermatology", PrescriptionStatus.OTC),
+    ("Clotrimazole Cream", ("1%",), DosageForm.CREAM, "Dermatology", PrescriptionStatus.OTC),
+    ("Salbutamol Inhaler", ("100mcg",), DosageForm.INHALER, "Respiratory", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+    ("Chloramphenicol Eye Drops", ("0.5%",), DosageForm.DROPS, "Ophthalmic", PrescriptionStatus.PRESCRIPTION_REQUIRED),
+)
+MANUFACTURERS = ("Ernest Chemists", "Kinapharma", "Letap", "Tobinco", "Danadams", "M&G", "Entrance", "Pharmanova")
+FIRST_NAMES = ("Kwame", "Ama", "Kofi", "Akosua", "Yaw", "Abena", "Kojo", "Efua", "Kwabena", "Adwoa", "Kwesi", "Esi")
+LAST_NAMES = ("Mensah", "Owusu", "Boateng", "Asante", "Osei", "Agyeman", "Appiah", "Darko", "Ofori", "Addo")
+# Relative checkout volume by hour of day; the pharmacy opens 7:00-21:00.
+HOUR_WEIGHTS = {7: 3, 8: 6, 9: 9, 10: 10, 11: 9, 12: 7, 13: 6, 14: 5, 15: 6, 16: 8, 17: 10, 18: 9, 19: 6, 20: 3}
+# Monday..Sunday
+WEEKDAY_FACTORS = (1.0, 0.95, 0.95, 1.0, 1.1, 1.15, 0.6)
+PAYMENT_WEIGHTS = ((PaymentMethod.CASH, 58), (PaymentMethod.MOMO, 35), (PaymentMethod.CARD, 5), (PaymentMethod.CREDIT, 2))
+LINES_PER_SALE_WEIGHTS = (55, 28, 12, 5)
+QUANTITY_WEIGHTS = (50, 25, 10, 6, 4, 3, 2)
+
+
+@dataclass(frozen=True)
+class DatasetProfile:
+    """Row volumes for one generated dataset."""
+
+    scale: float
+    organizations: int
+    branches_per_organization: int
+    devices_per_branch: int
+    products_per_branch: int
+    max_batches_per_product: int
+    customers_per_branch: int
+    sales_per_day: int
+    history_days: int
+
+    @classmethod
+    def for_scale(cls, scale: float) -> "DatasetProfile":
+        if scale <= 0:
+            raise ValueError("scale must be positive")
+        branches = max(1, round(4 * scale))
+        # Below one full branch, shrink the branch instead of rounding it away.
+        size = min(1.0, 4 * scale)
+        return cls(
+            scale=scale,
+            organizations=max(1, (branches + 1) // 2),
+            branches_per_organization=min(branches, 2),
+            devices_per_branch=2,
+            products_per_branch=max(10, round(400 * size)),
+            max_batches_per_product=4,
+            customers_per_branch=max(5, round(300 * size)),
+            sales_per_day=max(2, round(40 * size)),
+            history_days=90,
+        )
+
+
+@dataclass
+class BranchManifest:
+    """Identifiers a benchmark needs to act inside one generated branch."""
+
+    organization_id: int
+    branch_id: int
+    manager_id: int
+    cashier_id: int
+    device_ids: list[int]
+    device_uids: list[str]
+    next_sequence: dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class Dataset:
+    profile: DatasetProfile
+    seed: int
+    generated_at: datetime
+    branches: list[BranchManifest]
+    counts: dict[str, int]
+
+
+class _EventLog:
+    """Per-device sync events, numbered in the order the device recorded them."""
+
+    def __init__(self, rng: random.Random) -> None:
+        self._rng = rng
+        self.pending: list[dict] = []
+
+    def add(self, device: dict, occurred_at: datetime, event_type: SyncEventType, aggregate_type: str,
+            aggregate_id: int, payload: dict) -> None:
+        safe_payload = SyncOutboxService._json_safe(payload)
+        self.pending.append({
+            "_device": device,
+            "_occurred_at": occurred_at,
+            "event_id": str(uuid.UUID(int=self._rng.getrandbits(128), version=4)),
+            "organization_id": device["organization_id"],
+            "branch_id": device["branch_id"],
+            "source_device_id": device["id"],
+            "deployment_uid": device["deployment_uid"],
+            "event_type": event_type,
+            "aggregate_type": aggregate_type,
+            "aggregate_id": aggregate_id,
+            "aggregate_uid": build_aggregate_uid(device["deployment_uid"], aggregate_type, aggregate_id),
+            "schema_version": 1,
+            "payload": safe_payload,
+            "payload_hash": SyncOutboxService._payload_hash(safe_payload),
+            "duplicate_count": 0,
+        })
+
+    def rows(self) -> list[dict]:
+        """Assign sequences per device and upload times after each occurrence."""
+        self.pending.sort(key=lambda row: (row["_occurred_at"], row["aggregate_type"] != "product"))
+        rows = []
+        for row in self.pending:
+            device = row.pop("_device")
+            occurred_at = row.pop("_occurred_at")
+            row["local_sequence_number"] = device["next_sequence"]
+            device["next_sequence"] += 1
+            # Mostly uploaded within a minute; a few wait out a connectivity gap.
+            delay = self._rng.uniform(2, 60) if self._rng.random() < 0.97 else self._rng.uniform(600, 4 * 3600)
+            row["received_at"] = occurred_at + timedelta(seconds=delay)
+            rows.append(row)
+        self.pending = []
+        return rows
+
+
+def _insert_returning_ids(db: Session, model, rows: list[dict]) -> list[int]:
+    ids: list[int] = []
+    for first in range(0, len(rows), CHUNK):
+        result = db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows[first:first + CHUNK],
+        )
+        ids.extend(row.id for row in result)
+    return ids
+
+
+def _insert(db: Session, model, rows: list[dict]) -> None:
+    for first in range(0, len(rows), CHUNK):
+        db.execute(insert(model), rows[first:first + CHUNK])
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(str(round(value, 2)))
+
+
+def _seed_catalog(db, rng, branch: dict, profile: DatasetProfile, categories: dict[str, int], start: datetime,
+                  now: datetime, events: _EventLog, server: dict) -> list[dict]:
+    products = []
+    for index in range(profile.products_per_branch):
+        generic, strengths, dosage_form, category, prescription_status = FORMULARY[index % len(FORMULARY)]
+        strength = strengths[(index // len(FORMULARY)) % len(strengths)]
+        manufacturer = MANUFACTURERS[(index // len(FORMULARY)) % len(MANUFACTURERS)]
+        pack = 1 + index // (len(FORMULARY) * len(MANUFACTURERS))
+        cost_price = round(10 ** rng.uniform(-0.3, 1.9), 2)
+        products.append({
+            "organization_id": branch["organization_id"],
+            "branch_id": branch["id"],
+            "name": f"{generic} {strength} ({manufacturer})" + (f" x{pack * 10}" if pack > 1 else ""),
+            "generic_name": generic,
+            "sku": f"SYN-{branch['id']:03d}-{index:05d}",
+            "barcode": f"{rng.getrandbits(40):013d}",
+            "dosage_form": dosage_form,
+            "strength": strength,
+            "prescription_status": prescription_status,
+            "manufacturer": manufacturer,
+            "cost_price": _money(cost_price),
+            "selling_price": _money(cost_price * rng.uniform(1.25, 1.6)),
+            "total_stock": 0,
+            "low_stock_threshold": rng.choice((5, 10, 20)),
+            "reorder_level": rng.choice((20, 30, 50)),
+            "reorder_quantity": rng.choice((50, 100, 200)),
+            "category_id": categories[category],
+            # A few discontinued lines stay in the catalog.
+            "is_active": rng.random() >= 0.03,
+            "created_at": start,
+        })
+    for product, product_id in zip(products, _insert_returning_ids(db, Product, products)):
+        product["id"] = product_id
+
+    # Zipf-like demand: a few fast movers, a long tail of slow ones.
+    ranks = list(range(1, len(products) + 1))
+    rng.shuffle(ranks)
+    daily_units = profile.sales_per_day * 2.2
+    total_weight = sum(1 / rank ** 1.1 for rank in ranks)
+    batches = []
+    for product, rank in zip(products, ranks):
+        product["weight"] = 1 / rank ** 1.1
+        product["daily_demand"] = daily_units * product["weight"] / total_weight
+        events.add(server, start, SyncEventType.PRODUCT_CREATED, "product", product["id"], {
+            "product_id": product["id"],
+            "name": product["name"],
+            "sku": product["sku"],
+            "barcode": product["barcode"],
+            "category_id": product["category_id"],
+            "cost_price": product["cost_price"],
+            "selling_price": product["selling_price"],
+            "total_stock": 0,
+            "low_stock_threshold": product["low_stock_threshold"],
+            "reorder_level": product["reorder_level"],
+            "is_active": product["is_active"],
+        })
+
+        # Receipts spread over the history, each with a fresh expiry: older
+        # batches expire first, which is the order FEFO sells them in.
+        shelf_life_days = rng.choice((365, 540, 730, 1095))
+        batch_count = rng.randint(1, profile.max_batches_per_product)
+        gap_days = (profile.history_days + 60) / batch_count
+        for batch_index in range(batch_count):
+            received = start.date() - timedelta(days=60) + timedelta(days=round(gap_days * batch_index))
+            age_days = rng.randint(0, shelf_life_days * 2 // 5)
+            expiry = received + timedelta(days=shelf_life_days - age_days)
+            if batch_index == 0 and rng.random() < 0.08:
+                # Short-dated stock bought cheap: expired or expiring soon.
+                expiry = now.date() + timedelta(days=rng.randint(-30, 60))
+            quantity = max(10, round(product["daily_demand"] * gap_days * rng.uniform(1.0, 1.5)))
+            batches.append({
+                "organization_id": branch["organization_id"],
+                "branch_id": branch["id"],
+                "product_id": product["id"],
+                "batch_number": f"B{received:%y%m}-{rng.getrandbits(20):06X}",
+                "quantity": quantity,
+                "manufacture_date": received - timedelta(days=age_days),
+                "expiry_date": expiry,
+                "cost_price": product["cost_price"],
+                "received_date": received,
+                "is_quarantined": rng.random() < 0.01,
+                "created_at": datetime.combine(received, datetime.min.time(), tzinfo=timezone.utc),
+            })
+    for batch, batch_id in zip(batches, _insert_returning_ids(db, ProductBatch, batches)):
+        batch["id"] = batch_id
+        batch["remaining"] = batch["quantity"]
+
+    by_product: dict[int, list[dict]] = {}
+    for batch in batches:
+        by_product.setdefault(batch["product_id"], []).append(batch)
+    movements = []
+    for product in products:
+        product["batches"] = sorted(by_product.get(product["id"], []), key=lambda b: (b["expiry_date"], b["id"]))
+        stock = 0
+        for batch in sorted(product["batches"], key=lambda b: b["received_date"]):
+            stock += batch["quantity"]
+            movements.append({
+                "organization_id": branch["organization_id"],
+                "branch_id": branch["id"],
+                "source_device_id": server["id"],
+                "product_id": product["id"],
+                "batch_id": batch["id"],
+                "movement_type": InventoryMovementType.INITIAL_BATCH_STOCK,
+                "quantity_delta": batch["quantity"],
+                "stock_after": stock,
+                "source_document_type": "product_batch",
+                "source_document_id": batch["id"],
+                "created_at": batch["created_at"],
+            })
+            events.add(server, max(batch["created_at"], start), SyncEventType.PRODUCT_BATCH_CREATED,
+                       "product_batch", batch["id"], {
+                           "product_id": product["id"],
+                           "batch_id": batch["id"],
+                           "batch_number": batch["batch_number"],
+                           "quantity": batch["quantity"],
+                           "expiry_date": batch["expiry_date"],
+                           "cost_price": batch["cost_price"],
+                           "is_quarantined": batch["is_quarantined"],
+                           "stock_after": stock,
+                       })
+    _insert(db, InventoryMovement, movements)
+    return products
+
+
+def _seed_customers(db, rng, branch: dict, profile: DatasetProfile, start: datetime) -> list[dict]:
+    customers = []
+    for index in range(profile.customers_per_branch):
+        phone = f"024{branch['id'] % 10}{index:06d}"
+        customers.append({
+            "organization_id": branch["organization_id"],
+            "branch_id": branch["id"],
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "phone": phone,
+            "phone_normalized": normalize_phone(phone),
+            "is_active": rng.random() >= 0.05,
+            "created_at": start - timedelta(days=rng.randint(0, 365)),
+        })
+    for customer, customer_id in zip(customers, _insert_returning_ids(db, Customer, customers)):
+        customer["id"] = customer_id
+        customer["purchase_count"] = 0
+        customer["lifetime_spend"] = Decimal("0.00")
+        customer["last_purchase_at"] = None
+    return customers
+
+
+def _allocate(product: dict, quantity: int, sold_on: date) -> list[tuple[dict, int]]:
+    """FEFO over the batches received and unexpired on the sale date."""
+    allocations = []
+    for batch in product["batches"]:
+        if quantity <= 0:
+            break
+        if (
+            batch["remaining"] <= 0
+            or batch["is_quarantined"]
+            or batch["received_date"] > sold_on
+            or batch["expiry_date"] < sold_on
+        ):
+            continue
+        take = min(batch["remaining"], quantity)
+        batch["remaining"] -= take
+        quantity -= take
+        allocations.append((batch, take))
+    return allocations
+
+
+def _seed_sales(db, rng, branch: dict, profile: DatasetProfile, products: list[dict], customers: list[dict],
+                cashier_id: int, devices: list[dict], start: datetime, now: datetime, events: _EventLog) -> int:
+    cumulative_weights = list(accumulate(product["weight"] for product in products))
+    hours, hour_weights = zip(*HOUR_WEIGHTS.items())
+    methods, method_weights = zip(*PAYMENT_WEIGHTS)
+    sale_rows: list[dict] = []
+    line_rows: list[list[dict]] = []
+    # One closed till shift per day for the branch cashier, as checkout keeps it.
+    shifts: dict[date, dict] = {}
+    for day in range(profile.history_days):
+        sold_on = (start + timedelta(days=day)).date()
+        count = round(profile.sales_per_day * WEEKDAY_FACTORS[sold_on.weekday()] * rng.uniform(0.8, 1.2))
+        times = sorted(
+            datetime.combine(sold_on, datetime.min.time(), tzinfo=timezone.utc)
+            + timedelta(hours=rng.choices(hours, hour_weights)[0], seconds=rng.randint(0, 3599))
+            for _ in range(count)
+        )
+        times = [created_at for created_at in times if created_at < now]
+        for created_at in times:
+            lines = []
+            for _ in range(rng.choices((1, 2, 3, 4), LINES_PER_SALE_WEIGHTS)[0]):
+                product = products[bisect_left(cumulative_weights, rng.random() * cumulative_weights[-1])]
+                if not product["is_active"]:
+                    continue
+                quantity = rng.choices(range(1, len(QUANTITY_WEIGHTS) + 1), QUANTITY_WEIGHTS)[0]
+                for batch, taken in _allocate(product, quantity, sold_on):
+                    lines.append((product, batch, taken))
+            if not lines:
+                continue
+            subtotal = sum((product["selling_price"] * taken for product, _batch, taken in lines), Decimal("0.00"))
+            customer = rng.choice(customers) if rng.random() < 0.3 else None
+            device = devices[0] if rng.random() < 0.4 else rng.choice(devices[1:] or devices)
+            method = rng.choices(methods, method_weights)[0]
+            shift = shifts.setdefault(sold_on, {
+                "organization_id": branch["organization_id"],
+                "branch_id": branch["id"],
+                "user_id": cashier_id,
+                "business_date": sold_on,
+                "status": TillShiftStatus.CLOSED,
+                "opened_at": created_at,
+                "closed_at": created_at,
+                "completed_count": 0,
+                "completed_amount": Decimal("0.00"),
+                **{column: Decimal("0.00") for column in PAYMENT_COLUMNS.values()},
+                "items_sold": 0,
+                "gross_profit": Decimal("0.00"),
+            })
+            shift["closed_at"] = created_at
+            shift["completed_count"] += 1
+            shift["completed_amount"] += subtotal
+            shift[PAYMENT_COLUMNS[method]] += subtotal
+            shift["items_sold"] += sum(taken for _product, _batch, taken in lines)
+            shift["gross_profit"] += sum(
+                ((product["selling_price"] - product["cost_price"]) * taken for product, _batch, taken in lines),
+                Decimal("0.00"),
+            )
+            sale_rows.append({
+                "organization_id": branch["organization_id"],
+                "branch_id": branch["id"],
+                "source_device_id": device["id"],
+                "invoice_number": f"SYN-{branch['id']:03d}-{len(sale_rows) + 1:08d}",
+                "status": SaleStatus.COMPLETED,
+                "subtotal": subtotal,
+                "discount_amount": Decimal("0.00"),
+                "tax_amount": Decimal("0.00"),
+                "total_amount": subtotal,
+                "payment_method": method,
+                "amount_paid": subtotal,
+                "change_amount": Decimal("0.00"),
+                "customer_id": customer["id"] if customer else None,
+                "user_id": cashier_id,
+                "till_shift_date": sold_on,
+                "created_at": created_at,
+            })
+            line_rows.append(lines)
+            if customer:
+                customer["purchase_count"] += 1
+                customer["lifetime_spend"] += subtotal
+                customer["last_purchase_at"] = created_at
+
+    shift_ids = dict(zip(shifts, _insert_returning_ids(db, TillShift, list(shifts.values()))))
+    for sale in sale_rows:
+        sale["till_shift_id"] = shift_ids[sale.pop("till_shift_date")]
+    sale_ids = _insert_returning_ids(db, Sale, sale_rows)
+    items = []
+    movements = []
+    devices_by_id = {device["id"]: device for device in devices}
+    stock = {product["id"]: sum(batch["quantity"] for batch in product["batches"]) for product in products}
+    for sale, sale_id, lines in zip(sale_rows, sale_ids, line_rows):
+        payload_items = []
+        for product, batch, taken in lines:
+            stock[product["id"]] -= taken
+            line = {
+                "organization_id": branch["organization_id"],
+                "branch_id": branch["id"],
+                "sale_id": sale_id,
+                "product_id": product["id"],
+                "product_name": product["name"],
+                "dosage_form": product["dosage_form"].value,
+                "strength": product["strength"],
+                "batch_number": batch["batch_number"],
+                "expiry_date": batch["expiry_date"],
+                "quantity": taken,
+                "unit_price": product["selling_price"],
+                "unit_cost": product["cost_price"],
+                "discount_amount": Decimal("0.00"),
+                "total_price": product["selling_price"] * taken,
+            }
+            items.append(line)
+            movements.append({
+                "organization_id": branch["organization_id"],
+                "branch_id": branch["id"],
+                "source_device_id": sale["source_device_id"],
+                "product_id": product["id"],
+                "batch_id": batch["id"],
+                "movement_type": InventoryMovementType.SALE_DISPENSED,
+                "quantity_delta": -taken,
+                "stock_after": stock[product["id"]],
+                "source_document_type": "sale",
+                "source_document_id": sale_id,
+                "created_by": cashier_id,
+                "created_at": sale["created_at"],
+            })
+            payload_items.append({
+                "product_id": product["id"],
+                "product_name": product["name"],
+                "sku": product["sku"],
+                "batch_id": batch["id"],
+                "batch_number": batch["batch_number"],
+                "expiry_date": batch["expiry_date"],
+                "quantity": taken,
+                "unit_price": line["unit_price"],
+                "total_price": line["total_price"],
+            })
+        events.add(devices_by_id[sale["source_device_id"]], sale["created_at"], SyncEventType.SALE_CREATED,
+                   "sale", sale_id, {
+                       "sale_id": sale_id,
+                       "invoice_number": sale["invoice_number"],
+                       "occurred_at": sale["created_at"].isoformat(),
+                       "pricing_mode": "retail",
+                       "payment_method": sale["payment_method"].value,
+                       "subtotal": sale["subtotal"],
+                       "discount_amount": sale["discount_amount"],
+                       "tax_amount": sale["tax_amount"],
+                       "total_amount": sale["total_amount"],
+                       "user_id": cashier_id,
+                       "items": payload_items,
+                   })
+    _insert(db, SaleItem, items)
+    _insert(db, InventoryMovement, movements)
+
+    # Sellable stock as checkout computes it: unexpired, not quarantined.
+    today = now.date()
+    sold_batches = [
+        {"id": batch["id"], "quantity": batch["remaining"]}
+        for product in products for batch in product["batches"]
+        if batch["remaining"] != batch["quantity"]
+    ]
+    if sold_batches:
+        db.execute(update(ProductBatch), sold_batches)
+    db.execute(update(Product), [
+        {
+            "id": product["id"],
+            "total_stock": sum(
+                batch["remaining"] for batch in product["batches"]
+                if not batch["is_quarantined"] and batch["expiry_date"] >= today
+            ),
+        }
+        for product in products
+    ])
+    buyers = [
+        {
+            "id": customer["id"],
+            "purchase_count": customer["purchase_count"],
+            "lifetime_spend": customer["lifetime_spend"],
+            "last_purchase_at": customer["last_purchase_at"],
+        }
+        for customer in customers if customer["purchase_count"]
+    ]
+    if buyers:
+        db.execute(update(Customer), buyers)
+    return len(sale_rows)
+
+
+def generate(db: Session, profile: DatasetProfile, *, seed: int = 0, now: datetime | None = None) -> Dataset:
+    """Seed ``db`` with a synthetic dataset and return what was created."""
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    start = (now - timedelta(days=profile.history_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    # One bcrypt hash for every generated user keeps seeding fast.
+    hashed_password = get_password_hash("synthetic-password")
+
+    category_names = sorted({entry[3] for entry in FORMULARY})
+    category_rows = [Category(name=name) for name in category_names]
+    db.add_all(category_rows)
+    db.flush()
+    categories = {row.name: row.id for row in category_rows}
+
+    manifests: list[BranchManifest] = []
+    counts = {"products": 0, "batches": 0, "customers": 0, "sales": 0, "sync_events": 0}
+    events = _EventLog(rng)
+    for org_index in range(profile.organizations):
+        organization = Organization(name=f"Synthetic Pharmacy {org_index + 1}")
+        db.add(organization)
+        db.flush()
+        for branch_index in range(profile.branches_per_organization):
+            branch = Branch(
+                organization_id=organization.id,
+                name=f"Synthetic Branch {org_index + 1}-{branch_index + 1}",
+                code=f"SYN{branch_index + 1:02d}",
+            )
+            db.add(branch)
+            db.flush()
+            tag = f"{org_index + 1}-{branch_index + 1}"
+            users = {
+                role: User(
+                    username=f"synthetic-{role.value}-{tag}",
+                    email=f"synthetic-{role.value}-{tag}@example.com",
+                    hashed_password=hashed_password,
+                    full_name=f"Synthetic {role.value.title()} {tag}",
+                    role=role,
+                    organization_id=organization.id,
+                    branch_id=branch.id,
+                    is_active=True,
+                )
+                for role in (UserRole.MANAGER, UserRole.CASHIER)
+            }
+            device_rows = [
+                Device(
+                    organization_id=organization.id,
+                    branch_id=branch.id,
+                    device_uid=f"synthetic-{tag}-{'server' if index == 0 else f'till-{index}'}",
+                    deployment_uid=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                    name="Branch Server" if index == 0 else f"Till {index}",
+                    status=DeviceStatus.ACTIVE,
+                )
+                for index in range(profile.devices_per_branch)
+            ]
+            db.add_all([*users.values(), *device_rows])
+            db.flush()
+
+            branch_row = {"id": branch.id, "organization_id": organization.id}
+            devices = [
+                {
+                    "id": device.id,
+                    "organization_id": organization.id,
+                    "branch_id": branch.id,
+                    "deployment_uid": device.deployment_uid,
+                    "next_sequence": 1,
+                }
+                for device in device_rows
+            ]
+            products = _seed_catalog(db, rng, branch_row, profile, categories, start, now, events, devices[0])
+            customers = _seed_customers(db, rng, branch_row, profile, start)
+            cashier_id = users[UserRole.CASHIER].id
+            counts["sales"] += _seed_sales(
+                db, rng, branch_row, profile, products, customers, cashier_id, devices, start, now, events
+            )
+            event_rows = events.rows()
+            _insert(db, IngestedSyncEvent, event_rows)
+            db.commit()
+
+            counts["products"] += len(products)
+            counts["batches"] += sum(len(product["batches"]) for product in products)
+            counts["customers"] += len(customers)
+            counts["sync_events"] += len(event_rows)
+            manifests.append(BranchManifest(
+                organization_id=organization.id,
+                branch_id=branch.id,
+                manager_id=users[UserRole.MANAGER].id,
+                cashier_id=cashier_id,
+                device_ids=[device["id"] for device in devices],
+                device_uids=[device.device_uid for device in device_rows],
+                next_sequence={device["id"]: device["next_sequence"] for device in devices},
+            ))
+
+    # The events bypassed ingest, so build their sync-health counters now.
+    # Every device starts without a counter row; skip the drift warnings.
+    logging.disable(logging.WARNING)
+    try:
+        SyncIngestionStatsService.reconcile(db)
+    finally:
+        logging.disable(logging.NOTSET)
+    counts["organizations"] = profile.organizations
+    counts["branches"] = len(manifests)
+    counts["devices"] = sum(len(manifest.device_ids) for manifest in manifests)
+    return Dataset(profile=profile, seed=seed, generated_at=now, branches=manifests, counts=counts)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="empty scratch database to seed")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--create-schema", action="store_true", help="create tables instead of using migrations")
+    args = parser.parse_args()
+
+    engine_kwargs = {}
+    if args.database_url.startswith("sqlite"):
+        engine_kwargs = {"connect_args": {"check_same_thread": False}, "poolclass": StaticPool}
+    engine = create_engine(args.database_url, **engine_kwargs)
+    if args.create_schema:
+        Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        started = time.perf_counter()
+        dataset = generate(session, DatasetProfile.for_scale(args.scale), seed=args.seed)
+        seconds = round(time.perf_counter() - started, 1)
+    finally:
+        session.close()
+        engine.dispose()
+    print(json.dumps(
+        {"profile": asdict(dataset.profile), "counts": dataset.counts, "seed_seconds": seconds},
+        sort_keys=True,
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
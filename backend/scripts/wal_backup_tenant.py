@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Incremental (base backup + WAL) backups for the configured hosted tenant.
+
+    wal_backup_tenant.py base-backup
+    wal_backup_tenant.py archive-wal %p %f        # archive_command
+    wal_backup_tenant.py restore-wal %f %p        # restore_command
+    wal_backup_tenant.py status
+    wal_backup_tenant.py prepare-restore --target-time ISO --data-dir DIR
+    wal_backup_tenant.py prune
+"""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+import json
+from pathlib import Path
+import shlex
+import sys
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.hosted_backup_service import HostedBackupConfig  # noqa: E402
+from app.services.hosted_wal_archive_service import (  # noqa: E402
+    archive_wal_segment,
+    create_base_backup,
+    describe_chain,
+    fetch_wal_segment,
+    list_archived_wal,
+    list_chains,
+    prepare_point_in_time_restore,
+    prune_wal_chains,
+)
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("base-backup")
+    archive = commands.add_parser("archive-wal")
+    archive.add_argument("path")
+    archive.add_argument("file_name")
+    restore = commands.add_parser("restore-wal")
+    restore.add_argument("file_name")
+    restore.add_argument("path")
+    commands.add_parser("status")
+    prepare = commands.add_parser("prepare-restore")
+    prepare.add_argument("--target-time", required=True)
+    prepare.add_argument("--data-dir", required=True)
+    prepare.add_argument("--chain-id")
+    commands.add_parser("prune")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    config = HostedBackupConfig.from_env()
+
+    if args.command == "base-backup":
+        result = create_base_backup(config)
+    elif args.command == "archive-wal":
+        result = archive_wal_segment(config, Path(args.path), file_name=args.file_name)
+    elif args.command == "restore-wal":
+        # A non-zero exit tells recovery the file is not in the archive.
+        return 0 if fetch_wal_segment(config, args.file_name, Path(args.path)) else 1
+    elif args.command == "status":
+        archived = list_archived_wal(config)
+        result = {
+            "chains": [
+                describe_chain(config, chain, archived_wal=archived)
+                for chain in list_chains(config)
+            ],
+            "archived_wal_files": len(archived),
+        }
+    elif args.command == "prepare-restore":
+        restore_command = " ".join(
+            [shlex.quote(sys.executable), shlex.quote(str(Path(__file__).resolve())), "restore-wal", "%f", "%p"]
+        )
+        result = prepare_point_in_time_restore(
+            config,
+            target_time=datetime.fromisoformat(args.target_time),
+            data_dir=Path(args.data_dir),
+            restore_command=restore_command,
+            chain_id=args.chain_id,
+        )
+    else:
+        result = prune_wal_chains(config, keep=config.base_retention_count)
+
+    print(json.dumps(result, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 import os
+from contextlib import contextmanager
 from datetime import date, timedelta
 from pathlib import Path
 import sys
 
 import pytest
-from sqlalchemy import create_engine, text
+import pytest_asyncio
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from app.db.base import Base
+from app.db.base import Base, async_database_url
 from app.core.config import settings
 from app.core.security import get_password_hash
 from app.models import Branch, Category, Organization, Product, ProductBatch, User
@@ -21,6 +24,9 @@ from app.models.user import UserRole
 
 _TEST_DB_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
 _IS_POSTGRES = _TEST_DB_URL.startswith("postgresql")
+# A named shared-cache database, so the async reporting engine opens the same
+# in-memory tables the sync test session writes.
+_SQLITE_SHARED_URL = "sqlite:///file:pos_tests?mode=memory&cache=shared&uri=true"
 _TEST_DEPLOYMENT_PROFILE = os.getenv(
     "TEST_POS_DEPLOYMENT_PROFILE",
     "offline",
@@ -43,6 +49,46 @@ def _pin_operational_test_profile(monkeypatch):
     )
 
 
+@pytest.fixture(autouse=True)
+def _clear_ai_response_cache():
+    """Keep cached provider answers from leaking between tests."""
+    from app.services.ai_response_cache import response_cache
+
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_principal_cache():
+    """Keep cached principals from leaking between tests that reuse user ids."""
+    from app.services.principal_cache import principal_cache
+
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_metrics():
+    """Keep recorded request and job metrics from leaking between tests."""
+    from app.core.metrics import metrics
+
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_read_replica_lag():
+    """Keep a measured replica lag from leaking between tests."""
+    from app.db.read_replica import read_replica_router
+
+    read_replica_router.clear()
+    yield
+    read_replica_router.clear()
+
+
 @pytest.fixture(scope="session")
 def _engine():
     if _IS_POSTGRES:
@@ -50,7 +96,7 @@ def _engine():
     else:
         # StaticPool keeps the same in-memory connection alive for the whole session
         engine = create_engine(
-            "sqlite:///:memory:",
+            _SQLITE_SHARED_URL,
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
         )
@@ -60,6 +106,62 @@ def _engine():
     engine.dispose()
 
 
+@pytest.fixture(scope="session")
+def _async_engine(_engine):
+    # NullPool: each test runs on its own event loop, so connections are not reused across loops.
+    engine = create_async_engine(
+        async_database_url(_TEST_DB_URL if _IS_POSTGRES else _SQLITE_SHARED_URL),
+        poolclass=NullPool,
+    )
+    if not _IS_POSTGRES:
+        @event.listens_for(engine.sync_engine, "connect")
+        def _read_uncommitted(dbapi_connection, _record):
+            # Shared-cache readers otherwise hit table locks while the sync
+            # test session holds an open write transaction.
+            dbapi_connection.execute("PRAGMA read_uncommitted = 1")
+
+    return engine
+
+
+@pytest_asyncio.fixture()
+async def async_db(_async_engine, db_session):
+    """Async session for the ``async def`` reporting routes, on the test database."""
+    async with AsyncSession(_async_engine, autoflush=False, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest.fixture()
+def read_replica(monkeypatch, _engine, _async_engine):
+    """
+    Route reporting reads through a replica router whose "replica" is a second
+    set of connections to the test database, so routed reads see test data.
+    """
+    from app.db import read_replica as read_replica_module
+
+    if _IS_POSTGRES:
+        engine = create_engine(_TEST_DB_URL, poolclass=NullPool)
+    else:
+        engine = create_engine(
+            _SQLITE_SHARED_URL,
+            connect_args={"check_same_thread": False},
+            poolclass=NullPool,
+        )
+
+        @event.listens_for(engine, "connect")
+        def _read_uncommitted(dbapi_connection, _record):
+            dbapi_connection.execute("PRAGMA read_uncommitted = 1")
+
+    router = read_replica_module.ReadReplicaRouter(
+        engine,
+        _async_engine,
+        max_lag_seconds=30,
+        check_interval_seconds=60,
+    )
+    monkeypatch.setattr(read_replica_module, "read_replica_router", router)
+    yield router
+    engine.dispose()
+
+
 @pytest.fixture()
 def db_session(_engine):
     session = sessionmaker(autocommit=False, autoflush=False, bind=_engine)()
@@ -80,6 +182,46 @@ def db_session(_engine):
                     conn.execute(table.delete())
 
 
+class QueryCounter:
+    """SQL statements captured while a ``count_queries`` block ran."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __str__(self) -> str:
+        return "\n".join(
+            f"{index}. {' '.join(statement.split())}"
+            for index, statement in enumerate(self.statements, start=1)
+        )
+
+
+@contextmanager
+def count_queries(*engines):
+    """Count the statements ``engines`` execute inside the block."""
+    counter = QueryCounter()
+
+    def capture(_conn, _cursor, statement, _parameters, _context, _executemany):
+        counter.statements.append(statement)
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield counter
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", capture)
+
+
+@pytest.fixture()
+def query_counter(_engine, _async_engine):
+    """``with query_counter() as queries:`` counts the test engines' statements."""
+    return lambda: count_queries(_engine, _async_engine.sync_engine)
+
+
 @pytest.fixture()
 def tenant_scope(db_session):
     if _TEST_DEPLOYMENT_PROFILE != "hosted":
@@ -2,15 +2,21 @@ from __future__ import annotations
 
 import hashlib
 import json
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
 
-from app.api.endpoints.admin_tenancy import get_command_center
+from sqlalchemy import event as sa_event
+
+from app.api.endpoints.admin_tenancy import get_command_center, list_organizations
+from app.core.config import settings
 from app.models import Branch, Device, Organization
+from app.models.cloud_projection import CloudBatchSnapshot, CloudFleetSummary, CloudProductSnapshot, CloudSaleFact
 from app.models.sync_event import SyncEventType
 from app.models.sync_ingestion import IngestedSyncEvent
 from app.models.tenancy import DeviceStatus
 from app.services.cloud_projection_service import CloudProjectionService
 from app.services.sync_identity_service import build_aggregate_uid
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 
 def _hash(payload: dict) -> str:
@@ -82,3 +88,205 @@ def test_command_center_surfaces_heartbeat_readiness(db_session, admin_user):
     assert command.organizations[0].readiness_status == "critical"
     assert command.organizations[0].heartbeat_critical_count == 1
     assert any(item.kind == "heartbeat_critical" for item in command.attention)
+
+
+def _add_pharmacy(db_session, name: str, *, devices: int = 1, last_seen_at=None) -> Organization:
+    organization = Organization(name=name)
+    db_session.add(organization)
+    db_session.flush()
+    branch = Branch(organization_id=organization.id, name=f"{name} Main", code="MAIN")
+    db_session.add(branch)
+    db_session.flush()
+    for index in range(devices):
+        db_session.add(Device(
+            organization_id=organization.id,
+            branch_id=branch.id,
+            device_uid=f"{name.lower().replace(' ', '-')}-{index}",
+            name=f"{name} Till {index}",
+            status=DeviceStatus.ACTIVE,
+            last_seen_at=last_seen_at,
+        ))
+    db_session.commit()
+    return organization
+
+
+def _count_statements(db_session, func):
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    engine = db_session.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", count)
+    try:
+        result = func()
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", count)
+    return result, len(statements)
+
+
+def test_command_center_query_count_does_not_grow_with_fleet(db_session, admin_user):
+    now = datetime.now(timezone.utc)
+    alpha_org = _add_pharmacy(db_session, "Alpha", last_seen_at=now)
+    baseline, small_fleet = _count_statements(
+        db_session, lambda: get_command_center(expiry_warning_days=90, db=db_session, _=admin_user)
+    )
+
+    for index in range(6):
+        _add_pharmacy(db_session, f"Pharmacy {index}", devices=3, last_seen_at=now - timedelta(days=2))
+    db_session.add(Branch(organization_id=alpha_org.id, name="Empty Branch", code="EMPTY"))
+    db_session.commit()
+    db_session.expire_all()
+
+    command, large_fleet = _count_statements(
+        db_session, lambda: get_command_center(expiry_warning_days=90, db=db_session, _=admin_user)
+    )
+    organizations, listing = _count_statements(
+        db_session, lambda: list_organizations(active_only=False, db=db_session, _=admin_user)
+    )
+
+    assert large_fleet == small_fleet
+    assert command.totals.total_pharmacies - baseline.totals.total_pharmacies == 6
+    assert command.totals.total_devices - baseline.totals.total_devices == 18
+    assert command.totals.stale_devices - baseline.totals.stale_devices == 18
+    assert command.totals.synced_last_24h == baseline.totals.synced_last_24h
+    assert command.totals.branches_without_devices - baseline.totals.branches_without_devices == 1
+    assert len(command.attention) == 16
+    assert command.attention[0].kind == "branch_without_device"
+    alpha = next(org for org in command.organizations if org.organization_name == "Alpha")
+    assert (alpha.branch_count, alpha.device_count, alpha.sync_status) == (2, 1, "fresh")
+    assert listing == 3
+    assert [org.device_count for org in organizations if org.name == "Alpha"] == [1]
+
+
+def test_command_center_business_pulse_from_grouped_aggregates(db_session, admin_user):
+    organization = _add_pharmacy(db_session, "Pulse")
+    branch = db_session.query(Branch).filter(Branch.organization_id == organization.id).one()
+    device = db_session.query(Device).filter(Device.organization_id == organization.id).one()
+    now = datetime.now(timezone.utc)
+    today_start = datetime.combine(now.date(), datetime.min.time(), tzinfo=timezone.utc)
+    sale_times = [now, today_start - timedelta(hours=2), now - timedelta(days=3), now - timedelta(days=9)]
+    for index, occurred_at in enumerate(sale_times, start=1):
+        ingested = IngestedSyncEvent(
+            event_id=f"56565656-5656-5656-5656-{index:012d}",
+            organization_id=organization.id,
+            branch_id=branch.id,
+            source_device_id=device.id,
+            deployment_uid=device.deployment_uid,
+            local_sequence_number=index,
+            event_type=SyncEventType.SALE_CREATED,
+            aggregate_type="sale",
+            aggregate_id=index,
+            aggregate_uid=build_aggregate_uid(device.deployment_uid, "sale", index),
+            schema_version=1,
+            payload={},
+            payload_hash=_hash({"index": index}),
+            projected_at=now,
+            projection_error="bad payload" if index == 4 else None,
+        )
+        db_session.add(ingested)
+        db_session.flush()
+        db_session.add(CloudSaleFact(
+            source_event_id=ingested.id,
+            organization_id=organization.id,
+            branch_id=branch.id,
+            source_device_id=device.id,
+            local_sale_id=index,
+            invoice_number=f"INV-{index}",
+            total_amount=Decimal("10.00") * index,
+            payload={},
+            occurred_at=occurred_at,
+        ))
+    snapshot_fields = {
+        "organization_id": organization.id,
+        "branch_id": branch.id,
+        "last_source_event_id": ingested.id,
+        "payload": {},
+    }
+    for index, stock in enumerate([0, 5, 50], start=1):
+        db_session.add(CloudProductSnapshot(
+            **snapshot_fields,
+            local_product_id=index,
+            name=f"Product {index}",
+            sku=f"SKU-{index}",
+            total_stock=stock,
+            low_stock_threshold=10,
+        ))
+    today = date.today()
+    for index, (expiry, quantity) in enumerate(
+        [(today - timedelta(days=1), 4), (today + timedelta(days=30), 2), (today + timedelta(days=400), 9)],
+        start=1,
+    ):
+        db_session.add(CloudBatchSnapshot(
+            **snapshot_fields,
+            local_product_id=index,
+            local_batch_id=index,
+            batch_number=f"B-{index}",
+            quantity=quantity,
+            expiry_date=expiry,
+            cost_price=Decimal("2.50"),
+        ))
+    db_session.commit()
+    SyncIngestionStatsService.reconcile(db_session)
+
+    command = get_command_center(expiry_warning_days=90, db=db_session, _=admin_user)
+
+    assert command.money.today_sales_count == 1
+    assert command.money.today_revenue == 10.0
+    assert command.money.yesterday_sales_count == 1
+    assert command.money.yesterday_revenue == 20.0
+    assert command.money.trailing_7d_sales_count == 3
+    assert command.money.trailing_7d_revenue == 60.0
+    assert command.data_trust.ingested_event_count == 4
+    assert command.data_trust.projection_failed_count == 1
+    assert command.data_trust.status == "unsafe"
+    assert command.stock_risk.out_of_stock_products == 1
+    assert command.stock_risk.low_stock_products == 1
+    assert command.stock_risk.quantity_on_hand == 55
+    assert command.stock_risk.expired_batches == 1
+    assert command.stock_risk.near_expiry_batches == 1
+    assert command.stock_risk.value_at_risk == 15.0
+    summary = next(org for org in command.organizations if org.organization_id == organization.id)
+    assert (summary.today_revenue, summary.trailing_7d_revenue, summary.projection_failed_count) == (10.0, 60.0, 1)
+
+
+def test_fleet_summary_is_refreshed_on_heartbeat_projection_and_served_while_fresh(
+    db_session,
+    admin_user,
+    monkeypatch,
+):
+    monkeypatch.setattr(settings, "ADMIN_FLEET_SUMMARY_CACHE_ENABLED", True)
+    organization = _add_pharmacy(db_session, "Cached", last_seen_at=datetime.now(timezone.utc))
+    device = db_session.query(Device).filter(Device.organization_id == organization.id).one()
+    payload = {"device_uid": device.device_uid, "server_time": datetime.now(timezone.utc).isoformat(), "readiness_status": "ready"}
+    db_session.add(IngestedSyncEvent(
+        event_id="78787878-7878-7878-7878-787878787878",
+        organization_id=organization.id,
+        branch_id=device.branch_id,
+        source_device_id=device.id,
+        deployment_uid=device.deployment_uid,
+        local_sequence_number=1,
+        event_type=SyncEventType.SYSTEM_HEARTBEAT,
+        aggregate_type="system",
+        aggregate_id=None,
+        aggregate_uid=build_aggregate_uid(device.deployment_uid, "system", None),
+        schema_version=1,
+        payload=payload,
+        payload_hash=_hash(payload),
+    ))
+    db_session.commit()
+
+    CloudProjectionService.project_pending(db_session)
+
+    stored = db_session.query(CloudFleetSummary).one()
+    assert stored.payload["totals"]["heartbeat_ready_devices"] == 1
+
+    # A device added without a heartbeat projection is not in the stored copy yet.
+    _add_pharmacy(db_session, "Uncached")
+    command = get_command_center(expiry_warning_days=90, db=db_session, _=admin_user)
+    assert command.totals.total_devices == stored.payload["totals"]["total_devices"]
+    assert command.totals.heartbeat_ready_devices == 1
+
+    monkeypatch.setattr(settings, "ADMIN_FLEET_SUMMARY_MAX_AGE_SECONDS", 0)
+    command = get_command_center(expiry_warning_days=90, db=db_session, _=admin_user)
+    assert command.totals.total_devices == stored.payload["totals"]["total_devices"] + 1
@@ -30,8 +30,11 @@ from app.models.sync_ingestion import IngestedSyncEvent
 from app.models.tenancy import DeviceStatus
 from app.models.user import User, UserPermission, UserRole
 from app.schemas.ai_manager import AIExternalProviderSettingUpsert, AIFindingStatusUpdate, AIManagerChatRequest
+from app.services.ai_briefing_service import AIBriefingService
 from app.services.ai_llm_provider import AIManagerLLMProvider
+from app.services.ai_manager_service import AIManagerService
 from app.services.sync_identity_service import build_aggregate_uid
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 from app.services.telegram_alert_service import TelegramAlertService
 from app.api.endpoints.ai_manager import _ai_chat_calls
 
@@ -204,6 +207,7 @@ def _seed_facts(db_session, organization, branch_a, branch_b, device_a, device_b
         ]
     )
     db_session.commit()
+    SyncIngestionStatsService.reconcile(db_session)
 
 
 def test_ai_manager_answers_from_cloud_reporting_data(db_session):
@@ -781,7 +785,7 @@ def test_server_configured_external_ai_uses_available_api_key_without_tenant_pol
     monkeypatch.setattr(settings, "AI_MANAGER_MODEL", "")
     monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
 
-    def _fake_tool_answer(*, message, system_prompt, tools, tool_dispatcher, conversation_history, provider, model, fallback_summary):
+    def _fake_tool_answer(*, message, system_prompt, tools, tool_dispatcher, conversation_history, provider, model, fallback_summary, **cache_kwargs):
         return {"answer": "External Groq summary.", "provider": provider, "model": model, "fallback_used": False}
 
     monkeypatch.setattr(AIManagerLLMProvider, "generate_answer_with_tools", _fake_tool_answer)
@@ -810,7 +814,7 @@ def test_external_ai_numeric_claims_are_verified_before_return(monkeypatch, db_s
     monkeypatch.setattr(settings, "AI_MANAGER_MODEL", "")
     monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
 
-    def _fake_wrong_answer(*, message, system_prompt, tools, tool_dispatcher, conversation_history, provider, model, fallback_summary):
+    def _fake_wrong_answer(*, message, system_prompt, tools, tool_dispatcher, conversation_history, provider, model, fallback_summary, **cache_kwargs):
         return {
             "answer": "For all branches, revenue is GHS 9999.00.",
             "provider": provider,
@@ -851,7 +855,7 @@ def test_external_ai_tool_trace_is_returned(monkeypatch, db_session):
     monkeypatch.setattr(settings, "AI_MANAGER_MODEL", "")
     monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
 
-    def _fake_trace_answer(*, message, system_prompt, tools, tool_dispatcher, conversation_history, provider, model, fallback_summary):
+    def _fake_trace_answer(*, message, system_prompt, tools, tool_dispatcher, conversation_history, provider, model, fallback_summary, **cache_kwargs):
         result = tool_dispatcher("get_sales_summary", {"period": "period"})
         return {
             "answer": "For all branches in the last 30 day(s), revenue is GHS 400.00 from 2 sale(s).",
@@ -930,7 +934,8 @@ def test_branch_manager_cannot_change_tenant_external_ai_settings(db_session):
     assert exc.value.status_code == 403
 
 
-def test_ai_manager_briefing_returns_findings_for_critical_stock(db_session):
+@pytest.mark.asyncio
+async def test_ai_manager_briefing_returns_findings_for_critical_stock(async_db, db_session):
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     _seed_facts(db_session, organization, branch_a, branch_b, device_a, device_b)
     manager = _manager(db_session, organization.id, username="briefing-manager")
@@ -955,13 +960,13 @@ def test_ai_manager_briefing_returns_findings_for_critical_stock(db_session):
     )
     db_session.commit()
 
-    briefing = get_ai_manager_briefing(
+    briefing = await get_ai_manager_briefing(
         organization_id=organization.id,
         branch_id=None,
         period_days=30,
         max_findings=5,
         persist=False,
-        db=db_session,
+        db=async_db,
         current_user=manager,
     )
 
@@ -972,27 +977,43 @@ def test_ai_manager_briefing_returns_findings_for_critical_stock(db_session):
     assert "sync_failure" in finding_types, "Projection failure must be flagged in briefing"
 
 
-def test_ai_manager_briefing_respects_branch_scope(db_session):
+@pytest.mark.asyncio
+async def test_concurrent_briefing_matches_the_sequential_briefing(async_db, db_session):
+    organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
+    _seed_facts(db_session, organization, branch_a, branch_b, device_a, device_b)
+    scope = {"organization_id": organization.id, "branch_id": None, "period_days": 30, "max_findings": 10}
+
+    sequential = AIBriefingService.briefing(db_session, **scope)
+    concurrent = await AIBriefingService.briefing_async(async_db, **scope)
+
+    sequential.pop("generated_at")
+    concurrent.pop("generated_at")
+    assert sequential["finding_count"] > 0
+    assert concurrent == sequential
+
+
+@pytest.mark.asyncio
+async def test_ai_manager_briefing_respects_branch_scope(async_db, db_session):
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     _seed_facts(db_session, organization, branch_a, branch_b, device_a, device_b)
     manager = _manager(db_session, organization.id, username="briefing-branch-manager")
 
-    briefing_all = get_ai_manager_briefing(
+    briefing_all = await get_ai_manager_briefing(
         organization_id=organization.id,
         branch_id=None,
         period_days=30,
         max_findings=5,
         persist=False,
-        db=db_session,
+        db=async_db,
         current_user=manager,
     )
-    briefing_branch_a = get_ai_manager_briefing(
+    briefing_branch_a = await get_ai_manager_briefing(
         organization_id=organization.id,
         branch_id=branch_a.id,
         period_days=30,
         max_findings=5,
         persist=False,
-        db=db_session,
+        db=async_db,
         current_user=manager,
     )
 
@@ -1000,17 +1021,18 @@ def test_ai_manager_briefing_respects_branch_scope(db_session):
     assert briefing_branch_a.branch_id == branch_a.id
 
 
-def test_ai_manager_briefing_empty_data_trust_is_unsafe(db_session):
+@pytest.mark.asyncio
+async def test_ai_manager_briefing_empty_data_trust_is_unsafe(async_db, db_session):
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     manager = _manager(db_session, organization.id, username="briefing-empty-manager")
 
-    briefing = get_ai_manager_briefing(
+    briefing = await get_ai_manager_briefing(
         organization_id=organization.id,
         branch_id=None,
         period_days=30,
         max_findings=5,
         persist=False,
-        db=db_session,
+        db=async_db,
         current_user=manager,
     )
 
@@ -1019,19 +1041,21 @@ def test_ai_manager_briefing_empty_data_trust_is_unsafe(db_session):
     assert len(briefing.findings) > 0, "No-sync finding must be present when no data exists"
 
 
-def test_ai_findings_persist_saves_and_lists(db_session):
+@pytest.mark.asyncio
+async def test_ai_findings_persist_saves_and_lists(async_db, db_session):
     """persist=True upserts findings into ai_findings; list endpoint returns them."""
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     manager = _manager(db_session, organization.id, username="findings-persist-manager")
 
     # Generate briefing with persist=True — no sync data means a no_sync finding
-    get_ai_manager_briefing(
+    await get_ai_manager_briefing(
         organization_id=organization.id,
         branch_id=None,
         period_days=30,
         max_findings=50,
         persist=True,
-        db=db_session,
+        db=async_db,
+        write_db=async_db,
         current_user=manager,
     )
 
@@ -1049,18 +1073,20 @@ def test_ai_findings_persist_saves_and_lists(db_session):
     assert all(f.organization_id == organization.id for f in findings)
 
 
-def test_ai_findings_status_update_works(db_session):
+@pytest.mark.asyncio
+async def test_ai_findings_status_update_works(async_db, db_session):
     """Updating a finding status (acknowledge, dismiss, resolve) is reflected immediately."""
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     manager = _manager(db_session, organization.id, username="findings-status-manager")
 
-    get_ai_manager_briefing(
+    await get_ai_manager_briefing(
         organization_id=organization.id,
         branch_id=None,
         period_days=30,
         max_findings=50,
         persist=True,
-        db=db_session,
+        db=async_db,
+        write_db=async_db,
         current_user=manager,
     )
 
@@ -1108,19 +1134,21 @@ def test_ai_findings_status_update_works(db_session):
     assert all(f.id != target_id for f in active_findings), "Dismissed finding must not appear in active list"
 
 
-def test_ai_findings_upsert_does_not_duplicate(db_session):
+@pytest.mark.asyncio
+async def test_ai_findings_upsert_does_not_duplicate(async_db, db_session):
     """Running briefing twice with persist=True should not create duplicate rows."""
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     manager = _manager(db_session, organization.id, username="findings-dedup-manager")
 
     for _ in range(2):
-        get_ai_manager_briefing(
+        await get_ai_manager_briefing(
             organization_id=organization.id,
             branch_id=None,
             period_days=30,
             max_findings=50,
             persist=True,
-            db=db_session,
+            db=async_db,
+            write_db=async_db,
             current_user=manager,
         )
 
@@ -1135,3 +1163,459 @@ def test_ai_findings_upsert_does_not_duplicate(db_session):
 
     types = [f.type for f in findings]
     assert len(types) == len(set(types)), "Each finding type must appear at most once (no duplicates)"
+
+
+def test_identical_external_ai_questions_are_served_from_response_cache(monkeypatch, db_session):
+    organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
+    _seed_facts(db_session, organization, branch_a, branch_b, device_a, device_b)
+    first_manager = _manager(db_session, organization.id, username="cache-manager-a")
+    second_manager = _manager(db_session, organization.id, username="cache-manager-b")
+    monkeypatch.setattr(settings, "AI_MANAGER_PROVIDER", "groq")
+    monkeypatch.setattr(settings, "AI_MANAGER_MODEL", "")
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
+    upstream_calls = []
+
+    def _fake_tool_loop(**kwargs):
+        upstream_calls.append(kwargs["message"])
+        return "External Groq summary.", []
+
+    monkeypatch.setattr(AIManagerLLMProvider, "_openai_tool_loop", staticmethod(_fake_tool_loop))
+
+    first = chat_with_ai_manager(
+        AIManagerChatRequest(message="Summarize sales", organization_id=organization.id),
+        db=db_session,
+        current_user=first_manager,
+    )
+    second = chat_with_ai_manager(
+        AIManagerChatRequest(message="  summarize SALES? ", organization_id=organization.id),
+        db=db_session,
+        current_user=second_manager,
+    )
+
+    assert len(upstream_calls) == 1
+    assert first.cache["status"] == "miss"
+    assert second.cache["status"] == "hit"
+    assert second.cache["key"] == first.cache["key"]
+    assert second.answer == "External Groq summary."
+
+    db_session.add(
+        CloudSaleFact(
+            source_event_id=_ingested(
+                db_session,
+                organization,
+                branch_a,
+                device_a,
+                event_id="44444444-4444-4444-4444-444444444444",
+                sequence=3,
+                event_type=SyncEventType.SALE_CREATED,
+            ).id,
+            organization_id=organization.id,
+            branch_id=branch_a.id,
+            source_device_id=device_a.id,
+            local_sale_id=2,
+            invoice_number="A-2",
+            total_amount=Decimal("50.00"),
+            payment_method="cash",
+            item_count=1,
+            payload={},
+        )
+    )
+    db_session.commit()
+
+    third = chat_with_ai_manager(
+        AIManagerChatRequest(message="Summarize sales", organization_id=organization.id),
+        db=db_session,
+        current_user=first_manager,
+    )
+
+    assert len(upstream_calls) == 2
+    assert third.cache["status"] == "miss"
+
+
+def test_answers_built_on_live_tool_calls_are_not_served_from_response_cache(monkeypatch, db_session):
+    organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
+    _seed_facts(db_session, organization, branch_a, branch_b, device_a, device_b)
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
+    prefetched = {"sales_summary": {"sales_count": 2, "total_revenue": 400.0, "total_items": 13}}
+    upstream_calls = []
+
+    def _live_tool_loop(**kwargs):
+        today = kwargs["tool_dispatcher"]("get_sales_summary", {"period": "today"})
+        upstream_calls.append(today)
+        return f"Today's revenue is GHS {today['total_revenue']:.2f}.", [
+            {"tool": "get_sales_summary", "arguments": {"period": "today"}, "result": today}
+        ]
+
+    monkeypatch.setattr(AIManagerLLMProvider, "_openai_tool_loop", staticmethod(_live_tool_loop))
+
+    def _ask():
+        return AIManagerLLMProvider.generate_answer_with_tools(
+            message="How much did we sell today?",
+            system_prompt="system",
+            tools=[],
+            tool_dispatcher=AIManagerService._make_tool_dispatcher(
+                db_session,
+                organization_id=organization.id,
+                branch_id=None,
+                reporting_window=AIManagerService._reporting_window("how much did we sell", 30),
+                prefetched=prefetched,
+            ),
+            provider="groq",
+            model="llama-3.3-70b-versatile",
+            fallback_summary="fallback",
+            cache_evidence=prefetched,
+        )
+
+    first = _ask()
+    db_session.add(
+        CloudSaleFact(
+            source_event_id=_ingested(
+                db_session,
+                organization,
+                branch_a,
+                device_a,
+                event_id="55555555-5555-5555-5555-555555555555",
+                sequence=3,
+                event_type=SyncEventType.SALE_CREATED,
+            ).id,
+            organization_id=organization.id,
+            branch_id=branch_a.id,
+            source_device_id=device_a.id,
+            local_sale_id=3,
+            invoice_number="A-3",
+            total_amount=Decimal("50.00"),
+            payment_method="cash",
+            item_count=1,
+            payload={},
+        )
+    )
+    db_session.commit()
+    second = _ask()
+
+    assert len(upstream_calls) == 2
+    assert upstream_calls[1]["total_revenue"] == upstream_calls[0]["total_revenue"] + 50.0
+    assert (first["cache"]["status"], second["cache"]["status"]) == ("miss", "miss")
+    assert second["answer"] != first["answer"]
+
+
+def test_concurrent_identical_ai_requests_are_coalesced_into_one_upstream_call(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
+    release = threading.Event()
+    upstream_calls = []
+
+    def _slow_tool_loop(**kwargs):
+        upstream_calls.append(kwargs["message"])
+        release.wait(timeout=5)
+        return "Coalesced answer.", []
+
+    monkeypatch.setattr(AIManagerLLMProvider, "_openai_tool_loop", staticmethod(_slow_tool_loop))
+    results = []
+
+    def _ask():
+        results.append(
+            AIManagerLLMProvider.generate_answer_with_tools(
+                message="Which branch sold most?",
+                system_prompt="system",
+                tools=[],
+                tool_dispatcher=lambda name, args: {},
+                provider="groq",
+                model="llama-3.3-70b-versatile",
+                fallback_summary="fallback",
+                cache_evidence={"sales_summary": {"total_revenue": 400.0}},
+            )
+        )
+
+    threads = [threading.Thread(target=_ask) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(50):
+        if upstream_calls:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(upstream_calls) == 1
+    assert len(results) == 4
+    assert {result["answer"] for result in results} == {"Coalesced answer."}
+    assert sorted(result["cache"]["status"] for result in results).count("miss") == 1
+
+
+def test_ai_response_cache_does_not_store_fallbacks_and_bounds_entries(monkeypatch):
+    from app.services.ai_response_cache import AIResponseCache
+
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
+    attempts = []
+
+    def _failing_tool_loop(**kwargs):
+        attempts.append(kwargs["message"])
+        raise RuntimeError("provider down")
+
+    monkeypatch.setattr(AIManagerLLMProvider, "_openai_tool_loop", staticmethod(_failing_tool_loop))
+    for _ in range(2):
+        result = AIManagerLLMProvider.generate_answer_with_tools(
+            message="Summarize sales",
+            system_prompt="system",
+            tools=[],
+            tool_dispatcher=lambda name, args: {},
+            provider="groq",
+            model="llama-3.3-70b-versatile",
+            fallback_summary="fallback",
+        )
+        assert result["fallback_used"] is True
+        assert result["cache"]["status"] == "miss"
+    assert len(attempts) == 2
+
+    now = [0.0]
+    cache = AIResponseCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+    for key in ("a", "b", "c"):
+        cache.get_or_compute(key, lambda key=key: {"answer": key})
+    assert list(cache.keys()) == ["b", "c"]
+    assert cache.get_or_compute("b", lambda: {"answer": "new"}) == ({"answer": "b"}, "hit")
+    now[0] = 11.0
+    assert cache.get_or_compute("b", lambda: {"answer": "new"}) == ({"answer": "new"}, "miss")
+
+
+def test_ai_response_cache_treats_store_errors_as_misses():
+    from sqlalchemy.exc import OperationalError
+
+    from app.services.ai_response_cache import AIResponseCache, SQLAlchemyResponseCacheStore
+
+    def unavailable_session():
+        raise OperationalError("SELECT 1", {}, ConnectionError("database is down"))
+
+    cache = AIResponseCache(ttl_seconds=60, store=SQLAlchemyResponseCacheStore(unavailable_session))
+    computed = []
+
+    def compute():
+        computed.append(True)
+        return {"answer": "fresh"}
+
+    assert cache.get_or_compute("question", compute) == ({"answer": "fresh"}, "miss")
+    assert cache.get_or_compute("question", compute) == ({"answer": "fresh"}, "hit")
+    assert len(computed) == 1
+
+
+def test_scheduler_purges_expired_persisted_ai_answers(monkeypatch, db_session):
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models.ai_report import AIResponseCacheEntry
+    from app.services import ai_response_cache
+    from app.services.ai_response_cache import AIResponseCache, SQLAlchemyResponseCacheStore
+    from app.services.scheduler import SchedulerService
+
+    now = datetime.now(timezone.utc)
+    db_session.add_all(
+        [
+            AIResponseCacheEntry(cache_key="expired", provider="groq", payload={}, expires_at=now - timedelta(minutes=1)),
+            AIResponseCacheEntry(cache_key="live", provider="groq", payload={}, expires_at=now + timedelta(minutes=9)),
+        ]
+    )
+    db_session.commit()
+    store = SQLAlchemyResponseCacheStore(sessionmaker(bind=db_session.get_bind()))
+    monkeypatch.setattr(ai_response_cache, "response_cache", AIResponseCache(store=store))
+
+    SchedulerService.purge_ai_response_cache()
+
+    db_session.expire_all()
+    assert [entry.cache_key for entry in db_session.query(AIResponseCacheEntry).all()] == ["live"]
+
+    monkeypatch.setattr(settings, "ENABLE_BACKGROUND_SCHEDULER", True)
+    monkeypatch.setattr(settings, "AI_RESPONSE_CACHE_PERSISTENT", True)
+    scheduler_service = SchedulerService()
+    scheduler_service.start()
+    try:
+        assert scheduler_service.scheduler.get_job("purge_ai_response_cache") is not None
+    finally:
+        scheduler_service.stop()
+
+
+class _FakeLLMResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self._data
+
+
+def _fake_httpx_client(responses):
+    class _Client:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def post(self, *args, **kwargs):
+            return _FakeLLMResponse(responses.pop(0))
+
+    return _Client
+
+
+def _openai_tool_call_turn(*names):
+    return {
+        "choices": [
+            {
+                "finish_reason": "tool_calls",
+                "message": {
+                    "role": "assistant",
+                    "content": "Checking the numbers.",
+                    "tool_calls": [
+                        {"id": f"call-{index}", "function": {"name": name, "arguments": '{"period": "today"}'}}
+                        for index, name in enumerate(names)
+                    ],
+                },
+            }
+        ]
+    }
+
+
+def test_tool_calls_from_one_model_turn_run_concurrently(monkeypatch):
+    import threading
+    import time as _time
+
+    import app.services.ai_llm_provider as provider_module
+
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
+    monkeypatch.setattr(
+        provider_module.httpx,
+        "Client",
+        _fake_httpx_client([
+            _openai_tool_call_turn("get_sales_summary", "get_stock_risk", "get_reconciliation"),
+            {"choices": [{"finish_reason": "stop", "message": {"role": "assistant", "content": "All good."}}]},
+        ]),
+    )
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def _slow_dispatcher(name, arguments):
+        with lock:
+            active.append(name)
+            peak.append(len(active))
+        _time.sleep(0.3)
+        with lock:
+            active.remove(name)
+        return {"tool": name}
+
+    _slow_dispatcher.parallel_safe = True
+    events = []
+
+    started = _time.monotonic()
+    result = AIManagerLLMProvider.generate_answer_with_tools(
+        message="How are we doing today?",
+        system_prompt="system",
+        tools=[],
+        tool_dispatcher=_slow_dispatcher,
+        provider="groq",
+        model="llama-3.3-70b-versatile",
+        fallback_summary="fallback",
+        on_event=events.append,
+    )
+    elapsed = _time.monotonic() - started
+
+    assert result["answer"] == "All good."
+    assert max(peak) == 3
+    assert elapsed < 0.8
+    assert [entry["tool"] for entry in result["tool_trace"]] == [
+        "get_sales_summary",
+        "get_stock_risk",
+        "get_reconciliation",
+    ]
+    assert events[0] == {"type": "partial_answer", "text": "Checking the numbers."}
+    assert sorted(event["tool"] for event in events if event["type"] == "tool_result") == [
+        "get_reconciliation",
+        "get_sales_summary",
+        "get_stock_risk",
+    ]
+
+
+def test_tool_loop_falls_back_when_latency_budget_is_exceeded(monkeypatch):
+    import time as _time
+
+    import app.services.ai_llm_provider as provider_module
+
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
+    monkeypatch.setattr(settings, "AI_MANAGER_LATENCY_BUDGET_SECONDS", 0.2)
+    monkeypatch.setattr(
+        provider_module.httpx,
+        "Client",
+        _fake_httpx_client([_openai_tool_call_turn("get_sales_summary", "get_stock_risk")]),
+    )
+    failures_before = provider_module._circuit_breaker._failures
+
+    def _stuck_dispatcher(name, arguments):
+        _time.sleep(0.5)
+        return {}
+
+    _stuck_dispatcher.parallel_safe = True
+
+    result = AIManagerLLMProvider.generate_answer_with_tools(
+        message="How are we doing today?",
+        system_prompt="system",
+        tools=[],
+        tool_dispatcher=_stuck_dispatcher,
+        provider="groq",
+        model="llama-3.3-70b-versatile",
+        fallback_summary="fallback",
+    )
+
+    assert result["answer"] == "fallback"
+    assert result["fallback_used"] is True
+    assert result["budget_exceeded"] is True
+    assert provider_module._circuit_breaker._failures == failures_before
+
+
+def test_streamed_chat_emits_progress_and_final_response(monkeypatch, db_session):
+    import asyncio
+    import json
+
+    from app.api.endpoints.ai_manager import stream_chat_with_ai_manager
+    from app.models.ai_report import AIChatMessage
+
+    organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
+    _seed_facts(db_session, organization, branch_a, branch_b, device_a, device_b)
+    manager = _manager(db_session, organization.id, username="stream-ai-manager")
+    monkeypatch.setattr(settings, "AI_MANAGER_PROVIDER", "groq")
+    monkeypatch.setattr(settings, "AI_MANAGER_MODEL", "")
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "test-groq-key")
+
+    def _fake_tool_loop(**kwargs):
+        kwargs["on_event"]({"type": "partial_answer", "text": "Looking at sales."})
+        return "External streamed summary.", []
+
+    monkeypatch.setattr(AIManagerLLMProvider, "_openai_tool_loop", staticmethod(_fake_tool_loop))
+
+    response = stream_chat_with_ai_manager(
+        AIManagerChatRequest(message="Summarize sales", organization_id=organization.id),
+        db=db_session,
+        current_user=manager,
+    )
+
+    async def _collect():
+        return [chunk async for chunk in response.body_iterator]
+
+    events = [json.loads(line) for line in asyncio.run(_collect())]
+
+    assert response.media_type == "application/x-ndjson"
+    assert events[0]["type"] == "session"
+    assert {"type": "partial_answer", "text": "Looking at sales."} in events
+    assert events[-1]["type"] == "final"
+    assert events[-1]["response"]["answer"] == "External streamed summary."
+    assert events[-1]["response"]["session_id"] == events[0]["session_id"]
+    stored = (
+        db_session.query(AIChatMessage)
+        .filter(AIChatMessage.session_id == events[0]["session_id"])
+        .order_by(AIChatMessage.id)
+        .all()
+    )
+    assert [message.role for message in stored] == ["user", "assistant"]
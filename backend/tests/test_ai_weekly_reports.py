@@ -315,7 +315,8 @@ def test_weekly_report_generation_is_idempotent_for_same_scope_and_action_period
     assert forced.id == first.id
 
 
-def test_weekly_report_endpoint_persists_report_and_lists_it(monkeypatch, db_session):
+@pytest.mark.asyncio
+async def test_weekly_report_endpoint_persists_report_and_lists_it(async_db, monkeypatch, db_session):
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     _seed_report_data(db_session, organization, branch_a, branch_b, device_a, device_b)
     manager = _manager(db_session, organization.id)
@@ -326,14 +327,14 @@ def test_weekly_report_endpoint_persists_report_and_lists_it(monkeypatch, db_ses
         db=db_session,
         current_user=manager,
     )
-    reports = list_weekly_manager_reports(
+    reports = await list_weekly_manager_reports(
         organization_id=organization.id,
         branch_id=branch_a.id,
         limit=20,
-        db=db_session,
+        db=async_db,
         current_user=manager,
     )
-    fetched = get_weekly_manager_report(generated.id, db=db_session, current_user=manager)
+    fetched = await get_weekly_manager_report(generated.id, db=async_db, current_user=manager)
 
     assert generated.branch_id == branch_a.id
     assert reports[0].id == generated.id
@@ -341,7 +342,8 @@ def test_weekly_report_endpoint_persists_report_and_lists_it(monkeypatch, db_ses
     assert fetched.sections["coming_week_action_plan"]["risk_counts"]["out_of_stock_count"] == 1
 
 
-def test_manager_can_mark_weekly_report_reviewed(db_session):
+@pytest.mark.asyncio
+async def test_manager_can_mark_weekly_report_reviewed(async_db, db_session):
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     _seed_report_data(db_session, organization, branch_a, branch_b, device_a, device_b)
     manager = _manager(db_session, organization.id)
@@ -358,7 +360,7 @@ def test_manager_can_mark_weekly_report_reviewed(db_session):
         db=db_session,
         current_user=manager,
     )
-    fetched = get_weekly_manager_report(report.id, db=db_session, current_user=manager)
+    fetched = await get_weekly_manager_report(report.id, db=async_db, current_user=manager)
 
     assert reviewed.reviewed_by_user_id == manager.id
     assert reviewed.reviewed_at is not None
@@ -563,7 +565,8 @@ def test_retry_stops_at_max_attempts(monkeypatch, db_session):
     assert retried[0].next_retry_at is None
 
 
-def test_weekly_report_delivery_history_lists_persisted_attempts(monkeypatch, db_session):
+@pytest.mark.asyncio
+async def test_weekly_report_delivery_history_lists_persisted_attempts(async_db, monkeypatch, db_session):
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     _seed_report_data(db_session, organization, branch_a, branch_b, device_a, device_b)
     manager = _manager(db_session, organization.id)
@@ -587,10 +590,10 @@ def test_weekly_report_delivery_history_lists_persisted_attempts(monkeypatch, db
         current_user=manager,
     )
 
-    history = list_weekly_report_deliveries(
+    history = await list_weekly_report_deliveries(
         report.id,
         limit=20,
-        db=db_session,
+        db=async_db,
         current_user=manager,
     )
 
@@ -712,7 +715,8 @@ def test_branch_manager_cannot_generate_cross_branch_report(db_session):
     assert "Branch access denied" in exc.value.detail
 
 
-def test_branch_manager_cannot_view_cross_branch_delivery_history(db_session):
+@pytest.mark.asyncio
+async def test_branch_manager_cannot_view_cross_branch_delivery_history(async_db, db_session):
     organization, branch_a, branch_b, device_a, device_b = _tenant(db_session)
     _seed_report_data(db_session, organization, branch_a, branch_b, device_a, device_b)
     branch_manager = _manager(
@@ -729,10 +733,10 @@ def test_branch_manager_cannot_view_cross_branch_delivery_history(db_session):
     )
 
     with pytest.raises(HTTPException) as exc:
-        list_weekly_report_deliveries(
+        await list_weekly_report_deliveries(
             report.id,
             limit=20,
-            db=db_session,
+            db=async_db,
             current_user=branch_manager,
         )
 
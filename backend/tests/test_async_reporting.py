@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import event, text
+
+from app.db.base import async_database_url, async_pool_options, gather_reads
+
+
+def test_async_database_url_maps_sync_drivers_to_asyncio_drivers():
+    assert async_database_url("postgresql://pos:secret@db:5432/pos").drivername == "postgresql+asyncpg"
+    assert async_database_url("postgresql+psycopg2://pos@db/pos").drivername == "postgresql+asyncpg"
+    assert async_database_url("sqlite:///./pharma_pos.db").drivername == "sqlite+aiosqlite"
+
+    tls = async_database_url("postgresql://pos@db/pos?sslmode=require")
+    assert dict(tls.query) == {"ssl": "require"}
+
+
+def test_async_pool_sizing_applies_to_postgresql_only():
+    assert async_pool_options(async_database_url("postgresql://pos@db/pos"), 10, 20) == {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_timeout": 30,
+    }
+    assert async_pool_options(async_database_url("sqlite:///./pharma_pos.db"), 10, 20) == {}
+
+
+def test_app_imports_with_a_sqlite_database_url(tmp_path):
+    # aiosqlite engines use NullPool, which rejects pool sizing arguments.
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.db.read_replica"],
+        cwd=Path(__file__).resolve().parents[1],
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'pharma_pos.db'}"},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+
+
+# Long enough (tens of milliseconds) that the second read is issued while the first runs.
+_SLOW_PROBE = text(
+    "WITH RECURSIVE report_probe(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM report_probe WHERE n < 200000) "
+    "SELECT count(*) FROM report_probe"
+)
+
+
+@pytest.mark.asyncio
+async def test_gather_reads_overlaps_independent_queries_on_separate_connections(async_db, _async_engine):
+    timeline: list[tuple[str, int]] = []
+
+    def before(conn, _cursor, statement, _parameters, _context, _executemany):
+        if "report_probe" in statement:
+            timeline.append(("start", id(conn.connection.dbapi_connection)))
+
+    def after(conn, _cursor, statement, _parameters, _context, _executemany):
+        if "report_probe" in statement:
+            timeline.append(("end", id(conn.connection.dbapi_connection)))
+
+    event.listen(_async_engine.sync_engine, "before_cursor_execute", before)
+    event.listen(_async_engine.sync_engine, "after_cursor_execute", after)
+    try:
+        results = await gather_reads(
+            async_db,
+            lambda session: session.execute(_SLOW_PROBE).scalar(),
+            lambda session: session.execute(_SLOW_PROBE).scalar(),
+        )
+    finally:
+        event.remove(_async_engine.sync_engine, "before_cursor_execute", before)
+        event.remove(_async_engine.sync_engine, "after_cursor_execute", after)
+
+    assert results == [200000, 200000]
+    # Both statements were in flight before either finished, each on its own connection.
+    assert [phase for phase, _ in timeline] == ["start", "start", "end", "end"]
+    assert timeline[0][1] != timeline[1][1]
+
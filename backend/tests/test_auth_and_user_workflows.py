@@ -4,14 +4,26 @@ from types import SimpleNamespace
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
 
+from app.api.dependencies import auth as auth_dependencies
 from app.api.endpoints.auth import login
 from app.api.endpoints.users import create_user, update_user
 from app.models import Branch, Organization
 from app.models.activity_log import ActivityLog
 from app.models.user import UserPermission, UserRole
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
-from app.api.dependencies.auth import require_adjust_stock, require_manage_products
+from app.api.dependencies.auth import (
+    get_current_principal,
+    get_current_user,
+    require_adjust_stock,
+    require_manage_products,
+)
+from app.core.config import settings
+from app.core.password_pool import PasswordHashPool, PasswordPoolBusy
+from app.core.security import get_password_hash
+from app.services.login_rate_limiter import DatabaseLoginAttemptStore, LoginRateLimiter, login_rate_limiter
+from app.services.principal_cache import PrincipalCache
 
 
 def test_login_trims_username_and_returns_bearer_token(db_session, admin_user):
@@ -94,3 +106,169 @@ def test_user_schema_exposes_tenant_assignment(db_session, manager_user):
 
     assert payload.organization_id == organization.id
     assert payload.branch_id == branch.id
+
+
+def _login_token(db_session, username: str, password: str) -> str:
+    return login(form_data=SimpleNamespace(username=username, password=password), db=db_session)["access_token"]
+
+
+def _user_selects(db_session, resolve):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(db_session.bind, "before_cursor_execute", capture)
+    try:
+        result = resolve()
+    finally:
+        event.remove(db_session.bind, "before_cursor_execute", capture)
+    return result, statements
+
+
+def test_cached_principal_skips_user_lookup(db_session, manager_user):
+    token = _login_token(db_session, "manager", "manager-secret")
+    first, first_selects = _user_selects(db_session, lambda: get_current_principal(token=token, db=db_session))
+    db_session.expunge_all()
+
+    current_user, cached_selects = _user_selects(
+        db_session,
+        lambda: get_current_user(principal=get_current_principal(token=token, db=db_session), db=db_session),
+    )
+
+    assert len(first_selects) == 1
+    assert cached_selects == []
+    assert first.effective_permissions == manager_user.effective_permissions
+    assert (current_user.id, current_user.role, current_user.organization_id) == (
+        first.user_id,
+        UserRole.MANAGER,
+        first.organization_id,
+    )
+    assert require_adjust_stock(current_user=current_user) is current_user
+    assert current_user.email == "manager@example.com"
+
+
+def test_password_change_invalidates_principal_and_revokes_token(db_session, admin_user, cashier_user):
+    token = _login_token(db_session, "cashier", "cashier-secret")
+    assert get_current_principal(token=token, db=db_session).user_id == cashier_user.id
+
+    update_user(cashier_user.id, UserUpdate(password="new-secret1"), db=db_session, current_user=admin_user)
+
+    with pytest.raises(HTTPException) as exc:
+        get_current_principal(token=token, db=db_session)
+    assert exc.value.status_code == 401
+    assert "revoked" in exc.value.detail.lower()
+    fresh = _login_token(db_session, "cashier", "new-secret1")
+    assert get_current_principal(token=fresh, db=db_session).token_version == 1
+
+
+def test_demotion_revokes_tokens_on_every_worker(monkeypatch, db_session, admin_user, manager_user):
+    token = _login_token(db_session, "manager", "manager-secret")
+    assert get_current_principal(token=token, db=db_session).role == UserRole.MANAGER
+
+    update_user(manager_user.id, UserUpdate(role=UserRole.CASHIER), db=db_session, current_user=admin_user)
+
+    # Another worker whose cache never saw this user checks the database.
+    monkeypatch.setattr(auth_dependencies, "principal_cache", PrincipalCache())
+    with pytest.raises(HTTPException) as exc:
+        get_current_principal(token=token, db=db_session)
+    assert exc.value.status_code == 401
+    assert "revoked" in exc.value.detail.lower()
+    fresh = _login_token(db_session, "manager", "manager-secret")
+    assert get_current_principal(token=fresh, db=db_session).role == UserRole.CASHIER
+
+
+def test_permission_change_revokes_tokens(db_session, admin_user, cashier_user):
+    token = _login_token(db_session, "cashier", "cashier-secret")
+
+    update_user(
+        cashier_user.id,
+        UserUpdate(permissions=[UserPermission.VIEW_REPORTS]),
+        db=db_session,
+        current_user=admin_user,
+    )
+    with pytest.raises(HTTPException):
+        get_current_principal(token=token, db=db_session)
+
+    fresh = _login_token(db_session, "cashier", "cashier-secret")
+    update_user(cashier_user.id, UserUpdate(full_name="Renamed Cashier"), db=db_session, current_user=admin_user)
+    assert get_current_principal(token=fresh, db=db_session).user_id == cashier_user.id
+
+
+def test_signed_claims_skip_the_database_until_ttl(monkeypatch, db_session, manager_user):
+    monkeypatch.setattr(settings, "AUTH_PRINCIPAL_SIGNED_CLAIMS", True)
+    token = _login_token(db_session, "manager", "manager-secret")
+
+    principal, selects = _user_selects(db_session, lambda: get_current_principal(token=token, db=db_session))
+
+    assert selects == []
+    assert (principal.user_id, principal.role) == (manager_user.id, UserRole.MANAGER)
+
+    monkeypatch.setattr(settings, "AUTH_PRINCIPAL_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(settings, "AUTH_PRINCIPAL_CACHE_ENABLED", False)
+    _principal, selects = _user_selects(db_session, lambda: get_current_principal(token=token, db=db_session))
+
+    assert len(selects) == 1
+
+
+def test_password_pool_verifies_in_worker_and_sheds_excess_load():
+    pool = PasswordHashPool(workers=1, max_queue=0)
+    hashed = get_password_hash("pool-secret")
+    try:
+        assert pool.verify("pool-secret", hashed) is True
+        assert pool.verify("wrong", hashed) is False
+
+        pool._in_flight = 1  # the only worker is busy and no one may wait
+        with pytest.raises(PasswordPoolBusy):
+            pool.verify("pool-secret", hashed)
+        pool._in_flight = 0
+    finally:
+        pool.shutdown()
+
+    assert pool.stats() == {
+        "submitted": 2,
+        "completed": 2,
+        "rejected": 1,
+        "max_queue_depth": 0,
+        "workers": 1,
+        "in_flight": 0,
+        "queue_depth": 0,
+    }
+
+
+def test_login_rate_limit_is_shared_through_the_database(db_session):
+    now = [1_000_000 * 300.0]
+    workers = [
+        LoginRateLimiter(DatabaseLoginAttemptStore(), max_attempts=5, window_seconds=300, clock=lambda: now[0])
+        for _ in range(2)
+    ]
+    for attempt in range(5):
+        assert workers[attempt % 2].is_limited(db_session, "shared-user") is False
+        workers[attempt % 2].record_failure(db_session, "shared-user")
+
+    assert workers[0].is_limited(db_session, "shared-user") is True
+    assert workers[1].is_limited(db_session, "shared-user") is True
+
+    now[0] += 450  # halfway through the next window: half the old failures remain
+    assert workers[1].attempts(db_session, "shared-user") == pytest.approx(2.5)
+    workers[1].record_failure(db_session, "shared-user")
+    assert workers[0].attempts(db_session, "shared-user") == pytest.approx(3.5)
+
+    now[0] += 600
+    assert workers[0].attempts(db_session, "shared-user") == 0
+    assert workers[0].purge_expired(db_session) == 1
+
+
+def test_login_returns_429_after_repeated_failures(monkeypatch, db_session, admin_user):
+    monkeypatch.setattr(login_rate_limiter, "store", DatabaseLoginAttemptStore())
+    for _ in range(login_rate_limiter.max_attempts):
+        with pytest.raises(HTTPException) as exc:
+            login(form_data=SimpleNamespace(username="admin", password="wrong-secret"), db=db_session)
+        assert exc.value.status_code == 401
+
+    with pytest.raises(HTTPException) as exc:
+        login(form_data=SimpleNamespace(username="admin", password="admin-secret"), db=db_session)
+
+    assert exc.value.status_code == 429
+
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 
 import pytest
@@ -28,12 +28,14 @@ from app.core.security import get_password_hash
 from app.models.customer import Customer
 from app.models.product import DosageForm, PrescriptionStatus, Product, ProductBatch
 from app.models.sale import PaymentMethod, Sale, SaleItem
+from app.models.till_shift import TillShift
 from app.models.user import User, UserRole
 from app.schemas.product import ProductUpdate, ReceiveStock
 from app.schemas.sale import SaleActionRequest
 from app.schemas.stock_adjustment import StockAdjustmentCreate
 from app.schemas.stock_take import StockTakeCreate, StockTakeItemCreate
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.till_ledger_service import TillLedgerService
 
 
 def _user(db, *, username: str, organization_id: int, branch_id: int, role=UserRole.CASHIER):
@@ -95,9 +97,18 @@ def _sale(
     total: str,
     product: Product,
 ):
+    shift = TillShift(
+        organization_id=organization_id,
+        branch_id=branch_id,
+        user_id=user_id,
+        business_date=datetime.now(timezone.utc).date(),
+    )
+    db.add(shift)
+    db.flush()
     sale = Sale(
         organization_id=organization_id,
         branch_id=branch_id,
+        till_shift_id=shift.id,
         invoice_number=invoice,
         user_id=user_id,
         subtotal=Decimal(total),
@@ -110,19 +121,20 @@ def _sale(
     )
     db.add(sale)
     db.flush()
-    db.add(
-        SaleItem(
-            organization_id=organization_id,
-            branch_id=branch_id,
-            sale_id=sale.id,
-            product_id=product.id,
-            product_name=product.name,
-            quantity=2,
-            unit_price=Decimal(total) / 2,
-            discount_amount=Decimal("0.00"),
-            total_price=Decimal(total),
-        )
+    item = SaleItem(
+        organization_id=organization_id,
+        branch_id=branch_id,
+        sale_id=sale.id,
+        product_id=product.id,
+        product_name=product.name,
+        quantity=2,
+        unit_price=Decimal(total) / 2,
+        unit_cost=product.cost_price,
+        discount_amount=Decimal("0.00"),
+        total_price=Decimal(total),
     )
+    db.add(item)
+    TillLedgerService.record_sale(db, sale, [item])
     return sale
 
 
@@ -17,6 +17,7 @@ from app.models.sync_ingestion import IngestedSyncEvent
 from app.models.tenancy import DeviceStatus
 from app.services.cloud_projection_service import CloudProjectionService
 from app.services.sync_identity_service import build_aggregate_uid
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 
 def _hash(payload: dict) -> str:
@@ -482,6 +483,8 @@ def test_projection_status_counts_pending_projected_and_failed(db_session):
         payload={"supplier_id": 2, "name": "Supplier"},
     )
 
+    SyncIngestionStatsService.reconcile(db_session)
+
     before = CloudProjectionService.status(db_session)
     CloudProjectionService.project_pending(db_session)
     after = CloudProjectionService.status(db_session)
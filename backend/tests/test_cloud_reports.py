@@ -41,6 +41,7 @@ from app.models.user import User, UserPermission, UserRole
 from app.core.security import get_password_hash
 from app.schemas.cloud_reports import CloudReconciliationIssueActionRequest, CloudReconciliationRepairRequest
 from app.services.sync_identity_service import build_aggregate_uid
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 
 def _tenant(db_session, *, name: str, branch_code: str):
@@ -139,7 +140,8 @@ def _seed_reconciliation_issue(db_session):
     return org, branch, user
 
 
-def test_cloud_sales_summary_filters_by_organization_and_branch(db_session):
+@pytest.mark.asyncio
+async def test_cloud_sales_summary_filters_by_organization_and_branch(async_db, db_session):
     org_a, branch_a, device_a = _tenant(db_session, name="Org A", branch_code="A")
     org_b, branch_b, device_b = _tenant(db_session, name="Org B", branch_code="B")
     event_a1 = _ingested(db_session, org_a, branch_a, device_a, event_id="aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaa1", sequence=1, event_type=SyncEventType.SALE_CREATED)
@@ -189,8 +191,8 @@ def test_cloud_sales_summary_filters_by_organization_and_branch(db_session):
     db_session.commit()
     report_user = _report_user(db_session, org_a.id)
 
-    summary = get_cloud_sales_summary(organization_id=org_a.id, branch_id=branch_a.id, db=db_session, current_user=report_user)
-    branch_rows = get_cloud_branch_sales(organization_id=org_a.id, db=db_session, current_user=report_user)
+    summary = await get_cloud_sales_summary(organization_id=org_a.id, branch_id=branch_a.id, db=async_db, current_user=report_user)
+    branch_rows = await get_cloud_branch_sales(organization_id=org_a.id, db=async_db, current_user=report_user)
 
     assert summary.sales_count == 2
     assert summary.total_revenue == 25.5
@@ -201,7 +203,8 @@ def test_cloud_sales_summary_filters_by_organization_and_branch(db_session):
     assert branch_rows[0].sales_count == 2
 
 
-def test_cloud_sales_summary_filters_by_sale_occurred_at(db_session):
+@pytest.mark.asyncio
+async def test_cloud_sales_summary_filters_by_sale_occurred_at(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Occurred Org", branch_code="OCC")
     event = _ingested(
         db_session,
@@ -231,11 +234,11 @@ def test_cloud_sales_summary_filters_by_sale_occurred_at(db_session):
     db_session.commit()
     report_user = _report_user(db_session, org.id)
 
-    summary = get_cloud_sales_summary(
+    summary = await get_cloud_sales_summary(
         organization_id=org.id,
         start_at=datetime(2026, 5, 18, 0, 0, tzinfo=timezone.utc),
         end_at=datetime(2026, 5, 18, 23, 59, tzinfo=timezone.utc),
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
 
@@ -243,7 +246,8 @@ def test_cloud_sales_summary_filters_by_sale_occurred_at(db_session):
     assert summary.total_revenue == 25.0
 
 
-def test_cloud_inventory_movement_summary(db_session):
+@pytest.mark.asyncio
+async def test_cloud_inventory_movement_summary(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Movement Org", branch_code="MOV")
     event = _ingested(db_session, org, branch, device, event_id="cccccccc-cccc-cccc-cccc-ccccccccccc1", sequence=1, event_type=SyncEventType.STOCK_ADJUSTED)
     db_session.add_all(
@@ -279,7 +283,7 @@ def test_cloud_inventory_movement_summary(db_session):
     db_session.commit()
     report_user = _report_user(db_session, org.id)
 
-    summary = get_cloud_inventory_movement_summary(organization_id=org.id, branch_id=branch.id, db=db_session, current_user=report_user)
+    summary = await get_cloud_inventory_movement_summary(organization_id=org.id, branch_id=branch.id, db=async_db, current_user=report_user)
 
     assert summary.movement_count == 2
     assert summary.total_positive_quantity == 10
@@ -287,7 +291,8 @@ def test_cloud_inventory_movement_summary(db_session):
     assert summary.net_quantity_delta == 7
 
 
-def test_cloud_sync_health_counts_ingested_projection_and_duplicates(db_session):
+@pytest.mark.asyncio
+async def test_cloud_sync_health_counts_ingested_projection_and_duplicates(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Health Org", branch_code="HLTH")
     event_one = _ingested(db_session, org, branch, device, event_id="dddddddd-dddd-dddd-dddd-ddddddddddd1", sequence=1, event_type=SyncEventType.SALE_CREATED)
     event_two = _ingested(db_session, org, branch, device, event_id="dddddddd-dddd-dddd-dddd-ddddddddddd2", sequence=2, event_type=SyncEventType.STOCK_RECEIVED)
@@ -295,9 +300,10 @@ def test_cloud_sync_health_counts_ingested_projection_and_duplicates(db_session)
     event_one.projected_at = event_one.received_at
     event_two.projection_error = "bad payload"
     db_session.commit()
+    SyncIngestionStatsService.reconcile(db_session)
     report_user = _report_user(db_session, org.id)
 
-    health = get_cloud_sync_health(organization_id=org.id, branch_id=branch.id, db=db_session, current_user=report_user)
+    health = await get_cloud_sync_health(organization_id=org.id, branch_id=branch.id, db=async_db, current_user=report_user)
 
     assert health.ingested_event_count == 2
     assert health.projected_event_count == 1
@@ -336,7 +342,8 @@ def test_cloud_report_rejects_cross_branch_access(db_session):
     assert "Branch access denied" in exc.value.detail
 
 
-def test_branch_scoped_report_user_only_sees_assigned_branch(db_session):
+@pytest.mark.asyncio
+async def test_branch_scoped_report_user_only_sees_assigned_branch(async_db, db_session):
     org = Organization(name="Scoped Tenant")
     db_session.add(org)
     db_session.flush()
@@ -393,8 +400,8 @@ def test_branch_scoped_report_user_only_sees_assigned_branch(db_session):
     db_session.commit()
     report_user = _report_user(db_session, org.id, branch_id=branch_a.id, username="scoped-report-user")
 
-    summary = get_cloud_sales_summary(organization_id=org.id, db=db_session, current_user=report_user)
-    branch_rows = get_cloud_branch_sales(organization_id=org.id, db=db_session, current_user=report_user)
+    summary = await get_cloud_sales_summary(organization_id=org.id, db=async_db, current_user=report_user)
+    branch_rows = await get_cloud_branch_sales(organization_id=org.id, db=async_db, current_user=report_user)
 
     assert summary.branch_id == branch_a.id
     assert summary.sales_count == 1
@@ -421,7 +428,8 @@ def test_cloud_report_allows_platform_admin_access(db_session):
     assert require_organization_access(organization_id=org.id, current_user=platform_admin) == platform_admin
 
 
-def test_cloud_stock_risk_reports_are_tenant_and_branch_scoped(db_session):
+@pytest.mark.asyncio
+async def test_cloud_stock_risk_reports_are_tenant_and_branch_scoped(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Risk Org", branch_code="RISK")
     other_org, other_branch, other_device = _tenant(db_session, name="Other Risk Org", branch_code="ORISK")
     event = _ingested(db_session, org, branch, device, event_id="99999999-9999-9999-9999-999999999991", sequence=1, event_type=SyncEventType.PRODUCT_CREATED)
@@ -501,23 +509,23 @@ def test_cloud_stock_risk_reports_are_tenant_and_branch_scoped(db_session):
     db_session.commit()
     report_user = _report_user(db_session, org.id, branch_id=branch.id, username="risk-report-user")
 
-    summary = get_cloud_stock_risk_summary(
+    summary = await get_cloud_stock_risk_summary(
         organization_id=org.id,
         expiry_warning_days=90,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
-    low_stock = get_cloud_low_stock(
+    low_stock = await get_cloud_low_stock(
         organization_id=org.id,
         limit=50,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
-    expiry_risk = get_cloud_expiry_risk(
+    expiry_risk = await get_cloud_expiry_risk(
         organization_id=org.id,
         days=30,
         limit=50,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
 
@@ -533,7 +541,8 @@ def test_cloud_stock_risk_reports_are_tenant_and_branch_scoped(db_session):
     assert any(item.status == "expired" for item in expiry_risk)
 
 
-def test_cloud_stock_velocity_uses_sale_movements_for_days_remaining(db_session):
+@pytest.mark.asyncio
+async def test_cloud_stock_velocity_uses_sale_movements_for_days_remaining(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Velocity Org", branch_code="VEL")
     sale_event = _ingested(
         db_session,
@@ -627,11 +636,11 @@ def test_cloud_stock_velocity_uses_sale_movements_for_days_remaining(db_session)
     db_session.commit()
     report_user = _report_user(db_session, org.id)
 
-    velocity = get_cloud_stock_velocity(
+    velocity = await get_cloud_stock_velocity(
         organization_id=org.id,
         period_days=7,
         limit=10,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
 
@@ -652,7 +661,8 @@ def test_cloud_stock_velocity_uses_sale_movements_for_days_remaining(db_session)
     assert zero.confidence == "none"
 
 
-def test_cloud_profit_stock_value_and_stockout_impact_metrics(db_session):
+@pytest.mark.asyncio
+async def test_cloud_profit_stock_value_and_stockout_impact_metrics(async_db, db_session):
     org, branch, device = _tenant(db_session, name="CEO KPI Org", branch_code="CEO")
     sale_event = _ingested(
         db_session,
@@ -740,23 +750,23 @@ def test_cloud_profit_stock_value_and_stockout_impact_metrics(db_session):
     db_session.commit()
     report_user = _report_user(db_session, org.id)
 
-    profit = get_cloud_profit_summary(
+    profit = await get_cloud_profit_summary(
         organization_id=org.id,
         start_at=now - timedelta(days=7),
         end_at=now,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
-    stock_value = get_cloud_stock_value(
+    stock_value = await get_cloud_stock_value(
         organization_id=org.id,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
-    impact = get_cloud_stockout_impact(
+    impact = await get_cloud_stockout_impact(
         organization_id=org.id,
         period_days=3,
         limit=10,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
 
@@ -771,7 +781,80 @@ def test_cloud_profit_stock_value_and_stockout_impact_metrics(db_session):
     assert impact.items[0].product_name == "Stockout Syrup"
 
 
-def test_cloud_stock_velocity_respects_branch_scope_and_can_hide_stable_items(db_session):
+def test_cloud_stock_report_service_aggregates_and_limits_in_sql(db_session):
+    from app.services.cloud_stock_report_service import CloudStockReportService
+
+    org, branch, device = _tenant(db_session, name="Aggregate Stock Org", branch_code="AGG")
+    event = _ingested(db_session, org, branch, device, event_id="56565656-5656-5656-5656-565656565651", sequence=1, event_type=SyncEventType.PRODUCT_CREATED)
+    today = date.today()
+    db_session.add_all(
+        [
+            CloudProductSnapshot(
+                organization_id=org.id,
+                branch_id=branch.id,
+                local_product_id=index,
+                name=f"Product {index:02d}",
+                sku=f"AGG-{index}",
+                total_stock=index - 3,
+                low_stock_threshold=5,
+                cost_price=None if index == 10 else Decimal("2.00"),
+                selling_price=Decimal("5.00"),
+                is_active=index != 9,
+                last_source_event_id=event.id,
+                payload={},
+            )
+            for index in range(1, 13)
+        ]
+        + [
+            CloudBatchSnapshot(
+                organization_id=org.id,
+                branch_id=branch.id,
+                local_product_id=index,
+                local_batch_id=100 + index,
+                batch_number=f"AGG-B{index}",
+                quantity=2,
+                expiry_date=today + timedelta(days=index * 10 - 25),
+                cost_price=Decimal("1.50"),
+                is_quarantined=False,
+                last_source_event_id=event.id,
+                payload={},
+            )
+            for index in (1, 2, 3, 9, 12)
+        ]
+    )
+    db_session.commit()
+    scope = {"organization_id": org.id, "branch_id": None}
+
+    value = CloudStockReportService.stock_value(db_session, **scope)
+    product_counts = CloudStockReportService.product_risk_counts(db_session, **scope)
+    batch_counts = CloudStockReportService.batch_risk_counts(
+        db_session, **scope, today=today, warning_date=today + timedelta(days=30)
+    )
+    active_batch_counts = CloudStockReportService.batch_risk_counts(
+        db_session, **scope, today=today, warning_date=today + timedelta(days=30), active_products_only=True
+    )
+    low_stock = CloudStockReportService.low_stock_products(db_session, **scope, limit=3)
+    expiring = CloudStockReportService.expiry_batches(
+        db_session, **scope, today=today, warning_date=today + timedelta(days=70), limit=2
+    )
+
+    # Products 4..12 are in stock; 9 is inactive and 10 has no cost price.
+    assert value["total_active_products"] == 8
+    assert value["products_valued"] == 7
+    assert value["total_cost_value"] == 2.0 * (1 + 2 + 3 + 4 + 5 + 8 + 9)
+    assert value["total_retail_value"] == 5.0 * (1 + 2 + 3 + 4 + 5 + 7 + 8 + 9)
+    assert product_counts == {"low_stock_count": 5, "out_of_stock_count": 3, "total_quantity_on_hand": 39}
+    assert batch_counts == {"near_expiry_batch_count": 1, "expired_batch_count": 2, "value_at_risk": 9.0}
+    assert active_batch_counts == batch_counts
+    assert [row["product_id"] for row in low_stock] == [1, 2, 3]
+    assert [row["status"] for row in low_stock] == ["out_of_stock"] * 3
+    assert [row["batch_id"] for row in expiring] == [101, 102]
+    assert expiring[0]["status"] == "expired"
+    assert expiring[0]["product_name"] == "Product 01"
+
+
+@pytest.mark.asyncio
+async def test_cloud_stock_velocity_respects_branch_scope_and_can_hide_stable_items(async_db, db_session):
     org = Organization(name="Velocity Scoped Org")
     db_session.add(org)
     db_session.flush()
@@ -844,12 +927,12 @@ def test_cloud_stock_velocity_respects_branch_scope_and_can_hide_stable_items(db
     db_session.commit()
     report_user = _report_user(db_session, org.id, branch_id=branch_b.id, username="velocity-branch-user")
 
-    velocity = get_cloud_stock_velocity(
+    velocity = await get_cloud_stock_velocity(
         organization_id=org.id,
         period_days=10,
         limit=10,
         include_stable=False,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
 
@@ -859,7 +942,8 @@ def test_cloud_stock_velocity_respects_branch_scope_and_can_hide_stable_items(db
     assert velocity[0].status == "critical"
 
 
-def test_cloud_revenue_comparison_flags_branch_drops_and_growth(db_session):
+@pytest.mark.asyncio
+async def test_cloud_revenue_comparison_flags_branch_drops_and_growth(async_db, db_session):
     org = Organization(name="Trend Org")
     db_session.add(org)
     db_session.flush()
@@ -935,11 +1019,11 @@ def test_cloud_revenue_comparison_flags_branch_drops_and_growth(db_session):
     db_session.commit()
     report_user = _report_user(db_session, org.id)
 
-    comparison = get_cloud_revenue_comparison(
+    comparison = await get_cloud_revenue_comparison(
         organization_id=org.id,
         period_days=7,
         limit=10,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
 
@@ -955,7 +1039,8 @@ def test_cloud_revenue_comparison_flags_branch_drops_and_growth(db_session):
     assert growth.revenue_change_percent == 300.0
 
 
-def test_cloud_revenue_comparison_respects_branch_scope(db_session):
+@pytest.mark.asyncio
+async def test_cloud_revenue_comparison_respects_branch_scope(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Trend Scoped Org", branch_code="TS")
     event = _ingested(db_session, org, branch, device, event_id="13131313-1313-1313-1313-131313131313", sequence=1, event_type=SyncEventType.SALE_CREATED)
     now = datetime.now(timezone.utc)
@@ -977,11 +1062,11 @@ def test_cloud_revenue_comparison_respects_branch_scope(db_session):
     db_session.commit()
     report_user = _report_user(db_session, org.id, branch_id=branch.id, username="trend-branch-user")
 
-    comparison = get_cloud_revenue_comparison(
+    comparison = await get_cloud_revenue_comparison(
         organization_id=org.id,
         period_days=7,
         limit=10,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
 
@@ -991,7 +1076,8 @@ def test_cloud_revenue_comparison_respects_branch_scope(db_session):
     assert comparison.branches[0].status == "new_sales"
 
 
-def test_cloud_reconciliation_flags_projection_and_snapshot_inconsistencies(db_session):
+@pytest.mark.asyncio
+async def test_cloud_reconciliation_flags_projection_and_snapshot_inconsistencies(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Reconcile Org", branch_code="REC")
     other_org, other_branch, other_device = _tenant(db_session, name="Other Reconcile Org", branch_code="OREC")
     event = _ingested(db_session, org, branch, device, event_id="88888888-8888-8888-8888-888888888881", sequence=1, event_type=SyncEventType.PRODUCT_CREATED)
@@ -1079,10 +1165,10 @@ def test_cloud_reconciliation_flags_projection_and_snapshot_inconsistencies(db_s
     db_session.commit()
     report_user = _report_user(db_session, org.id, branch_id=branch.id, username="reconcile-report-user")
 
-    summary = get_cloud_reconciliation(
+    summary = await get_cloud_reconciliation(
         organization_id=org.id,
         limit=50,
-        db=db_session,
+        db=async_db,
         current_user=report_user,
     )
 
@@ -1102,12 +1188,13 @@ def test_cloud_reconciliation_flags_projection_and_snapshot_inconsistencies(db_s
     assert all(issue.issue_key for issue in summary.issues)
 
 
-def test_manager_can_acknowledge_and_resolve_cloud_reconciliation_issue(db_session):
+@pytest.mark.asyncio
+async def test_manager_can_acknowledge_and_resolve_cloud_reconciliation_issue(async_db, db_session):
     org, branch, user = _seed_reconciliation_issue(db_session)
-    summary = get_cloud_reconciliation(
+    summary = await get_cloud_reconciliation(
         organization_id=org.id,
         limit=50,
-        db=db_session,
+        db=async_db,
         current_user=user,
     )
     issue = summary.issues[0]
@@ -1122,10 +1209,10 @@ def test_manager_can_acknowledge_and_resolve_cloud_reconciliation_issue(db_sessi
         db=db_session,
         current_user=user,
     )
-    acknowledged_summary = get_cloud_reconciliation(
+    acknowledged_summary = await get_cloud_reconciliation(
         organization_id=org.id,
         limit=50,
-        db=db_session,
+        db=async_db,
         current_user=user,
     )
     acknowledged_issue = next(item for item in acknowledged_summary.issues if item.issue_key == issue.issue_key)
@@ -1146,10 +1233,10 @@ def test_manager_can_acknowledge_and_resolve_cloud_reconciliation_issue(db_sessi
         db=db_session,
         current_user=user,
     )
-    resolved_summary = get_cloud_reconciliation(
+    resolved_summary = await get_cloud_reconciliation(
         organization_id=org.id,
         limit=50,
-        db=db_session,
+        db=async_db,
         current_user=user,
     )
     resolved_issue = next(item for item in resolved_summary.issues if item.issue_key == issue.issue_key)
@@ -1185,7 +1272,8 @@ def test_acknowledging_unknown_cloud_reconciliation_issue_returns_404(db_session
     assert exc.value.status_code == 404
 
 
-def test_admin_can_repair_product_stock_total_mismatch(db_session):
+@pytest.mark.asyncio
+async def test_admin_can_repair_product_stock_total_mismatch(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Repair Mismatch Org", branch_code="RMO")
     event = _ingested(
         db_session,
@@ -1232,10 +1320,10 @@ def test_admin_can_repair_product_stock_total_mismatch(db_session):
         username="repair-mismatch-user",
         role=UserRole.ADMIN,
     )
-    summary = get_cloud_reconciliation(
+    summary = await get_cloud_reconciliation(
         organization_id=org.id,
         limit=50,
-        db=db_session,
+        db=async_db,
         current_user=user,
     )
     issue = next(item for item in summary.issues if item.issue_type == "product_batch_quantity_mismatch")
@@ -1252,10 +1340,10 @@ def test_admin_can_repair_product_stock_total_mismatch(db_session):
         current_user=user,
     )
     product = db_session.query(CloudProductSnapshot).filter_by(local_product_id=44).one()
-    repaired_summary = get_cloud_reconciliation(
+    repaired_summary = await get_cloud_reconciliation(
         organization_id=org.id,
         limit=50,
-        db=db_session,
+        db=async_db,
         current_user=user,
     )
     audit_entry = (
@@ -1393,7 +1481,69 @@ def test_admin_can_repair_cloud_sale_item_counts_from_sale_payload(db_session):
     assert audit_entry.extra_data["repair_type"] == "repair_sale_item_counts"
 
 
-def test_cloud_dead_stock_identifies_products_with_no_sales(db_session):
+def test_sale_item_count_repair_covers_facts_whose_events_were_archived(db_session):
+    org, branch, device = _tenant(db_session, name="Repair Archived Org", branch_code="RAO")
+    for sequence, payload in (
+        (1, {"sale_id": 401, "items": [{"product_id": 10, "quantity": 4}]}),
+        (2, {"old": "line-count semantics"}),
+    ):
+        event = _ingested(
+            db_session,
+            org,
+            branch,
+            device,
+            event_id=f"99999999-9999-9999-9999-99999999999{4 + sequence}",
+            sequence=sequence,
+            event_type=SyncEventType.SALE_CREATED,
+        )
+        db_session.add(
+            CloudSaleFact(
+                source_event_id=event.id,
+                organization_id=org.id,
+                branch_id=branch.id,
+                source_device_id=device.id,
+                local_sale_id=400 + sequence,
+                invoice_number=f"INV-RAO-{400 + sequence}",
+                total_amount=Decimal("40.00"),
+                payment_method="cash",
+                item_count=1,
+                payload=payload,
+            )
+        )
+        # The archive job has since moved the event to cold storage.
+        db_session.delete(event)
+    db_session.commit()
+    user = _report_user(
+        db_session,
+        org.id,
+        branch_id=branch.id,
+        username="repair-archived-user",
+        role=UserRole.ADMIN,
+    )
+
+    result = repair_cloud_reconciliation_issue(
+        CloudReconciliationRepairRequest(
+            organization_id=org.id,
+            branch_id=branch.id,
+            repair_type="repair_sale_item_counts",
+            limit=10,
+        ),
+        db=db_session,
+        current_user=user,
+    )
+    facts = {fact.local_sale_id: fact for fact in db_session.query(CloudSaleFact).filter_by(organization_id=org.id)}
+
+    assert (result.attempted, result.repaired, result.skipped) == (2, 1, 1)
+    assert facts[401].item_count == 4
+    assert facts[402].item_count == 1
+    assert [(detail["sale_fact_id"], detail["source"], detail["status"]) for detail in result.details] == [
+        (facts[401].id, "sale_fact_payload", "repaired"),
+        (facts[402].id, "sale_fact_payload", "skipped"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cloud_dead_stock_identifies_products_with_no_sales(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Dead Stock Org", branch_code="DSO")
     user = _report_user(db_session, org.id, username="dead-stock-user")
     sale_event = _ingested(
@@ -1426,9 +1576,9 @@ def test_cloud_dead_stock_identifies_products_with_no_sales(db_session):
     ])
     db_session.commit()
 
-    result = get_cloud_dead_stock(
+    result = await get_cloud_dead_stock(
         organization_id=org.id, branch_id=None, period_days=30, limit=50,
-        db=db_session, current_user=user,
+        db=async_db, current_user=user,
     )
 
     product_names = [item.product_name for item in result]
@@ -1440,7 +1590,8 @@ def test_cloud_dead_stock_identifies_products_with_no_sales(db_session):
     assert stagnant.branch_name == branch.name
 
 
-def test_cloud_dead_stock_slow_mover_below_threshold(db_session):
+@pytest.mark.asyncio
+async def test_cloud_dead_stock_slow_mover_below_threshold(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Slow Mover Org", branch_code="SMO")
     user = _report_user(db_session, org.id, username="slow-mover-user")
     sale_event = _ingested(
@@ -1480,9 +1631,9 @@ def test_cloud_dead_stock_slow_mover_below_threshold(db_session):
     ])
     db_session.commit()
 
-    result = get_cloud_dead_stock(
+    result = await get_cloud_dead_stock(
         organization_id=org.id, branch_id=None, period_days=30, limit=50,
-        db=db_session, current_user=user,
+        db=async_db, current_user=user,
     )
 
     product_names = [item.product_name for item in result]
@@ -1493,7 +1644,8 @@ def test_cloud_dead_stock_slow_mover_below_threshold(db_session):
     assert slow.units_sold_in_period == 1
 
 
-def test_cloud_dead_stock_respects_branch_scope(db_session):
+@pytest.mark.asyncio
+async def test_cloud_dead_stock_respects_branch_scope(async_db, db_session):
     org, branch, device = _tenant(db_session, name="Dead Scope Org", branch_code="DSB")
     other_branch = Branch(organization_id=org.id, name="Other Branch", code="OTH")
     db_session.add(other_branch)
@@ -1519,9 +1671,9 @@ def test_cloud_dead_stock_respects_branch_scope(db_session):
     ])
     db_session.commit()
 
-    result = get_cloud_dead_stock(
+    result = await get_cloud_dead_stock(
         organization_id=org.id, branch_id=branch.id, period_days=30, limit=50,
-        db=db_session, current_user=user,
+        db=async_db, current_user=user,
     )
 
     product_names = [item.product_name for item in result]
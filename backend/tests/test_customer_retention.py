@@ -10,21 +10,40 @@ Covers:
   - Message adapter: StubAdapter
   - Message adapter: get_adapter() defaults to StubAdapter
   - AfricasTalkingAdapter: Ghana number normalisation (unit test, no network)
+  - Customer purchase counters (checkout + void) and phone/name search
+  - Chunked follow-up dispatch (per-chunk commits, skips, pacing)
+  - Receipt outbox: queued at checkout, delivered in batches with retries
 """
 from __future__ import annotations
 
 import os
+import time
 from datetime import datetime, timedelta, timezone
+from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import pytest
-
-from app.models.customer import ConsentStatus, Customer, CustomerFollowUp, FollowUpStatus
+from sqlalchemy import event
+
+from app.api.endpoints.customers import get_customer, list_customer_messages, list_customers, search_customers
+from app.api.endpoints.sales import create_sale, void_sale
+from app.core.config import settings
+from app.models.customer import (
+    ConsentStatus,
+    Customer,
+    CustomerFollowUp,
+    FollowUpStatus,
+    OutboundMessage,
+    OutboundMessageStatus,
+    normalize_phone,
+)
+from app.services import customer_retention_service
 from app.models.sale import Sale, SaleItem
 from app.models.tenancy import Organization
 from app.models.user import User, UserRole
+from app.schemas.sale import SaleActionRequest, SaleCreate, SaleItemCreate
 from app.services.customer_analytics_service import CustomerAnalyticsService
-from app.services.message_adapter import DeliveryResult, StubAdapter, get_adapter
+from app.services.message_adapter import DeliveryResult, OutgoingMessage, StubAdapter, get_adapter
 
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
@@ -449,6 +468,352 @@ class TestStubAdapter:
             _settings.SMS_PROVIDER = original
 
 
+# ─── Purchase counters and search ─────────────────────────────────────────────
+
+class TestCustomerPurchaseCounters:
+    @pytest.fixture
+    def scoped_customer(
+        self,
+        db_session,
+        cashier_user,
+        category,
+        product_factory,
+        batch_factory,
+        assign_tenant_scope,
+        monkeypatch,
+    ):
+        organization, branch, _other_branch = assign_tenant_scope(cashier_user)
+        product = product_factory(category.id, name="Counter Product", sku="COUNTER-001")
+        product.selling_price = Decimal("4.00")
+        product.organization_id = organization.id
+        product.branch_id = branch.id
+        batch = batch_factory(product.id, batch_number="COUNTER-B1", quantity=10, expiry_offset_days=180)
+        batch.organization_id = organization.id
+        batch.branch_id = branch.id
+        customer = Customer(
+            organization_id=organization.id,
+            branch_id=branch.id,
+            full_name="Akosua Mensah",
+            phone="+233 24 412 3456",
+        )
+        db_session.add(customer)
+        db_session.commit()
+        monkeypatch.setattr(settings, "APP_MODE", "online_pos")
+        return customer, product
+
+    def _sell(self, db_session, cashier_user, product, customer, quantity: int):
+        return create_sale(
+            SaleCreate(
+                items=[SaleItemCreate(product_id=product.id, quantity=quantity, unit_price=4.0, discount_amount=0.0)],
+                discount_amount=0.0,
+                tax_amount=0.0,
+                amount_paid=4.0 * quantity,
+                customer_id=customer.id,
+            ),
+            db=db_session,
+            current_user=cashier_user,
+        )
+
+    def test_checkout_and_void_maintain_counters(self, db_session, cashier_user, scoped_customer):
+        customer, product = scoped_customer
+        first = self._sell(db_session, cashier_user, product, customer, 1)
+        second = self._sell(db_session, cashier_user, product, customer, 2)
+
+        profile = get_customer(customer.id, db=db_session, current_user=cashier_user)
+        assert profile.total_purchases == 2
+        assert float(profile.lifetime_spend) == 12.0
+        assert profile.last_purchase_at == second.created_at
+
+        void_sale(
+            second.id,
+            SaleActionRequest(reason="Wrong customer"),
+            db=db_session,
+            current_user=cashier_user,
+        )
+
+        profile = get_customer(customer.id, db=db_session, current_user=cashier_user)
+        assert profile.total_purchases == 1
+        assert float(profile.lifetime_spend) == 4.0
+        assert profile.last_purchase_at == first.created_at
+
+    def test_list_customers_does_not_query_sales(self, db_session, cashier_user, scoped_customer):
+        customer, product = scoped_customer
+        for _ in range(3):
+            self._sell(db_session, cashier_user, product, customer, 1)
+        cashier_user.organization_id  # load the user before counting
+
+        statements = []
+
+        def _capture(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(db_session.bind, "before_cursor_execute", _capture)
+        try:
+            customers = list_customers(skip=0, limit=50, is_active=None, db=db_session, current_user=cashier_user)
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", _capture)
+
+        assert [c.total_purchases for c in customers] == [3]
+        assert len(statements) == 1
+        assert "FROM sales" not in statements[0]
+
+    def test_search_matches_phone_in_any_format_and_partial_name(self, db_session, cashier_user, scoped_customer):
+        customer, _product = scoped_customer
+        assert customer.phone_normalized == "0244123456"
+
+        for term in ("024 412", "+233244123456", "0244-123-456", "kosua"):
+            results = search_customers(q=term, limit=10, db=db_session, current_user=cashier_user)
+            assert [result.id for result in results] == [customer.id], term
+
+        assert search_customers(q="0555", limit=10, db=db_session, current_user=cashier_user) == []
+
+    def test_normalize_phone(self):
+        assert normalize_phone("00233 24 412 3456") == "0244123456"
+        assert normalize_phone("(024) 412-3456") == "0244123456"
+        assert normalize_phone("Akosua") == ""
+
+
+# ─── Follow-up dispatch ────────────────────────────────────────────────────────
+
+class _RecordingAdapter(StubAdapter):
+    def __init__(self, crash_on_call: int | None = None):
+        self.recipients: list[str] = []
+        self.crash_on_call = crash_on_call
+
+    def send(self, *, to: str, message: str, channel: str = "sms") -> DeliveryResult:
+        self.recipients.append(to)
+        if self.crash_on_call is not None and len(self.recipients) >= self.crash_on_call:
+            raise KeyboardInterrupt("worker killed mid-run")
+        return DeliveryResult(success=True, provider_message_id=f"msg-{len(self.recipients)}")
+
+
+class TestFollowUpDispatch:
+    def _due_follow_ups(self, db, *, slug: str, count: int) -> list[CustomerFollowUp]:
+        organization, user = _make_tenant(db, slug=slug)
+        follow_ups = []
+        for index in range(count):
+            customer = _make_customer(db, org_id=organization.id, phone=f"02440099{index:02d}", name=f"Ama {index}")
+            sale = _make_sale(db, org_id=organization.id, user_id=user.id, customer_id=customer.id, amount=5.0, days_ago=3)
+            follow_up = CustomerFollowUp(
+                organization_id=organization.id,
+                customer_id=customer.id,
+                sale_id=sale.id,
+                scheduled_at=datetime.now(timezone.utc) - timedelta(minutes=index + 1),
+                channel="sms",
+            )
+            db.add(follow_up)
+            follow_ups.append(follow_up)
+        db.commit()
+        return follow_ups
+
+    def test_dispatches_due_follow_ups_in_chunks(self, db_session, monkeypatch):
+        follow_ups = self._due_follow_ups(db_session, slug="chunked-dispatch", count=5)
+        follow_ups[1].customer.sms_consent = ConsentStatus.DECLINED
+        db_session.commit()
+        adapter = _RecordingAdapter()
+        monkeypatch.setattr(customer_retention_service, "get_adapter", lambda: adapter)
+
+        result = customer_retention_service.process_pending_follow_ups(
+            db_session, chunk_size=2, concurrency=3, max_per_second=0,
+        )
+
+        assert result["sent"] == 4
+        assert result["skipped"] == 1
+        assert result["total_processed"] == 5
+        assert result["chunks"] == 3
+        assert result["messages_per_second"] > 0
+        assert sorted(adapter.recipients) == sorted(
+            f.customer.phone for index, f in enumerate(follow_ups) if index != 1
+        )
+        db_session.expire_all()
+        assert [f.status for f in follow_ups] == [
+            FollowUpStatus.SENT,
+            FollowUpStatus.SKIPPED,
+            FollowUpStatus.SENT,
+            FollowUpStatus.SENT,
+            FollowUpStatus.SENT,
+        ]
+
+    def test_crash_late_in_run_keeps_committed_chunks(self, db_session, monkeypatch):
+        follow_ups = self._due_follow_ups(db_session, slug="crashed-dispatch", count=4)
+        monkeypatch.setattr(
+            customer_retention_service, "get_adapter", lambda: _RecordingAdapter(crash_on_call=3)
+        )
+
+        with pytest.raises(KeyboardInterrupt):
+            customer_retention_service.process_pending_follow_ups(
+                db_session, chunk_size=2, concurrency=1, max_per_second=0,
+            )
+        db_session.rollback()
+
+        assert [f.status for f in follow_ups] == [
+            FollowUpStatus.SENT,
+            FollowUpStatus.SENT,
+            FollowUpStatus.PENDING,
+            FollowUpStatus.PENDING,
+        ]
+
+    def test_send_pacer_spaces_sends(self):
+        pacer = customer_retention_service._SendPacer(max_per_second=50)
+        started = time.monotonic()
+        for _ in range(6):
+            pacer.wait()
+        assert time.monotonic() - started >= 0.09
+
+
+# ─── Receipt outbox ────────────────────────────────────────────────────────────
+
+class _FlakyBatchAdapter(StubAdapter):
+    def __init__(self, fail_recipients: set[str]):
+        self.fail_recipients = fail_recipients
+        self.batches: list[list[str]] = []
+
+    def send_batch(self, messages: list[OutgoingMessage]) -> list[DeliveryResult]:
+        self.batches.append([item.to for item in messages])
+        return [
+            DeliveryResult(success=False, error="gateway timeout")
+            if item.to in self.fail_recipients
+            else DeliveryResult(success=True, provider_message_id=f"bulk-{item.to}")
+            for item in messages
+        ]
+
+
+class TestReceiptOutbox:
+    def test_checkout_queues_receipt_without_calling_provider(
+        self,
+        db_session,
+        cashier_user,
+        category,
+        product_factory,
+        batch_factory,
+        assign_tenant_scope,
+        monkeypatch,
+    ):
+        organization, branch, _other_branch = assign_tenant_scope(cashier_user)
+        product = product_factory(category.id, name="Receipt Product", sku="RECEIPT-001")
+        product.selling_price = Decimal("4.00")
+        product.organization_id = organization.id
+        product.branch_id = branch.id
+        batch = batch_factory(product.id, batch_number="RECEIPT-B1", quantity=5, expiry_offset_days=180)
+        batch.organization_id = organization.id
+        batch.branch_id = branch.id
+        customer = Customer(
+            organization_id=organization.id,
+            branch_id=branch.id,
+            full_name="Yaw Boateng",
+            phone="0244001122",
+            sms_consent=ConsentStatus.GRANTED,
+        )
+        db_session.add(customer)
+        db_session.commit()
+        monkeypatch.setattr(settings, "APP_MODE", "online_pos")
+        monkeypatch.setattr(settings, "CUSTOMER_RETENTION_ENABLED", True)
+        monkeypatch.setattr(settings, "CUSTOMER_RECEIPTS_ENABLED", True)
+        monkeypatch.setattr(settings, "CUSTOMER_FOLLOWUPS_ENABLED", False)
+
+        def _provider_called():
+            raise AssertionError("checkout must not call the SMS provider")
+
+        monkeypatch.setattr(customer_retention_service, "get_adapter", _provider_called)
+
+        sale = create_sale(
+            SaleCreate(
+                items=[SaleItemCreate(product_id=product.id, quantity=1, unit_price=4.0, discount_amount=0.0)],
+                discount_amount=0.0,
+                tax_amount=0.0,
+                amount_paid=4.0,
+                customer_id=customer.id,
+            ),
+            db=db_session,
+            current_user=cashier_user,
+        )
+
+        messages = list_customer_messages(customer.id, limit=50, db=db_session, current_user=cashier_user)
+        assert len(messages) == 1
+        assert messages[0].status == OutboundMessageStatus.PENDING
+        assert messages[0].sale_id == sale.id
+        assert sale.invoice_number in messages[0].body
+        assert sale.receipt_sent is False
+
+        adapter = _FlakyBatchAdapter(fail_recipients=set())
+        monkeypatch.setattr(customer_retention_service, "get_adapter", lambda: adapter)
+        result = customer_retention_service.deliver_outbound_messages(db_session)
+
+        assert result == {"sent": 1, "retrying": 0, "failed": 0, "batches": 1}
+        db_session.refresh(sale)
+        assert sale.receipt_sent is True
+
+    def test_worker_batches_and_retries_with_backoff(self, db_session, monkeypatch):
+        organization, _user = _make_tenant(db_session, slug="receipt-worker")
+        customers = [
+            _make_customer(db_session, org_id=organization.id, phone=f"02440077{index:02d}", name=f"Kofi {index}")
+            for index in range(3)
+        ]
+        for customer in customers:
+            db_session.add(
+                OutboundMessage(
+                    organization_id=organization.id,
+                    customer_id=customer.id,
+                    channel="sms",
+                    recipient=customer.phone,
+                    body="Receipt INV-1",
+                    next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+                )
+            )
+        db_session.commit()
+        adapter = _FlakyBatchAdapter(fail_recipients={customers[2].phone})
+        monkeypatch.setattr(customer_retention_service, "get_adapter", lambda: adapter)
+
+        first = customer_retention_service.deliver_outbound_messages(
+            db_session, batch_size=2, max_attempts=2, retry_base_seconds=60,
+        )
+        assert first == {"sent": 2, "retrying": 1, "failed": 0, "batches": 2}
+        assert [len(batch) for batch in adapter.batches] == [2, 1]
+
+        retry = db_session.query(OutboundMessage).filter(OutboundMessage.recipient == customers[2].phone).one()
+        assert retry.status == OutboundMessageStatus.PENDING
+        assert retry.last_error == "gateway timeout"
+        # Not due again until the backoff elapses.
+        assert customer_retention_service.deliver_outbound_messages(db_session)["batches"] == 0
+
+        retry.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db_session.commit()
+        final = customer_retention_service.deliver_outbound_messages(db_session, max_attempts=2)
+        assert final == {"sent": 0, "retrying": 0, "failed": 1, "batches": 1}
+        db_session.refresh(retry)
+        assert retry.status == OutboundMessageStatus.FAILED
+        assert retry.attempts == 2
+
+    def test_africas_talking_batch_groups_identical_text(self):
+        from app.services._africas_talking_adapter import AfricasTalkingAdapter
+
+        sms = MagicMock()
+        sms.send.side_effect = lambda message, recipients, sender_id: {
+            "SMSMessageData": {
+                "Recipients": [
+                    {"number": number, "statusCode": 101 if number != "+233244000003" else 403,
+                     "status": "Success" if number != "+233244000003" else "InvalidPhoneNumber",
+                     "messageId": f"AT-{number}"}
+                    for number in recipients
+                ]
+            }
+        }
+        adapter = AfricasTalkingAdapter.__new__(AfricasTalkingAdapter)
+        adapter._sms = sms
+        adapter._sender_id = "PharmaPOS"
+
+        results = adapter.send_batch([
+            OutgoingMessage(to="0244000001", message="Same text"),
+            OutgoingMessage(to="0244000002", message="Other text"),
+            OutgoingMessage(to="0244000003", message="Same text"),
+        ])
+
+        assert sms.send.call_count == 2
+        assert [result.success for result in results] == [True, True, False]
+        assert results[0].provider_message_id == "AT-+233244000001"
+        assert results[2].error == "InvalidPhoneNumber"
+
+
 # ─── Africa's Talking number normalisation ────────────────────────────────────
 
 class TestAfricasTalkingNormalisation:
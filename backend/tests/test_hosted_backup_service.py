@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 from base64 import urlsafe_b64encode
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
+import hashlib
+import io
 import json
 from pathlib import Path
+import subprocess
+
+import boto3
+from cryptography.exceptions import InvalidTag
+from moto import mock_aws
+import pytest
 
 from app.services.hosted_backup_service import (
     HostedBackupConfig,
@@ -92,38 +101,144 @@ def test_backup_encryption_round_trip_detects_plaintext_checksum(tmp_path):
     assert manifest["encrypted_sha256"]
 
 
-def test_create_hosted_backup_uploads_daily_monthly_and_manifest():
-    config = _config()
-    fake_s3 = _FakeS3()
-    captured = {}
+class _FakePgDump:
+    """Stand-in for ``subprocess.Popen`` running ``pg_dump`` to stdout."""
+
+    def __init__(self, data: bytes, returncode: int = 0):
+        self.data = data
+        self.returncode = returncode
+        self.calls = []
+
+    def __call__(self, command, **kwargs):
+        self.calls.append({"command": command, **kwargs})
+        if self.returncode:
+            kwargs["stderr"].write(b"pg_dump: error: connection refused")
+        return _FakeProcess(self.data, self.returncode)
+
+
+class _FakeProcess:
+    def __init__(self, data: bytes, returncode: int):
+        self.stdout = io.BytesIO(data)
+        self._returncode = returncode
+        self.killed = False
+
+    def wait(self):
+        return self._returncode
+
+    def poll(self):
+        return self._returncode
+
+    def kill(self):
+        self.killed = True
+
 
-    def runner(command, **kwargs):
-        captured["command"] = command
-        captured["env"] = kwargs["env"]
-        destination = Path(command[command.index("-f") + 1])
-        destination.write_bytes(b"custom-postgres-dump")
+@pytest.fixture()
+def moto_s3():
+    with mock_aws():
+        client = boto3.client(
+            "s3",
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        )
+        client.create_bucket(Bucket="tenant-backups")
+        yield client
+
+
+def _dump_bytes(size: int) -> bytes:
+    block = hashlib.sha256(b"pharmacy").digest() * 2048
+    return (block * (size // len(block) + 1))[:size]
+
+
+def test_create_hosted_backup_streams_multipart_daily_and_copies_monthly(moto_s3, tmp_path):
+    config = replace(_config(), upload_part_size_bytes=5 * 1024 * 1024, upload_concurrency=3)
+    dump = _dump_bytes(12 * 1024 * 1024 + 123)
+    pg_dump = _FakePgDump(dump)
+    part_copies = []
+    moto_s3.meta.events.register("before-call.s3.UploadPartCopy", lambda **kwargs: part_copies.append(kwargs))
 
     result = create_hosted_backup(
         config,
-        s3_client=fake_s3,
+        s3_client=moto_s3,
         now=datetime(2026, 6, 1, 2, 0, tzinfo=timezone.utc),
         revision="q2r3s4t5u6v7",
-        runner=runner,
+        popen=pg_dump,
     )
 
-    assert "database-secret" not in " ".join(captured["command"])
-    assert captured["env"]["PGPASSWORD"] == "database-secret"
-    assert captured["env"]["PGSSLMODE"] == "require"
-    assert len(fake_s3.uploads) == 2
+    command = pg_dump.calls[0]["command"]
+    assert "database-secret" not in " ".join(command)
+    assert "-f" not in command
+    assert pg_dump.calls[0]["env"]["PGPASSWORD"] == "database-secret"
+    assert pg_dump.calls[0]["env"]["PGSSLMODE"] == "require"
     assert "/daily/2026/06/" in result["object_key"]
     assert "/monthly/2026/06/" in result["monthly_object_key"]
-    assert f'{result["object_key"]}.json' in fake_s3.objects
+    assert result["upload_part_count"] == 3
+
+    daily_bytes = moto_s3.get_object(Bucket="tenant-backups", Key=result["object_key"])["Body"].read()
+    monthly_bytes = moto_s3.get_object(Bucket="tenant-backups", Key=result["monthly_object_key"])["Body"].read()
+    assert monthly_bytes == daily_bytes
+    # Copied in parts, as a single CopyObject fails for objects over 5 GB.
+    assert len(part_copies) == 3
+    daily_head = moto_s3.head_object(Bucket="tenant-backups", Key=result["object_key"])
+    monthly_head = moto_s3.head_object(Bucket="tenant-backups", Key=result["monthly_object_key"])
+    assert monthly_head["Metadata"] == daily_head["Metadata"]
+    assert hashlib.sha256(daily_bytes).hexdigest() == result["encrypted_sha256"]
+    assert len(daily_bytes) == result["encrypted_size_bytes"]
+
     manifest = json.loads(
-        fake_s3.objects[f'{result["object_key"]}.json']["Body"]
+        moto_s3.get_object(Bucket="tenant-backups", Key=f'{result["object_key"]}.json')["Body"].read()
     )
     assert manifest["schema_revision"] == "q2r3s4t5u6v7"
     assert manifest["organization_uid"] == config.organization_uid
-    assert manifest["encrypted_sha256"]
+    assert manifest["plaintext_sha256"] == hashlib.sha256(dump).hexdigest()
+
+    encrypted = tmp_path / "download.dump.enc"
+    restored = tmp_path / "restored.dump"
+    encrypted.write_bytes(daily_bytes)
+    decrypt_backup(
+        encrypted,
+        restored,
+        encryption_key=config.encryption_key_bytes(),
+        expected_plaintext_sha256=manifest["plaintext_sha256"],
+    )
+    assert restored.read_bytes() == dump
+
+
+def test_create_hosted_backup_aborts_multipart_upload_when_pg_dump_fails(moto_s3):
+    config = _config()
+
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        create_hosted_backup(
+            config,
+            s3_client=moto_s3,
+            now=datetime(2026, 6, 2, 2, 0, tzinfo=timezone.utc),
+            revision="q2r3s4t5u6v7",
+            popen=_FakePgDump(b"partial-dump", returncode=1),
+        )
+
+    assert "connection refused" in error.value.stderr
+    assert moto_s3.list_multipart_uploads(Bucket="tenant-backups").get("Uploads", []) == []
+    assert moto_s3.list_objects_v2(Bucket="tenant-backups").get("Contents", []) == []
+
+
+def test_streamed_backup_detects_truncated_ciphertext(tmp_path):
+    source = tmp_path / "source.dump"
+    encrypted = tmp_path / "source.dump.enc"
+    restored = tmp_path / "restored.dump"
+    source.write_bytes(_dump_bytes(3 * 1024 * 1024 + 10))
+    encrypt_backup(
+        source,
+        encrypted,
+        encryption_key=b"k" * 32,
+        header={"backup_id": "backup-1"},
+    )
+    # Drop the whole 10-byte final frame (4-byte length + data + 16-byte tag)
+    # so the cut lands exactly on a frame boundary.
+    encrypted.write_bytes(encrypted.read_bytes()[:-30])
+
+    with pytest.raises(InvalidTag):
+        decrypt_backup(encrypted, restored, encryption_key=b"k" * 32)
+    assert not restored.exists()
 
 
 def test_prune_prefix_deletes_only_objects_older_than_retention():
@@ -155,3 +270,160 @@ def test_prune_prefix_deletes_only_objects_older_than_retention():
 
     assert deleted == 1
     assert fake_s3.deleted == [{"Key": "tenants/t1/daily/old.dump.enc"}]
+
+
+def test_decrypt_backup_still_reads_single_frame_v1_objects(tmp_path):
+    import struct
+
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    from app.services.hosted_backup_service import BACKUP_MAGIC
+
+    plaintext = b"legacy-custom-postgres-dump" * 100
+    nonce = b"n" * 12
+    header_bytes = json.dumps(
+        {
+            "backup_id": "legacy",
+            "nonce": nonce.hex(),
+            "plaintext_sha256": hashlib.sha256(plaintext).hexdigest(),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    ).encode()
+    encryptor = Cipher(algorithms.AES(b"k" * 32), modes.GCM(nonce)).encryptor()
+    encryptor.authenticate_additional_data(header_bytes)
+    ciphertext = encryptor.update(plaintext) + encryptor.finalize()
+    legacy = tmp_path / "legacy.dump.enc"
+    legacy.write_bytes(
+        BACKUP_MAGIC + struct.pack(">I", len(header_bytes)) + header_bytes + ciphertext + encryptor.tag
+    )
+    restored = tmp_path / "legacy.dump"
+
+    header = decrypt_backup(legacy, restored, encryption_key=b"k" * 32)
+
+    assert restored.read_bytes() == plaintext
+    assert header["backup_id"] == "legacy"
+
+
+def _base_tar_bytes() -> bytes:
+    import tarfile
+
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:") as archive:
+        for name, data in {"PG_VERSION": b"16\n", "postgresql.auto.conf": b"# base\n"}.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def test_next_wal_segment_name_rolls_over_to_next_log():
+    from app.services.hosted_wal_archive_service import next_wal_segment_name
+
+    assert next_wal_segment_name("000000010000000000000003") == "000000010000000000000004"
+    assert next_wal_segment_name("0000000100000000000000FF") == "000000010000000100000000"
+
+
+def test_base_backup_chain_archives_wal_and_prepares_point_in_time_restore(moto_s3, tmp_path):
+    from app.services.hosted_wal_archive_service import (
+        archive_wal_segment,
+        create_base_backup,
+        describe_chain,
+        fetch_wal_segment,
+        prepare_point_in_time_restore,
+    )
+
+    config = _config()
+    base = _base_tar_bytes()
+    pg_basebackup = _FakePgDump(base)
+    chain = create_base_backup(
+        config,
+        s3_client=moto_s3,
+        now=datetime(2026, 6, 2, 2, 0, tzinfo=timezone.utc),
+        revision="r3s4t5u6v7w8",
+        start_wal_file="0000000100000000000000FE",
+        popen=pg_basebackup,
+    )
+    command = pg_basebackup.calls[0]["command"]
+    assert command[0] == "pg_basebackup"
+    assert ["-X", "none"] == command[command.index("-X"):command.index("-X") + 2]
+    assert "database-secret" not in " ".join(command)
+    assert chain["object_key"].endswith(f"/chains/{chain['chain_id']}/base.tar.enc")
+
+    for name in ("0000000100000000000000FE", "0000000100000000000000FF", "000000010000000100000001"):
+        segment = tmp_path / name
+        segment.write_bytes(name.encode() * 64)
+        assert archive_wal_segment(config, segment, s3_client=moto_s3)["status"] == "archived"
+    # A retried archive_command with identical content is a no-op.
+    retried = archive_wal_segment(config, tmp_path / "0000000100000000000000FE", s3_client=moto_s3)
+    assert retried["status"] == "already_archived"
+
+    status = describe_chain(config, chain, s3_client=moto_s3)
+    assert status["last_contiguous_wal_file"] == "0000000100000000000000FF"
+    assert status["contiguous_wal_segments"] == 2
+    assert status["first_missing_wal_file"] == "000000010000000100000000"
+
+    restored_segment = tmp_path / "restored-segment"
+    assert fetch_wal_segment(config, "0000000100000000000000FF", restored_segment, s3_client=moto_s3)
+    assert restored_segment.read_bytes() == b"0000000100000000000000FF" * 64
+    assert not fetch_wal_segment(config, "000000010000000100000000", tmp_path / "missing", s3_client=moto_s3)
+
+    data_dir = tmp_path / "pgdata"
+    result = prepare_point_in_time_restore(
+        config,
+        target_time=datetime.now(timezone.utc) + timedelta(minutes=5),
+        data_dir=data_dir,
+        restore_command="restore-wal %f %p",
+        s3_client=moto_s3,
+    )
+    assert result["chain_id"] == chain["chain_id"]
+    assert (data_dir / "PG_VERSION").read_bytes() == b"16\n"
+    assert (data_dir / "recovery.signal").exists()
+    auto_conf = (data_dir / "postgresql.auto.conf").read_text()
+    assert "restore_command = 'restore-wal %f %p'" in auto_conf
+    assert "recovery_target_action = 'promote'" in auto_conf
+
+
+def test_archive_wal_segment_refuses_conflicting_content(moto_s3, tmp_path):
+    from app.services.hosted_wal_archive_service import archive_wal_segment
+
+    config = _config()
+    segment = tmp_path / "000000010000000000000001"
+    segment.write_bytes(b"first")
+    archive_wal_segment(config, segment, s3_client=moto_s3)
+    segment.write_bytes(b"second")
+
+    with pytest.raises(RuntimeError):
+        archive_wal_segment(config, segment, s3_client=moto_s3)
+
+
+def test_new_base_backup_prunes_old_chains_and_wal_they_alone_needed(moto_s3, tmp_path):
+    from app.services.hosted_wal_archive_service import (
+        archive_wal_segment,
+        create_base_backup,
+        list_archived_wal,
+        list_chains,
+    )
+
+    config = replace(_config(), base_retention_count=1)
+    for name in ("000000010000000000000001", "000000010000000000000002", "000000010000000000000005"):
+        segment = tmp_path / name
+        segment.write_bytes(name.encode())
+        archive_wal_segment(config, segment, s3_client=moto_s3)
+
+    for day, start in ((1, "000000010000000000000001"), (2, "000000010000000000000005")):
+        result = create_base_backup(
+            config,
+            s3_client=moto_s3,
+            now=datetime(2026, 6, day, 2, 0, tzinfo=timezone.utc),
+            revision="r3s4t5u6v7w8",
+            start_wal_file=start,
+            popen=_FakePgDump(_base_tar_bytes()),
+        )
+
+    assert result["deleted_chains"] == 1
+    assert result["deleted_wal_files"] == 2
+    assert [chain["start_wal_file"] for chain in list_chains(config, s3_client=moto_s3)] == [
+        "000000010000000000000005"
+    ]
+    assert list_archived_wal(config, s3_client=moto_s3) == ["000000010000000000000005"]
@@ -0,0 +1,459 @@
+"""Query-count budgets for hot endpoints and jobs.
+
+Each budget allows ``fixed + per_item * size`` statements and is checked at
+every size in ``SIZES``. Responses are serialized through the route's
+``response_model`` inside the counted block, so lazy loads during
+serialization count too. An N+1 pattern adds statements with each size step
+and fails the larger size even if the small one passes.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+import hashlib
+
+import pytest
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.api import api_router
+from app.api.endpoints.admin_tenancy import list_organizations
+from app.api.endpoints.cloud_reports import (
+    get_cloud_dead_stock,
+    get_cloud_expiry_risk,
+    get_cloud_low_stock,
+    get_cloud_profit_summary,
+    get_cloud_sales_summary,
+    get_cloud_stock_risk_summary,
+    get_cloud_stock_value,
+)
+from app.api.endpoints.customers import list_customers
+from app.api.endpoints.dashboard import get_dashboard_kpis
+from app.api.endpoints.products import list_products_catalog
+from app.api.endpoints.sales import create_sale, list_sales
+from app.api.endpoints.sync import ingest_sync_event
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models import Branch, Device, Organization
+from app.models.cloud_projection import (
+    CloudBatchSnapshot,
+    CloudInventoryMovementFact,
+    CloudProductSnapshot,
+    CloudSaleFact,
+)
+from app.models.customer import Customer
+from app.models.sync_event import SyncEventType
+from app.models.tenancy import DeviceStatus
+from app.models.user import User, UserPermission, UserRole
+from app.schemas.sale import SaleCreate, SaleItemCreate
+from app.schemas.sync_ingestion import SyncIngestionRequest
+from app.services.notification_service import NotificationService
+from app.services.sync_identity_service import build_aggregate_uid
+from app.services.sync_outbox_service import SyncOutboxService
+
+SIZES = (2, 8)
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    fixed: int
+    per_item: int = 0
+
+    def limit(self, size: int) -> int:
+        return self.fixed + self.per_item * size
+
+
+# ``per_item`` is per sale line for create_sale; everything else must not grow
+# with data size.
+BUDGETS = {
+    "create_sale": QueryBudget(fixed=20, per_item=2),
+    "product_search": QueryBudget(fixed=5),
+    "dashboard_kpis": QueryBudget(fixed=7),
+    "list_sales": QueryBudget(fixed=3),
+    "list_customers": QueryBudget(fixed=2),
+    "list_organizations": QueryBudget(fixed=3),
+    "sync_ingest": QueryBudget(fixed=8),
+    "cloud_reports": QueryBudget(fixed=13),
+    "notification_checks": QueryBudget(fixed=13),
+}
+
+
+def _serialize(endpoint, result):
+    """Validate ``result`` against ``endpoint``'s response model, like FastAPI does."""
+    route = next(route for route in api_router.routes if getattr(route, "endpoint", None) is endpoint)
+    return TypeAdapter(route.response_model).validate_python(result, from_attributes=True)
+
+
+def _assert_within_budget(name: str, size: int, queries) -> None:
+    limit = BUDGETS[name].limit(size)
+    assert queries.count <= limit, (
+        f"{name} ran {queries.count} statements at size {size}; budget is {limit}:\n{queries}"
+    )
+
+
+@pytest.fixture()
+def stocked_products(db_session, category, product_factory, batch_factory):
+    products = []
+    for index in range(max(SIZES)):
+        product = product_factory(category.id, name=f"Budget Paracetamol {index}", sku=f"BUDGET-{index}")
+        for batch_index, expiry_offset_days in enumerate((200, 400)):
+            batch_factory(
+                product.id,
+                batch_number=f"BUDGET-{index}-{batch_index}",
+                quantity=100,
+                expiry_offset_days=expiry_offset_days,
+            )
+        products.append(product)
+    return products
+
+
+def _sale(products, *, lines: int) -> SaleCreate:
+    return SaleCreate(
+        items=[
+            SaleItemCreate(product_id=product.id, quantity=1, unit_price=3.5)
+            for product in products[:lines]
+        ],
+        amount_paid=100,
+    )
+
+
+def _sell(db_session, user: User, products, *, lines: int):
+    return create_sale(_sale(products, lines=lines), db=db_session, current_user=user)
+
+
+def test_create_sale_budget_grows_only_per_line(db_session, cashier_user, stocked_products, query_counter):
+    for lines in SIZES:
+        sale = _sale(stocked_products, lines=lines)
+        db_session.expire_all()
+        with query_counter() as queries:
+            _serialize(create_sale, create_sale(sale, db=db_session, current_user=cashier_user))
+
+        _assert_within_budget("create_sale", lines, queries)
+
+
+def test_product_search_budget(db_session, cashier_user, stocked_products, query_counter):
+    def search():
+        return _serialize(list_products_catalog, list_products_catalog(
+            q="paracetamol",
+            skip=0,
+            limit=25,
+            category_id=None,
+            is_active=True,
+            db=db_session,
+            current_user=cashier_user,
+        ))
+
+    for size in SIZES:
+        for index, product in enumerate(stocked_products):
+            product.is_active = index < size
+        db_session.commit()
+        search()  # stores the recalculated stock of the seeded products
+        db_session.expire_all()
+        with query_counter() as queries:
+            page = search()
+
+        assert page.total == size
+        _assert_within_budget("product_search", size, queries)
+
+
+def test_dashboard_kpis_budget(db_session, cashier_user, manager_user, stocked_products, query_counter):
+    sold = 0
+    for size in SIZES:
+        while sold < size:
+            _sell(db_session, cashier_user, stocked_products, lines=2)
+            sold += 1
+        db_session.expire_all()
+        with query_counter() as queries:
+            _serialize(get_dashboard_kpis, get_dashboard_kpis(db=db_session, current_user=manager_user))
+
+        _assert_within_budget("dashboard_kpis", size, queries)
+
+
+def _list_sales(db_session, user: User):
+    return list_sales(
+        skip=0,
+        limit=50,
+        start_date=None,
+        end_date=None,
+        cursor=None,
+        db=db_session,
+        current_user=user,
+        response=Response(),
+    )
+
+
+def test_list_sales_budget_loads_items_in_one_query(
+    db_session,
+    cashier_user,
+    manager_user,
+    stocked_products,
+    query_counter,
+):
+    sold = 0
+    for size in SIZES:
+        while sold < size:
+            _sell(db_session, cashier_user, stocked_products, lines=3)
+            sold += 1
+        db_session.expire_all()
+        with query_counter() as queries:
+            sales = _serialize(list_sales, _list_sales(db_session, manager_user))
+
+        assert len(sales) == size
+        assert all(len(sale.items) == 3 for sale in sales)
+        _assert_within_budget("list_sales", size, queries)
+
+
+def test_list_customers_budget(db_session, manager_user, assign_tenant_scope, query_counter):
+    _organization, branch, _other_branch = assign_tenant_scope(manager_user)
+    added = 0
+    for size in SIZES:
+        while added < size:
+            db_session.add(Customer(
+                organization_id=branch.organization_id,
+                branch_id=branch.id,
+                full_name=f"Budget Customer {added}",
+                phone=f"0244{added:06d}",
+            ))
+            added += 1
+        db_session.commit()
+        db_session.expire_all()
+        with query_counter() as queries:
+            customers = _serialize(list_customers, list_customers(
+                skip=0,
+                limit=50,
+                is_active=None,
+                db=db_session,
+                current_user=manager_user,
+            ))
+
+        assert len(customers) == size
+        _assert_within_budget("list_customers", size, queries)
+
+
+def test_list_organizations_budget_counts_branches_and_devices_in_bulk(db_session, admin_user, query_counter):
+    added = 0
+    for size in SIZES:
+        while added < size:
+            organization = Organization(name=f"Budget Pharmacy {added}")
+            db_session.add(organization)
+            db_session.flush()
+            branch = Branch(organization_id=organization.id, name="Main", code=f"BUD{added}")
+            db_session.add(branch)
+            db_session.flush()
+            db_session.add(Device(
+                organization_id=organization.id,
+                branch_id=branch.id,
+                device_uid=f"budget-device-{added}",
+                name="Server",
+                status=DeviceStatus.ACTIVE,
+            ))
+            added += 1
+        db_session.commit()
+        db_session.expire_all()
+        with query_counter() as queries:
+            organizations = _serialize(list_organizations, list_organizations(
+                active_only=False,
+                db=db_session,
+                _=admin_user,
+            ))
+
+        assert len(organizations) >= size
+        _assert_within_budget("list_organizations", size, queries)
+
+
+@pytest.fixture()
+def cloud_tenant(db_session):
+    organization = Organization(name="Budget Cloud Pharmacy")
+    db_session.add(organization)
+    db_session.flush()
+    branch = Branch(organization_id=organization.id, name="Main", code="BCLOUD")
+    db_session.add(branch)
+    db_session.flush()
+    device = Device(
+        organization_id=organization.id,
+        branch_id=branch.id,
+        device_uid="budget-cloud-device",
+        name="Main Server",
+        token_hash=hashlib.sha256(b"budget-sync-token").hexdigest(),
+        status=DeviceStatus.ACTIVE,
+    )
+    db_session.add(device)
+    db_session.commit()
+    return organization, branch, device
+
+
+def _ingest_request(organization, branch, device, sequence: int) -> SyncIngestionRequest:
+    payload = SyncOutboxService._json_safe({
+        "sale_id": sequence,
+        "invoice_number": f"INV-BUDGET-{sequence:06d}",
+        "total_amount": "12.50",
+    })
+    return SyncIngestionRequest(
+        event_id=f"00000000-0000-4000-8000-{sequence:012d}",
+        organization_id=organization.id,
+        branch_id=branch.id,
+        organization_uid=organization.organization_uid,
+        branch_uid=branch.branch_uid,
+        deployment_uid=device.deployment_uid,
+        device_uid=device.device_uid,
+        local_sequence_number=sequence,
+        event_type=SyncEventType.SALE_CREATED,
+        aggregate_type="sale",
+        aggregate_id=sequence,
+        aggregate_uid=build_aggregate_uid(device.deployment_uid, "sale", sequence),
+        payload=payload,
+        payload_hash=SyncOutboxService._payload_hash(payload),
+    )
+
+
+def test_sync_ingest_budget_is_flat_in_ingested_history(db_session, cloud_tenant, monkeypatch, query_counter):
+    monkeypatch.setattr(settings, "CLOUD_SYNC_REQUIRE_TOKEN", True)
+    organization, branch, device = cloud_tenant
+    sequence = 0
+    for size in SIZES:
+        while sequence < size - 1:
+            sequence += 1
+            ingest_sync_event(
+                _ingest_request(organization, branch, device, sequence),
+                authorization="Bearer budget-sync-token",
+                db=db_session,
+            )
+        sequence += 1
+        request = _ingest_request(organization, branch, device, sequence)
+        db_session.expire_all()
+        with query_counter() as queries:
+            _serialize(ingest_sync_event, ingest_sync_event(
+                request,
+                authorization="Bearer budget-sync-token",
+                db=db_session,
+            ))
+
+        _assert_within_budget("sync_ingest", size, queries)
+
+
+def _seed_cloud_product(db_session, organization, branch, device, index: int) -> None:
+    scope = {"organization_id": organization.id, "branch_id": branch.id}
+    now = datetime.now(timezone.utc)
+    db_session.add_all([
+        CloudProductSnapshot(
+            **scope,
+            local_product_id=index,
+            name=f"Budget Cloud Product {index}",
+            sku=f"BCP-{index}",
+            total_stock=index % 3,
+            low_stock_threshold=5,
+            reorder_level=10,
+            cost_price=Decimal("2.00"),
+            selling_price=Decimal("4.00"),
+            is_active=True,
+            last_source_event_id=index,
+            payload={},
+        ),
+        CloudBatchSnapshot(
+            **scope,
+            local_product_id=index,
+            local_batch_id=index,
+            batch_number=f"BCB-{index}",
+            quantity=index % 3,
+            expiry_date=date.today() + timedelta(days=5 * index),
+            cost_price=Decimal("2.00"),
+            is_quarantined=False,
+            last_source_event_id=index,
+            payload={},
+        ),
+        CloudSaleFact(
+            **scope,
+            source_event_id=index,
+            source_device_id=device.id,
+            local_sale_id=index,
+            invoice_number=f"INV-BCS-{index}",
+            total_amount=Decimal("8.00"),
+            item_count=2,
+            payload={},
+            occurred_at=now - timedelta(days=index % 10),
+        ),
+        CloudInventoryMovementFact(
+            **scope,
+            source_event_id=index,
+            line_number=1,
+            source_device_id=device.id,
+            event_type=SyncEventType.SALE_CREATED.value,
+            local_product_id=index,
+            local_batch_id=index,
+            quantity_delta=-2,
+            stock_after=index % 3,
+            payload={"unit_cost": "2.00"},
+        ),
+    ])
+
+
+@pytest.mark.asyncio
+async def test_cloud_reports_budget(db_session, async_db, cloud_tenant, query_counter):
+    organization, branch, device = cloud_tenant
+    report_user = User(
+        username="budget-report-user",
+        email="budget-report-user@example.com",
+        hashed_password=get_password_hash("budget-secret"),
+        full_name="Budget Report User",
+        role=UserRole.MANAGER,
+        permissions=[UserPermission.VIEW_REPORTS.value],
+        organization_id=organization.id,
+        is_active=True,
+    )
+    db_session.add(report_user)
+    db_session.commit()
+    scope = {"organization_id": organization.id, "db": async_db, "current_user": report_user}
+    seeded = 0
+    for size in SIZES:
+        while seeded < size:
+            seeded += 1
+            _seed_cloud_product(db_session, organization, branch, device, seeded)
+        db_session.commit()
+        db_session.expire_all()
+        with query_counter() as queries:
+            _serialize(get_cloud_sales_summary, await get_cloud_sales_summary(branch_id=None, start_at=None, end_at=None, **scope))
+            _serialize(get_cloud_stock_risk_summary, await get_cloud_stock_risk_summary(expiry_warning_days=90, **scope))
+            _serialize(get_cloud_low_stock, await get_cloud_low_stock(limit=50, **scope))
+            _serialize(get_cloud_expiry_risk, await get_cloud_expiry_risk(days=30, limit=50, **scope))
+            _serialize(get_cloud_dead_stock, await get_cloud_dead_stock(branch_id=None, period_days=30, limit=50, **scope))
+            _serialize(get_cloud_stock_value, await get_cloud_stock_value(branch_id=None, **scope))
+            _serialize(get_cloud_profit_summary, await get_cloud_profit_summary(branch_id=None, start_at=None, end_at=None, **scope))
+
+        _assert_within_budget("cloud_reports", size, queries)
+
+
+NOTIFICATION_CHECKS = (
+    NotificationService.check_low_stock,
+    NotificationService.check_out_of_stock,
+    NotificationService.check_expiring_products,
+    NotificationService.check_near_expiry,
+    NotificationService.check_dead_stock,
+    NotificationService.check_overstock,
+)
+
+
+def test_notification_checks_dedupe_in_one_query_per_check(
+    db_session,
+    category,
+    product_factory,
+    batch_factory,
+    query_counter,
+):
+    added = 0
+    for size in SIZES:
+        while added < size:
+            product = product_factory(category.id, name=f"Budget Alert {added}", sku=f"ALERT-{added}")
+            product.total_stock = added % 2  # low stock, half of it out of stock
+            db_session.commit()
+            batch_factory(product.id, batch_number=f"ALERT-{added}", quantity=1, expiry_offset_days=3)
+            added += 1
+        for check in NOTIFICATION_CHECKS:
+            check(db_session)
+        db_session.expire_all()
+        # Every candidate is notified now, so this round only dedupes.
+        with query_counter() as queries:
+            for check in NOTIFICATION_CHECKS:
+                check(db_session)
+
+        _assert_within_budget("notification_checks", size, queries)
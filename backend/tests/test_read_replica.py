@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import os
+import threading
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine
+
+from app.api.endpoints.cloud_reports import get_cloud_sales_summary
+from app.core.security import get_password_hash
+from app.core.metrics import read_routing, replica_lag
+from app.db import read_replica as read_replica_module
+from app.db.read_replica import ReadReplicaRouter, get_read_db, read_session, read_target
+from app.models import Branch, Device, Organization
+from app.models.cloud_projection import CloudSaleFact
+from app.models.sync_event import SyncEventType
+from app.models.sync_ingestion import IngestedSyncEvent
+from app.models.tenancy import DeviceStatus
+from app.models.user import User, UserPermission, UserRole
+from app.services.ai_briefing_service import AIBriefingService
+from app.services.ai_manager_service import AIManagerService
+from app.services.sync_identity_service import build_aggregate_uid
+
+
+async def _read_db(response: Response):
+    dependency = get_read_db(response)
+    return dependency, await dependency.__anext__()
+
+
+def _sale(db_session, total: str) -> tuple[Organization, User]:
+    organization = Organization(name="Replica Pharmacy")
+    db_session.add(organization)
+    db_session.flush()
+    branch = Branch(organization_id=organization.id, name="Replica Branch", code="REPLICA")
+    db_session.add(branch)
+    db_session.flush()
+    device = Device(
+        organization_id=organization.id,
+        branch_id=branch.id,
+        device_uid="replica-device",
+        name="Replica Server",
+        status=DeviceStatus.ACTIVE,
+    )
+    user = User(
+        username="replica-owner",
+        email="replica-owner@example.com",
+        hashed_password=get_password_hash("replica-secret"),
+        full_name="Replica Owner",
+        role=UserRole.MANAGER,
+        permissions=[UserPermission.VIEW_REPORTS.value],
+        organization_id=organization.id,
+        is_active=True,
+    )
+    db_session.add_all([device, user])
+    db_session.flush()
+    event = IngestedSyncEvent(
+        event_id="cccccccc-cccc-cccc-cccc-ccccccccccc1",
+        organization_id=organization.id,
+        branch_id=branch.id,
+        source_device_id=device.id,
+        deployment_uid=device.deployment_uid,
+        local_sequence_number=1,
+        event_type=SyncEventType.SALE_CREATED,
+        aggregate_type="sale",
+        aggregate_id=1,
+        aggregate_uid=build_aggregate_uid(device.deployment_uid, "sale", 1),
+        schema_version=1,
+        payload={"id": 1},
+        payload_hash="c" * 64,
+        duplicate_count=0,
+    )
+    db_session.add(event)
+    db_session.flush()
+    db_session.add(
+        CloudSaleFact(
+            source_event_id=event.id,
+            organization_id=organization.id,
+            branch_id=branch.id,
+            source_device_id=device.id,
+            local_sale_id=1,
+            invoice_number="R-1",
+            total_amount=Decimal(total),
+            payment_method="cash",
+            item_count=1,
+            payload={},
+        )
+    )
+    db_session.commit()
+    return organization, user
+
+
+@pytest.mark.asyncio
+async def test_reports_read_the_primary_when_no_replica_is_configured(async_db):
+    response = Response()
+    dependency, db = await _read_db(response)
+    try:
+        assert read_target(db).source == "primary"
+        assert db.bind is read_replica_module.async_engine
+    finally:
+        await dependency.aclose()
+
+    assert response.headers["X-Data-Source"] == "primary"
+    assert response.headers["X-Data-Staleness-Seconds"] == "0.000"
+    assert read_routing.value("primary", "no_replica") == 1
+
+
+@pytest.mark.asyncio
+async def test_reports_read_a_fresh_replica_and_report_its_staleness(
+    monkeypatch, read_replica, db_session
+):
+    organization, user = _sale(db_session, "42.00")
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", lambda self, connection: 2.5)
+
+    response = Response()
+    dependency, db = await _read_db(response)
+    try:
+        summary = await get_cloud_sales_summary(
+            organization_id=organization.id, db=db, current_user=user
+        )
+        target = read_target(db)
+    finally:
+        await dependency.aclose()
+
+    assert summary.total_revenue == 42.0
+    assert (target.source, target.staleness_seconds) == ("replica", 2.5)
+    assert response.headers["X-Data-Source"] == "replica"
+    assert response.headers["X-Data-Staleness-Seconds"] == "2.500"
+    assert replica_lag.value() == 2.5
+    assert read_routing.value("replica", "replica") == 1
+
+
+def test_lagging_or_unreachable_replica_falls_back_to_the_primary(monkeypatch, read_replica):
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", lambda self, connection: 120.0)
+    lagging = read_replica.target()
+
+    def unreachable(self, connection):
+        raise ConnectionError("replica down")
+
+    read_replica.clear()
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", unreachable)
+    unavailable = read_replica.target()
+
+    assert (lagging.source, lagging.reason) == ("primary", "replica_lagging")
+    assert (unavailable.source, unavailable.reason) == ("primary", "replica_unavailable")
+    assert read_routing.value("primary", "replica_lagging") == 1
+    assert read_routing.value("primary", "replica_unavailable") == 1
+
+
+def test_standby_without_a_streaming_wal_receiver_is_unavailable(monkeypatch, read_replica):
+    class DisconnectedStandby:
+        """PostgreSQL connection whose lag query finds no streaming WAL receiver."""
+
+        dialect = type("Dialect", (), {"name": "postgresql"})()
+
+        def __init__(self):
+            self.statements = []
+
+        def execute(self, statement):
+            self.statements.append(str(statement))
+            return type("Result", (), {"scalar": lambda result: None})()
+
+    standby = DisconnectedStandby()
+    measure_lag = ReadReplicaRouter._measure_lag
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", lambda self, connection: measure_lag(self, standby))
+
+    target = read_replica.target()
+
+    assert "pg_stat_wal_receiver WHERE status = 'streaming'" in standby.statements[0]
+    assert (target.source, target.reason) == ("primary", "replica_unavailable")
+    assert read_routing.value("primary", "replica_unavailable") == 1
+
+
+@pytest.mark.asyncio
+async def test_lag_is_measured_once_per_check_interval(monkeypatch, read_replica):
+    probes = []
+
+    def measure(self, connection):
+        probes.append(connection)
+        return 1.0
+
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", measure)
+
+    read_replica.target()
+    await read_replica.target_async()
+    read_replica.target()
+    assert len(probes) == 1
+
+    read_replica.clear()
+    read_replica.target()
+    assert len(probes) == 2
+
+
+def test_concurrent_requests_share_one_lag_probe(monkeypatch, read_replica):
+    probe_started = threading.Event()
+    release_probe = threading.Event()
+    probes = []
+
+    def slow_measure(self, connection):
+        probes.append(connection)
+        probe_started.set()
+        release_probe.wait(timeout=5)
+        return 1.0
+
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", slow_measure)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        probing = pool.submit(read_replica.target)
+        assert probe_started.wait(timeout=5)
+        # Requests arriving mid-probe do not start another one.
+        waiting = [pool.submit(read_replica.target) for _ in range(3)]
+        concurrent_targets = [future.result(timeout=5) for future in waiting]
+        release_probe.set()
+        probed_target = probing.result(timeout=5)
+
+    assert len(probes) == 1
+    assert {target.reason for target in concurrent_targets} == {"replica_unavailable"}
+    assert (probed_target.source, probed_target.staleness_seconds) == ("replica", 1.0)
+    assert read_replica.target().source == "replica"
+    assert len(probes) == 1
+
+
+def test_replica_pool_is_sized_from_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(read_replica_module.settings, "READ_REPLICA_DATABASE_URL", f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(read_replica_module.settings, "READ_REPLICA_POOL_SIZE", 2)
+    monkeypatch.setattr(read_replica_module.settings, "READ_REPLICA_MAX_OVERFLOW", 3)
+
+    router = read_replica_module._build_router()
+    try:
+        assert router.configured
+        assert (router.engine.pool.size(), router.engine.pool._max_overflow) == (2, 3)
+    finally:
+        router.engine.dispose()
+
+
+def test_read_session_uses_the_replica_only_while_it_is_fresh(monkeypatch, read_replica, db_session):
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", lambda self, connection: 0.0)
+    with read_session(db_session) as replica_db:
+        assert replica_db is not db_session
+        assert replica_db.get_bind() is read_replica.engine
+        assert read_target(replica_db).source == "replica"
+        # Nested analytics calls keep reading from the same session.
+        with read_session(replica_db) as nested:
+            assert nested is replica_db
+
+    read_replica.clear()
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", lambda self, connection: 300.0)
+    with read_session(db_session) as primary_db:
+        assert primary_db is db_session
+        assert read_target(primary_db).source == "primary"
+
+
+def test_ai_answers_and_briefings_carry_data_freshness(monkeypatch, read_replica, db_session):
+    organization, _user = _sale(db_session, "42.00")
+    monkeypatch.setattr(ReadReplicaRouter, "_measure_lag", lambda self, connection: 4.0)
+
+    result = AIManagerService.answer(
+        db_session,
+        message="What were total sales?",
+        organization_id=organization.id,
+        branch_id=None,
+        period_days=30,
+    )
+    briefing = AIBriefingService.briefing(
+        db_session,
+        organization_id=organization.id,
+        branch_id=None,
+        period_days=30,
+    )
+
+    assert result["tool_results"]["sales_summary"]["total_revenue"] == 42.0
+    assert result["data_scope"]["data_source"] == "replica"
+    assert result["data_scope"]["data_staleness_seconds"] == 4.0
+    assert (briefing["data_source"], briefing["data_staleness_seconds"]) == ("replica", 4.0)
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_READ_REPLICA_DATABASE_URL"),
+    reason="set TEST_READ_REPLICA_DATABASE_URL to a local PostgreSQL standby",
+)
+def test_lag_probe_against_a_postgresql_standby():
+    engine = create_engine(os.environ["TEST_READ_REPLICA_DATABASE_URL"])
+    router = ReadReplicaRouter(engine, None, max_lag_seconds=30, check_interval_seconds=0)
+    try:
+        with engine.connect() as connection:
+            lag = router._measure_lag(connection)
+    finally:
+        engine.dispose()
+
+    assert 0.0 <= lag < 30.0
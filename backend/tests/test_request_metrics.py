@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.api.endpoints.system_ops import get_metrics
+from app.core.config import settings
+from app.core.metrics import (
+    RequestMetricsMiddleware,
+    UNMATCHED_ROUTE,
+    http_request_db_duration,
+    http_request_duration,
+    http_request_statements,
+    instrument_engine,
+    metrics,
+    normalize_sql,
+    scheduler_job_duration,
+    slow_queries,
+    timed_job,
+)
+from app.services.scheduler import SchedulerService
+
+
+@pytest.fixture()
+def instrumented_client():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    instrument_engine(engine)
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        # A sync endpoint runs in the threadpool, like the real ones.
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT :item_id"), {"item_id": item_id})
+        return {"id": item_id}
+
+    with TestClient(app) as client:
+        yield client
+    engine.dispose()
+
+
+def test_request_latency_and_statements_are_recorded_per_route_template(instrumented_client):
+    assert instrumented_client.get("/items/1").status_code == 200
+    assert instrumented_client.get("/items/2").status_code == 200
+
+    assert http_request_duration.count("GET", "/items/{item_id}", "200") == 2
+    assert http_request_statements.count("GET", "/items/{item_id}") == 2
+    assert http_request_statements.total("GET", "/items/{item_id}") == 6
+    assert http_request_db_duration.total("GET", "/items/{item_id}") > 0
+
+
+def test_unmatched_paths_share_one_route_label(instrumented_client):
+    instrumented_client.get("/nope/1")
+    instrumented_client.get("/nope/2")
+
+    assert http_request_duration.count("GET", UNMATCHED_ROUTE, "404") == 2
+
+
+def test_slow_queries_are_logged_with_normalized_sql_and_route(instrumented_client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+        instrumented_client.get("/items/7")
+
+    assert slow_queries.value("/items/{item_id}") == 3
+    assert "in /items/{item_id}: SELECT ?" in caplog.records[0].getMessage()
+
+
+def test_normalize_sql_collapses_literals_and_parameter_lists():
+    statement = """
+        SELECT sales.id FROM sales
+        WHERE sales.branch_id = %(branch_id_1)s AND sales.invoice_number = 'INV-0042'
+          AND sales.id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s) AND sales.total_amount > 12.50
+        LIMIT 25
+    """
+
+    assert normalize_sql(statement) == (
+        "SELECT sales.id FROM sales WHERE sales.branch_id = ? AND sales.invoice_number = ? "
+        "AND sales.id IN (?...) AND sales.total_amount > ? LIMIT ?"
+    )
+    assert normalize_sql("SELECT created_at::date FROM sales WHERE id = $1") == (
+        "SELECT created_at::date FROM sales WHERE id = ?"
+    )
+
+
+def test_timed_job_records_duration_even_when_the_job_raises():
+    def failing_job():
+        raise RuntimeError("boom")
+
+    timed_job("nightly", lambda: None)()
+    with pytest.raises(RuntimeError):
+        timed_job("nightly", failing_job)()
+
+    assert scheduler_job_duration.count("nightly") == 2
+
+
+def test_scheduler_registers_timed_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "ENABLE_BACKGROUND_SCHEDULER", True)
+    service = SchedulerService()
+    service.start()
+    try:
+        job = service.scheduler.get_job("check_low_stock")
+        assert job.func.__wrapped__ is SchedulerService.check_low_stock
+    finally:
+        service.stop()
+
+
+def test_metrics_endpoint_requires_the_scrape_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_BEARER_TOKEN", "")
+    with pytest.raises(HTTPException) as disabled:
+        get_metrics(authorization="Bearer anything")
+    assert disabled.value.status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_BEARER_TOKEN", "scrape-secret")
+    for authorization in (None, "Bearer wrong"):
+        with pytest.raises(HTTPException) as rejected:
+            get_metrics(authorization=authorization)
+        assert rejected.value.status_code == 401
+
+
+def test_metrics_endpoint_renders_prometheus_text(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_BEARER_TOKEN", "scrape-secret")
+    http_request_duration.observe(0.02, "GET", "/api/sales/", "200")
+
+    response = get_metrics(authorization="Bearer scrape-secret")
+    body = response.body.decode()
+
+    assert response.media_type.startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/sales/",status="200",le="0.025"} 1' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/sales/",status="200",le="0.01"} 0' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/sales/",status="200"} 1' in body
+    assert body == metrics.render()
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
 from decimal import Decimal
 
 import pytest
-
-from app.api.endpoints.sales import create_sale, get_today_sales_summary
+from fastapi import HTTPException
+
+from app.api.endpoints.sales import (
+    _allocate_product_batches,
+    create_sale,
+    create_sales_batch,
+    get_today_sales_summary,
+)
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models import Branch, Organization, Product, User
 from app.models.activity_log import ActivityLog
 from app.models.inventory_movement import InventoryMovement
-from app.models.product import ProductBatch
+from app.models.product import DosageForm, PrescriptionStatus, ProductBatch
 from app.models.sale import Sale
 from app.models.sale import SalePricingMode
 from app.models.sync_event import SyncEvent, SyncEventType
+from app.models.user import UserRole
 from app.services.audit_service import AuditService
-from app.schemas.sale import SaleCreate, SaleItemCreate
+from app.schemas.sale import SaleBatchCreate, SaleCreate, SaleItemCreate
 
 
 def test_create_sale_rounds_and_stores_decimal_money(
@@ -245,6 +256,73 @@ def test_create_sale_sync_payload_preserves_split_batch_ids(
     ]
 
 
+def test_repeated_product_lines_share_fefo_batches_within_one_sale(
+    db_session,
+    cashier_user,
+    category,
+    product_factory,
+    batch_factory,
+):
+    product = product_factory(category.id, name="Repeated Line Product", sku="REPEAT-LINE-001")
+    late_batch = batch_factory(product.id, batch_number="REPEAT-B3", quantity=5, expiry_offset_days=180)
+    early_batch = batch_factory(product.id, batch_number="REPEAT-B1", quantity=2, expiry_offset_days=60)
+    middle_batch = batch_factory(product.id, batch_number="REPEAT-B2", quantity=3, expiry_offset_days=120)
+
+    sale = create_sale(
+        SaleCreate(
+            items=[
+                SaleItemCreate(product_id=product.id, quantity=3, unit_price=3.50, discount_amount=0.00),
+                SaleItemCreate(product_id=product.id, quantity=4, unit_price=3.50, discount_amount=0.00),
+            ],
+            discount_amount=0.00,
+            tax_amount=0.00,
+            amount_paid=24.50,
+        ),
+        db=db_session,
+        current_user=cashier_user,
+    )
+
+    sync_event = db_session.query(SyncEvent).filter(
+        SyncEvent.event_type == SyncEventType.SALE_CREATED,
+        SyncEvent.aggregate_id == sale.id,
+    ).one()
+    assert [(item["batch_id"], item["quantity"]) for item in sync_event.payload["items"]] == [
+        (early_batch.id, 2),
+        (middle_batch.id, 1),
+        (middle_batch.id, 2),
+        (late_batch.id, 2),
+    ]
+    for batch in (early_batch, middle_batch, late_batch):
+        db_session.refresh(batch)
+    assert (early_batch.quantity, middle_batch.quantity, late_batch.quantity) == (0, 0, 3)
+
+    with pytest.raises(HTTPException) as insufficient:
+        create_sale(
+            SaleCreate(
+                items=[
+                    SaleItemCreate(product_id=product.id, quantity=2, unit_price=3.50, discount_amount=0.00),
+                    SaleItemCreate(product_id=product.id, quantity=2, unit_price=3.50, discount_amount=0.00),
+                ],
+                discount_amount=0.00,
+                tax_amount=0.00,
+                amount_paid=14.00,
+            ),
+            db=db_session,
+            current_user=cashier_user,
+        )
+
+    assert insufficient.value.status_code == 400
+    assert insufficient.value.detail.endswith("Available: 1")
+    db_session.refresh(late_batch)
+    assert late_batch.quantity == 3
+    assert db_session.query(Sale).count() == 1
+
+    reserved = {late_batch.id: 2}
+    with pytest.raises(HTTPException) as over_reserved:
+        _allocate_product_batches(product, [late_batch], 2, reserved)
+    assert over_reserved.value.detail.endswith("Available in valid batches: 1")
+
+
 def test_create_sale_rolls_back_stock_and_ledger_when_audit_fails(
     db_session,
     monkeypatch,
@@ -284,3 +362,185 @@ def test_create_sale_rolls_back_stock_and_ledger_when_audit_fails(
     assert db_session.query(InventoryMovement).count() == 0
     assert db_session.query(SyncEvent).count() == 0
     assert refreshed_batch.quantity == 5
+
+
+def test_create_sale_replay_with_same_idempotency_key_returns_original_sale(
+    db_session,
+    cashier_user,
+    category,
+    product_factory,
+    batch_factory,
+):
+    product = product_factory(category.id, name="Replay Product", sku="REPLAY-001")
+    batch = batch_factory(
+        product.id,
+        batch_number="REPLAY-B1",
+        quantity=5,
+        expiry_offset_days=180,
+    )
+    sale_data = SaleCreate(
+        items=[SaleItemCreate(product_id=product.id, quantity=2, unit_price=3.50, discount_amount=0.00)],
+        discount_amount=0.00,
+        tax_amount=0.00,
+        amount_paid=7.00,
+        idempotency_key="till-1-0001-replay",
+    )
+
+    first = create_sale(sale_data, db=db_session, current_user=cashier_user)
+    replay = create_sale(sale_data, db=db_session, current_user=cashier_user)
+
+    refreshed_batch = db_session.query(ProductBatch).filter(ProductBatch.id == batch.id).one()
+    assert replay.id == first.id
+    assert db_session.query(Sale).count() == 1
+    assert db_session.query(InventoryMovement).count() == 1
+    assert refreshed_batch.quantity == 3
+
+
+def test_create_sales_batch_isolates_failures_and_reports_duplicates(
+    db_session,
+    cashier_user,
+    category,
+    product_factory,
+    batch_factory,
+):
+    product = product_factory(category.id, name="Batch Replay Product", sku="BATCH-REPLAY-001")
+    batch = batch_factory(
+        product.id,
+        batch_number="BATCH-REPLAY-B1",
+        quantity=5,
+        expiry_offset_days=180,
+    )
+
+    def queued(key: str, quantity: int) -> SaleCreate:
+        return SaleCreate(
+            items=[SaleItemCreate(product_id=product.id, quantity=quantity, unit_price=2.00, discount_amount=0.00)],
+            discount_amount=0.00,
+            tax_amount=0.00,
+            amount_paid=100.00,
+            idempotency_key=key,
+        )
+
+    already_synced = create_sale(queued("queued-sale-0001", 1), db=db_session, current_user=cashier_user)
+
+    result = create_sales_batch(
+        SaleBatchCreate(
+            sales=[
+                queued("queued-sale-0001", 1),
+                queued("queued-sale-0002", 2),
+                queued("queued-sale-0003", 10),
+                queued("queued-sale-0004", 1),
+                queued("queued-sale-0002", 2),
+            ]
+        ),
+        db=db_session,
+        current_user=cashier_user,
+    )
+
+    assert (result.created, result.duplicate, result.failed) == (2, 2, 1)
+    assert [item.outcome for item in result.results] == [
+        "duplicate",
+        "created",
+        "failed",
+        "created",
+        "duplicate",
+    ]
+    assert result.results[0].sale.id == already_synced.id
+    assert result.results[2].status_code == 400
+    assert "Insufficient stock" in result.results[2].error
+    assert result.results[4].sale.id == result.results[1].sale.id
+
+    refreshed_batch = db_session.query(ProductBatch).filter(ProductBatch.id == batch.id).one()
+    assert db_session.query(Sale).count() == 3
+    assert db_session.query(InventoryMovement).count() == 3
+    assert refreshed_batch.quantity == 1
+
+
+def _tenant_cashier_with_stock(db_session, category, name: str) -> tuple[User, int]:
+    organization = Organization(name=f"{name} Pharmacy")
+    db_session.add(organization)
+    db_session.flush()
+    branch = Branch(organization_id=organization.id, name="Main Branch", code="MAIN")
+    db_session.add(branch)
+    db_session.flush()
+    product = Product(
+        organization_id=organization.id,
+        branch_id=branch.id,
+        name=f"{name} Paracetamol",
+        sku=f"{name.upper()}-PARA",
+        dosage_form=DosageForm.TABLET,
+        prescription_status=PrescriptionStatus.OTC,
+        cost_price=2.0,
+        selling_price=3.5,
+        total_stock=0,
+        category_id=category.id,
+        is_active=True,
+    )
+    db_session.add(product)
+    db_session.flush()
+    db_session.add(
+        ProductBatch(
+            organization_id=organization.id,
+            branch_id=branch.id,
+            product_id=product.id,
+            batch_number=f"{name.upper()}-B1",
+            quantity=5,
+            expiry_date=date.today() + timedelta(days=180),
+            cost_price=2.0,
+        )
+    )
+    cashier = User(
+        username=f"{name.lower()}-cashier",
+        email=f"{name.lower()}-cashier@example.com",
+        hashed_password=get_password_hash("cashier-secret"),
+        full_name=f"{name} Cashier",
+        role=UserRole.CASHIER,
+        organization_id=organization.id,
+        branch_id=branch.id,
+        is_active=True,
+    )
+    db_session.add(cashier)
+    db_session.commit()
+    return cashier, product.id
+
+
+def test_tenants_can_replay_the_same_idempotency_key(monkeypatch, db_session, category):
+    monkeypatch.setattr(settings, "POS_DEPLOYMENT_PROFILE", "hosted")
+    first_cashier, first_product_id = _tenant_cashier_with_stock(db_session, category, "North")
+    second_cashier, second_product_id = _tenant_cashier_with_stock(db_session, category, "South")
+
+    def queued(product_id: int) -> SaleBatchCreate:
+        # Tills in different tenants can stamp the same provisional invoice.
+        return SaleBatchCreate(
+            sales=[
+                SaleCreate(
+                    items=[SaleItemCreate(product_id=product_id, quantity=1, unit_price=3.50)],
+                    amount_paid=3.50,
+                    idempotency_key="TMP-20260105-123456",
+                )
+            ]
+        )
+
+    first = create_sales_batch(queued(first_product_id), db=db_session, current_user=first_cashier)
+    second = create_sales_batch(queued(second_product_id), db=db_session, current_user=second_cashier)
+    replay = create_sales_batch(queued(second_product_id), db=db_session, current_user=second_cashier)
+
+    assert [item.outcome for item in first.results + second.results + replay.results] == [
+        "created",
+        "created",
+        "duplicate",
+    ]
+    assert first.results[0].sale.id != second.results[0].sale.id
+    assert replay.results[0].sale.id == second.results[0].sale.id
+    assert db_session.query(Sale).filter(Sale.idempotency_key == "TMP-20260105-123456").count() == 2
+
+
+def test_sale_batch_requires_an_idempotency_key_per_sale():
+    with pytest.raises(ValueError, match="idempotency_key"):
+        SaleBatchCreate(
+            sales=[
+                SaleCreate(
+                    items=[SaleItemCreate(product_id=1, quantity=1, unit_price=1.00)],
+                    amount_paid=1.00,
+                )
+            ]
+        )
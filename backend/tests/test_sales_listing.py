@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from fastapi import HTTPException, Response
+import pytest
+from sqlalchemy import event
+
+from app.api.endpoints.sales import list_sales
+from app.core.config import settings
+from app.models.sale import Sale, SaleItem
+
+
+def _seed_sales(db_session, cashier_user, product, created_ats: list[datetime]) -> list[Sale]:
+    sales = []
+    for index, created_at in enumerate(created_ats):
+        sale = Sale(
+            organization_id=cashier_user.organization_id,
+            branch_id=cashier_user.branch_id,
+            invoice_number=f"LIST-{index:04d}",
+            user_id=cashier_user.id,
+            subtotal=Decimal("5.00"),
+            total_amount=Decimal("5.00"),
+            amount_paid=Decimal("5.00"),
+            created_at=created_at,
+        )
+        db_session.add(sale)
+        db_session.flush()
+        db_session.add(
+            SaleItem(
+                organization_id=sale.organization_id,
+                branch_id=sale.branch_id,
+                sale_id=sale.id,
+                product_id=product.id,
+                product_name=product.name,
+                quantity=1,
+                unit_price=Decimal("5.00"),
+                total_price=Decimal("5.00"),
+            )
+        )
+        sales.append(sale)
+    db_session.commit()
+    return sales
+
+
+def _page(db_session, user, **params):
+    response = Response()
+    sales = list_sales(
+        skip=0,
+        limit=params.pop("limit", 50),
+        start_date=params.pop("start_date", None),
+        end_date=params.pop("end_date", None),
+        cursor=params.pop("cursor", None),
+        db=db_session,
+        current_user=user,
+        response=response,
+    )
+    return sales, response.headers.get("X-Next-Cursor")
+
+
+def test_list_sales_keyset_cursor_walks_every_sale_once(
+    db_session,
+    cashier_user,
+    category,
+    product_factory,
+):
+    product = product_factory(category.id, name="Listing Product", sku="LIST-001")
+    tied = datetime(2026, 10, 18, 9, 0, tzinfo=timezone.utc)
+    sales = _seed_sales(
+        db_session,
+        cashier_user,
+        product,
+        [tied, tied, tied, datetime(2026, 10, 18, 10, 0, tzinfo=timezone.utc), datetime(2026, 10, 17, 8, 0, tzinfo=timezone.utc)],
+    )
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page, cursor = _page(db_session, cashier_user, limit=2, cursor=cursor)
+        pages += 1
+        seen.extend(sale.id for sale in page)
+        if cursor is None:
+            break
+
+    expected = [sale.id for sale in sorted(sales, key=lambda sale: (sale.created_at, sale.id), reverse=True)]
+    assert seen == expected
+    assert pages == 3
+
+
+def test_list_sales_date_filters_are_half_open_utc_days(
+    db_session,
+    cashier_user,
+    category,
+    product_factory,
+):
+    product = product_factory(category.id, name="Range Product", sku="RANGE-001")
+    sales = _seed_sales(
+        db_session,
+        cashier_user,
+        product,
+        [
+            datetime(2026, 10, 16, 23, 59, 59, tzinfo=timezone.utc),
+            datetime(2026, 10, 17, 0, 0, tzinfo=timezone.utc),
+            datetime(2026, 10, 18, 23, 59, 59, tzinfo=timezone.utc),
+            datetime(2026, 10, 19, 0, 0, tzinfo=timezone.utc),
+        ],
+    )
+
+    page, cursor = _page(db_session, cashier_user, start_date=date(2026, 10, 17), end_date=date(2026, 10, 18))
+
+    assert [sale.id for sale in page] == [sales[2].id, sales[1].id]
+    assert cursor is None
+
+
+def test_list_sales_loads_items_with_one_extra_query(
+    db_session,
+    cashier_user,
+    category,
+    product_factory,
+):
+    product = product_factory(category.id, name="Eager Product", sku="EAGER-001")
+    _seed_sales(
+        db_session,
+        cashier_user,
+        product,
+        [datetime(2026, 10, 18, hour, 0, tzinfo=timezone.utc) for hour in range(8)],
+    )
+    db_session.expire_all()
+    cashier_user.organization_id  # reload the user outside the counted window
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        page, _cursor = _page(db_session, cashier_user)
+        assert sum(len(sale.items) for sale in page) == 8
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(statements) == 2
+
+
+def test_list_sales_keyset_query_uses_tenant_created_index(
+    db_session,
+    monkeypatch,
+    cashier_user,
+    assign_tenant_scope,
+    category,
+    product_factory,
+):
+    # Hosted mode scopes the listing to the user's branch.
+    assign_tenant_scope(cashier_user)
+    monkeypatch.setattr(settings, "APP_MODE", "online_pos")
+    product = product_factory(category.id, name="Plan Product", sku="PLAN-001")
+    _seed_sales(
+        db_session,
+        cashier_user,
+        product,
+        [datetime(2026, 10, 18, hour, 0, tzinfo=timezone.utc) for hour in range(3)],
+    )
+    _first_page, cursor = _page(db_session, cashier_user, limit=1)
+
+    captured = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        captured.append((statement, parameters))
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        _page(db_session, cashier_user, limit=1, start_date=date(2026, 10, 1), cursor=cursor)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = captured[0]
+    assert "FROM sales" in statement
+    plan = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    details = " ".join(row[-1] for row in plan)
+
+    assert "ix_sales_org_branch_created_id" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_list_sales_rejects_malformed_cursor(db_session, cashier_user):
+    with pytest.raises(HTTPException) as exc:
+        _page(db_session, cashier_user, cursor="not-a-cursor")
+
+    assert exc.value.status_code == 400
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING
+from sqlalchemy import create_engine
+
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import SchedulerService
+from app.services.scheduler_leadership import LeaderElector, SchedulerLeaderLock
+
+
+class _FakeLock:
+    def __init__(self, *, available: bool = True):
+        self.available = available
+        self.held = False
+        self.released = False
+
+    def try_acquire(self) -> bool:
+        self.held = self.available
+        return self.held
+
+    def is_held(self) -> bool:
+        return self.held
+
+    def release(self) -> None:
+        self.released = True
+        self.held = False
+
+
+def _elector(lock, events):
+    return LeaderElector(
+        lock,
+        on_elected=lambda: events.append("elected"),
+        on_demoted=lambda: events.append("demoted"),
+        retry_seconds=60,
+    )
+
+
+def test_leader_elector_fails_over_when_lock_session_is_lost():
+    events = []
+    follower_lock = _FakeLock(available=False)
+    follower = _elector(follower_lock, events)
+
+    follower.tick()
+    assert not follower.is_leader and events == []
+
+    # The previous leader died, releasing its advisory lock.
+    follower_lock.available = True
+    follower.tick()
+    assert follower.is_leader and events == ["elected"]
+
+    follower_lock.held = False
+    follower.tick()
+    assert not follower.is_leader and events == ["elected", "demoted"]
+
+
+def test_leader_elector_stop_demotes_and_releases_lock():
+    events = []
+    lock = _FakeLock()
+    elector = _elector(lock, events)
+
+    elector.start()
+    elector.stop()
+
+    assert events == ["elected", "demoted"]
+    assert lock.released
+
+
+def test_non_postgres_database_is_always_leader():
+    lock = SchedulerLeaderLock(create_engine("sqlite://"), lock_key=1)
+
+    assert not lock.uses_advisory_lock
+    assert lock.try_acquire()
+    assert lock.is_held()
+
+
+def test_scheduler_jobs_stay_paused_until_this_worker_is_leader(monkeypatch):
+    lock = _FakeLock(available=False)
+    monkeypatch.setattr(scheduler_module.settings, "ENABLE_BACKGROUND_SCHEDULER", True)
+    monkeypatch.setattr(scheduler_module.settings, "SCHEDULER_LEADER_ELECTION", True)
+    monkeypatch.setattr(scheduler_module, "SchedulerLeaderLock", lambda engine, key: lock)
+    service = SchedulerService()
+
+    service.start()
+    try:
+        assert service.scheduler.running
+        assert service.scheduler.get_job("check_low_stock") is not None
+        assert not service.is_leader
+        assert service.scheduler.state == STATE_PAUSED
+
+        lock.available = True
+        service.elector.tick()
+        assert service.is_leader
+        assert service.scheduler.state == STATE_RUNNING
+    finally:
+        service.stop()
+
+    assert lock.released
+    assert not service.scheduler.running
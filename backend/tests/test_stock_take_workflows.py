@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from app.api.endpoints.stock_takes import complete_stock_take, create_stock_take
+import io
+
+from app.api.endpoints.stock_takes import complete_stock_take, create_stock_take, upload_stock_take
 from app.core.config import settings
 from app.models.activity_log import ActivityLog
 from app.models.inventory_movement import InventoryMovement, InventoryMovementType
 from app.models.product import Product, ProductBatch
 from app.models.stock_adjustment import AdjustmentType, StockAdjustment
 from app.models.stock_take import StockTakeStatus
+from app.models.sync_event import SyncEvent, SyncEventType
 from app.schemas.stock_take import StockTakeComplete, StockTakeCreate, StockTakeItemCreate
 
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import event
 
 
 def test_complete_stock_take_applies_batch_correction_with_audit_and_movement(
@@ -148,3 +152,166 @@ def test_complete_stock_take_rejects_stale_count_when_batch_changed(
         InventoryMovement.source_document_type == "stock_take",
         InventoryMovement.source_document_id == stock_take.id,
     ).count() == 0
+
+
+def _count_statements(db_session):
+    statements = []
+
+    def count(_conn, _cursor, statement, _parameters, _context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", count)
+
+
+def test_stock_take_create_and_complete_use_set_based_queries(
+    db_session,
+    manager_user,
+    category,
+    product_factory,
+    batch_factory,
+):
+    def draft(line_count: int, prefix: str):
+        items = []
+        for index in range(line_count):
+            product = product_factory(category.id, name=f"{prefix} {index}", sku=f"{prefix}-{index:03d}")
+            batch = batch_factory(product.id, batch_number=f"{prefix}-B{index}", quantity=10, expiry_offset_days=180)
+            items.append(StockTakeItemCreate(product_id=product.id, batch_id=batch.id, counted_quantity=index % 3 + 8))
+        db_session.expire_all()
+        manager_user.id  # reload outside the counted window
+        statements, stop = _count_statements(db_session)
+        try:
+            stock_take = create_stock_take(
+                StockTakeCreate(reason="Full store count", items=items),
+                db=db_session,
+                current_user=manager_user,
+            )
+            created_statements = len(statements)
+            statements.clear()
+            complete_stock_take(stock_take.id, StockTakeComplete(), db=db_session, current_user=manager_user)
+            completed_statements = len(statements)
+        finally:
+            stop()
+        return created_statements, completed_statements
+
+    draft(1, "WARM")  # first use creates the outbox sequence counter
+    small = draft(3, "SMALL")
+    large = draft(30, "LARGE")
+
+    assert large == small
+
+
+def test_complete_stock_take_emits_one_event_with_running_stock_per_line(
+    db_session,
+    manager_user,
+    category,
+    product_factory,
+    batch_factory,
+):
+    product = product_factory(category.id, name="Two Batch Product", sku="TWO-001")
+    first_batch = batch_factory(product.id, batch_number="TWO-B1", quantity=10, expiry_offset_days=180)
+    second_batch = batch_factory(product.id, batch_number="TWO-B2", quantity=5, expiry_offset_days=240)
+    expired_product = product_factory(category.id, name="Expired Product", sku="EXP-001")
+    expired_batch = batch_factory(expired_product.id, batch_number="EXP-B1", quantity=4, expiry_offset_days=-10)
+    steady_product = product_factory(category.id, name="Steady Product", sku="STEADY-001")
+    steady_batch = batch_factory(steady_product.id, batch_number="STEADY-B1", quantity=6, expiry_offset_days=180)
+
+    stock_take = create_stock_take(
+        StockTakeCreate(
+            reason="Quarterly count",
+            items=[
+                StockTakeItemCreate(product_id=product.id, batch_id=first_batch.id, counted_quantity=7),
+                StockTakeItemCreate(product_id=expired_product.id, batch_id=expired_batch.id, counted_quantity=2),
+                StockTakeItemCreate(product_id=steady_product.id, batch_id=steady_batch.id, counted_quantity=6),
+                StockTakeItemCreate(product_id=product.id, batch_id=second_batch.id, counted_quantity=9),
+            ],
+        ),
+        db=db_session,
+        current_user=manager_user,
+    )
+    complete_stock_take(stock_take.id, StockTakeComplete(), db=db_session, current_user=manager_user)
+
+    movements = db_session.query(InventoryMovement).filter(
+        InventoryMovement.source_document_type == "stock_take",
+        InventoryMovement.source_document_id == stock_take.id,
+    ).order_by(InventoryMovement.id).all()
+    events = db_session.query(SyncEvent).filter(
+        SyncEvent.event_type == SyncEventType.STOCK_TAKE_COMPLETED,
+        SyncEvent.aggregate_id == stock_take.id,
+    ).all()
+    refreshed_product = db_session.query(Product).filter(Product.id == product.id).one()
+
+    assert [(movement.batch_id, movement.quantity_delta, movement.stock_after) for movement in movements] == [
+        (first_batch.id, -3, 12),
+        (expired_batch.id, -2, 0),
+        (second_batch.id, 4, 16),
+    ]
+    assert refreshed_product.total_stock == 16
+    assert db_session.query(StockAdjustment).count() == 3
+    assert len(events) == 1
+    assert events[0].payload["movement_count"] == 3
+    assert events[0].payload["line_count"] == 4
+    assert [line["batch_id"] for line in events[0].payload["lines"]] == [
+        first_batch.id,
+        expired_batch.id,
+        second_batch.id,
+    ]
+
+
+def test_upload_stock_take_reads_scanner_csv_by_batch_id_or_batch_number(
+    db_session,
+    manager_user,
+    category,
+    product_factory,
+    batch_factory,
+):
+    product = product_factory(category.id, name="Scanned Product", sku="SCAN-001")
+    coded_batch = batch_factory(product.id, batch_number="SCAN-B1", quantity=10, expiry_offset_days=180)
+    numbered_batch = batch_factory(product.id, batch_number="SCAN-B2", quantity=5, expiry_offset_days=180)
+    csv_body = (
+        "\ufeffBatch_ID,SKU,Batch_Number,Counted_Quantity,Reason\r\n"
+        f"{coded_batch.id},,,8,Shelf A\r\n"
+        "\r\n"
+        ",SCAN-001,SCAN-B2,5,\r\n"
+    ).encode("utf-8")
+
+    stock_take = upload_stock_take(
+        reason="Handheld scanner count",
+        notes=None,
+        file=UploadFile(file=io.BytesIO(csv_body), filename="count.csv"),
+        db=db_session,
+        current_user=manager_user,
+    )
+
+    assert stock_take.status == StockTakeStatus.DRAFT
+    assert sorted((item.batch_id, item.counted_quantity, item.variance_quantity, item.reason) for item in stock_take.items) == sorted(
+        [
+            (coded_batch.id, 8, -2, "Shelf A"),
+            (numbered_batch.id, 5, 0, None),
+        ]
+    )
+
+
+def test_upload_stock_take_reports_the_csv_line_of_an_unknown_batch(
+    db_session,
+    manager_user,
+    category,
+    product_factory,
+    batch_factory,
+):
+    product = product_factory(category.id, name="Unknown Scan Product", sku="UNKNOWN-001")
+    batch_factory(product.id, batch_number="UNKNOWN-B1", quantity=10, expiry_offset_days=180)
+    csv_body = b"sku,batch_number,counted_quantity\nUNKNOWN-001,UNKNOWN-B1,4\nUNKNOWN-001,MISSING,3\n"
+
+    with pytest.raises(HTTPException) as exc:
+        upload_stock_take(
+            reason="Handheld scanner count",
+            notes=None,
+            file=UploadFile(file=io.BytesIO(csv_body), filename="count.csv"),
+            db=db_session,
+            current_user=manager_user,
+        )
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "CSV line 3: batch not found"
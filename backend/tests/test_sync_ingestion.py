@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import gzip
 import hashlib
 import json
+from datetime import datetime, timedelta, timezone
 
 import pytest
 from fastapi import HTTPException
@@ -10,10 +12,13 @@ from app.api.endpoints.sync import ingest_sync_event
 from app.core.config import settings
 from app.models import Branch, Device, Organization
 from app.models.sync_event import SyncEventType
-from app.models.sync_ingestion import IngestedSyncEvent
+from app.models.sync_ingestion import IngestedSyncEvent, SyncIngestionStats
 from app.models.tenancy import DeviceStatus
 from app.schemas.sync_ingestion import SyncIngestionRequest
+from app.services.cloud_projection_service import CloudProjectionService
+from app.services.sync_event_archive_service import SyncEventArchiveService
 from app.services.sync_identity_service import build_aggregate_uid
+from app.services.sync_ingestion_stats_service import SyncIngestionStatsService
 
 
 def _payload_hash(payload: dict) -> str:
@@ -287,3 +292,114 @@ def test_ingest_sync_event_fails_closed_when_sync_token_is_not_configured(
 
     assert exc.value.status_code == 503
     assert "not configured" in exc.value.detail.lower()
+
+
+def test_ingest_and_projection_keep_ingestion_counters_in_step(db_session, registered_device):
+    organization, branch, device = registered_device
+    first = _request(organization, branch)
+    _ingest(first, db_session=db_session)
+    _ingest(first, db_session=db_session)
+    _ingest(
+        _request(organization, branch, event_id="22222222-2222-2222-2222-222222222222", sequence=2),
+        db_session=db_session,
+    )
+    CloudProjectionService.project_pending(db_session)
+
+    stats = db_session.query(SyncIngestionStats).one()
+    assert (stats.organization_id, stats.branch_id, stats.source_device_id) == (organization.id, branch.id, device.id)
+    assert stats.ingested_count == 2
+    assert stats.duplicate_count == 1
+    assert stats.projected_count + stats.failed_count == 2
+    assert stats.last_received_at is not None
+    totals = SyncIngestionStatsService.totals(db_session, organization_id=organization.id)
+    assert totals["unprojected_event_count"] == 0
+    assert SyncIngestionStatsService.reconcile(db_session) == {"checked": 1, "mismatched": 0, "repaired": 0}
+
+
+def test_reconcile_repairs_drifted_ingestion_counters(db_session, registered_device):
+    organization, branch, _device = registered_device
+    _ingest(_request(organization, branch), db_session=db_session)
+    stats = db_session.query(SyncIngestionStats).one()
+    stats.ingested_count = 40
+    stats.duplicate_count = 3
+    db_session.commit()
+
+    result = SyncIngestionStatsService.reconcile(db_session)
+
+    db_session.refresh(stats)
+    assert result == {"checked": 1, "mismatched": 1, "repaired": 1}
+    assert (stats.ingested_count, stats.duplicate_count) == (1, 0)
+    assert SyncIngestionStatsService.reconcile(db_session)["mismatched"] == 0
+
+
+def test_archived_events_stay_counted_and_idempotent(monkeypatch, tmp_path, db_session, registered_device):
+    organization, branch, device = registered_device
+    monkeypatch.setattr(settings, "SYNC_EVENT_ARCHIVE_DIR", str(tmp_path))
+    requests = [
+        _request(organization, branch, event_id=f"{sequence}" * 8 + "-1111-1111-1111-111111111111", sequence=sequence)
+        for sequence in (1, 2, 3)
+    ]
+    for request in requests:
+        _ingest(request, db_session=db_session)
+    _ingest(requests[0], db_session=db_session)
+    now = datetime.now(timezone.utc)
+    for event in db_session.query(IngestedSyncEvent).all():
+        event.projected_at = now
+        event.projection_error = None
+        if event.local_sequence_number < 3:
+            event.received_at = now - timedelta(days=120)
+    db_session.commit()
+    SyncIngestionStatsService.reconcile(db_session)
+    before = SyncIngestionStatsService.totals(db_session, organization_id=organization.id)
+
+    result = SyncEventArchiveService.archive(db_session, older_than_days=90)
+
+    assert result == {"devices": 1, "archived": 2, "files": 1}
+    assert [event.local_sequence_number for event in db_session.query(IngestedSyncEvent).all()] == [3]
+    stats = db_session.query(SyncIngestionStats).one()
+    assert (stats.archived_through_sequence, stats.archived_count, stats.archived_duplicate_count) == (2, 2, 1)
+    archive_file = tmp_path / f"org_{organization.id}" / f"device_{device.id}" / "000000000001-000000000002.jsonl.gz"
+    with gzip.open(archive_file, "rt", encoding="utf-8") as handle:
+        archived = [json.loads(line) for line in handle]
+    assert [row["event_id"] for row in archived] == [requests[0].event_id, requests[1].event_id]
+    assert SyncIngestionStatsService.totals(db_session, organization_id=organization.id) == before
+    assert SyncIngestionStatsService.reconcile(db_session)["mismatched"] == 0
+
+    response = _ingest(requests[1], db_session=db_session)
+
+    assert response.duplicate is True
+    assert response.ingested_event_id is None
+    assert db_session.query(IngestedSyncEvent).count() == 1
+    assert SyncIngestionStatsService.totals(db_session, organization_id=organization.id)["duplicate_delivery_count"] == 2
+    assert SyncIngestionStatsService.reconcile(db_session)["mismatched"] == 0
+    assert SyncEventArchiveService.archive(db_session, older_than_days=90)["archived"] == 0
+
+
+
+def test_archive_stops_at_a_sequence_the_cloud_never_received(monkeypatch, tmp_path, db_session, registered_device):
+    organization, branch, _device = registered_device
+    monkeypatch.setattr(settings, "SYNC_EVENT_ARCHIVE_DIR", str(tmp_path))
+    requests = {
+        sequence: _request(organization, branch, event_id=f"{sequence}" * 8 + "-2222-2222-2222-222222222222", sequence=sequence)
+        for sequence in (1, 2, 3, 4)
+    }
+    # Event 3 failed to upload and is still pending on the device.
+    for sequence in (1, 2, 4):
+        _ingest(requests[sequence], db_session=db_session)
+    long_ago = datetime.now(timezone.utc) - timedelta(days=120)
+    for event in db_session.query(IngestedSyncEvent).all():
+        event.projected_at = long_ago
+        event.projection_error = None
+        event.received_at = long_ago
+    db_session.commit()
+
+    result = SyncEventArchiveService.archive(db_session, older_than_days=90)
+
+    assert result["archived"] == 2
+    assert db_session.query(SyncIngestionStats).one().archived_through_sequence == 2
+
+    late = _ingest(requests[3], db_session=db_session)
+
+    assert late.duplicate is False
+    assert late.ingested_event_id is not None
+    assert sorted(event.local_sequence_number for event in db_session.query(IngestedSyncEvent).all()) == [3, 4]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta, timezone
+
 from app.core.config import settings
 from app.models import Branch, Device, Organization, SyncEvent
 from app.models.sync_event import SyncEventStatus, SyncEventType
@@ -143,3 +145,29 @@ def test_upload_pending_marks_missing_identity_failed(monkeypatch, db_session):
     assert saved_event.status == SyncEventStatus.FAILED
     assert saved_event.retry_count == 1
     assert "missing organization" in saved_event.last_error
+
+
+def test_prune_acknowledged_keeps_events_after_oldest_undelivered(db_session):
+    events = [
+        SyncOutboxService.record_event(
+            db_session,
+            event_type=SyncEventType.PRODUCT_UPDATED,
+            aggregate_type="product",
+            aggregate_id=index,
+            payload={"product_id": index},
+        )
+        for index in range(1, 5)
+    ]
+    acknowledged_at = datetime.now(timezone.utc) - timedelta(days=40)
+    for event in events:
+        event.status = SyncEventStatus.SENT
+        event.acknowledged_at = acknowledged_at
+    events[2].status = SyncEventStatus.FAILED
+    db_session.commit()
+    kept_ids = {events[2].id, events[3].id}
+
+    result = SyncUploadService.prune_acknowledged(db_session, older_than_days=30)
+
+    assert result == {"watermark": events[2].local_sequence_number - 1, "deleted": 2}
+    assert {event.id for event in db_session.query(SyncEvent).all()} == kept_ids
+
@@ -0,0 +1,259 @@
+"""Plan regressions for hosted queries scoped by ``scope_query_to_user``."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi import Response
+from sqlalchemy import event
+
+from app.api.endpoints.customers import list_customers
+from app.api.endpoints.dashboard import get_dashboard_kpis
+from app.api.endpoints.products import list_products_catalog
+from app.api.endpoints.sales import get_today_sales_summary, list_sales
+from app.api.endpoints.stock_adjustments import list_stock_adjustments
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.customer import Customer
+from app.models.product import DosageForm, PrescriptionStatus, Product, ProductBatch
+from app.models.sale import Sale, SaleItem, SaleStatus
+from app.models.stock_adjustment import AdjustmentType, StockAdjustment
+from app.models.tenancy import Branch, Organization
+from app.models.user import User, UserRole
+
+
+@pytest.fixture()
+def hosted_tenants(db_session, monkeypatch, category):
+    """Two organizations with two branches each; returns a user in the first."""
+    monkeypatch.setattr(settings, "APP_MODE", "online_pos")
+    now = datetime.now(timezone.utc)
+    users = []
+    for org_index in range(2):
+        organization = Organization(name=f"Plan Pharmacy {org_index}")
+        db_session.add(organization)
+        db_session.flush()
+        for branch_index in range(2):
+            branch = Branch(
+                organization_id=organization.id,
+                name=f"Plan Branch {org_index}-{branch_index}",
+                code=f"PLAN{org_index}{branch_index}",
+            )
+            db_session.add(branch)
+            db_session.flush()
+            tag = f"{org_index}{branch_index}"
+            user = User(
+                username=f"plan-manager-{tag}",
+                email=f"plan-manager-{tag}@example.com",
+                hashed_password=get_password_hash("plan-secret"),
+                full_name=f"Plan Manager {tag}",
+                role=UserRole.MANAGER,
+                organization_id=organization.id,
+                branch_id=branch.id,
+                is_active=True,
+            )
+            db_session.add(user)
+            db_session.flush()
+            users.append(user)
+            _seed_branch(db_session, user, category.id, tag, now)
+    db_session.commit()
+    return users[0]
+
+
+def _seed_branch(db, user: User, category_id: int, tag: str, now: datetime) -> None:
+    scope = {"organization_id": user.organization_id, "branch_id": user.branch_id}
+    for index in range(6):
+        product = Product(
+            **scope,
+            name=f"Plan Product {tag}-{index}",
+            sku=f"PLAN-{tag}-{index}",
+            dosage_form=DosageForm.TABLET,
+            prescription_status=PrescriptionStatus.OTC,
+            cost_price=Decimal("2.00"),
+            selling_price=Decimal("3.50"),
+            total_stock=10,
+            low_stock_threshold=2,
+            reorder_level=5,
+            reorder_quantity=10,
+            category_id=category_id,
+            is_active=index % 3 != 0,
+        )
+        db.add(product)
+        db.flush()
+        db.add(ProductBatch(
+            **scope,
+            product_id=product.id,
+            batch_number=f"PLAN-{tag}-{index}-B1",
+            quantity=10,
+            expiry_date=date.today() + timedelta(days=10 * index),
+            cost_price=Decimal("2.00"),
+        ))
+        db.add(StockAdjustment(
+            **scope,
+            product_id=product.id,
+            adjustment_type=AdjustmentType.CORRECTION,
+            quantity=1,
+            performed_by=user.id,
+        ))
+        db.add(Customer(
+            **scope,
+            full_name=f"Plan Customer {tag}-{index}",
+            phone=f"0244{tag}{index:04d}",
+            is_active=index % 3 != 0,
+        ))
+        sale = Sale(
+            **scope,
+            invoice_number=f"PLAN-{tag}-{index:04d}",
+            user_id=user.id,
+            status=SaleStatus.COMPLETED if index % 2 else SaleStatus.CANCELLED,
+            subtotal=Decimal("7.00"),
+            total_amount=Decimal("7.00"),
+            amount_paid=Decimal("7.00"),
+            created_at=now - timedelta(hours=index),
+        )
+        db.add(sale)
+        db.flush()
+        db.add(SaleItem(
+            **scope,
+            sale_id=sale.id,
+            product_id=product.id,
+            product_name=product.name,
+            quantity=2,
+            unit_price=Decimal("3.50"),
+            total_price=Decimal("7.00"),
+        ))
+
+
+def _statements(db_session, call) -> list[tuple[str, object]]:
+    captured = []
+
+    def capture(_conn, _cursor, statement, parameters, _context, _executemany):
+        captured.append((statement, parameters))
+
+    db_session.expire_all()
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return captured
+
+
+def _plan(db_session, statement: str, parameters) -> str:
+    connection = db_session.connection()
+    if connection.dialect.name == "postgresql":
+        # The seeded tables are tiny; make the planner show its index choice.
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+        return " ".join(row[0] for row in rows)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return " ".join(row[-1] for row in rows)
+
+
+def _plans_from(db_session, call, table: str) -> list[str]:
+    plans = [
+        _plan(db_session, statement, parameters)
+        for statement, parameters in _statements(db_session, call)
+        if f"FROM {table}" in statement and "organization_id" in statement
+    ]
+    assert plans, f"no scoped statement read {table}"
+    return plans
+
+
+def test_sales_history_uses_tenant_created_index(db_session, hosted_tenants):
+    user = hosted_tenants
+
+    [plan] = _plans_from(
+        db_session,
+        lambda: list_sales(
+            skip=0,
+            limit=2,
+            start_date=date.today() - timedelta(days=1),
+            end_date=None,
+            cursor=None,
+            db=db_session,
+            current_user=user,
+            response=Response(),
+        ),
+        "sales",
+    )
+
+    assert "ix_sales_org_branch_created_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_sales_summary_reads_the_till_ledger_by_tenant_business_date(db_session, hosted_tenants):
+    user = hosted_tenants
+
+    plans = _plans_from(
+        db_session,
+        lambda: get_today_sales_summary(db=db_session, current_user=user),
+        "till_shifts",
+    )
+
+    assert "ix_till_shifts_org_branch_business_date" in plans[0]
+
+
+def test_dashboard_kpis_use_tenant_indexes(db_session, hosted_tenants):
+    user = hosted_tenants
+    call = lambda: get_dashboard_kpis(db=db_session, current_user=user)
+
+    sales_plan = _plans_from(db_session, call, "sales")[0]
+    product_plans = _plans_from(db_session, call, "products")
+    batch_plan = _plans_from(db_session, call, "product_batches")[0]
+
+    assert "ix_sales_org_branch_status_created" in sales_plan
+    assert all("ix_products_org_branch_active_name" in plan for plan in product_plans)
+    assert "ix_product_batches_org_branch_expiry" in batch_plan
+
+
+def test_product_catalog_uses_tenant_active_name_index(db_session, hosted_tenants):
+    user = hosted_tenants
+    call = lambda: list_products_catalog(
+        q=None,
+        skip=0,
+        limit=25,
+        category_id=None,
+        is_active=True,
+        db=db_session,
+        current_user=user,
+    )
+
+    count_plan, page_plan = _plans_from(db_session, call, "products")[:2]
+
+    assert "ix_products_org_branch_active_name" in count_plan
+    assert "ix_products_org_branch_active_name" in page_plan
+    assert "TEMP B-TREE" not in page_plan
+
+
+def test_customer_list_uses_tenant_active_name_index(db_session, hosted_tenants):
+    user = hosted_tenants
+
+    [plan] = _plans_from(
+        db_session,
+        lambda: list_customers(skip=0, limit=50, is_active=True, db=db_session, current_user=user),
+        "customers",
+    )
+
+    assert "ix_customers_org_branch_active_name" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_stock_adjustment_review_uses_tenant_created_index(db_session, hosted_tenants):
+    user = hosted_tenants
+
+    [plan] = _plans_from(
+        db_session,
+        lambda: list_stock_adjustments(
+            product_id=None,
+            batch_id=None,
+            limit=100,
+            db=db_session,
+            current_user=user,
+        ),
+        "stock_adjustments",
+    )
+
+    assert "ix_stock_adjustments_org_branch_created" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import importlib.util
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.endpoints.sales import (
+    create_sale,
+    get_end_of_day_closeout,
+    get_today_sales_summary,
+    refund_sale,
+    verify_end_of_day_closeout,
+)
+from app.api.endpoints.till_shifts import close_till_shift, get_current_till_shift, open_till_shift
+from app.core.security import get_password_hash
+from app.models.sale import PaymentMethod, Sale, SaleItem
+from app.models.till_shift import TillShift, TillShiftStatus
+from app.models.user import User, UserRole
+from app.schemas.sale import SaleActionRequest, SaleCreate, SaleItemCreate
+from app.schemas.till_shift import TillShiftClose, TillShiftOpen
+from app.services.till_ledger_service import TillLedgerService
+
+
+def _load_migration():
+    migration_path = (
+        Path(__file__).resolve().parents[1]
+        / "alembic"
+        / "versions"
+        / "c4d5e6f7a8b9_add_till_shifts.py"
+    )
+    spec = importlib.util.spec_from_file_location("till_shift_migration", migration_path)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture()
+def stocked_product(db_session, category, product_factory, batch_factory):
+    product = product_factory(category.id, name="Ledger Amoxicillin", sku="LEDGER-001")
+    product.cost_price = Decimal("2.00")
+    product.selling_price = Decimal("3.50")
+    db_session.commit()
+    batch_factory(product.id, batch_number="LEDGER-B1", quantity=50, expiry_offset_days=200)
+    db_session.refresh(product)
+    return product
+
+
+def _sell(db_session, user, product, quantity, payment_method=PaymentMethod.CASH):
+    total = float(Decimal("3.50") * quantity)
+    return create_sale(
+        SaleCreate(
+            items=[SaleItemCreate(product_id=product.id, quantity=quantity, unit_price=3.50)],
+            payment_method=payment_method,
+            amount_paid=total,
+        ),
+        db=db_session,
+        current_user=user,
+    )
+
+
+def test_checkout_and_refund_keep_the_shift_ledger_in_step_with_sales(
+    db_session,
+    admin_user,
+    cashier_user,
+    stocked_product,
+):
+    cash_sale = _sell(db_session, cashier_user, stocked_product, 2)
+    _sell(db_session, cashier_user, stocked_product, 4, PaymentMethod.MOMO)
+    refund_sale(
+        cash_sale.id,
+        SaleActionRequest(reason="Returned unopened"),
+        db=db_session,
+        current_user=admin_user,
+    )
+
+    shift = db_session.query(TillShift).one()
+    assert shift.user_id == cashier_user.id
+    assert shift.status == TillShiftStatus.OPEN
+    assert (shift.completed_count, shift.completed_amount) == (1, Decimal("14.00"))
+    assert (shift.refunded_count, shift.refunded_amount) == (1, Decimal("7.00"))
+    assert (shift.cash_amount, shift.momo_amount) == (Decimal("0.00"), Decimal("14.00"))
+    assert (shift.items_sold, shift.gross_profit) == (4, Decimal("6.00"))
+
+    closeout = get_end_of_day_closeout(
+        business_date=datetime.now(timezone.utc).date(),
+        db=db_session,
+        current_user=admin_user,
+    )
+    summary = get_today_sales_summary(db=db_session, current_user=admin_user)
+    verification = verify_end_of_day_closeout(
+        business_date=datetime.now(timezone.utc).date(),
+        db=db_session,
+        current_user=admin_user,
+    )
+
+    assert closeout["completed_sales_count"] == 1
+    assert closeout["refunded_revenue"] == 7.0
+    assert closeout["momo_revenue"] == 14.0
+    assert summary == {
+        "total_sales": 1,
+        "total_revenue": 14.0,
+        "total_profit": 6.0,
+        "total_items_sold": 4,
+    }
+    assert verification["in_balance"] is True
+    assert verification["drift"] == []
+
+
+def test_closeout_verification_reports_sales_missing_from_the_ledger(
+    db_session,
+    admin_user,
+    cashier_user,
+    stocked_product,
+):
+    _sell(db_session, cashier_user, stocked_product, 1)
+    stray_sale = Sale(
+        organization_id=cashier_user.organization_id,
+        branch_id=cashier_user.branch_id,
+        invoice_number="INV-IMPORTED-1",
+        user_id=cashier_user.id,
+        subtotal=Decimal("10.00"),
+        total_amount=Decimal("10.00"),
+        payment_method=PaymentMethod.CASH,
+        amount_paid=Decimal("10.00"),
+    )
+    db_session.add(stray_sale)
+    db_session.commit()
+
+    verification = verify_end_of_day_closeout(
+        business_date=datetime.now(timezone.utc).date(),
+        db=db_session,
+        current_user=admin_user,
+    )
+
+    assert verification["in_balance"] is False
+    assert verification["ledger"]["completed_sales_count"] == 1
+    assert verification["recomputed"]["completed_sales_count"] == 2
+    drift = {entry["field"]: entry["difference"] for entry in verification["drift"]}
+    assert drift == {"completed_count": -1.0, "completed_amount": -10.0, "cash_amount": -10.0}
+
+
+def test_cashier_drawer_session_reports_expected_cash_and_variance(
+    db_session,
+    cashier_user,
+    stocked_product,
+):
+    opened = open_till_shift(TillShiftOpen(opening_float=50.0), db=db_session, current_user=cashier_user)
+    with pytest.raises(HTTPException) as duplicate:
+        open_till_shift(TillShiftOpen(), db=db_session, current_user=cashier_user)
+    _sell(db_session, cashier_user, stocked_product, 2)
+
+    current = get_current_till_shift(db=db_session, current_user=cashier_user)
+    closed = close_till_shift(
+        opened.id,
+        TillShiftClose(counted_cash=56.0),
+        db=db_session,
+        current_user=cashier_user,
+    )
+    _sell(db_session, cashier_user, stocked_product, 1)
+
+    assert duplicate.value.status_code == 409
+    assert current.id == opened.id
+    assert closed.status == TillShiftStatus.CLOSED
+    assert closed.expected_cash == Decimal("57.00")
+    assert closed.cash_variance == Decimal("-1.00")
+    reopened = get_current_till_shift(db=db_session, current_user=cashier_user)
+    assert reopened.id != opened.id
+    assert reopened.completed_count == 1
+
+
+def test_refund_after_the_shift_closed_is_booked_into_the_refunding_shift(
+    db_session,
+    admin_user,
+    cashier_user,
+    stocked_product,
+):
+    opened = open_till_shift(TillShiftOpen(opening_float=50.0), db=db_session, current_user=cashier_user)
+    sale = _sell(db_session, cashier_user, stocked_product, 2)
+    close_till_shift(opened.id, TillShiftClose(counted_cash=57.0), db=db_session, current_user=cashier_user)
+    today = datetime.now(timezone.utc).date()
+    yesterday = today - timedelta(days=1)
+    db_session.query(TillShift).filter(TillShift.id == opened.id).update({TillShift.business_date: yesterday})
+    db_session.query(Sale).filter(Sale.id == sale.id).update(
+        {Sale.created_at: datetime.now(timezone.utc) - timedelta(days=1)}
+    )
+    db_session.commit()
+
+    refund_sale(sale.id, SaleActionRequest(reason="Returned next day"), db=db_session, current_user=admin_user)
+
+    closed = db_session.get(TillShift, opened.id)
+    db_session.refresh(closed)
+    assert (closed.completed_count, closed.refunded_count) == (1, 0)
+    assert closed.cash_amount == Decimal("7.00")
+    assert (closed.expected_cash, closed.cash_variance) == (Decimal("57.00"), Decimal("0.00"))
+    refunding = db_session.query(TillShift).filter(TillShift.id != opened.id).one()
+    assert (refunding.user_id, refunding.business_date) == (admin_user.id, today)
+    assert refunding.status == TillShiftStatus.OPEN
+    assert (refunding.refunded_count, refunding.refunded_amount) == (1, Decimal("7.00"))
+    assert refunding.cash_amount == Decimal("-7.00")
+    assert db_session.get(Sale, sale.id).reversal_till_shift_id == refunding.id
+    for business_date in (yesterday, today):
+        verification = verify_end_of_day_closeout(
+            business_date=business_date,
+            db=db_session,
+            current_user=admin_user,
+        )
+        assert verification["drift"] == []
+    assert verification["ledger"]["refunded_revenue"] == 7.0
+    assert verification["ledger"]["cash_revenue"] == -7.0
+
+
+def test_closing_another_cashiers_shift_requires_report_access(
+    db_session,
+    cashier_user,
+    manager_user,
+):
+    other_cashier = User(
+        username="other-cashier",
+        email="other-cashier@example.com",
+        hashed_password=get_password_hash("cashier-secret"),
+        full_name="Other Cashier",
+        role=UserRole.CASHIER,
+        organization_id=cashier_user.organization_id,
+        branch_id=cashier_user.branch_id,
+        is_active=True,
+    )
+    db_session.add(other_cashier)
+    db_session.commit()
+    shift = open_till_shift(TillShiftOpen(), db=db_session, current_user=cashier_user)
+
+    with pytest.raises(HTTPException) as forbidden:
+        close_till_shift(shift.id, TillShiftClose(counted_cash=0), db=db_session, current_user=other_cashier)
+    closed = close_till_shift(shift.id, TillShiftClose(counted_cash=0), db=db_session, current_user=manager_user)
+
+    assert forbidden.value.status_code == 403
+    assert closed.closed_by == manager_user.id
+
+
+def test_migration_backfill_rebuilds_the_ledger_from_existing_sales(
+    db_session,
+    admin_user,
+    cashier_user,
+    stocked_product,
+):
+    refunded = _sell(db_session, cashier_user, stocked_product, 3)
+    _sell(db_session, cashier_user, stocked_product, 2, PaymentMethod.CARD)
+    _sell(db_session, admin_user, stocked_product, 1)
+    refund_sale(refunded.id, SaleActionRequest(reason="Wrong strength"), db=db_session, current_user=admin_user)
+    today = datetime.now(timezone.utc).date()
+    expected = TillLedgerService.day_totals(db_session, admin_user, today)
+
+    db_session.query(Sale).update({Sale.till_shift_id: None})
+    db_session.query(SaleItem).update({SaleItem.unit_cost: None})
+    db_session.query(TillShift).delete()
+    _load_migration()._backfill(db_session.connection())
+    db_session.commit()
+
+    shifts = db_session.query(TillShift).all()
+    assert {shift.user_id for shift in shifts} == {cashier_user.id, admin_user.id}
+    assert all(shift.status == TillShiftStatus.CLOSED for shift in shifts)
+    assert db_session.query(Sale).filter(Sale.till_shift_id.is_(None)).count() == 0
+    assert TillLedgerService.day_totals(db_session, admin_user, today) == expected
+    assert TillLedgerService.recompute_day_totals(db_session, admin_user, today) == expected
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import logging
+import os
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.api import api_router
+from app.core.metrics import instrument_pool, pool_capacity, pool_in_use, pool_saturation
+from app.core.config import settings
+from app.db.base import (
+    SessionLocal,
+    connections_per_worker,
+    get_db,
+    log_connection_budget,
+    workload_engines,
+)
+from app.db.workloads import (
+    Workload,
+    current_workload,
+    statement_timeout_connect_args,
+    use_workload,
+    workload_scope,
+)
+from app.services.notification_service import NotificationService
+from app.services.scheduler import SchedulerService
+
+
+def _route_workload(path: str, method: str) -> Workload:
+    for route in api_router.routes:
+        if route.path == path and method in route.methods:
+            tags = [
+                dependency.call.workload
+                for dependency in route.dependant.dependencies
+                if hasattr(dependency.call, "workload")
+            ]
+            # Route-level tags run after the router's and win.
+            return tags[-1]
+    raise AssertionError(f"{method} {path} is not routed")
+
+
+def test_sessions_bind_to_the_pool_of_the_current_workload():
+    default_session = SessionLocal()
+    with workload_scope(Workload.POS_CRITICAL):
+        checkout_session = SessionLocal()
+    after_scope = SessionLocal()
+    try:
+        assert default_session.get_bind() is workload_engines[Workload.INTERACTIVE_READ]
+        assert checkout_session.get_bind() is workload_engines[Workload.POS_CRITICAL]
+        assert after_scope.workload is Workload.INTERACTIVE_READ
+        assert len({id(engine.pool) for engine in workload_engines.values()}) == len(Workload)
+    finally:
+        for session in (default_session, checkout_session, after_scope):
+            session.close()
+
+
+def test_router_and_route_tags_choose_the_request_pool():
+    router = APIRouter()
+
+    @router.get("/checkout")
+    def checkout(db=Depends(get_db)):
+        return {"session": db.workload, "endpoint": current_workload()}
+
+    @router.get("/history", dependencies=[Depends(use_workload(Workload.INTERACTIVE_READ))])
+    def history(db=Depends(get_db)):
+        return {"session": db.workload, "endpoint": current_workload()}
+
+    app = FastAPI()
+    app.include_router(router, dependencies=[Depends(use_workload(Workload.POS_CRITICAL))])
+
+    with TestClient(app) as client:
+        assert client.get("/checkout").json() == {"session": "pos_critical", "endpoint": "pos_critical"}
+        assert client.get("/history").json() == {"session": "interactive_read", "endpoint": "interactive_read"}
+
+
+def test_api_routers_are_tagged_with_their_workload():
+    assert _route_workload("/sales", "POST") is Workload.POS_CRITICAL
+    assert _route_workload("/sales", "GET") is Workload.INTERACTIVE_READ
+    assert _route_workload("/products/search", "GET") is Workload.INTERACTIVE_READ
+    assert _route_workload("/system/audit-logs/export", "GET") is Workload.REPORTING
+    assert _route_workload("/system/sync-now", "POST") is Workload.REPORTING
+    assert _route_workload("/sync/project", "POST") is Workload.REPORTING
+    assert _route_workload("/sync/ingest", "POST") is Workload.SYNC_INGEST
+
+
+def test_background_pool_is_left_to_scheduler_jobs():
+    assert not [
+        route.path
+        for route in api_router.routes
+        if _route_workload(route.path, next(iter(route.methods))) is Workload.BACKGROUND
+    ]
+
+
+def test_scheduler_jobs_open_sessions_in_their_workload(monkeypatch):
+    seen = []
+    monkeypatch.setattr(NotificationService, "check_low_stock", lambda db: seen.append(db.workload))
+
+    SchedulerService.check_low_stock()
+
+    assert seen == [Workload.BACKGROUND]
+    assert current_workload() is Workload.INTERACTIVE_READ
+
+
+def test_statement_timeout_is_a_per_session_postgresql_setting():
+    assert statement_timeout_connect_args("postgresql://pos@db/pos", 10000) == {
+        "options": "-c statement_timeout=10000"
+    }
+    assert statement_timeout_connect_args("postgresql+asyncpg://pos@db/pos", 120000) == {
+        "server_settings": {"statement_timeout": "120000"}
+    }
+    assert statement_timeout_connect_args("postgresql://pos@db/pos", 0) == {}
+    assert statement_timeout_connect_args("sqlite:///./pharma_pos.db", 10000) == {}
+
+
+def test_pool_saturation_is_exported_per_workload(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=1)
+    instrument_pool(engine, "reporting", 2)
+    try:
+        first = engine.connect()
+        second = engine.connect()
+        assert pool_in_use.value("reporting") == 2
+        assert pool_capacity.value("reporting") == 2
+        assert pool_saturation.value("reporting") == 1.0
+
+        first.close()
+        assert pool_saturation.value("reporting") == 0.5
+        second.close()
+        assert pool_in_use.value("reporting") == 0
+    finally:
+        engine.dispose()
+
+
+def test_two_workers_fit_under_the_default_connection_limit(monkeypatch, caplog):
+    assert connections_per_worker() == 43
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 2)
+    with caplog.at_level(logging.INFO, logger="app.db.base"):
+        assert log_connection_budget() == 86
+    assert "43 primary connections per worker, 86 for 2 worker(s)" in caplog.text
+    assert not [record for record in caplog.records if record.levelno >= logging.WARNING]
+
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 3)
+    caplog.clear()
+    with caplog.at_level(logging.INFO, logger="app.db.base"):
+        log_connection_budget()
+    assert "over DB_MAX_CONNECTIONS=100" in caplog.text
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL", "").startswith("postgresql"),
+    reason="statement_timeout needs PostgreSQL",
+)
+def test_postgresql_cancels_statements_over_the_workload_timeout():
+    database_url = os.environ["TEST_DATABASE_URL"]
+    engine = create_engine(database_url, connect_args=statement_timeout_connect_args(database_url, 100))
+    try:
+        with engine.connect() as connection, pytest.raises(OperationalError, match="statement timeout"):
+            connection.execute(text("SELECT pg_sleep(1)"))
+    finally:
+        engine.dispose()
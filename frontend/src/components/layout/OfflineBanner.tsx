@@ -59,7 +59,7 @@ export default function OfflineBanner({ onlineStatus }: Props) {
       setBannerState('flushing')
       try {
         const result = await flush(
-          (payload) => api.createSale(payload as any),
+          (sales) => api.createSalesBatch(sales),
           async () => {
             const remaining = await pendingCount()
             setQueueSize(remaining)
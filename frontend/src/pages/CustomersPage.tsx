@@ -45,6 +45,17 @@ interface FollowUp {
   message_text?: string
 }
 
+interface ReceiptMessage {
+  id: number
+  sale_id?: number
+  channel: string
+  status: string
+  attempts: number
+  sent_at?: string
+  last_error?: string
+  created_at: string
+}
+
 const CONSENT_COLOR: Record<string, string> = {
   granted: '#16a34a',
   declined: '#dc2626',
@@ -78,6 +89,7 @@ export default function CustomersPage() {
   const [selected, setSelected] = useState<Customer | null>(null)
   const [followUps, setFollowUps] = useState<FollowUp[]>([])
   const [isLoadingFollowUps, setIsLoadingFollowUps] = useState(false)
+  const [receipts, setReceipts] = useState<ReceiptMessage[]>([])
 
   useEffect(() => {
     loadCustomers()
@@ -99,10 +111,15 @@ export default function CustomersPage() {
     setSelected(c)
     setIsLoadingFollowUps(true)
     try {
-      const data = await api.getCustomerFollowUps(c.id)
-      setFollowUps(data)
+      const [followUpData, receiptData] = await Promise.all([
+        api.getCustomerFollowUps(c.id),
+        api.getCustomerMessages(c.id).catch(() => []),
+      ])
+      setFollowUps(followUpData)
+      setReceipts(receiptData)
     } catch {
       setFollowUps([])
+      setReceipts([])
     } finally {
       setIsLoadingFollowUps(false)
     }
@@ -307,6 +324,36 @@ export default function CustomersPage() {
                 </div>
               )}
             </div>
+
+            {/* Receipt delivery */}
+            {receipts.length > 0 && (
+              <div>
+                <p style={{ margin: '0 0 10px', fontSize: 13, fontWeight: 600 }} className="text-gray-700 dark:text-gray-300">
+                  Digital Receipts
+                </p>
+                <div style={{ display: 'flex', flexDirection: 'column', gap: 6 }}>
+                  {receipts.slice(0, 10).map(r => (
+                    <div key={r.id} style={{
+                      border: '1px solid #e5e7eb', borderRadius: 8, padding: '8px 12px',
+                      borderLeft: `3px solid ${r.status === 'sent' ? '#16a34a' : r.status === 'failed' ? '#dc2626' : '#d97706'}`,
+                    }}>
+                      <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
+                        <span style={{ fontSize: 12, fontWeight: 600, textTransform: 'capitalize', color: '#374151' }}>{r.status}</span>
+                        <span style={{ fontSize: 11, color: '#9ca3af' }}>{r.sale_id ? `Sale #${r.sale_id}` : r.channel}</span>
+                      </div>
+                      <p style={{ margin: '4px 0 0', fontSize: 11, color: '#6b7280' }}>
+                        Queued: {new Date(r.created_at).toLocaleDateString('en-GB')}
+                        {r.sent_at && ` · Sent: ${new Date(r.sent_at).toLocaleDateString('en-GB')}`}
+                        {r.status !== 'sent' && r.attempts > 0 && ` · ${r.attempts} attempt${r.attempts !== 1 ? 's' : ''}`}
+                      </p>
+                      {r.last_error && r.status !== 'sent' && (
+                        <p style={{ margin: '2px 0 0', fontSize: 11, color: '#dc2626' }}>{r.last_error.slice(0, 80)}</p>
+                      )}
+                    </div>
+                  ))}
+                </div>
+              </div>
+            )}
           </div>
         </div>
       ) : (
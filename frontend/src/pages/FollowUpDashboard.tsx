@@ -49,6 +49,7 @@ export default function FollowUpDashboard() {
   const [followUps, setFollowUps] = useState<FollowUp[]>([])
   const [isLoading, setIsLoading] = useState(true)
   const [filter, setFilter] = useState<'pending' | 'all'>('pending')
+  const [receiptQueue, setReceiptQueue] = useState({ pending: 0, failed: 0 })
 
   useEffect(() => {
     load()
@@ -57,8 +58,13 @@ export default function FollowUpDashboard() {
   const load = async () => {
     setIsLoading(true)
     try {
-      const data = await api.getPendingFollowUps()
+      const [data, pendingReceipts, failedReceipts] = await Promise.all([
+        api.getPendingFollowUps(),
+        api.getOutboundMessages('pending').catch(() => []),
+        api.getOutboundMessages('failed').catch(() => []),
+      ])
       setFollowUps(data)
+      setReceiptQueue({ pending: pendingReceipts.length, failed: failedReceipts.length })
     } catch {
       toast.error('Failed to load follow-ups')
     } finally {
@@ -109,6 +115,13 @@ export default function FollowUpDashboard() {
           </div>
         )}
 
+        {(receiptQueue.pending > 0 || receiptQueue.failed > 0) && (
+          <p style={{ margin: '14px 0 0', fontSize: 13 }} className="text-gray-600 dark:text-gray-400">
+            Digital receipts: <strong>{receiptQueue.pending}</strong> queued for delivery
+            {receiptQueue.failed > 0 && <> · <strong style={{ color: '#dc2626' }}>{receiptQueue.failed}</strong> failed after retries</>}
+          </p>
+        )}
+
         {/* Stat tiles */}
         <div style={{ display: 'grid', gridTemplateColumns: 'repeat(4, 1fr)', gap: 12, marginTop: 16 }}>
           {[
@@ -108,7 +108,7 @@ export default function OfflineQueuePage() {
     setFlushing(true)
     try {
       const result = await flush(
-        (payload) => api.createSale(payload as never),
+        (sales) => api.createSalesBatch(sales),
         () => loadQueue(),
       )
       toast.success(`Flushed ${result.flushed} sale(s). ${result.failed} failed.`)
@@ -29,20 +29,28 @@ export default function SalesPage() {
   const [expandedSales, setExpandedSales] = useState<Set<number>>(new Set())
   const [startDate, setStartDate] = useState('')
   const [endDate, setEndDate] = useState('')
+  const [activeFilters, setActiveFilters] = useState<{ start_date?: string; end_date?: string }>({})
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [isLoadingMore, setIsLoadingMore] = useState(false)
 
   useEffect(() => {
     loadSales()
   }, [])
 
-  const loadSales = async (filters?: { start_date?: string; end_date?: string }) => {
+  const buildParams = (filters: { start_date?: string; end_date?: string }) => {
+    const params: any = { limit: 50 }
+    if (filters.start_date) params.start_date = filters.start_date
+    if (filters.end_date) params.end_date = filters.end_date
+    return params
+  }
+
+  const loadSales = async (filters: { start_date?: string; end_date?: string } = {}) => {
     setIsLoading(true)
     try {
-      const params: any = { limit: 50 }
-      if (filters?.start_date) params.start_date = filters.start_date
-      if (filters?.end_date) params.end_date = filters.end_date
-
-      const data = await api.getSales(params)
-      setSales(data)
+      const page = await api.getSalesPage(buildParams(filters))
+      setSales(page.items)
+      setNextCursor(page.nextCursor)
+      setActiveFilters(filters)
     } catch (error) {
       toast.error('Failed to load sales')
     } finally {
@@ -50,6 +58,20 @@ export default function SalesPage() {
     }
   }
 
+  const loadMore = async () => {
+    if (!nextCursor) return
+    setIsLoadingMore(true)
+    try {
+      const page = await api.getSalesPage({ ...buildParams(activeFilters), cursor: nextCursor })
+      setSales((current) => [...current, ...page.items])
+      setNextCursor(page.nextCursor)
+    } catch (error) {
+      toast.error('Failed to load more sales')
+    } finally {
+      setIsLoadingMore(false)
+    }
+  }
+
   const handleFilter = () => {
     if (startDate && endDate && startDate > endDate) {
       toast.error('Start date must be before end date')
@@ -285,6 +307,17 @@ export default function SalesPage() {
             )}
           </table>
         </div>
+        {nextCursor && !isLoading && (
+          <div className="p-4 text-center border-t border-gray-200 dark:border-gray-700">
+            <button
+              onClick={loadMore}
+              disabled={isLoadingMore}
+              className="btn-secondary px-6"
+            >
+              {isLoadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   )
@@ -193,11 +193,21 @@ class ApiClient {
     return response.data
   }
 
+  async createSalesBatch(sales: any[]) {
+    const response = await this.client.post('/sales/batch', { sales })
+    return response.data
+  }
+
   async getSales(params?: any) {
     const response = await this.client.get('/sales', { params })
     return response.data
   }
 
+  async getSalesPage(params?: any): Promise<{ items: any[]; nextCursor: string | null }> {
+    const response = await this.client.get('/sales', { params })
+    return { items: response.data, nextCursor: response.headers['x-next-cursor'] ?? null }
+  }
+
   async getSale(id: number) {
     const response = await this.client.get(`/sales/${id}`)
     return response.data
@@ -576,6 +586,16 @@ class ApiClient {
     return response.data
   }
 
+  async getCustomerMessages(customerId: number) {
+    const response = await this.client.get(`/customers/${customerId}/messages`)
+    return response.data
+  }
+
+  async getOutboundMessages(status?: 'pending' | 'sent' | 'failed', limit = 200) {
+    const response = await this.client.get('/customers/messages', { params: { status, limit } })
+    return response.data
+  }
+
   async getCustomerAnalytics(periodDays = 30) {
     const response = await this.client.get('/customers/analytics', { params: { period_days: periodDays } })
     return response.data
@@ -0,0 +1,70 @@
+import { describe, expect, it, vi } from 'vitest'
+
+import { postChunk, type BatchSaleResult, type QueuedSale } from './offlineQueue'
+
+function queued(localInvoice: string, payload: Record<string, unknown>): QueuedSale {
+  return {
+    localInvoice,
+    idempotencyKey: `key-${localInvoice}`,
+    payload,
+    queuedAt: '2026-01-05T08:00:00.000Z',
+    attempts: 0,
+    status: 'pending',
+  }
+}
+
+function validationError() {
+  return Object.assign(new Error('Request failed with status code 422'), {
+    response: { status: 422, data: { detail: [{ msg: 'Field required' }] } },
+  })
+}
+
+/** Stand-in for ``/sales/batch``: rejects the whole request if any sale has no items. */
+async function salesBatch(sales: Record<string, unknown>[]): Promise<BatchSaleResult> {
+  if (sales.some((sale) => !Array.isArray(sale.items))) throw validationError()
+  return {
+    created: sales.length,
+    duplicate: 0,
+    failed: 0,
+    results: sales.map((sale, index) => ({
+      index,
+      idempotency_key: sale.idempotency_key as string,
+      outcome: 'created',
+      sale: { invoice_number: `INV-${index}` },
+      status_code: 201,
+    })),
+  }
+}
+
+describe('offlineQueue postChunk', () => {
+  it('re-posts a rejected chunk one sale at a time so only the malformed sale fails', async () => {
+    const postBatch = vi.fn(salesBatch)
+    const chunk = [
+      queued('TMP-1', { items: [{ product_id: 1, quantity: 1 }] }),
+      queued('TMP-2', { payment_method: 'cash' }),
+      queued('TMP-3', { items: [{ product_id: 2, quantity: 2 }] }),
+    ]
+
+    const outcomes = await postChunk(chunk, postBatch)
+
+    expect(postBatch).toHaveBeenCalledTimes(4)
+    expect(outcomes.map((outcome) => [outcome.index, outcome.outcome])).toEqual([
+      [0, 'created'],
+      [1, 'failed'],
+      [2, 'created'],
+    ])
+    expect(outcomes[1]).toMatchObject({
+      idempotency_key: 'key-TMP-2',
+      status_code: 422,
+      error: 'HTTP 422: Field required',
+    })
+  })
+
+  it('rethrows transport failures so the items stay pending', async () => {
+    const offline = new Error('Network Error')
+    const postBatch = vi.fn().mockRejectedValue(offline)
+
+    await expect(postChunk([queued('TMP-1', { items: [] })], postBatch)).rejects.toBe(offline)
+    expect(postBatch).toHaveBeenCalledTimes(1)
+  })
+})
@@ -8,9 +8,13 @@
  *   1. When connectivity is lost, the POS calls ``enqueue()`` instead of
  *      posting to the API.
  *   2. When connectivity returns, ``flush()`` drains the queue by posting
- *      each pending transaction to the API in FIFO order.
+ *      pending transactions to ``/sales/batch`` in FIFO chunks. Each sale
+ *      carries an idempotency key, so replaying a chunk is safe.
  *   3. If a flush fails (server rejects the payload) the item is marked
  *      ``failed`` after MAX_ATTEMPTS and skipped so the queue does not jam.
+ *      A payload that fails validation makes the server reject its whole
+ *      chunk, so a rejected chunk is re-posted one sale at a time and only
+ *      the bad sale is charged an attempt.
  *   4. Successful flushes remove the item from the queue permanently.
  *   5. Failed items can be inspected, individually retried, or exported
  *      (CSV / JSON) via the Offline Queue management page (/offline-queue).
@@ -31,6 +35,7 @@ export const MAX_ATTEMPTS = 3
 export interface QueuedSale {
   id?: number           // auto-incremented by IndexedDB
   localInvoice: string  // provisional invoice number stamped at queue time
+  idempotencyKey?: string  // sent with the sale so replays never double-record it
   payload: Record<string, unknown>
   queuedAt: string      // ISO timestamp
   attempts: number
@@ -91,6 +96,7 @@ export async function enqueue(
     const store = tx.objectStore(STORE_NAME)
     const item: QueuedSale = {
       localInvoice: invoice,
+      idempotencyKey: crypto.randomUUID(),
       payload,
       queuedAt: new Date().toISOString(),
       attempts: 0,
@@ -182,15 +188,105 @@ export interface FlushResult {
   remaining: number
 }
 
+export interface BatchSaleOutcome {
+  index: number
+  idempotency_key: string
+  outcome: 'created' | 'duplicate' | 'failed'
+  sale?: { invoice_number?: string } | null
+  status_code: number
+  error?: string | null
+}
+
+export interface BatchSaleResult {
+  created: number
+  duplicate: number
+  failed: number
+  results: BatchSaleOutcome[]
+}
+
+/** Sales posted per ``/sales/batch`` request (the backend accepts up to 100). */
+export const FLUSH_BATCH_SIZE = 50
+
+function toBatchSale(item: QueuedSale): Record<string, unknown> {
+  return {
+    ...item.payload,
+    // Items queued before keys existed fall back to their provisional invoice.
+    idempotency_key: item.idempotencyKey ?? item.localInvoice,
+  }
+}
+
+/**
+ * HTTP status when the server rejected the request itself, e.g. a 422 because
+ * one sale in the batch failed validation. Transport failures, expired
+ * sessions (401/403) and throttling (408/429) return ``undefined``: those stop
+ * the flush and leave the items pending instead of counting attempts.
+ */
+function rejectionStatus(error: unknown): number | undefined {
+  const status = (error as { response?: { status?: unknown } } | null)?.response?.status
+  if (typeof status !== 'number' || status < 400 || status >= 500) return undefined
+  if ([401, 403, 408, 429].includes(status)) return undefined
+  return status
+}
+
+function rejectionDetail(error: unknown, status: number): string {
+  const detail = (error as { response?: { data?: { detail?: unknown } } }).response?.data?.detail
+  if (typeof detail === 'string') return detail
+  if (Array.isArray(detail) && typeof detail[0]?.msg === 'string') return `HTTP ${status}: ${detail[0].msg}`
+  return `HTTP ${status}`
+}
+
 /**
- * Drain the queue by posting each pending item to the API.
+ * Post one chunk and return an outcome per item, indexed into ``chunk``.
  *
- * @param postSale - A function that accepts the sale payload and POSTs it to
- *   the backend. Should resolve on success and reject on failure.
- * @param onProgress - Optional callback called after each item is processed.
+ * When the server rejects the whole request, each sale is posted on its own
+ * so the valid ones still go through and the rejected one comes back as a
+ * ``failed`` outcome. Any other error is rethrown.
+ */
+export async function postChunk(
+  chunk: QueuedSale[],
+  postBatch: (sales: Record<string, unknown>[]) => Promise<BatchSaleResult>,
+): Promise<BatchSaleOutcome[]> {
+  try {
+    const result = await postBatch(chunk.map(toBatchSale))
+    return result.results
+  } catch (error) {
+    const status = rejectionStatus(error)
+    if (status === undefined) throw error
+    if (chunk.length === 1) {
+      return [
+        {
+          index: 0,
+          idempotency_key: toBatchSale(chunk[0]).idempotency_key as string,
+          outcome: 'failed',
+          status_code: status,
+          error: rejectionDetail(error, status),
+        },
+      ]
+    }
+    const outcomes: BatchSaleOutcome[] = []
+    for (let index = 0; index < chunk.length; index++) {
+      const [outcome] = await postChunk([chunk[index]], postBatch)
+      if (outcome) outcomes.push({ ...outcome, index })
+    }
+    return outcomes
+  }
+}
+
+/**
+ * Drain the queue by posting pending items to ``/sales/batch`` in FIFO chunks.
+ *
+ * Every sale carries its idempotency key, so a chunk whose response was lost
+ * can be replayed safely: sales the server already recorded come back as
+ * ``duplicate`` and are removed like fresh ones.
+ *
+ * @param postBatch - A function that POSTs a list of sale payloads to the
+ *   backend batch endpoint. A 4xx rejection of the whole request falls back
+ *   to posting each sale on its own (see ``postChunk``); any other rejection
+ *   (e.g. network loss) stops the flush and leaves the remaining items pending.
+ * @param onProgress - Optional callback called after each chunk is processed.
  */
 export async function flush(
-  postSale: (payload: Record<string, unknown>) => Promise<unknown>,
+  postBatch: (sales: Record<string, unknown>[]) => Promise<BatchSaleResult>,
   onProgress?: (result: FlushResult) => void,
 ): Promise<FlushResult> {
   const db = await openDB()
@@ -200,24 +296,28 @@ export async function flush(
   let flushed = 0
   let failed = 0
 
-  for (const item of pending) {
-    try {
-      await postSale(item.payload)
-      await deleteItem(db, item.id!)
-      flushed++
-    } catch (err: unknown) {
-      item.attempts++
-      item.lastError = err instanceof Error ? err.message : String(err)
-      // After MAX_ATTEMPTS, mark as failed so the queue does not jam.
-      if (item.attempts >= MAX_ATTEMPTS) {
-        item.status = 'failed'
-        failed++
+  for (let start = 0; start < pending.length; start += FLUSH_BATCH_SIZE) {
+    const chunk = pending.slice(start, start + FLUSH_BATCH_SIZE)
+    const outcomes = await postChunk(chunk, postBatch)
+    for (const outcome of outcomes) {
+      const item = chunk[outcome.index]
+      if (!item) continue
+      if (outcome.outcome === 'failed') {
+        item.attempts++
+        item.lastError = outcome.error ?? `HTTP ${outcome.status_code}`
+        // After MAX_ATTEMPTS, mark as failed so the queue does not jam.
+        if (item.attempts >= MAX_ATTEMPTS) {
+          item.status = 'failed'
+          failed++
+        }
+        await updateItem(db, item)
+      } else {
+        await deleteItem(db, item.id!)
+        flushed++
       }
-      await updateItem(db, item)
     }
     if (onProgress) {
-      const remaining = (await pendingCount()) - flushed
-      onProgress({ flushed, failed, remaining })
+      onProgress({ flushed, failed, remaining: await pendingCount() })
     }
   }
 